@@ -49,8 +49,15 @@ parser.add_argument('-g', '--no-gui', action='store_true',
         help='does not load the manager gui module')
 parser.add_argument('-c', '--config', default='', help='configuration file')
 parser.add_argument('-l', '--logdir', default='', help='log directory')
+parser.add_argument('--profile-startup', action='store_true',
+        help='record the startup time of every module, see the manager window')
 args = parser.parse_args()
 
+# start the startup profiler before the heavy imports
+if args.profile_startup:
+    from .startup_profiler import profiler
+    profiler.enable()
+
 
 # install logging facility
 from .logger import initialize_logger
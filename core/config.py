@@ -9,6 +9,10 @@ to dump numpy dtypes and numpy ndarrays.
 
 The fix of the scientific notation is applied globally at module import.
 
+Status variables are saved with save_status, which stores numpy ndarrays in
+uncompressed .npy files named by their content hash. They are only written if
+the array changed and are memory-mapped on loading.
+
 The idea of the implementation of the OrderedDict was taken from
 http://stackoverflow.com/questions/5121931/in-python-how-can-you-load-yaml-mappings-as-ordereddicts
 
@@ -32,6 +36,8 @@ top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi
 """
 
 from collections import OrderedDict
+import glob
+import hashlib
 import numpy
 import re
 import os
@@ -80,6 +86,17 @@ def ordered_load(stream, Loader=yaml.Loader):
         arrays = numpy.load(filename)
         return arrays['array']
 
+    def construct_npy_ndarray(loader, node):
+        """
+        The constructor for a numpy array that is saved in an uncompressed .npy
+        file next to the YAML file. The file is memory-mapped copy-on-write, so
+        only the accessed parts are read and changes do not alter the file.
+        """
+        filename = loader.construct_yaml_str(node)
+        if not os.path.isabs(filename):
+            filename = os.path.join(os.path.dirname(stream.name), filename)
+        return numpy.load(filename, mmap_mode='c')
+
     def construct_frozenset(loader, node):
         """
         The frozenset constructor.
@@ -120,6 +137,9 @@ def ordered_load(stream, Loader=yaml.Loader):
     OrderedLoader.add_constructor(
             '!extndarray',
             construct_external_ndarray)
+    OrderedLoader.add_constructor(
+            '!npyarray',
+            construct_npy_ndarray)
     OrderedLoader.add_constructor(
         '!frozenset',
         construct_frozenset)
@@ -136,13 +156,17 @@ def ordered_load(stream, Loader=yaml.Loader):
         return OrderedDict()
 
 
-def ordered_dump(data, stream=None, Dumper=yaml.Dumper, **kwds):
+def ordered_dump(data, stream=None, Dumper=yaml.Dumper, npy_files=None, **kwds):
     """
     dumps (OrderedDict) data in YAML format
 
     @param OrderedDict data: the data
     @param Stream stream: where the data in YAML is dumped
     @param Dumper Dumper: The dumper that is used as a base class
+    @param set npy_files: optional, save arrays as uncompressed .npy files named
+                          by their content hash next to the file of the stream
+                          and add the names of all written array files to this
+                          set
     """
     class OrderedDumper(Dumper):
         """
@@ -188,6 +212,11 @@ def ordered_dump(data, stream=None, Dumper=yaml.Dumper, **kwds):
         """
         Representer for numpy ndarrays
         """
+        if npy_files is not None and not array_data.dtype.hasobject:
+            try:
+                return represent_npy_ndarray(dumper, array_data)
+            except (AttributeError, OSError):
+                pass
         try:
             filename = os.path.splitext(os.path.basename(stream.name))[0]
             configdir = os.path.dirname(stream.name)
@@ -198,6 +227,8 @@ def ordered_dump(data, stream=None, Dumper=yaml.Dumper, **kwds):
             node = dumper.represent_str(newpath)
             node.tag = '!extndarray'
             dumper.external_ndarray_counter += 1
+            if npy_files is not None:
+                npy_files.add(os.path.basename(newpath))
         except:
             with BytesIO() as f:
                 numpy.savez_compressed(f, array=array_data)
@@ -206,6 +237,30 @@ def ordered_dump(data, stream=None, Dumper=yaml.Dumper, **kwds):
             node.tag = '!ndarray'
         return node
 
+    def represent_npy_ndarray(dumper, array_data):
+        """
+        Representer for numpy ndarrays in .npy files. The file name contains
+        the hash of the array, so unchanged arrays are not written again.
+        """
+        # numpy.ascontiguousarray would turn 0-d arrays into arrays of shape (1,)
+        array_data = numpy.require(array_data, requirements='C')
+        hasher = hashlib.sha1('{0}{1}'.format(array_data.dtype.str,
+                                              array_data.shape).encode())
+        hasher.update(array_data.reshape(-1).view(numpy.uint8))
+        filename = '{0}-{1}.npy'.format(
+            os.path.splitext(os.path.basename(stream.name))[0],
+            hasher.hexdigest()[:20])
+        path = os.path.join(os.path.dirname(stream.name), filename)
+        if not os.path.isfile(path):
+            # write to a temporary file first, so no broken file is left behind
+            with open(path + '.tmp', 'wb') as f:
+                numpy.save(f, array_data)
+            os.replace(path + '.tmp', path)
+        npy_files.add(filename)
+        node = dumper.represent_str(filename)
+        node.tag = '!npyarray'
+        return node
+
     # add representers
     OrderedDumper.add_representer(OrderedDict, represent_ordereddict)
     OrderedDumper.add_representer(numpy.uint8, represent_int)
@@ -248,3 +303,34 @@ def save(filename, data):
     """
     with open(filename, 'w') as f:
         ordered_dump(data, stream=f, Dumper=yaml.SafeDumper, default_flow_style=False)
+
+
+def save_status(filename, data):
+    """
+    saves status variables to filename in yaml format with numpy arrays in
+    uncompressed, memory-mappable .npy files next to it.
+
+    @param str filename: filename of the status file
+    @param OrderedDict data: status variable values
+
+    Array files are named after the content hash of the array and are only
+    written if the array changed. Array files of earlier saves, which are not
+    used anymore, are removed.
+    """
+    npy_files = set()
+    with open(filename, 'w') as f:
+        ordered_dump(data, stream=f, Dumper=yaml.SafeDumper, npy_files=npy_files,
+                     default_flow_style=False)
+
+    # remove unused array files of this status file, including the .npz files
+    # of the former format
+    base = os.path.splitext(filename)[0]
+    pattern = re.compile(r'-([0-9a-f]{20}\.npy|\d{6}\.npz)$')
+    for path in glob.glob(glob.escape(base) + '-*.np[yz]'):
+        if (os.path.basename(path) not in npy_files
+                and pattern.match(path[len(base):]) is not None):
+            try:
+                os.remove(path)
+            except OSError:
+                # still memory-mapped by a module on Windows, removed next time
+                pass
@@ -31,6 +31,8 @@ import os
 import sys
 import traceback
 import functools
+import threading
+import time
 from qtpy import QtCore
 
 
@@ -113,6 +115,108 @@ class QtLogHandler(QtCore.QObject, logging.Handler):
             self.sigLoggedMessage.emit(record)
 
 
+class BufferedQtLogHandler(QtLogHandler):
+    """Log handler delivering log records to a QT gui in batches.
+
+      Log records are collected and sigLoggedMessages is emitted with a list of
+      entries at most every `interval` seconds. Records with the same logger,
+      level and message as a record already waiting for delivery are not added
+      again, instead the key 'repeated' of the waiting entry is increased. At
+      most `max_batch` entries are delivered at once, further records below
+      level error are dropped and reported by one warning entry.
+
+      The entries are dictionaries like the ones of QtLogHandler with the
+      additional key 'repeated' (number of records, 1 for unique records).
+
+      @param object parent: parent of QObject, defaults to None
+      @param int level: log level, defaults to NOTSET
+      @param float interval: minimum time between two batches in seconds
+      @param int max_batch: maximum number of entries per batch
+    """
+
+    sigLoggedMessages = QtCore.Signal(object)
+    """signal emitted with a list of log entries"""
+    _sigScheduleFlush = QtCore.Signal()
+
+    def __init__(self, parent=None, level=0, interval=0.1, max_batch=200):
+        super().__init__(parent, level)
+        self.interval = interval
+        self.max_batch = max_batch
+        # total numbers of records merged into waiting entries and of dropped records
+        self.duplicates = 0
+        self.dropped = 0
+        self._bufferLock = threading.Lock()
+        self._pending = list()
+        self._pendingKeys = dict()
+        self._droppedInBatch = 0
+        self._flushScheduled = False
+        self._lastFlush = 0
+        self._sigScheduleFlush.connect(self._scheduleFlush, QtCore.Qt.QueuedConnection)
+
+    def emit(self, record):
+        """Emit function of handler.
+
+          Adds the log record to the next batch of :sigLoggedMessages:
+
+          @param object record: :logging.LogRecord:
+        """
+        key = None
+        if record.exc_info is None:
+            key = (record.name, record.levelno, record.getMessage())
+            with self._bufferLock:
+                entry = self._pendingKeys.get(key)
+                if entry is not None:
+                    entry['repeated'] += 1
+                    self.duplicates += 1
+                    return
+                if (len(self._pending) >= self.max_batch
+                        and record.levelno < logging.ERROR):
+                    self._droppedInBatch += 1
+                    self.dropped += 1
+                    return
+        entry = self.format(record)
+        if not entry:
+            return
+        entry['repeated'] = 1
+        with self._bufferLock:
+            self._pending.append(entry)
+            if key is not None:
+                self._pendingKeys[key] = entry
+            schedule = not self._flushScheduled
+            self._flushScheduled = True
+        if schedule:
+            self._sigScheduleFlush.emit()
+
+    @QtCore.Slot()
+    def _scheduleFlush(self):
+        """ Deliver the next batch after the minimum interval since the last one. """
+        delay = max(0, self._lastFlush + self.interval - time.monotonic())
+        QtCore.QTimer.singleShot(int(round(1e3 * delay)), self.flush)
+
+    @QtCore.Slot()
+    def flush(self):
+        """Emit :sigLoggedMessages: with the waiting log entries.
+        """
+        with self._bufferLock:
+            batch = self._pending
+            dropped = self._droppedInBatch
+            self._pending = list()
+            self._pendingKeys = dict()
+            self._droppedInBatch = 0
+            self._flushScheduled = False
+            self._lastFlush = time.monotonic()
+        if dropped > 0:
+            batch.append({
+                'name': __name__,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'level': 'warning',
+                'message': '{0:d} log messages were not displayed because too many messages '
+                           'were logged. See the log file for all messages.'.format(dropped),
+                'repeated': 1})
+        if batch:
+            self.sigLoggedMessages.emit(batch)
+
+
 def initialize_logger(path=''):
     """sets up the logger including a console, file and qt handler
     """
@@ -142,7 +246,7 @@ def initialize_logger(path=''):
     logger.addHandler(rotating_file_handler)
 
     # add Qt log handler
-    qt_log_handler = QtLogHandler()
+    qt_log_handler = BufferedQtLogHandler()
     qt_log_handler.setLevel(logging.DEBUG)
     logging.getLogger().addHandler(qt_log_handler)
 
@@ -31,15 +31,18 @@ import sys
 import re
 import time
 import importlib
+import concurrent.futures
 
 from qtpy import QtCore
 from . import config
 
 from .util.mutex import Mutex   # Mutex provides access serialization between threads
-from .util.modules import toposort, is_base
+from .util import mutex
+from .util.modules import toposort, toposort_layers, is_base, DependencyGraph
 from collections import OrderedDict
 from .logger import register_exception_handler
 from .threadmanager import ThreadManager
+from .startup_profiler import profiler
 # try to import RemoteObjectManager. Might fail if rpyc is not installed.
 try:
     from .remote import RemoteObjectManager
@@ -96,9 +99,16 @@ class Manager(QtCore.QObject):
         self.tree['defined']['logic'] = OrderedDict()
         self.tree['loaded']['logic'] = OrderedDict()
 
+        # connections between the defined modules, updated when the config changes
+        self.dependencyGraph = DependencyGraph()
+
         self.tree['global'] = OrderedDict()
         self.tree['global']['startup'] = list()
 
+        # durations of the startup steps of the modules, the detailed startup profile with the
+        # call tree is enabled with --profile-startup
+        self.profiler = profiler
+
         self.hasGui = not args.no_gui
         self.currentDir = None
         self.baseDir = None
@@ -134,6 +144,10 @@ class Manager(QtCore.QObject):
             self.configDir = os.path.dirname(config_file)
             self.readConfig(config_file)
 
+            # record wait and hold times of all mutexes from the start
+            if self.tree['global'].get('mutex_statistics', False):
+                mutex.enable_instrumentation()
+
             # check first if remote support is enabled and if so create RemoteObjectManager
             if RemoteObjectManager is None:
                 logger.error('Remote modules disabled. Rpyc not installed.')
@@ -156,7 +170,10 @@ class Manager(QtCore.QObject):
                             certfile = self.tree['global']['module_server'].get(
                                 'certfile', None)
                             keyfile = self.tree['global']['module_server'].get('keyfile', None)
-                            self.rm.createServer(server_address, server_port, certfile, keyfile)
+                            array_port = self.tree['global']['module_server'].get(
+                                'array_port', None)
+                            self.rm.createServer(server_address, server_port, certfile, keyfile,
+                                                 array_port=array_port)
                             # successfully started remote server
                             logger.info('Started server rpyc://{0}:{1}'.format(server_address,
                                                                                server_port))
@@ -213,6 +230,7 @@ class Manager(QtCore.QObject):
             if (len(self.tree['loaded']['logic']) == 0
                     and len(self.tree['loaded']['gui']) == 0):
                 logger.critical('No modules loaded during startup.')
+            self.saveStartupProfile()
 
     def getMainDir(self):
         """Returns the absolut path to the directory of the main software.
@@ -288,7 +306,8 @@ class Manager(QtCore.QObject):
             configFile))
         logger.info("Starting Manager configuration from {0}".format(
             configFile))
-        cfg = config.load(configFile)
+        with self.profiler.measure('qudi', 'config'):
+            cfg = config.load(configFile)
         self.configFile = configFile
         # Read modules, devices, and stylesheet out of config
         self.configure(cfg)
@@ -427,6 +446,7 @@ class Manager(QtCore.QObject):
             except:
                 logger.exception('Error in configuration:')
         # print self.tree['config']
+        self.dependencyGraph.rebuild(self.tree['defined'])
         self.sigConfigChanged.emit()
 
     def readConfigFile(self, fileName, missingOk=True):
@@ -524,6 +544,7 @@ class Manager(QtCore.QObject):
         try:
             if cfg[base][mod]['module.Class'] == self.tree['defined'][base][mod]['module.Class']:
                 self.tree['defined'][base][mod] = cfg[base][mod]
+                self.dependencyGraph.update_module(base, mod, cfg[base][mod])
         except KeyError:
             pass
 
@@ -745,11 +766,13 @@ class Manager(QtCore.QObject):
                 return -1
         return 0
 
-    def loadConfigureModule(self, base, key):
+    def loadConfigureModule(self, base, key, reload=True):
         """Loads the configuration Module in key with the help of base class.
 
           @param string base: module base package (hardware, logic or gui)
           @param string key: module which is going to be loaded
+          @param bool reload: reload the python module before instantiation. Pass False if it
+                              was just imported or reloaded.
 
           @return int: 0 on success, -1 on fatal error, 1 on error
         """
@@ -768,7 +791,10 @@ class Manager(QtCore.QObject):
                     instance = self.rm.getRemoteModuleUrl(
                         defined_module['remote'],
                         certfile=certfile,
-                        keyfile=keyfile)
+                        keyfile=keyfile,
+                        array_compression=defined_module.get('array_compression', None),
+                        cached_getters=defined_module.get('cached_getters', None),
+                        shared_connection=defined_module.get('shared_connection', False))
                     logger.info('Remote module {0} loaded as {1}.{2}.'
                                 ''.format(defined_module['remote'], base, key))
                     with self.lock:
@@ -793,7 +819,8 @@ class Manager(QtCore.QObject):
                         '',
                         defined_module['module.Class'])
 
-                    modObj = self.importModule(base, module_name)
+                    with self.profiler.measure(key, 'import'):
+                        modObj = self.importModule(base, module_name)
 
                     # Ensure that the namespace of a module is reloaded before 
                     # instantiation. That will not harm anything.
@@ -803,9 +830,12 @@ class Manager(QtCore.QObject):
                     # Reloading the namespace will prevent the need to restart 
                     # Qudi, if a module instantiation was not successful upon 
                     # load.
-                    importlib.reload(modObj)  # keep the namespace of module up to date
+                    if reload:
+                        with self.profiler.measure(key, 'import'):
+                            importlib.reload(modObj)  # keep the namespace of module up to date
 
-                    self.configureModule(modObj, base, class_name, key, defined_module)
+                    with self.profiler.measure(key, 'instantiate'):
+                        self.configureModule(modObj, base, class_name, key, defined_module)
                     if 'remoteaccess' in defined_module and defined_module['remoteaccess']:
                         if self.rm is None:
                             logger.error('Remote module sharing functionality disabled. Rpyc not'
@@ -965,14 +995,17 @@ class Manager(QtCore.QObject):
                 modthread = self.tm.newThread('mod-{0}-{1}'.format(base, name))
                 module.moveToThread(modthread)
                 modthread.start()
-                success = QtCore.QMetaObject.invokeMethod(
-                    module.module_state,
-                    'trigger',
-                    QtCore.Qt.BlockingQueuedConnection,
-                    QtCore.Q_RETURN_ARG(bool),
-                    QtCore.Q_ARG(str, 'activate'))
+                with self.profiler.measure(name, 'activate'):
+                    success = QtCore.QMetaObject.invokeMethod(
+                        module.module_state,
+                        'trigger',
+                        QtCore.Qt.BlockingQueuedConnection,
+                        QtCore.Q_RETURN_ARG(bool),
+                        QtCore.Q_ARG(str, 'activate'))
             else:
-                success = module.module_state.activate() # runs on_activate in main thread
+                # GUI modules build their windows in on_activate
+                with self.profiler.measure(name, 'gui' if base == 'gui' else 'activate'):
+                    success = module.module_state.activate() # runs on_activate in main thread
             logger.debug('Activation success: {}'.format(success))
         except:
             logger.exception(
@@ -1042,35 +1075,8 @@ class Manager(QtCore.QObject):
         if not self.isModuleDefined(base, module):
             logger.error('{0} module {1}: no such module defined'.format(base, module))
             return None
-
-        deplist = set()
-        for bname, base in self.tree['defined'].items():
-            for mname, mod in base.items():
-                if 'connect' not in mod:
-                    continue
-                connections = mod['connect']
-                if not isinstance(connections, OrderedDict):
-                    logger.error('{0} module {1}: connect is not a dictionary'.format(bname, mname))
-                    continue
-                for cname, connection in connections.items():
-                    conn = connection
-                    if '.' in connection:
-                        conn = connection.split('.')[0]
-                        logger.warning(
-                           '{0}.{1}: connection {2}: {3} has legacy '
-                           ' format for connection target'
-                           ''.format(bname, mname, cname, connection))
-                    if conn == module:
-                        deplist.add(mname)
-        if len(deplist) > 0:
-            deps.update({module: list(deplist)})
-
-        for name in deplist:
-            if name not in deps:
-                subdeps = self.getReverseRecursiveModuleDependencies(self.findBase(name), name, deps)
-                if subdeps is not None:
-                    deps.update(subdeps)
-
+        deps.update(self.dependencyGraph.reverse_subgraph(
+            self.dependencyGraph.reverse_closure(module) | {module}))
         return deps
 
     @QtCore.Slot(str, str)
@@ -1082,53 +1088,49 @@ class Manager(QtCore.QObject):
 
           @return dict: module dependencies in the right format for the toposort function
         """
-        deps = dict()
         if not self.isModuleDefined(base, key):
             logger.error('{0} module {1}: no such module defined'.format(base, key))
             return None
-        defined_module =  self.tree['defined'][base][key]
-        if 'connect' not in defined_module:
-            return dict()
-        if not isinstance(defined_module['connect'], OrderedDict):
-            logger.error('{0} module {1}: connect is not a dictionary'.format(base, key))
+        try:
+            closure = self.dependencyGraph.closure(key)
+        except ValueError as e:
+            logger.error(str(e))
             return None
-        connections = defined_module['connect']
-        deplist = set()
-        for c in connections:
-            if not isinstance(connections[c], str):
-                logger.error('Value for class key is not a string.')
-                return None
-            if '.' in connections[c]:
-                logger.warning('{0}.{1}: connection {2}: {3} has legacy '
-                               ' format for connection target'.format(
-                                   base, key, c, connections[c]))
-                destmod = connections[c].split('.')[0]
-            else:
-                destmod = connections[c]
-            destbase = ''
-            if destmod in self.tree['defined']['hardware'] and destmod in self.tree['defined']['logic']:
-                logger.error('Unique name {0} is in both hardware and '
-                             'logic module list. Connection is not well defined.'
-                             ''.format(destmod))
-                return None
-            elif destmod in self.tree['defined']['hardware']:
-                destbase = 'hardware'
-            elif destmod in self.tree['defined']['logic']:
-                destbase = 'logic'
-            else:
-                logger.error('Unique name {0} is neither in hardware or '
-                             'logic module list. Cannot connect {1} '
-                             'to it.'.format(connections[c], key))
-                return None
-            deplist.add(destmod)
-            subdeps = self.getRecursiveModuleDependencies(destbase, destmod)
-            if subdeps is not None:
-                deps.update(subdeps)
-            else:
-                return None
-        if len(deplist) > 0:
-            deps.update({key: list(deplist)})
-        return deps
+        return self.dependencyGraph.subgraph(closure | {key})
+
+    def getModuleStartOrder(self, base, key):
+        """ A module and all modules it needs in the order they have to be started.
+
+          @param str base: Module category
+          @param str key: Unique configured module name
+
+          @return list: module names ending with key, None on error
+
+          The order is computed once per module and configuration.
+        """
+        if not self.isModuleDefined(base, key):
+            logger.error('{0} module {1}: no such module defined'.format(base, key))
+            return None
+        try:
+            return self.dependencyGraph.start_order(key)
+        except ValueError as e:
+            logger.error(str(e))
+            return None
+
+    def getModuleReloadSet(self, base, key):
+        """ The minimal set of loaded modules affected by reloading a module.
+
+          @param str base: Module category
+          @param str key: Unique configured module name
+
+          @return list: the module and the loaded modules depending on it, in the order they
+                        have to be deactivated. Activate them again in reversed order.
+        """
+        if not self.isModuleDefined(base, key):
+            logger.error('{0} module {1}: no such module defined'.format(base, key))
+            return None
+        loaded = [name for modules in self.tree['loaded'].values() for name in modules]
+        return self.dependencyGraph.reload_set([key], loaded=loaded + [key])
 
     def getAllRecursiveModuleDependencies(self, allmods):
         """ Build a dependency tre for defined or loaded modules.
@@ -1139,7 +1141,9 @@ class Manager(QtCore.QObject):
         deps = {}
         for mbase, bdict in allmods.items():
             for module in bdict:
-                deps.update(self.getRecursiveModuleDependencies(mbase, module))
+                moddeps = self.getRecursiveModuleDependencies(mbase, module)
+                if moddeps is not None:
+                    deps.update(moddeps)
         return deps
 
     @QtCore.Slot(str, str)
@@ -1154,10 +1158,9 @@ class Manager(QtCore.QObject):
             If the module is already loaded, just activate it.
             If the module is an active GUI module, show its window.
         """
-        deps = self.getRecursiveModuleDependencies(base, key)
-        sorteddeps = toposort(deps)
-        if len(sorteddeps) == 0:
-            sorteddeps.append(key)
+        sorteddeps = self.getModuleStartOrder(base, key)
+        if sorteddeps is None:
+            return -1
 
         for mkey in sorteddeps:
             for mbase in ('hardware', 'logic', 'gui'):
@@ -1168,7 +1171,8 @@ class Manager(QtCore.QObject):
                         return -1
                     elif success > 0:
                         logger.warning('Nonfatal loading error, going on.')
-                    success = self.connectModule(mbase, mkey)
+                    with self.profiler.measure(mkey, 'connect'):
+                        success = self.connectModule(mbase, mkey)
                     if success < 0:
                         logger.warning('Stopping loading module {0}.{1} after '
                                        'connection failure.'.format(mbase, mkey))
@@ -1191,10 +1195,9 @@ class Manager(QtCore.QObject):
           @param str key: Unique module name
 
         """
-        deps = self.getRecursiveModuleDependencies(base, key)
-        sorteddeps = toposort(deps)
-        if len(sorteddeps) == 0:
-            sorteddeps.append(key)
+        sorteddeps = self.getModuleStartOrder(base, key)
+        if sorteddeps is None:
+            return
 
         for mkey in reversed(sorteddeps):
             for mbase in ('hardware', 'logic', 'gui'):
@@ -1215,11 +1218,10 @@ class Manager(QtCore.QObject):
           @param str key: Unique configured module name
 
         """
-        unload_deps = self.getReverseRecursiveModuleDependencies(base, key)
-        sorted_u_deps = toposort(unload_deps)
+        sorted_u_deps = self.getModuleReloadSet(base, key)
+        if sorted_u_deps is None:
+            return -1
         unloaded_mods = []
-        if len(sorted_u_deps) == 0:
-            sorted_u_deps.append(key)
 
         for mkey in sorted_u_deps:
             mbase = self.findBase(mkey)
@@ -1259,16 +1261,233 @@ class Manager(QtCore.QObject):
     def startAllConfiguredModules(self):
         """Connect all Qudi modules from the currently loaded configuration and
             activate them.
+
+            With 'parallel_startup: True' in the global section of the config, the
+            modules of one dependency layer are imported and activated concurrently,
+            see startModulesParallel.
         """
         deps = self.getAllRecursiveModuleDependencies(self.tree['defined'])
-        sorteddeps = toposort(deps)
+        self.profiler.clear()
+        start = time.perf_counter()
 
-        for module in sorteddeps:
-            base = self.findBase(module)
-            if self.startModule(base, module) < 0:
-                break
+        if self.tree['global'].get('parallel_startup', False):
+            self.startModulesParallel(deps)
+        else:
+            sorteddeps = toposort(deps)
+            for module in sorteddeps:
+                base = self.findBase(module)
+                if self.startModule(base, module) < 0:
+                    break
+
+        logger.info('Start all modules finished in {0:.2f}s.'.format(time.perf_counter() - start))
+        self.logStartupReport()
+        self.saveStartupProfile()
+        # stop timing the imports, the detailed profile only covers the startup
+        self.profiler.disable()
+
+    def startModulesParallel(self, deps):
+        """ Load and activate modules layer by layer of the dependency graph.
+
+          @param dict deps: module dependencies in the format for the toposort function
+
+          @return int: 0 on success, -1 on error
+
+            The python modules of one layer are imported in a thread pool. Instantiation
+            and connection happen in the main thread. Hardware and logic modules of one
+            layer are activated concurrently: threaded modules in their own thread,
+            other modules in a temporary thread and moved back to the main thread after
+            activation. Modules with 'parallel_activation: False' in their config and GUI
+            modules are activated afterwards in the main thread. 'parallel_activation'
+            defaults to False for modules which are not threaded, because QObjects they
+            create without parent in on_activate would belong to the temporary thread. The number of threads is
+            set by 'startup_threads' in the global section of the config (default 8).
+        """
+        workers = self.tree['global'].get('startup_threads', 8)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            for layer in toposort_layers(deps):
+                # import the python modules of modules not loaded yet
+                imports = OrderedDict()
+                for mkey in layer:
+                    mbase = self.findBase(mkey)
+                    defined_module = self.tree['defined'][mbase][mkey]
+                    if (mkey not in self.tree['loaded'][mbase]
+                            and 'module.Class' in defined_module
+                            and 'remote' not in defined_module):
+                        imports[mkey] = pool.submit(self._importModuleTimed, mbase, mkey)
+                # a failed import is logged when loadConfigureModule repeats it
+                self._waitProcessingEvents(imports.values(), log_errors=False)
+
+                # instantiate and connect in the main thread
+                for mkey in layer:
+                    mbase = self.findBase(mkey)
+                    if mkey in self.tree['loaded'][mbase]:
+                        continue
+                    # a failed import is repeated by loadConfigureModule, which logs the error
+                    imported = mkey in imports and imports[mkey].exception() is None
+                    success = self.loadConfigureModule(mbase, mkey, reload=not imported)
+                    if success < 0:
+                        logger.warning('Stopping module loading after loading failure.')
+                        return -1
+                    elif success > 0:
+                        logger.warning('Nonfatal loading error, going on.')
+                    with self.profiler.measure(mkey, 'connect'):
+                        success = self.connectModule(mbase, mkey)
+                    if success < 0:
+                        logger.warning('Stopping loading module {0}.{1} after '
+                                       'connection failure.'.format(mbase, mkey))
+                        return -1
+
+                # activate hardware and logic concurrently, the rest in the main thread
+                activations = list()
+                sequential = list()
+                for mkey in layer:
+                    mbase = self.findBase(mkey)
+                    if (mkey not in self.tree['loaded'][mbase]
+                            or self.tree['loaded'][mbase][mkey].module_state() != 'deactivated'):
+                        continue
+                    defined_module = self.tree['defined'][mbase][mkey]
+                    threaded = self.tree['loaded'][mbase][mkey].is_module_threaded
+                    if (mbase == 'gui' or 'remote' in defined_module
+                            or not defined_module.get('parallel_activation', threaded)):
+                        sequential.append((mbase, mkey))
+                    else:
+                        thread_name = self._prepareConcurrentActivation(mbase, mkey)
+                        if thread_name is not None:
+                            activations.append(pool.submit(
+                                self._activateInThread, mbase, mkey, thread_name))
+                self._waitProcessingEvents(activations)
+                for mbase, mkey in sequential:
+                    self.activateModule(mbase, mkey)
+                self.sigModulesChanged.emit()
+        return 0
+
+    def _importModuleTimed(self, base, key):
+        """ Import or reload the python module of a configured module, used in a worker thread.
+
+          @param str base: module base package (hardware, logic or gui)
+          @param str key: unique module name
+        """
+        module_name = self.tree['defined'][base][key]['module.Class'].rsplit('.', 1)[0]
+        already_imported = '{0}.{1}'.format(base, module_name) in sys.modules
+        with self.profiler.measure(key, 'import'):
+            modObj = self.importModule(base, module_name)
+            if already_imported:
+                importlib.reload(modObj)
+
+    def _prepareConcurrentActivation(self, base, name):
+        """ Load status variables and move a module into the thread it is activated in.
+
+          @param str base: module base package (hardware, logic or gui)
+          @param str name: unique module name
+
+          @return str: name of the activation thread, None on error
+        """
+        module = self.tree['loaded'][base][name]
+        try:
+            module.setStatusVariables(self.loadStatusVariables(base, name))
+            if module.is_module_threaded:
+                thread_name = 'mod-{0}-{1}'.format(base, name)
+            else:
+                thread_name = 'activate-{0}-{1}'.format(base, name)
+            modthread = self.tm.newThread(thread_name)
+            module.moveToThread(modthread)
+            modthread.start()
+        except:
+            logger.exception(
+                '{0} module {1}: error during activation:'.format(base, name))
+            return None
+        return thread_name
+
+    def _activateInThread(self, base, name, thread_name):
+        """ Activate a module in the thread it was moved to, used in a worker thread.
+
+          @param str base: module base package (hardware, logic or gui)
+          @param str name: unique module name
+          @param str thread_name: name of the thread of the module
 
-        logger.info('Start all modules finished.')
+            Modules which are not threaded are moved back to the main thread and their
+            temporary thread is stopped.
+        """
+        module = self.tree['loaded'][base][name]
+        try:
+            with self.profiler.measure(name, 'activate'):
+                success = QtCore.QMetaObject.invokeMethod(
+                    module.module_state,
+                    'trigger',
+                    QtCore.Qt.BlockingQueuedConnection,
+                    QtCore.Q_RETURN_ARG(bool),
+                    QtCore.Q_ARG(str, 'activate'))
+            logger.debug('Activation success: {}'.format(success))
+        except:
+            logger.exception(
+                '{0} module {1}: error during activation:'.format(base, name))
+        finally:
+            if not module.is_module_threaded:
+                try:
+                    QtCore.QMetaObject.invokeMethod(
+                        module,
+                        'moveToThread',
+                        QtCore.Qt.BlockingQueuedConnection,
+                        QtCore.Q_ARG(QtCore.QThread, self.tm.thread))
+                except:
+                    logger.exception('{0} module {1}: could not move module back to the main '
+                                     'thread after activation:'.format(base, name))
+                finally:
+                    self.tm.quitThread(thread_name)
+                    self.tm.joinThread(thread_name)
+
+    def _waitProcessingEvents(self, futures, log_errors=True):
+        """ Wait for futures of the startup thread pool while processing Qt events.
+
+          @param list futures: futures to wait for
+          @param bool log_errors: log exceptions raised in the futures
+
+            Events have to be processed, because activating modules may need the main thread.
+        """
+        futures = list(futures)
+        while len(futures) > 0:
+            done, not_done = concurrent.futures.wait(futures, timeout=0.01)
+            futures = list(not_done)
+            QtCore.QCoreApplication.instance().processEvents()
+            for future in done:
+                if not log_errors:
+                    continue
+                try:
+                    future.result()
+                except Exception:
+                    logger.exception('Error in module startup thread:')
+
+    def logStartupReport(self):
+        """ Log a table of the durations of the startup steps of all started modules, as recorded
+        by the startup profiler.
+        """
+        rows = self.profiler.table()
+        if len(rows) == 0:
+            return
+        steps = self.profiler.steps
+        lines = ['{0:<30}'.format('module') + ''.join('{0:>18}'.format(s) for s in steps)]
+        for name, times in rows:
+            lines.append('{0:<30}'.format(name) + ''.join(
+                '{0:>18.3f}'.format(times[s]) if s in times else '{0:>18}'.format('-')
+                for s in steps))
+        logger.info('Module startup times [s]:\n{0}'.format('\n'.join(lines)))
+
+    def saveStartupProfile(self):
+        """ Write the startup profile as flame graph input to the app status directory.
+
+          @return str: path of the file, None if the profiler is disabled
+        """
+        if not self.profiler.enabled:
+            return None
+        try:
+            filename = os.path.join(self.getStatusDir(), 'startup_profile.folded')
+            self.profiler.save(filename)
+        except:
+            logger.exception('Failed to save the startup profile.')
+            return None
+        logger.info('Startup profile saved to {0}. Render it with a flame graph tool, e.g. '
+                    'flamegraph.pl or speedscope.'.format(filename))
+        return filename
 
     def getStatusDir(self):
         """ Get the directory where the app state is saved, create it if necessary.
@@ -1294,7 +1513,7 @@ class Manager(QtCore.QObject):
                 classname = self.tree['loaded'][base][module].__class__.__name__
                 filename = os.path.join(statusdir,
                     'status-{0}_{1}_{2}.cfg'.format(classname, base, module))
-                config.save(filename, variables)
+                config.save_status(filename, variables)
             except:
                 print(variables)
                 logger.exception('Failed to save status variables of module '
@@ -1313,10 +1532,11 @@ class Manager(QtCore.QObject):
             classname = self.tree['loaded'][base][module].__class__.__name__
             filename = os.path.join(
                 statusdir, 'status-{0}_{1}_{2}.cfg'.format(classname, base, module))
-            if os.path.isfile(filename):
-                variables = config.load(filename)
-            else:
-                variables = OrderedDict()
+            with self.profiler.measure(module, 'status variables'):
+                if os.path.isfile(filename):
+                    variables = config.load(filename)
+                else:
+                    variables = OrderedDict()
         except:
             logger.exception('Failed to load status variables.')
             variables = OrderedDict()
@@ -1331,6 +1551,8 @@ class Manager(QtCore.QObject):
             filename = os.path.join(
                 statusdir, 'status-{0}_{1}_{2}.cfg'.format(classname, base, module))
             if os.path.isfile(filename):
+                # drop the array files by saving an empty status first
+                config.save_status(filename, OrderedDict())
                 os.remove(filename)
         except:
             logger.exception('Failed to remove module status file.')
@@ -1379,6 +1601,8 @@ class Manager(QtCore.QObject):
                 logger.info('Deactivating module {0}.{1}'.format(base, module))
                 self.deactivateModule(base, module)
             QtCore.QCoreApplication.processEvents()
+        if self.rm is not None:
+            self.rm.closeConnections()
         self.sigManagerQuit.emit(self, False)
 
     @QtCore.Slot()
@@ -1393,6 +1617,8 @@ class Manager(QtCore.QObject):
                     logger.exception(
                         'Module {0} failed to stop, continuing anyway.'.format(module))
                 QtCore.QCoreApplication.processEvents()
+        if self.rm is not None:
+            self.rm.closeConnections()
         self.sigManagerQuit.emit(self, True)
 
     @QtCore.Slot(object)
@@ -336,4 +336,11 @@ class BaseMixin(metaclass=ModuleMeta):
 
 
 class Base(QtCore.QObject, BaseMixin):
-    pass
+
+    @QtCore.Slot(QtCore.QThread)
+    def moveToThread(self, thread):
+        """ Move the module to another thread, as slot so it can be invoked from other threads.
+
+          @param QThread thread: the new thread of the module
+        """
+        super().moveToThread(thread)
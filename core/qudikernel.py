@@ -172,6 +172,7 @@ def install_kernel():
             'argv': [sys.executable, kernelpath, '{connection_file}'],
             'display_name': 'Qudi',
             'language': 'python',
+            'interrupt_mode': 'message',
         }
         # write the kernelspe file
         with open(os.path.join(path, 'kernel.json'), 'w') as f:
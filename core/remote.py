@@ -26,7 +26,11 @@ logger = logging.getLogger(__name__)
 from qtpy.QtCore import QObject
 from urllib.parse import urlparse
 import ssl
+import threading
 from .util.models import DictTableModel, ListTableModel
+from .util.array_transport import ArrayClient, ArrayServer
+from .util.network import netobtain, register_array_client
+import numpy as np
 import rpyc
 from rpyc.utils.server import ThreadedServer
 from rpyc.utils.authenticators import SSLAuthenticator
@@ -47,6 +51,8 @@ class RemoteObjectManager(QObject):
         self.remoteModules.headers[0] = 'Remote Modules'
         self.sharedModules = DictTableModel()
         self.sharedModules.headers[0] = 'Shared Modules'
+        self.arrayServer = None
+        self.connectionPool = ConnectionPool()
 
     def makeRemoteService(self):
         """ A function that returns a class containing a module list hat can be manipulated from the host.
@@ -56,6 +62,7 @@ class RemoteObjectManager(QObject):
             """
             modules = self.sharedModules
             _manager = self.manager
+            _remote_manager = self
 
             @staticmethod
             def get_service_name():
@@ -95,12 +102,37 @@ class RemoteObjectManager(QObject):
                         logger.error('Client requested a module that is not '
                                 'shared.')
                         return None
+
+            def exposed_getArrayPort(self):
+                """ Port of the array server for the bulk transfer of numpy arrays.
+
+                  @return int: port number, None if there is no array server
+                """
+                if self._remote_manager.arrayServer is None:
+                    return None
+                return self._remote_manager.arrayServer.port
+
+            def exposed_shareArray(self, array):
+                """ Put an array into the outbox of the array server.
+
+                  @param numpy.ndarray array: array, which the client has as netref
+
+                  @return int: token for fetching the array from the array server, None if the
+                               array can not be sent as raw buffer
+                """
+                array_server = self._remote_manager.arrayServer
+                if (array_server is None or not isinstance(array, np.ndarray)
+                        or array.dtype.hasobject or array.dtype.fields is not None):
+                    return None
+                return array_server.put(array)
         return RemoteModuleService
 
-    def createServer(self, hostname, port, certfile=None, keyfile=None):
+    def createServer(self, hostname, port, certfile=None, keyfile=None, array_port=None):
         """ Start the rpyc modules server on a given port.
 
           @param int port: port where the server should be running
+          @param int array_port: port of the server for numpy arrays, default is port + 1.
+                                 There is no array server for SSL connections.
         """
         thread = self.tm.newThread('rpyc-server')
         if certfile is not None and keyfile is not None:
@@ -114,6 +146,16 @@ class RemoteObjectManager(QObject):
             if hostname != 'localhost':
                 logger.warning('Remote connection not secured! Use a certificate!')
             self.server = RPyCServer(self.makeRemoteService(), hostname, port)
+            try:
+                self.arrayServer = ArrayServer(
+                    hostname, port + 1 if array_port is None else array_port)
+                self.arrayServer.start()
+                logger.info('Started array server at {0} on port {1}'
+                            ''.format(hostname, self.arrayServer.port))
+            except OSError:
+                logger.exception('Array server could not be started. Arrays are sent '
+                                 'through rpyc.')
+                self.arrayServer = None
         self.server.moveToThread(thread)
         thread.started.connect(self.server.run)
         thread.start()
@@ -125,6 +167,9 @@ class RemoteObjectManager(QObject):
         """
         if hasattr(self, 'server'):
             self.server.close()
+        if self.arrayServer is not None:
+            self.arrayServer.close()
+            self.arrayServer = None
 
     def shareModule(self, name, obj):
         """ Add a module to the list of modules that can be accessed remotely.
@@ -146,20 +191,33 @@ class RemoteObjectManager(QObject):
             logger.error('Module {0} was not shared.'.format(name))
         self.sharedModules.pop(name)
 
-    def getRemoteModuleUrl(self, url, certfile=None, keyfile=None):
+    def closeConnections(self):
+        """ Close the connections to all remote module servers.
+        """
+        self.connectionPool.closeAll()
+
+    def getRemoteModuleUrl(self, url, certfile=None, keyfile=None, array_compression=None,
+                           cached_getters=None, shared_connection=False):
         """ Get a remote module via its URL.
 
           @param str url: URL pointing to a module hosted b a remote server
           @param str certfile: filename of certificate or None if SSL is not used
           @param str keyfile: filename of key or None if SSL is not used
+          @param str array_compression: None, 'lz4' or 'zstd' for the transfer of arrays
+          @param list cached_getters: names of pure getters, whose results are cached
+          @param bool shared_connection: use one connection for all remote modules of the server
 
           @return object: remote module
         """
         parsed = urlparse(url)
         name = parsed.path.replace('/', '')
-        return self.getRemoteModule(parsed.hostname, parsed.port, name)
+        return self.getRemoteModule(parsed.hostname, parsed.port, name,
+                                    array_compression=array_compression,
+                                    cached_getters=cached_getters,
+                                    shared_connection=shared_connection)
 
-    def getRemoteModule(self, host, port, name, certfile=None, keyfile=None):
+    def getRemoteModule(self, host, port, name, certfile=None, keyfile=None,
+                        array_compression=None, cached_getters=None, shared_connection=False):
         """ Get a remote module via its host, port and name.
 
           @param str host: host that the remote module server is running on
@@ -167,10 +225,15 @@ class RemoteObjectManager(QObject):
           @param str name: unique name of the remote module
           @param str certfile: filename of certificate or None if SSL is not used
           @param str keyfile: filename of key or None if SSL is not used
+          @param str array_compression: None, 'lz4' or 'zstd' for the transfer of arrays
+          @param list cached_getters: names of pure getters, whose results are cached
+          @param bool shared_connection: use one connection for all remote modules of the server
 
           @return object: remote module
         """
-        module = RemoteModule(host, port, name, certfile=certfile, keyfile=keyfile)
+        module = RemoteModule(self.connectionPool, host, port, name, certfile=certfile,
+                              keyfile=keyfile, array_compression=array_compression,
+                              cached_getters=cached_getters, shared_connection=shared_connection)
         self.remoteModules.append(module)
         return module.module
 
@@ -213,18 +276,160 @@ class RPyCServer(QObject):
         self.server.start()
 
 
-class RemoteModule:
-    """ This class represents a module on a remote computer and holds a reference to it.
+class ConnectionPool:
+    """ Keeps the rpyc connections to remote module servers.
+
+    Remote modules get their own connection by default. Calls through one rpyc connection are
+    serialised, so only remote modules which are rarely used at the same time should share a
+    connection.
     """
-    def __init__(self, host, port, name, certfile=None, keyfile=None):
+    def __init__(self):
+        self._connections = dict()
+        self._dedicated = list()
+        self._lock = threading.Lock()
+
+    def connect(self, host, port, certfile=None, keyfile=None, array_compression=None,
+                shared=False):
+        """ Get a connection to a remote module server.
+
+          @param str host: host that the remote module server is running on
+          @param int port: port that the remote module server is listening on
+          @param str certfile: filename of certificate or None if SSL is not used
+          @param str keyfile: filename of key or None if SSL is not used
+          @param str array_compression: None, 'lz4' or 'zstd' for the transfer of arrays
+          @param bool shared: reuse the shared connection to the server, connect if there is none
+
+          @return rpyc.Connection: open connection
+        """
+        key = (host, port, certfile, keyfile, array_compression)
+        if not shared:
+            connection = self._newConnection(*key)
+            with self._lock:
+                self._dedicated = [conn for conn in self._dedicated if not conn.closed]
+                self._dedicated.append(connection)
+            return connection
+        with self._lock:
+            connection = self._connections.get(key)
+            if connection is None or connection.closed:
+                connection = self._newConnection(*key)
+                self._connections[key] = connection
+            return connection
+
+    @staticmethod
+    def _newConnection(host, port, certfile, keyfile, array_compression):
         if certfile is not None and keyfile is not None:
-            self.connection = rpyc.ssl_connect(
+            connection = rpyc.ssl_connect(
                 host,
                 port=port,
                 config={'allow_all_attrs': True},
                 certfile=certfile,
                 keyfile=keyfile)
         else:
-            self.connection = rpyc.connect(host, port, config={'allow_all_attrs': True})
+            connection = rpyc.connect(host, port, config={'allow_all_attrs': True})
+            try:
+                array_port = connection.root.getArrayPort()
+            except AttributeError:
+                # server of an older qudi version
+                array_port = None
+            if array_port is not None:
+                register_array_client(
+                    connection, ArrayClient(host, array_port, compression=array_compression))
+        return connection
+
+    def closeAll(self):
+        """ Close all connections.
+        """
+        with self._lock:
+            connections = list(self._connections.values()) + self._dedicated
+            self._connections.clear()
+            self._dedicated = list()
+        for connection in connections:
+            try:
+                connection.close()
+            except:
+                logger.exception('Closing remote connection failed.')
+
+
+class RemoteModuleProxy:
+    """ Reference to a remote module, which caches the results of pure getters.
+
+    All attributes are forwarded to the remote module. Methods listed as cached getters are
+    called remotely only once per set of arguments, their results are obtained as local copies.
+    """
+    def __init__(self, module, cached_getters):
+        """
+          @param module: rpyc netref of the remote module
+          @param list cached_getters: names of the methods without side effects, whose results
+                                      do not change, e.g. 'get_constraints'
+        """
+        object.__setattr__(self, '_proxy_module', module)
+        object.__setattr__(self, '_proxy_cached_getters', frozenset(cached_getters))
+        object.__setattr__(self, '_proxy_cache', dict())
+        object.__setattr__(self, '_proxy_lock', threading.Lock())
+
+    @property
+    def __class__(self):
+        # connectors check the interfaces of the remote class
+        return self._proxy_module.__class__
+
+    def __getattr__(self, name):
+        attr = getattr(self._proxy_module, name)
+        if name not in self._proxy_cached_getters:
+            return attr
+
+        def cached_getter(*args, **kwargs):
+            try:
+                key = (name, args, tuple(sorted(kwargs.items())))
+                hash(key)
+            except TypeError:
+                return attr(*args, **kwargs)
+            with self._proxy_lock:
+                if key not in self._proxy_cache:
+                    result = attr(*args, **kwargs)
+                    try:
+                        result = netobtain(result)
+                    except Exception:
+                        # keep the reference if the object can not be copied
+                        pass
+                    self._proxy_cache[key] = result
+                return self._proxy_cache[key]
+        return cached_getter
+
+    def __setattr__(self, name, value):
+        setattr(self._proxy_module, name, value)
+
+    def __delattr__(self, name):
+        delattr(self._proxy_module, name)
+
+    def __repr__(self):
+        return repr(self._proxy_module)
+
+    def __str__(self):
+        return str(self._proxy_module)
+
+    def __dir__(self):
+        return dir(self._proxy_module)
+
+    def clearCache(self):
+        """ Forget the cached results, e.g. after a reconfiguration of the remote module.
+        """
+        with self._proxy_lock:
+            self._proxy_cache.clear()
+
+
+class RemoteModule:
+    """ This class represents a module on a remote computer and holds a reference to it.
+
+    With shared_connection, the connection is shared with all remote modules of the same server
+    using this option. If the server has an array server, netobtain fetches numpy arrays of this
+    connection through it.
+    """
+    def __init__(self, pool, host, port, name, certfile=None, keyfile=None,
+                 array_compression=None, cached_getters=None, shared_connection=False):
+        self.connection = pool.connect(host, port, certfile=certfile, keyfile=keyfile,
+                                       array_compression=array_compression,
+                                       shared=shared_connection)
         self.module = self.connection.root.getModule(name)
+        if cached_getters:
+            self.module = RemoteModuleProxy(self.module, cached_getters)
         self.name = name
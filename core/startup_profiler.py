@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains the Qudi startup profiler.
+
+The profiler records the time spent per module in importing, parsing the config, instantiating,
+restoring status variables, connecting and activating. This table is always recorded and logged
+by the manager as startup report. With the command line option --profile-startup the profiler
+is enabled: it also times the transitive imports of other packages and keeps the call tree, which
+is saved in the folded stack format of flame graph tools (e.g. flamegraph.pl or speedscope).
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import builtins
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Span:
+    """ Context manager measuring one step, see StartupProfiler.measure. """
+
+    __slots__ = ('_profiler', '_name', '_step', '_start', '_stacked')
+
+    def __init__(self, profiler, name, step):
+        self._profiler = profiler
+        self._name = name
+        self._step = step
+
+    def __enter__(self):
+        # the call tree is only kept while the profiler is enabled
+        self._stacked = self._profiler.enabled
+        if self._stacked:
+            self._profiler._push('{0} {1}'.format(self._name, self._step))
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self._start
+        if self._stacked:
+            self._profiler._pop(duration)
+        self._profiler.record(self._name, self._step, duration)
+        return False
+
+
+class StartupProfiler:
+    """ Records the durations of the startup steps of Qudi modules.
+    """
+    steps = ('import', 'config', 'instantiate', 'status variables', 'connect', 'activate', 'gui')
+
+    def __init__(self):
+        self.enabled = False
+        # True once the detailed profile was recorded
+        self.has_profile = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._original_import = None
+        # {name: {step: seconds}}
+        self._table = OrderedDict()
+        # {'frame;frame;frame': self time in seconds}
+        self._folded = OrderedDict()
+
+    def enable(self):
+        """ Start recording and timing of imports. Call as early as possible.
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        self.has_profile = True
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def disable(self):
+        """ Stop recording the call tree and restore the import function. The table of the
+        durations per module is still recorded.
+        """
+        if not self.enabled:
+            return
+        self.enabled = False
+        if builtins.__import__ == self._timed_import:
+            builtins.__import__ = self._original_import
+
+    def measure(self, name, step):
+        """ Context manager measuring a startup step of a module.
+
+          @param str name: unique module name or 'qudi' for the core
+          @param str step: one of StartupProfiler.steps
+
+          @return: context manager
+        """
+        return _Span(self, name, step)
+
+    def record(self, name, step, duration):
+        """ Add the duration of a step to the table.
+
+          @param str name: unique module name
+          @param str step: one of StartupProfiler.steps
+          @param float duration: duration in seconds
+        """
+        with self._lock:
+            if name not in self._table:
+                self._table[name] = OrderedDict()
+            self._table[name][step] = self._table[name].get(step, 0) + duration
+
+    def clear(self, keep=('qudi', )):
+        """ Discard the durations of the modules in the table. The call tree is kept.
+
+          @param tuple keep: names, whose durations are kept, by default the core
+        """
+        with self._lock:
+            for name in list(self._table):
+                if name not in keep:
+                    del self._table[name]
+
+    def table(self):
+        """ The recorded durations.
+
+          @return list: tuples of module name and dict of durations by step in seconds, sorted by
+                        total duration
+        """
+        with self._lock:
+            rows = [(name, dict(times)) for name, times in self._table.items()]
+        return sorted(rows, key=lambda row: -sum(row[1].values()))
+
+    def folded_stacks(self):
+        """ The recorded call tree in the folded stack format of flame graph tools.
+
+          @return str: one line 'frame;frame;frame microseconds' per stack
+        """
+        with self._lock:
+            items = list(self._folded.items())
+        return ''.join('{0} {1:d}\n'.format(stack, int(round(1e6 * duration)))
+                       for stack, duration in items if duration > 0)
+
+    def save(self, filename):
+        """ Write the folded stacks to a file.
+
+          @param str filename: path of the file
+        """
+        with open(filename, 'w') as file:
+            file.write(self.folded_stacks())
+
+    def _stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            # frames and the durations of their children
+            self._local.stack = [['qudi', 0]]
+            return self._local.stack
+
+    def _push(self, frame):
+        self._stack().append([frame, 0])
+
+    def _pop(self, duration):
+        stack = self._stack()
+        key = ';'.join(frame for frame, _ in stack)
+        children = stack.pop()[1]
+        stack[-1][1] += duration
+        with self._lock:
+            self._folded[key] = self._folded.get(key, 0) + duration - children
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """ Replacement of builtins.__import__, timing the first import of absolute imports. """
+        if level != 0 or name in sys.modules or not self.enabled:
+            return self._original_import(name, globals, locals, fromlist, level)
+        self._push('import ' + name)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._pop(time.perf_counter() - start)
+
+
+# profiler of this Qudi process
+profiler = StartupProfiler()
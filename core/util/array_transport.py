@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains the bulk transport of numpy arrays for remote modules.
+
+rpyc transfers numpy arrays by pickling them through its protocol, which is slow for large
+arrays. The remote module server therefore runs an additional ArrayServer on its own port.
+netobtain asks the server via rpyc to put a remote array into the outbox of the ArrayServer and
+receives a token, then fetches the array by the token over the array socket. The array is sent
+as dtype/shape header followed by the raw buffer in chunks, optionally compressed with LZ4 or
+zstd, and received directly into the memory of the new array.
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import logging
+import secrets
+import socket
+import socketserver
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# request: token, compression
+_REQUEST = struct.Struct('!QB')
+# header: status, compression, dtype length, number of dimensions, number of bytes
+_HEADER = struct.Struct('!BBHBQ')
+_CHUNK = struct.Struct('!I')
+
+_STATUS_OK = 0
+_STATUS_UNKNOWN_TOKEN = 1
+
+COMPRESSIONS = OrderedDict([(None, 0), ('lz4', 1), ('zstd', 2)])
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def available_compressions():
+    """ The compression methods for which the python packages are installed.
+
+      @return list: None, 'lz4' and/or 'zstd'
+    """
+    available = [None]
+    if lz4 is not None:
+        available.append('lz4')
+    if zstandard is not None:
+        available.append('zstd')
+    return available
+
+
+def _compress(compression, data):
+    if compression == 1:
+        return lz4.frame.compress(data)
+    return zstandard.ZstdCompressor(level=1).compress(data)
+
+
+def _decompress(compression, data):
+    if compression == 1:
+        return lz4.frame.decompress(data)
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+def _recv_into(sock, view):
+    """ Fill a memoryview with data from a socket. """
+    received = 0
+    while received < len(view):
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError('Array connection closed by the remote side.')
+        received += count
+
+
+def _recv_bytes(sock, count):
+    buffer = bytearray(count)
+    _recv_into(sock, memoryview(buffer))
+    return buffer
+
+
+def send_array(sock, array, compression=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """ Send a numpy array over a socket as header and raw buffer.
+
+      @param socket sock: connected socket
+      @param numpy.ndarray array: array to send, no python objects or structured dtype
+      @param str compression: None, 'lz4' or 'zstd'. Chunks are sent uncompressed if the
+                              package is not installed.
+      @param int chunk_size: number of bytes sent (and compressed) at once
+    """
+    # np.ascontiguousarray would turn 0-d arrays into arrays of shape (1,)
+    array = np.require(array, requirements='C')
+    if array.dtype.hasobject or array.dtype.fields is not None:
+        raise TypeError('Arrays of python objects or with structured dtype can not be sent as '
+                        'raw buffer.')
+    code = COMPRESSIONS.get(compression, 0)
+    if compression not in available_compressions():
+        code = 0
+    dtype = array.dtype.str.encode('ascii')
+    sock.sendall(_HEADER.pack(_STATUS_OK, code, len(dtype), array.ndim, array.nbytes)
+                 + dtype + struct.pack('!{0:d}Q'.format(array.ndim), *array.shape))
+    data = memoryview(array.reshape(-1).view(np.uint8))
+    for start in range(0, array.nbytes, chunk_size):
+        chunk = data[start:start + chunk_size]
+        if code == 0:
+            sock.sendall(chunk)
+        else:
+            compressed = _compress(code, chunk)
+            sock.sendall(_CHUNK.pack(len(compressed)) + compressed)
+
+
+def recv_array(sock):
+    """ Receive a numpy array sent with send_array.
+
+      @param socket sock: connected socket
+
+      @return numpy.ndarray: received array
+    """
+    status, code, dtype_length, ndim, nbytes = _HEADER.unpack(_recv_bytes(sock, _HEADER.size))
+    if status == _STATUS_UNKNOWN_TOKEN:
+        raise KeyError('The array is not available on the remote side anymore.')
+    dtype = np.dtype(bytes(_recv_bytes(sock, dtype_length)).decode('ascii'))
+    shape = struct.unpack('!{0:d}Q'.format(ndim), _recv_bytes(sock, 8 * ndim))
+    array = np.empty(shape, dtype=dtype)
+    data = memoryview(array.reshape(-1).view(np.uint8))
+    if code == 0:
+        _recv_into(sock, data)
+    else:
+        start = 0
+        while start < nbytes:
+            length, = _CHUNK.unpack(_recv_bytes(sock, _CHUNK.size))
+            chunk = _decompress(code, _recv_bytes(sock, length))
+            data[start:start + len(chunk)] = chunk
+            start += len(chunk)
+    return array
+
+
+class _ArrayRequestHandler(socketserver.BaseRequestHandler):
+    """ Serves the arrays in the outbox of the ArrayServer, one request after the other. """
+
+    def handle(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while True:
+            try:
+                token, code = _REQUEST.unpack(_recv_bytes(self.request, _REQUEST.size))
+            except ConnectionError:
+                return
+            array = self.server.array_server.pop(token)
+            if array is None:
+                self.request.sendall(_HEADER.pack(_STATUS_UNKNOWN_TOKEN, 0, 0, 0, 0))
+                continue
+            compression = [name for name, value in COMPRESSIONS.items() if value == code]
+            send_array(self.request, array, compression=compression[0] if compression else None,
+                       chunk_size=self.server.array_server.chunk_size)
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ArrayServer:
+    """ Serves arrays put into its outbox to ArrayClients.
+    """
+
+    def __init__(self, host, port, max_pending=64, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+          @param str host: address the server listens on
+          @param int port: port the server listens on, 0 picks a free port
+          @param int max_pending: number of arrays kept for clients, the oldest are dropped
+          @param int chunk_size: number of bytes sent at once
+        """
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        self._outbox = OrderedDict()
+        self._lock = threading.Lock()
+        self._server = _ThreadingTCPServer((host, port), _ArrayRequestHandler)
+        self._server.array_server = self
+        self.host = host
+        self.port = self._server.server_address[1]
+        self._thread = None
+
+    def start(self):
+        """ Serve requests in a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='array-server', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """ Stop serving and close the socket.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def put(self, array):
+        """ Put an array into the outbox.
+
+          @param numpy.ndarray array: the array
+
+          @return int: token for fetching the array
+        """
+        token = secrets.randbits(64)
+        with self._lock:
+            self._outbox[token] = array
+            while len(self._outbox) > self.max_pending:
+                self._outbox.popitem(last=False)
+        return token
+
+    def pop(self, token):
+        """ Remove an array from the outbox.
+
+          @param int token: token returned by put
+
+          @return numpy.ndarray: the array, None if the token is unknown
+        """
+        with self._lock:
+            return self._outbox.pop(token, None)
+
+
+class ArrayClient:
+    """ Fetches arrays from an ArrayServer over one persistent connection.
+    """
+
+    def __init__(self, host, port, compression=None):
+        """
+          @param str host: host of the ArrayServer
+          @param int port: port of the ArrayServer
+          @param str compression: None, 'lz4' or 'zstd'
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError('Unknown compression {0}, use one of {1}.'.format(
+                compression, list(COMPRESSIONS)))
+        if compression not in available_compressions():
+            logger.warning('Python package for {0} compression not installed. Arrays are sent '
+                           'uncompressed.'.format(compression))
+            compression = None
+        self.host = host
+        self.port = port
+        self.compression = compression
+        self._socket = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._socket = socket.create_connection((self.host, self.port))
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def fetch(self, token):
+        """ Fetch an array from the outbox of the server.
+
+          @param int token: token returned by ArrayServer.put
+
+          @return numpy.ndarray: the array
+        """
+        with self._lock:
+            if self._socket is None:
+                self._connect()
+            try:
+                self._socket.sendall(_REQUEST.pack(token, COMPRESSIONS[self.compression]))
+                return recv_array(self._socket)
+            except (OSError, ConnectionError):
+                self.close()
+                raise
+
+    def close(self):
+        """ Close the connection, it is opened again by the next fetch.
+        """
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            finally:
+                self._socket = None
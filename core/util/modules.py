@@ -22,7 +22,11 @@ Derived form ACQ4:
 Copyright 2010  Luke Campagnola
 Originally distributed under MIT/X11 license. See documentation/MITLicense.txt for more infomation.
 """
+import logging
 import os
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
 
 
 def get_main_dir():
@@ -134,6 +138,312 @@ def toposort(deps, cost=None):
     return order
 
 
+def toposort_layers(deps):
+    """Topological sort into layers of independent nodes.
+
+      @param dict deps: Dictionary describing dependencies where a:[b,c]
+                        means "a depends on b and c"
+
+      @return list: list of lists of nodes. The nodes of one layer only depend
+                    on nodes of the previous layers and can be started
+                    concurrently.
+
+    Example::
+
+        deps = {'a': ['b', 'c'], 'c': ['b', 'd'], 'e': ['b']}
+        toposort_layers(deps)
+        => [['b', 'd'], ['c', 'e'], ['a']]
+    """
+    # copy deps and make sure all nodes have a key in deps
+    remaining = {}
+    for k, v in list(deps.items()):
+        remaining.setdefault(k, set()).update(v)
+        for k2 in v:
+            remaining.setdefault(k2, set())
+
+    layers = []
+    while len(remaining) > 0:
+        ready = sorted(k for k, v in remaining.items() if len(v) == 0)
+        # If no nodes are ready, then there must be a cycle in the graph
+        if len(ready) == 0:
+            raise Exception(
+                'Cannot resolve requested device configure/start order.')
+        layers.append(ready)
+        for k in ready:
+            del remaining[k]
+        for v in remaining.values():
+            v.difference_update(ready)
+    return layers
+
+
+class DependencyGraph:
+    """ Connections between the configured modules with memoised recursive dependencies.
+
+    The forward adjacency maps each module to the modules it connects to, the reverse adjacency
+    each module to the modules connecting to it. Recursive dependencies, dependents and start
+    orders are computed once and kept until the configuration of a module changes.
+    """
+
+    def __init__(self, defined=None):
+        """
+          @param dict defined: optional, configured modules by base
+                               (the manager's tree['defined'])
+        """
+        self._bases = dict()
+        # names defined in more than one base
+        self._ambiguous = set()
+        self._forward = dict()
+        self._reverse = dict()
+        # connection targets by module, including the ones which could not be resolved
+        self._targets = dict()
+        # error messages of modules with invalid connections
+        self._errors = dict()
+        self._closures = dict()
+        self._reverse_closures = dict()
+        self._start_orders = dict()
+        if defined is not None:
+            self.rebuild(defined)
+
+    def rebuild(self, defined):
+        """ Build the graph from the configuration.
+
+          @param dict defined: configured modules by base (the manager's tree['defined'])
+        """
+        self._bases = dict()
+        self._ambiguous = set()
+        for base, modules in defined.items():
+            for name in modules:
+                if name in self._bases:
+                    self._ambiguous.add(name)
+                self._bases[name] = base
+        self._forward = {name: set() for name in self._bases}
+        self._reverse = {name: set() for name in self._bases}
+        self._targets = dict()
+        self._errors = dict()
+        self._clear_memos()
+        for base, modules in defined.items():
+            for name, module in modules.items():
+                self._add_edges(base, name, module)
+
+    def update_module(self, base, name, module):
+        """ Replace the connections of one module after its configuration changed.
+
+          @param str base: base of the module
+          @param str name: unique module name
+          @param dict module: new configuration of the module
+        """
+        if self._bases.get(name, base) != base:
+            raise ValueError('Module {0} is already defined as {1} module.'.format(
+                name, self._bases[name]))
+        old_targets = self._targets.get(name, set())
+        self._invalidate(name, old_targets)
+        for target in self._forward.get(name, ()):
+            self._reverse[target].discard(name)
+        for target in old_targets:
+            if target in self._reverse:
+                self._reverse[target].discard(name)
+        self._bases[name] = base
+        self._forward[name] = set()
+        self._reverse.setdefault(name, set())
+        self._errors.pop(name, None)
+        self._add_edges(base, name, module)
+        self._invalidate(name, self._targets.get(name, set()))
+
+    def _add_edges(self, base, name, module):
+        """ Resolve the connections of a module and add them to the adjacencies. """
+        if 'connect' not in module:
+            self._targets[name] = set()
+            return
+        connections = module['connect']
+        if not isinstance(connections, OrderedDict):
+            self._targets[name] = set()
+            self._errors[name] = '{0} module {1}: connect is not a dictionary'.format(base, name)
+            return
+        targets = set()
+        for connector, target in connections.items():
+            if not isinstance(target, str):
+                self._errors.setdefault(name, 'Value for class key is not a string.')
+                continue
+            if '.' in target:
+                logger.warning('{0}.{1}: connection {2}: {3} has legacy '
+                               ' format for connection target'.format(
+                                   base, name, connector, target))
+                target = target.split('.')[0]
+            targets.add(target)
+            if target in self._ambiguous:
+                self._errors.setdefault(
+                    name, 'Unique name {0} is in both hardware and logic module list. '
+                          'Connection is not well defined.'.format(target))
+                continue
+            target_base = self._bases.get(target)
+            if target_base not in ('hardware', 'logic'):
+                self._errors.setdefault(
+                    name, 'Unique name {0} is neither in hardware or logic module list. '
+                          'Cannot connect {1} to it.'.format(target, name))
+                continue
+            self._forward[name].add(target)
+        for target in targets:
+            if target in self._reverse:
+                self._reverse[target].add(name)
+        self._targets[name] = targets
+
+    def _clear_memos(self):
+        self._closures.clear()
+        self._reverse_closures.clear()
+        self._start_orders.clear()
+
+    def _invalidate(self, name, targets):
+        """ Forget the memoised results depending on the connections of a module. """
+        for key in [key for key, closure in self._closures.items()
+                    if key == name or name in closure]:
+            del self._closures[key]
+            self._start_orders.pop(key, None)
+        reached = set(targets)
+        stack = list(targets)
+        while stack:
+            for target in self._forward.get(stack.pop(), ()):
+                if target not in reached:
+                    reached.add(target)
+                    stack.append(target)
+        for key in [key for key, closure in self._reverse_closures.items()
+                    if key == name or key in reached or name in closure]:
+            del self._reverse_closures[key]
+
+    def __contains__(self, name):
+        return name in self._bases
+
+    def base(self, name):
+        """ Base of a module.
+
+          @param str name: unique module name
+
+          @return str: 'hardware', 'logic' or 'gui'
+        """
+        return self._bases[name]
+
+    def dependencies(self, name):
+        """ Modules a module connects to directly.
+
+          @param str name: unique module name
+
+          @return frozenset: names of the modules
+        """
+        return frozenset(self._forward[name])
+
+    def dependents(self, name):
+        """ Modules connecting directly to a module.
+
+          @param str name: unique module name
+
+          @return frozenset: names of the modules
+        """
+        return frozenset(self._reverse[name])
+
+    def closure(self, name):
+        """ All modules a module needs, directly or through other modules.
+
+          @param str name: unique module name
+
+          @return frozenset: names of the modules, without the module itself
+
+        Raises KeyError for unknown modules and ValueError if the connections of the module or
+        of one of its dependencies are invalid.
+        """
+        closure = self._closures.get(name)
+        if closure is None:
+            if name not in self._bases:
+                raise KeyError(name)
+            if name in self._errors:
+                raise ValueError(self._errors[name])
+            closure = set()
+            for target in self._forward[name]:
+                closure.add(target)
+                closure.update(self.closure(target))
+            closure = self._closures[name] = frozenset(closure)
+        return closure
+
+    def reverse_closure(self, name):
+        """ All modules needing a module, directly or through other modules.
+
+          @param str name: unique module name
+
+          @return frozenset: names of the modules, without the module itself
+        """
+        closure = self._reverse_closures.get(name)
+        if closure is None:
+            if name not in self._bases:
+                raise KeyError(name)
+            closure = set()
+            stack = [name]
+            while stack:
+                for dependent in self._reverse[stack.pop()]:
+                    if dependent not in closure and dependent != name:
+                        closure.add(dependent)
+                        stack.append(dependent)
+            closure = self._reverse_closures[name] = frozenset(closure)
+        return closure
+
+    def subgraph(self, names):
+        """ Connections between some modules in the format of the toposort function.
+
+          @param iterable names: unique module names
+
+          @return dict: direct dependencies of each module with dependencies
+        """
+        names = set(names)
+        return {name: sorted(self._forward[name] & names)
+                for name in names if self._forward[name] & names}
+
+    def reverse_subgraph(self, names):
+        """ Reverse connections between some modules in the format of the toposort function.
+
+          @param iterable names: unique module names
+
+          @return dict: direct dependents of each module with dependents
+        """
+        names = set(names)
+        return {name: sorted(self._reverse[name] & names)
+                for name in names if self._reverse[name] & names}
+
+    def start_order(self, name):
+        """ A module and all modules it needs in the order they have to be started.
+
+          @param str name: unique module name
+
+          @return list: names of the modules, ending with the module itself
+
+        Raises the exceptions of closure.
+        """
+        order = self._start_orders.get(name)
+        if order is None:
+            order = toposort(self.subgraph(self.closure(name) | {name}))
+            if len(order) == 0:
+                order.append(name)
+            self._start_orders[name] = order
+        return list(order)
+
+    def reload_set(self, names, loaded=None):
+        """ The minimal set of modules affected by reloading some modules.
+
+          @param iterable names: unique names of the modules to reload
+          @param iterable loaded: optional, names of the loaded modules. Only these are
+                                  returned, as modules which are not loaded need no restart.
+
+          @return list: names of the affected modules in the order they have to be stopped
+                        (dependents first). Restart them in reversed order.
+        """
+        affected = set()
+        for name in names:
+            affected.add(name)
+            affected.update(self.reverse_closure(name))
+        order = toposort(self.reverse_subgraph(affected))
+        order.extend(sorted(affected.difference(order)))
+        if loaded is not None:
+            loaded = set(loaded)
+            order = [name for name in order if name in loaded]
+        return order
+
+
 def is_base(base):
     """Is the given base one of the three allowed ones?
 
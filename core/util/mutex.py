@@ -2,6 +2,11 @@
 """
 Mutex.py -  Stand-in extension of Qt's QMutex class
 
+With enable_instrumentation() all mutexes record how long threads wait for them and how long
+they are held, by which thread and from which line of code. The statistics are shown in the
+manager window and available through mutex_statistics() and dump_mutex_statistics(). While the
+instrumentation is disabled, it only costs one check per lock and unlock.
+
 Qudi is free software: you can redistribute it and/or modify
 it under the terms of the GNU General Public License as published by
 the Free Software Foundation, either version 3 of the License, or
@@ -24,10 +29,132 @@ Originally distributed under MIT/X11 license. See documentation/MITLicense.txt f
 """
 
 from qtpy import QtCore
+import bisect
+import linecache
+import os
+import re
+import sys
+import threading
+import time
 import traceback
 import logging
 logger = logging.getLogger(__name__)
 
+# upper edges of the wait and hold time histograms in seconds
+HISTOGRAM_EDGES = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1)
+HISTOGRAM_LABELS = ('<10us', '<100us', '<1ms', '<10ms', '<100ms', '<1s', '>=1s')
+# a lock counts as contended if the thread waited longer than this
+CONTENTION_THRESHOLD = 1e-4
+
+# statistics by mutex name while the instrumentation is enabled, else None
+_statistics = None
+_statistics_lock = threading.Lock()
+
+
+def enable_instrumentation():
+    """ Start recording wait and hold times of all mutexes.
+    """
+    global _statistics
+    with _statistics_lock:
+        if _statistics is None:
+            _statistics = dict()
+
+
+def disable_instrumentation():
+    """ Stop recording, the recorded statistics are discarded.
+    """
+    global _statistics
+    with _statistics_lock:
+        _statistics = None
+
+
+def instrumentation_enabled():
+    """ Whether mutexes record statistics.
+
+        @return bool: True if enable_instrumentation was called
+    """
+    return _statistics is not None
+
+
+def reset_mutex_statistics():
+    """ Discard the recorded statistics and continue recording.
+    """
+    with _statistics_lock:
+        if _statistics is not None:
+            _statistics.clear()
+
+
+def mutex_statistics():
+    """ Recorded statistics of all mutexes, sorted by the total waiting time.
+
+        @return list: dicts with the keys name, locks, contended, wait_total, wait_max,
+                      hold_total, hold_max (times in seconds), wait_histogram, hold_histogram
+                      (counts per HISTOGRAM_LABELS), holder (name of the thread holding the
+                      mutex or None), last_holder and sites (dict of call site: [locks, total
+                      hold time])
+    """
+    with _statistics_lock:
+        if _statistics is None:
+            return list()
+        stats = [record.copy() for record in _statistics.values()]
+    for record in stats:
+        record['wait_histogram'] = list(record['wait_histogram'])
+        record['hold_histogram'] = list(record['hold_histogram'])
+        record['sites'] = {site: list(value) for site, value in record['sites'].items()}
+    return sorted(stats, key=lambda record: -record['wait_total'])
+
+
+def dump_mutex_statistics(filename=None):
+    """ Statistics of all mutexes as text table.
+
+        @param str filename: optional, also write the table to this file
+
+        @return str: the table
+    """
+    lines = ['{0:<40} {1:>8} {2:>9} {3:>11} {4:>10} {5:>11} {6:>10}  {7}'.format(
+        'mutex', 'locks', 'contended', 'wait [ms]', 'max [ms]', 'hold [ms]', 'max [ms]',
+        'main call site (locks, hold [ms])')]
+    for record in mutex_statistics():
+        site = ''
+        if record['sites']:
+            site, (count, hold) = max(record['sites'].items(), key=lambda item: item[1][1])
+            site = '{0} ({1:d}, {2:.1f})'.format(site, count, 1e3 * hold)
+        lines.append('{0:<40} {1:>8d} {2:>9d} {3:>11.1f} {4:>10.1f} {5:>11.1f} {6:>10.1f}  '
+                     '{7}'.format(record['name'][:40], record['locks'], record['contended'],
+                                  1e3 * record['wait_total'], 1e3 * record['wait_max'],
+                                  1e3 * record['hold_total'], 1e3 * record['hold_max'], site))
+        lines.append('{0:<40} wait  {1}'.format('', '  '.join(
+            '{0}: {1:d}'.format(*item) for item in zip(HISTOGRAM_LABELS, record['wait_histogram']))))
+        lines.append('{0:<40} hold  {1}'.format('', '  '.join(
+            '{0}: {1:d}'.format(*item) for item in zip(HISTOGRAM_LABELS, record['hold_histogram']))))
+    text = '\n'.join(lines) + '\n'
+    if filename is not None:
+        with open(filename, 'w') as f:
+            f.write(text)
+    return text
+
+
+def _new_record(name):
+    return {'name': name, 'locks': 0, 'contended': 0, 'wait_total': 0.0, 'wait_max': 0.0,
+            'hold_total': 0.0, 'hold_max': 0.0,
+            'wait_histogram': [0] * len(HISTOGRAM_LABELS),
+            'hold_histogram': [0] * len(HISTOGRAM_LABELS),
+            'holder': None, 'last_holder': None, 'sites': dict()}
+
+
+def _call_site():
+    """ File, line and function of the code locking the mutex. """
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename == _THIS_FILE:
+        frame = frame.f_back
+    if frame is None:
+        return '???'
+    return '{0}:{1:d} ({2})'.format(os.path.basename(frame.f_code.co_filename), frame.f_lineno,
+                                    frame.f_code.co_name)
+
+
+_THIS_FILE = _call_site.__code__.co_filename
+
 
 class Mutex(QtCore.QMutex):
     """Extends QMutex (which serves as access serialization between threads).
@@ -46,6 +173,83 @@ class Mutex(QtCore.QMutex):
         self.mutex = QtCore.QMutex()  # for serializing access to self.tb
         self.tb = []
         self.debug = kargs.pop('debug', False)  # True to enable debugging functions
+        # name in the statistics, derived from the line creating the mutex if not given
+        self._name = kargs.pop('name', None)
+        if self._name is None:
+            frame = sys._getframe(1)
+            while frame.f_back is not None and frame.f_code.co_filename == _THIS_FILE:
+                frame = frame.f_back
+            owner = frame.f_locals.get('self')
+            self._creation = (frame.f_code.co_filename, frame.f_lineno,
+                              None if owner is None else type(owner).__name__)
+        # thread ident, nesting depth, lock time and call site of the current holder
+        self._holder = None
+        self._hold_depth = 0
+        self._locked_at = 0
+        self._lock_site = None
+
+    @property
+    def name(self):
+        """ Name of the mutex in the statistics, e.g. ODMRLogic.threadlock.
+        """
+        if self._name is None:
+            filename, lineno, owner = self._creation
+            match = re.match(r'\s*self\.(\w+)\s*=', linecache.getline(filename, lineno))
+            if owner is not None and match is not None:
+                self._name = '{0}.{1}'.format(owner, match.group(1))
+            else:
+                self._name = '{0}:{1:d}'.format(os.path.basename(filename), lineno)
+        return self._name
+
+    def _record_lock(self, wait):
+        """ Add a successful lock after waiting for wait seconds to the statistics. """
+        ident = threading.get_ident()
+        if self._holder == ident:
+            # nested lock of a recursive mutex
+            self._hold_depth += 1
+            return
+        self._holder = ident
+        self._hold_depth = 1
+        self._lock_site = _call_site()
+        thread_name = threading.current_thread().name
+        with _statistics_lock:
+            if _statistics is None:
+                return
+            record = _statistics.get(self.name)
+            if record is None:
+                record = _statistics[self.name] = _new_record(self.name)
+            record['locks'] += 1
+            record['wait_total'] += wait
+            record['wait_max'] = max(record['wait_max'], wait)
+            record['wait_histogram'][bisect.bisect(HISTOGRAM_EDGES, wait)] += 1
+            if wait > CONTENTION_THRESHOLD:
+                record['contended'] += 1
+            record['holder'] = thread_name
+        self._locked_at = time.perf_counter()
+
+    def _record_unlock(self):
+        """ Add the hold time to the statistics before unlocking. """
+        if self._holder != threading.get_ident():
+            return
+        self._hold_depth -= 1
+        if self._hold_depth > 0:
+            return
+        hold = time.perf_counter() - self._locked_at
+        self._holder = None
+        with _statistics_lock:
+            if _statistics is None:
+                return
+            record = _statistics.get(self.name)
+            if record is None:
+                return
+            record['hold_total'] += hold
+            record['hold_max'] = max(record['hold_max'], hold)
+            record['hold_histogram'][bisect.bisect(HISTOGRAM_EDGES, hold)] += 1
+            record['last_holder'] = record['holder']
+            record['holder'] = None
+            site = record['sites'].setdefault(self._lock_site, [0, 0.0])
+            site[0] += 1
+            site[1] += hold
 
     def tryLock(self, timeout=None, id=None):
         """ Try to lock  the mutex.
@@ -55,6 +259,17 @@ class Mutex(QtCore.QMutex):
 
             @return bool: whether locking succeeded
         """
+        if _statistics is None:
+            return self._tryLock(timeout, id)
+        start = time.perf_counter()
+        locked = self._tryLock(timeout, id)
+        if locked:
+            self._record_lock(time.perf_counter() - start)
+        return locked
+
+    def _tryLock(self, timeout=None, id=None):
+        """ Try to lock the mutex without recording statistics, see tryLock.
+        """
         if timeout is None:
             locked = QtCore.QMutex.tryLock(self)
         else:
@@ -78,8 +293,11 @@ class Mutex(QtCore.QMutex):
         """
         c = 0
         wait_time = 5000  # in ms
+        start = time.perf_counter() if _statistics is not None else None
         while True:
-            if self.tryLock(wait_time, id):
+            if self._tryLock(wait_time, id):
+                if start is not None:
+                    self._record_lock(time.perf_counter() - start)
                 break
             c += 1
             if self.debug:
@@ -98,6 +316,8 @@ class Mutex(QtCore.QMutex):
     def unlock(self):
         """ Unlock mutex.
         """
+        if self._holder is not None:
+            self._record_unlock()
         QtCore.QMutex.unlock(self)
         if self.debug:
             self.mutex.lock()
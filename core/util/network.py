@@ -19,14 +19,123 @@ Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
 top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
 """
 
+import logging
+import weakref
+
 import rpyc.core.netref
 import rpyc.utils.classic
 
+logger = logging.getLogger(__name__)
 
-def netobtain(obj):
+# ArrayClient of each rpyc connection with an array server
+_array_clients = weakref.WeakKeyDictionary()
+
+
+def register_array_client(connection, client):
+    """ Fetch the numpy arrays of a connection with an ArrayClient in netobtain.
+
+      @param rpyc.Connection connection: connection to a remote module server
+      @param ArrayClient client: client of the array server of the remote module server
     """
+    _array_clients[connection] = client
+
+
+def netobtain(obj):
+    """ Get a local copy of an object of a remote module.
+
+      @param obj: object, which may be an rpyc netref
+
+      @return: local object
+
+    Numpy arrays are fetched as raw buffer from the array server, if the remote module server
+    has one. Other objects are pickled through rpyc.
     """
     if isinstance(obj, rpyc.core.netref.BaseNetref):
+        # the netref class is named 'ndarray' in rpyc 4.0 and 'numpy.ndarray' from rpyc 4.1
+        if type(obj).__name__.rsplit('.', 1)[-1] == 'ndarray' and len(_array_clients) > 0:
+            connection = object.__getattribute__(obj, '____conn__')
+            if isinstance(connection, weakref.ref):
+                connection = connection()
+            client = _array_clients.get(connection)
+            if client is not None:
+                try:
+                    token = connection.root.shareArray(obj)
+                    if token is not None:
+                        return client.fetch(token)
+                except Exception:
+                    logger.exception('Fetching array from the array server failed, '
+                                     'falling back to rpyc.')
         return rpyc.utils.classic.obtain(obj)
     else:
         return obj
+
+
+class NetResult:
+    """ Result of a call started with netasync.
+    """
+
+    def __init__(self, async_result=None, value=None, exception=None):
+        self._async_result = async_result
+        self._value = value
+        self._exception = exception
+
+    def done(self):
+        """ Whether the call has finished.
+
+          @return bool: True if the result is available
+        """
+        return self._async_result is None or self._async_result.ready
+
+    def result(self, timeout=None, obtain=True):
+        """ Wait for the call to finish and return its result.
+
+          @param float timeout: optional, maximum time to wait in seconds
+          @param bool obtain: return a local copy of remote objects, see netobtain
+
+          @return: return value of the call, exceptions of the call are raised
+        """
+        if self._async_result is not None:
+            if timeout is not None:
+                self._async_result.set_expiry(timeout)
+            value = self._async_result.value
+        elif self._exception is not None:
+            raise self._exception
+        else:
+            value = self._value
+        return netobtain(value) if obtain else value
+
+
+def netasync(method, *args, **kwargs):
+    """ Call a method of a module without waiting for the result.
+
+      @param method: method of a remote (rpyc) or local module
+      @param args: positional arguments of the call
+      @param kwargs: keyword arguments of the call
+
+      @return NetResult: result of the call
+
+    Methods of remote modules send the request and return immediately, so several calls to a
+    remote computer only cost one round trip. Methods of local modules are called directly.
+    """
+    if isinstance(method, rpyc.core.netref.BaseNetref):
+        return NetResult(async_result=rpyc.async_(method)(*args, **kwargs))
+    try:
+        return NetResult(value=method(*args, **kwargs))
+    except Exception as e:
+        return NetResult(exception=e)
+
+
+def netbatch(calls, obtain=True):
+    """ Call several methods of modules and wait for all results.
+
+      @param list calls: tuples of method, args and optional kwargs,
+                         e.g. [(counter.get_counter, (10, )), (laser.get_power, ())]
+      @param bool obtain: return local copies of remote objects, see netobtain
+
+      @return list: return values of the calls in the same order
+
+    All requests to remote modules are sent before waiting for the first reply.
+    """
+    results = [netasync(call[0], *call[1], **(call[2] if len(call) > 2 else dict()))
+               for call in calls]
+    return [result.result(obtain=obtain) for result in results]
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains the tracing of measurement loops of logic modules.
+
+Every GenericLogic has a Tracer as attribute `tracer`. Loop bodies are decorated with
+`traced_iteration` and mark their phases (e.g. 'hardware', 'processing', 'emit') with
+`self.tracer.phase(name)`. While the tracer is enabled, the duration of every iteration and of
+its phases is kept in a ring buffer. From the jupyter kernel:
+
+    counterlogic.tracer.enable()
+    counterlogic.tracer.summary()
+    core.util.tracing.export_chrome_trace('trace.json')  # open in chrome://tracing or Perfetto
+
+While disabled, the decorator and the phase context manager only check one attribute.
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+
+# all tracers by module name
+_tracers = weakref.WeakValueDictionary()
+
+
+class _NoSpan:
+    """ Context manager doing nothing, used while the tracer is disabled. """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_no_span = _NoSpan()
+
+
+class _Iteration:
+    """ Context manager recording one iteration, see Tracer.iteration. """
+
+    __slots__ = ('_tracer', 'name', 'start', 'phases')
+
+    def __init__(self, tracer, name):
+        self._tracer = tracer
+        self.name = name
+        # tuples of phase name, start and duration
+        self.phases = list()
+
+    def __enter__(self):
+        self._tracer._local.iteration = self
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self.start
+        self._tracer._local.iteration = None
+        self._tracer._record(self.name, self.start, duration, self.phases)
+        return False
+
+
+class _Phase:
+    """ Context manager recording one phase of the current iteration, see Tracer.phase. """
+
+    __slots__ = ('_tracer', '_name', '_start')
+
+    def __init__(self, tracer, name):
+        self._tracer = tracer
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self._start
+        iteration = getattr(self._tracer._local, 'iteration', None)
+        if iteration is not None:
+            iteration.phases.append((self._name, self._start, duration))
+        else:
+            self._tracer._record(self._name, self._start, duration, [])
+        return False
+
+
+class Tracer:
+    """ Records the durations of measurement loop iterations of a module.
+    """
+
+    def __init__(self, name, capacity=10000):
+        """
+          @param str name: name of the module
+          @param int capacity: number of iterations kept
+        """
+        self.name = name
+        self.enabled = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # tuples of iteration name, thread id and name, start, duration and list of phases
+        self._records = deque(maxlen=capacity)
+        _tracers[name] = self
+
+    def enable(self):
+        """ Start recording.
+        """
+        self.enabled = True
+
+    def disable(self):
+        """ Stop recording, the recorded iterations are kept.
+        """
+        self.enabled = False
+
+    def clear(self):
+        """ Discard the recorded iterations.
+        """
+        with self._lock:
+            self._records.clear()
+
+    def iteration(self, name):
+        """ Context manager recording one iteration of a loop.
+
+          @param str name: name of the loop, e.g. the name of the loop body method
+
+          @return: context manager, which does nothing while the tracer is disabled
+        """
+        if not self.enabled:
+            return _no_span
+        return _Iteration(self, name)
+
+    def phase(self, name):
+        """ Context manager recording a phase of the current iteration.
+
+          @param str name: name of the phase, e.g. 'hardware', 'processing' or 'emit'
+
+          @return: context manager, which does nothing while the tracer is disabled
+        """
+        if not self.enabled:
+            return _no_span
+        return _Phase(self, name)
+
+    def _record(self, name, start, duration, phases):
+        thread = threading.current_thread()
+        thread = (thread.ident, thread.name)
+        with self._lock:
+            self._records.append((name, thread, start, duration, phases))
+
+    def records(self):
+        """ The recorded iterations.
+
+          @return list: dicts with the keys name, thread, start, duration (in seconds, start of
+                        time.perf_counter) and phases (dict of phase durations)
+        """
+        with self._lock:
+            records = list(self._records)
+        result = list()
+        for name, thread, start, duration, phases in records:
+            durations = OrderedDict()
+            for phase, _, phase_duration in phases:
+                durations[phase] = durations.get(phase, 0) + phase_duration
+            result.append({'name': name, 'thread': thread[1], 'start': start,
+                           'duration': duration, 'phases': durations})
+        return result
+
+    def summary(self):
+        """ Statistics of the recorded iterations per loop.
+
+          @return dict: for each loop name a dict with the number of iterations, mean and
+                        maximum duration and the mean duration of each phase in seconds. The
+                        time not covered by phases is reported as phase 'other'.
+        """
+        summary = OrderedDict()
+        for record in self.records():
+            stats = summary.setdefault(record['name'], {'count': 0, 'mean': 0, 'max': 0,
+                                                        'phases': OrderedDict()})
+            stats['count'] += 1
+            stats['mean'] += record['duration']
+            stats['max'] = max(stats['max'], record['duration'])
+            other = record['duration']
+            for phase, duration in record['phases'].items():
+                stats['phases'][phase] = stats['phases'].get(phase, 0) + duration
+                other -= duration
+            if record['phases']:
+                stats['phases']['other'] = stats['phases'].get('other', 0) + other
+        for stats in summary.values():
+            stats['mean'] /= stats['count']
+            for phase in stats['phases']:
+                stats['phases'][phase] /= stats['count']
+        return summary
+
+    def chrome_trace_events(self, pid=None):
+        """ The recorded iterations as events of the Chrome trace event format.
+
+          @param int pid: process id of the events, defaults to the id of this process
+
+          @return list: complete ('X') events with timestamps in microseconds
+        """
+        if pid is None:
+            pid = os.getpid()
+        with self._lock:
+            records = list(self._records)
+        events = list()
+        threads = dict()
+        for name, (tid, thread), start, duration, phases in records:
+            threads[tid] = thread
+            events.append({'name': name, 'cat': self.name, 'ph': 'X', 'pid': pid,
+                           'tid': tid, 'ts': 1e6 * start, 'dur': 1e6 * duration})
+            for phase, phase_start, phase_duration in phases:
+                events.append({'name': phase, 'cat': self.name, 'ph': 'X', 'pid': pid,
+                               'tid': tid, 'ts': 1e6 * phase_start,
+                               'dur': 1e6 * phase_duration})
+        # metadata events naming the threads
+        for tid, thread in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': thread}})
+        return events
+
+    def export_chrome_trace(self, filename):
+        """ Write the recorded iterations as Chrome trace file.
+
+          @param str filename: path of the JSON file
+        """
+        export_chrome_trace(filename, [self])
+
+
+def traced_iteration(func=None, name=None):
+    """ Decorator recording each call of a loop body method of a GenericLogic as iteration.
+
+      @param callable func: the method, which has to belong to an object with a `tracer`
+      @param str name: optional, name of the loop, defaults to the name of the method
+
+      Can be used as @traced_iteration or @traced_iteration(name='scan line').
+    """
+    if func is None:
+        return functools.partial(traced_iteration, name=name)
+    loop_name = func.__name__ if name is None else name
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        tracer = self.tracer
+        if not tracer.enabled:
+            return func(self, *args, **kwargs)
+        with _Iteration(tracer, loop_name):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
+def tracers():
+    """ The tracers of all loaded logic modules.
+
+      @return dict: tracers by module name
+    """
+    return dict(_tracers)
+
+
+def export_chrome_trace(filename, tracer_list=None):
+    """ Write the recorded iterations of several modules as Chrome trace file.
+
+      @param str filename: path of the JSON file, open it with chrome://tracing or Perfetto
+      @param list tracer_list: optional, the tracers to export, defaults to all tracers
+    """
+    if tracer_list is None:
+        tracer_list = list(_tracers.values())
+    events = list()
+    for tracer in tracer_list:
+        events.extend(tracer.chrome_trace_events())
+    with open(filename, 'w') as file:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
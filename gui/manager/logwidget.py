@@ -33,10 +33,15 @@ import sys
 
 class LogModel(QtCore.QAbstractTableModel):
     """ This is a Qt model that represents the log for dislpay in a QTableView.
+
+    The entries are kept in a ring buffer of fixed capacity. When new entries
+    are added to a full model, the oldest entries are removed.
     """
 
-    def __init__(self, **kwargs):
+    def __init__(self, capacity=1000, **kwargs):
         """ Set up the model.
+
+          @param int capacity: maximum number of log entries kept in the model
         """
         super().__init__(**kwargs)
         self.header = ['Name', 'Time', 'Level', 'Message']
@@ -47,14 +52,57 @@ class LogModel(QtCore.QAbstractTableModel):
             'error':    QtGui.QColor('#F11'),
             'critical': QtGui.QColor('#FF00FF')
         }
-        self.entries = list()
+        # ring buffer of rows [name, time, level, message, repeated]
+        self._capacity = capacity
+        self._buffer = [None] * capacity
+        self._start = 0
+        self._count = 0
+
+    @property
+    def capacity(self):
+        """ Maximum number of log entries kept in the model.
+        """
+        return self._capacity
+
+    @property
+    def entries(self):
+        """ Copy of the log entries, oldest first.
+
+          @return list: log entries as lists [name, time, level, message]
+        """
+        return [row[:4] for row in self._rows()]
+
+    def _rows(self):
+        return [self._buffer[(self._start + ii) % self._capacity]
+                for ii in range(self._count)]
+
+    def _row(self, row):
+        return self._buffer[(self._start + row) % self._capacity]
+
+    def _setRows(self, rows):
+        """ Replace the content of the buffer, keeping the newest rows. """
+        rows = rows[-self._capacity:] if self._capacity > 0 else []
+        self._buffer = rows + [None] * (self._capacity - len(rows))
+        self._start = 0
+        self._count = len(rows)
+
+    def setCapacity(self, capacity):
+        """ Change the maximum number of log entries.
+
+          @param int capacity: maximum number of log entries kept in the model
+        """
+        self.beginResetModel()
+        rows = self._rows()
+        self._capacity = capacity
+        self._setRows(rows)
+        self.endResetModel()
 
     def rowCount(self, parent=QtCore.QModelIndex()):
         """ Gives th number of log entries  stored in the model.
 
           @return int: number of log entries stored
         """
-        return len(self.entries)
+        return self._count
 
     def columnCount(self, parent=QtCore.QModelIndex()):
         """ Gives the number of columns each log entry has.
@@ -82,18 +130,21 @@ class LogModel(QtCore.QAbstractTableModel):
 
           @return QVariant: data for given cell and role
         """
-        if not index.isValid():
+        if not index.isValid() or not 0 <= index.row() < self._count:
             return None
-        elif role == QtCore.Qt.TextColorRole:
+        entry = self._row(index.row())
+        if role == QtCore.Qt.TextColorRole:
             try:
-                return self.fgColor[self.entries[index.row()][2]]
+                return self.fgColor[entry[2]]
             except KeyError:
-                print('fgcolor', self.entries[index.row()][2])
+                print('fgcolor', entry[2])
                 return QtGui.QColor('#FFF')
         elif role == QtCore.Qt.DisplayRole:
-            return self.entries[index.row()][index.column()]
+            if index.column() == 3 and entry[4] > 1:
+                return '{0} ({1:d}x)'.format(entry[3], entry[4])
+            return entry[index.column()]
         elif role == QtCore.Qt.EditRole:
-            return self.entries[index.row()][index.column()]
+            return entry[index.column()]
         else:
             return None
 
@@ -108,15 +159,14 @@ class LogModel(QtCore.QAbstractTableModel):
           @return bool: True if setting data succeeded, False otherwise
         """
         if role == QtCore.Qt.EditRole:
-            try:
-                self.entries[index.row()][index.column()] = value
-            except Exception as e:
-                print(e)
+            if not 0 <= index.row() < self._count or not 0 <= index.column() < 4:
                 return False
+            self._row(index.row())[index.column()] = value
             topleft = self.createIndex(index.row(), 0)
             bottomright = self.createIndex(index.row(), 3)
             self.dataChanged.emit(topleft, bottomright)
             return True
+        return False
 
     def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
         """ Data for the table view headers.
@@ -145,13 +195,7 @@ class LogModel(QtCore.QAbstractTableModel):
 
           @return bool: True if insertion succeeded, False otherwise
         """
-        self.beginInsertRows(parent, row, row + count - 1)
-        insertion = list()
-        for ii in range(count):
-            insertion.append([None, None, None, None])
-        self.entries[row:row] = insertion
-        self.endInsertRows()
-        return True
+        return self.addRows(row, [[None, None, None, None] for ii in range(count)], parent)
 
     def addRow(self, row, data, parent=QtCore.QModelIndex()):
         """ Add a single log entry to model.
@@ -167,20 +211,67 @@ class LogModel(QtCore.QAbstractTableModel):
         """ Add a log entries to model.
           @param int row: row before which to insert log entry
           @param list data: log entries in list format (list of lists of
-                            4 elements)
+                            4 elements and optionally the repetition count)
           @param QModelIndex parent: parent model index
 
           @return bool: True if adding entry succeede, False otherwise
         """
-        count = len(data)
-        self.beginInsertRows(parent, row, row + count - 1)
-        self.entries[row:row] = data
-        self.endInsertRows()
-        topleft = self.createIndex(row, 0)
-        bottomright = self.createIndex(row, 3)
-        self.dataChanged.emit(topleft, bottomright)
+        if not data:
+            return True
+        data = [list(entry) + [1] if len(entry) < 5 else list(entry) for entry in data]
+        if row == self._count:
+            self.appendRows(data)
+            return True
+        # inserting in the middle is not needed for logging, rebuild the buffer
+        rows = self._rows()
+        rows[row:row] = data
+        self.beginResetModel()
+        self._setRows(rows)
+        self.endResetModel()
         return True
 
+    def appendRows(self, data):
+        """ Append log entries, removing the oldest entries if the model is full.
+
+          An entry with the same name, level and message as the last entry in
+          the model is merged into it: the repetition count is increased and the
+          time is updated.
+
+          @param list data: log entries as lists [name, time, level, message, repeated]
+        """
+        if self._capacity == 0:
+            return
+        if self._count > 0:
+            last = self._row(self._count - 1)
+            merged = 0
+            for entry in data:
+                if (entry[0], entry[2], entry[3]) != (last[0], last[2], last[3]):
+                    break
+                last[1] = entry[1]
+                last[4] += entry[4]
+                merged += 1
+            if merged > 0:
+                data = data[merged:]
+                self.dataChanged.emit(self.createIndex(self._count - 1, 1),
+                                      self.createIndex(self._count - 1, 3))
+        data = data[-self._capacity:]
+        if not data:
+            return
+        overflow = self._count + len(data) - self._capacity
+        if overflow > 0:
+            self.beginRemoveRows(QtCore.QModelIndex(), 0, overflow - 1)
+            for ii in range(overflow):
+                self._buffer[(self._start + ii) % self._capacity] = None
+            self._start = (self._start + overflow) % self._capacity
+            self._count -= overflow
+            self.endRemoveRows()
+        first = self._count
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(data) - 1)
+        for ii, entry in enumerate(data):
+            self._buffer[(self._start + first + ii) % self._capacity] = entry
+        self._count += len(data)
+        self.endInsertRows()
+
     def removeRows(self, row, count, parent=QtCore.QModelIndex()):
         """ Remove rows (log entries) from model.
 
@@ -190,8 +281,18 @@ class LogModel(QtCore.QAbstractTableModel):
 
           @return bool: True if removal succeeded, False otherwise
         """
+        if count <= 0:
+            return False
         self.beginRemoveRows(parent, row, row + count - 1)
-        self.entries[row:row + count] = []
+        if row == 0:
+            for ii in range(count):
+                self._buffer[(self._start + ii) % self._capacity] = None
+            self._start = (self._start + count) % self._capacity
+            self._count -= count
+        else:
+            rows = self._rows()
+            rows[row:row + count] = []
+            self._setRows(rows)
         self.endRemoveRows()
         return True
 
@@ -289,6 +390,7 @@ class LogWidget(QtWidgets.QWidget):
     """
     sigDisplayEntry = QtCore.Signal(object)  # for thread-safetyness
     sigAddEntry = QtCore.Signal(object)  # for thread-safetyness
+    sigAddEntries = QtCore.Signal(object)  # for thread-safetyness
     sigScrollToAnchor = QtCore.Signal(object)  # for internal use.
 
     def __init__(self, manager=None, **kwargs):
@@ -308,7 +410,7 @@ class LogWidget(QtWidgets.QWidget):
         self.logLength = 1000
 
         # Set up data model and visibility filter
-        self.model = LogModel()
+        self.model = LogModel(capacity=self.logLength)
         self.filtermodel = LogFilter()
         self.filtermodel.setSourceModel(self.model)
         self.output.setModel(self.filtermodel)
@@ -345,6 +447,7 @@ class LogWidget(QtWidgets.QWidget):
         self.sigDisplayEntry.connect(self.displayEntry,
                                      QtCore.Qt.QueuedConnection)
         self.sigAddEntry.connect(self.addEntry, QtCore.Qt.QueuedConnection)
+        self.sigAddEntries.connect(self.addEntries, QtCore.Qt.QueuedConnection)
         self.filterTree.itemChanged.connect(self.setCheckStates)
 
     def setManager(self, manager):
@@ -380,8 +483,24 @@ class LogWidget(QtWidgets.QWidget):
         if not isGuiThread:
             self.sigAddEntry.emit(entry)
             return
-        if self.model.rowCount() > self.logLength:
-            self.model.removeRows(0, self.model.rowCount() - self.logLength)
+        self.model.appendRows([self._logEntry(entry)])
+        self.output.scrollToBottom()
+
+    def addEntries(self, entries):
+        """Add several log entries to the log view at once.
+
+          @param list entries: log entries in dict format
+        """
+        isGuiThread = QtCore.QThread.currentThread(
+        ) == QtCore.QCoreApplication.instance().thread()
+        if not isGuiThread:
+            self.sigAddEntries.emit(entries)
+            return
+        self.model.appendRows([self._logEntry(entry) for entry in entries])
+        self.output.scrollToBottom()
+
+    def _logEntry(self, entry):
+        """ Convert a log entry dict into a row of the model. """
         text = entry['message']
         if entry.get('exception') is not None:
             if 'reasons' in entry['exception']:
@@ -390,9 +509,8 @@ class LogWidget(QtWidgets.QWidget):
                 text += '\n' + entry['exception']['message']
             for line in entry['exception']['traceback']:
                 text += '\n' + str(line)
-        logEntry = [entry['name'], entry['timestamp'], entry['level'], text]
-        self.model.addRow(self.model.rowCount(), logEntry)
-        self.output.scrollToBottom()
+        return [entry['name'], entry['timestamp'], entry['level'], text,
+                entry.get('repeated', 1)]
 
     def displayEntry(self, entry):
         """ Scroll to entry in QTableView.
@@ -410,6 +528,7 @@ class LogWidget(QtWidgets.QWidget):
         """
         if length > 0:
             self.logLength = length
+            self.model.setCapacity(length)
 
     def setCheckStates(self, item, column):
         """ Set state of the checkbox in the filter list and update log view.
@@ -28,6 +28,8 @@ from collections import OrderedDict
 from core.statusvariable import StatusVar
 from core.util.modules import get_main_dir
 from .errordialog import ErrorDialog
+from .startupprofilewidget import StartupProfileWidget
+from .mutexwidget import MutexStatisticsWidget
 from gui.guibase import GUIBase
 from qtpy import QtCore, QtWidgets, uic
 from qtpy.QtGui import QPalette
@@ -144,7 +146,9 @@ class ManagerGui(GUIBase):
         # Log widget
         self._mw.logwidget.setManager(self._manager)
         for loghandler in logging.getLogger().handlers:
-            if isinstance(loghandler, core.logger.QtLogHandler):
+            if isinstance(loghandler, core.logger.BufferedQtLogHandler):
+                loghandler.sigLoggedMessages.connect(self.handleLogEntries)
+            elif isinstance(loghandler, core.logger.QtLogHandler):
                 loghandler.sigLoggedMessage.connect(self.handleLogEntry)
         # Module widgets
         self.sigStartModule.connect(self._manager.startModule)
@@ -181,9 +185,30 @@ class ManagerGui(GUIBase):
                 self._mw.remoteWidget.portLabel.setVisible(False)
                 self._mw.remoteWidget.sharedModuleListView.setVisible(False)
 
+        # startup profile widget, only with the command line option --profile-startup
+        self._profileDockWidget = None
+        if self._manager.profiler.has_profile:
+            self._profileWidget = StartupProfileWidget(self._manager.profiler)
+            self._profileDockWidget = QtWidgets.QDockWidget('Startup profile', self._mw)
+            self._profileDockWidget.setObjectName('profileDockWidget')
+            self._profileDockWidget.setWidget(self._profileWidget)
+            self._mw.addDockWidget(QtCore.Qt.DockWidgetArea(8), self._profileDockWidget)
+            self._mw.menuView.addAction(self._profileDockWidget.toggleViewAction())
+            self._manager.sigModulesChanged.connect(self._profileWidget.refresh)
+            self._profileWidget.refresh()
+
+        # mutex contention statistics, recording is started in the widget or by the config
+        self._mutexWidget = MutexStatisticsWidget()
+        self._mutexDockWidget = QtWidgets.QDockWidget('Mutex contention', self._mw)
+        self._mutexDockWidget.setObjectName('mutexDockWidget')
+        self._mutexDockWidget.setWidget(self._mutexWidget)
+        self._mw.addDockWidget(QtCore.Qt.DockWidgetArea(8), self._mutexDockWidget)
+        self._mw.menuView.addAction(self._mutexDockWidget.toggleViewAction())
+
         self._mw.configDisplayDockWidget.hide()
         self._mw.remoteDockWidget.hide()
         self._mw.threadDockWidget.hide()
+        self._mutexDockWidget.hide()
         self._mw.show()
 
     def on_deactivate(self):
@@ -194,6 +219,9 @@ class ManagerGui(GUIBase):
         self.checkTimer.stop()
         if len(self.modlist) > 0:
             self.checkTimer.timeout.disconnect()
+        if self._profileDockWidget is not None:
+            self._manager.sigModulesChanged.disconnect(self._profileWidget.refresh)
+        self._mutexWidget.timer.stop()
         self.sigStartModule.disconnect()
         self.sigReloadModule.disconnect()
         self.sigStopModule.disconnect()
@@ -270,6 +298,17 @@ class ManagerGui(GUIBase):
         if entry['level'] == 'error' or entry['level'] == 'critical':
             self.errorDialog.show(entry)
 
+    def handleLogEntries(self, entries):
+        """ Forward a batch of log entries to log widget and show an error
+            popup for error messages.
+
+            @param list entries: Log entries
+        """
+        self._mw.logwidget.addEntries(entries)
+        for entry in entries:
+            if entry['level'] == 'error' or entry['level'] == 'critical':
+                self.errorDialog.show(entry)
+
     def startIPython(self):
         """ Create an IPython kernel manager and kernel.
             Add modules to its namespace.
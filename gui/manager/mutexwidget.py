@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains the Qudi mutex contention widget class.
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+from qtpy import QtCore, QtWidgets
+
+from core.util import mutex
+
+
+class MutexStatisticsWidget(QtWidgets.QWidget):
+    """ Live table of the wait and hold times of all mutexes, see core.util.mutex.
+    """
+
+    columns = ['Mutex', 'Locks', 'Contended', 'Wait total', 'Wait max', 'Hold total',
+               'Hold max', 'Holder', 'Main call site']
+
+    def __init__(self, interval=1000):
+        """
+          @param int interval: refresh interval of the table in ms
+        """
+        super().__init__()
+        self.table = QtWidgets.QTableWidget(0, len(self.columns), self)
+        self.table.setHorizontalHeaderLabels(self.columns)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+        self.recordCheckBox = QtWidgets.QCheckBox('Record', self)
+        self.recordCheckBox.setChecked(mutex.instrumentation_enabled())
+        self.recordCheckBox.toggled.connect(self.setRecording)
+        self.resetButton = QtWidgets.QPushButton('Reset', self)
+        self.resetButton.clicked.connect(self.reset)
+        self.dumpButton = QtWidgets.QPushButton('Save...', self)
+        self.dumpButton.clicked.connect(self.dump)
+        self.infoLabel = QtWidgets.QLabel(
+            'Times in ms. Hover a row for the histograms.', self)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.table)
+        bottom = QtWidgets.QHBoxLayout()
+        bottom.addWidget(self.recordCheckBox)
+        bottom.addWidget(self.infoLabel, 1)
+        bottom.addWidget(self.resetButton)
+        bottom.addWidget(self.dumpButton)
+        layout.addLayout(bottom)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+
+    @QtCore.Slot(bool)
+    def setRecording(self, record):
+        """ Enable or disable the mutex instrumentation.
+
+          @param bool record: True to start recording
+        """
+        if record:
+            mutex.enable_instrumentation()
+        else:
+            mutex.disable_instrumentation()
+        self.refresh()
+
+    @QtCore.Slot()
+    def reset(self):
+        """ Discard the recorded statistics.
+        """
+        mutex.reset_mutex_statistics()
+        self.refresh()
+
+    @QtCore.Slot()
+    def dump(self):
+        """ Save the statistics as text table.
+        """
+        filename = QtWidgets.QFileDialog.getSaveFileName(
+            self, 'Save mutex statistics', 'mutex_statistics.txt', 'Text files (*.txt)')[0]
+        if filename:
+            mutex.dump_mutex_statistics(filename)
+
+    @QtCore.Slot()
+    def refresh(self):
+        """ Fill the table with the current statistics, skipped while the widget is hidden.
+        """
+        if not self.isVisible():
+            return
+        stats = mutex.mutex_statistics()
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(stats))
+        for row, record in enumerate(stats):
+            site = ''
+            if record['sites']:
+                site = max(record['sites'].items(), key=lambda item: item[1][1])[0]
+            tooltip = 'wait: {0}\nhold: {1}'.format(
+                ', '.join('{0} {1:d}'.format(*item) for item in zip(
+                    mutex.HISTOGRAM_LABELS, record['wait_histogram'])),
+                ', '.join('{0} {1:d}'.format(*item) for item in zip(
+                    mutex.HISTOGRAM_LABELS, record['hold_histogram'])))
+            values = [record['name'], record['locks'], record['contended'],
+                      round(1e3 * record['wait_total'], 2), round(1e3 * record['wait_max'], 2),
+                      round(1e3 * record['hold_total'], 2), round(1e3 * record['hold_max'], 2),
+                      record['holder'] or '', site]
+            for column, value in enumerate(values):
+                item = QtWidgets.QTableWidgetItem()
+                # numeric display role, so sorting works
+                item.setData(QtCore.Qt.DisplayRole, value)
+                item.setToolTip(tooltip)
+                self.table.setItem(row, column, item)
+        self.table.setSortingEnabled(True)
+        self.table.resizeColumnsToContents()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains the Qudi startup profile widget class.
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+from qtpy import QtCore, QtWidgets
+
+
+class StartupProfileWidget(QtWidgets.QWidget):
+    """ Table of the startup durations per module recorded by the StartupProfiler.
+    """
+
+    def __init__(self, profiler):
+        """
+          @param StartupProfiler profiler: the profiler of the manager
+        """
+        super().__init__()
+        self._profiler = profiler
+        self.columns = ['Module'] + list(profiler.steps) + ['Total']
+
+        self.table = QtWidgets.QTableWidget(0, len(self.columns), self)
+        self.table.setHorizontalHeaderLabels(self.columns)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+        self.refreshButton = QtWidgets.QPushButton('Refresh', self)
+        self.refreshButton.clicked.connect(self.refresh)
+        self.infoLabel = QtWidgets.QLabel(
+            'Durations in ms. The flame graph input is saved as startup_profile.folded in the '
+            'app status directory.', self)
+        self.infoLabel.setWordWrap(True)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.table)
+        bottom = QtWidgets.QHBoxLayout()
+        bottom.addWidget(self.infoLabel, 1)
+        bottom.addWidget(self.refreshButton)
+        layout.addLayout(bottom)
+
+    @QtCore.Slot()
+    def refresh(self):
+        """ Fill the table with the current durations of the profiler.
+        """
+        rows = self._profiler.table()
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(rows))
+        for row, (name, times) in enumerate(rows):
+            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(name))
+            values = [times.get(step) for step in self._profiler.steps]
+            values.append(sum(times.values()))
+            for column, value in enumerate(values, 1):
+                item = QtWidgets.QTableWidgetItem()
+                if value is not None:
+                    # numeric display role, so sorting works
+                    item.setData(QtCore.Qt.DisplayRole, round(1e3 * value, 1))
+                self.table.setItem(row, column, item)
+        self.table.setSortingEnabled(True)
+        self.table.resizeColumnsToContents()
@@ -262,7 +262,7 @@ class ODMRGui(GUIBase):
         self.sigStopOdmrScan.connect(self._odmr_logic.stop_odmr_scan, QtCore.Qt.QueuedConnection)
         self.sigContinueOdmrScan.connect(self._odmr_logic.continue_odmr_scan,
                                          QtCore.Qt.QueuedConnection)
-        self.sigDoFit.connect(self._odmr_logic.do_fit, QtCore.Qt.QueuedConnection)
+        self.sigDoFit.connect(self._odmr_logic.do_fit_async, QtCore.Qt.QueuedConnection)
         self.sigMwCwParamsChanged.connect(self._odmr_logic.set_cw_parameters,
                                           QtCore.Qt.QueuedConnection)
         self.sigMwSweepParamsChanged.connect(self._odmr_logic.set_sweep_parameters,
@@ -318,7 +318,7 @@ class ODMRGui(GUIBase):
         self.sigContinueOdmrScan.connect(self._odmr_logic.continue_odmr_scan,
                                          QtCore.Qt.QueuedConnection)
         self.sigDoFit.connect(
-            self._odmr_logic.do_fit,
+            self._odmr_logic.do_fit_async,
             QtCore.Qt.QueuedConnection)
         self.sigMwCwParamsChanged.connect(self._odmr_logic.set_cw_parameters,
                                           QtCore.Qt.QueuedConnection)
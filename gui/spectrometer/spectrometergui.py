@@ -231,7 +231,7 @@ class SpectrometerGui(GUIBase):
         """ Command spectrum logic to do the fit with the chosen fit function.
         """
         fit_function = self._mw.fit_methods_ComboBox.getCurrentFit()[0]
-        self._spectrum_logic.do_fit(fit_function)
+        self._spectrum_logic.do_fit_async(fit_function)
 
     def set_fit_domain(self):
         """ Set the fit domain in the spectrum logic to values given by the GUI spinboxes.
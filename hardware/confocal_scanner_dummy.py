@@ -37,6 +37,12 @@ class ConfocalScannerDummy(Base, ConfocalScannerInterface):
         module.Class: 'confocal_scanner_dummy.ConfocalScannerDummy'
         clock_frequency: 100 # in Hz
         fitlogic: 'fitlogic' # name of the fitlogic module, see default config
+        num_emitters: 500 # number of simulated NV centres
+        background_count_rate: 1e4 # mean background in counts/s
+        poisson_noise: False # draw shot noise for the counts of each pixel
+        drift_velocity: [0, 0, 0] # sample drift in m/s along x, y and z
+        bleaching_time: 0 # illumination time in s at the focus until an emitter is bleached
+                          # to 1/e, 0 disables bleaching
 
     """
 
@@ -45,6 +51,14 @@ class ConfocalScannerDummy(Base, ConfocalScannerInterface):
 
     # config
     _clock_frequency = ConfigOption('clock_frequency', 100, missing='warn')
+    _num_points = ConfigOption('num_emitters', 500)
+    _background_count_rate = ConfigOption('background_count_rate', 1e4)
+    _poisson_noise = ConfigOption('poisson_noise', False)
+    _drift_velocity = ConfigOption('drift_velocity', [0, 0, 0])
+    _bleaching_time = ConfigOption('bleaching_time', 0)
+
+    # number of path samples rendered at once, limits the memory used for the emitter profiles
+    _render_chunk_size = 1024
 
     def __init__(self, config, **kwargs):
         super().__init__(config=config, **kwargs)
@@ -55,7 +69,9 @@ class ConfocalScannerDummy(Base, ConfocalScannerInterface):
 
         self._position_range = [[0, 100e-6], [0, 100e-6], [0, 100e-6], [0, 1e-6]]
         self._current_position = [0, 0, 0, 0][0:len(self.get_scanner_axes())]
-        self._num_points = 500
+        self._frame_path = None
+        self._frame_samples_read = 0
+        self._frame_start_time = 0
 
     def on_activate(self):
         """ Initialisation performed during activation of the module.
@@ -120,6 +136,8 @@ class ConfocalScannerDummy(Base, ConfocalScannerInterface):
         # offset
         self._points_z[:, 3] = 0
 
+        self._prepare_emitters()
+
     def on_deactivate(self):
         """ Deactivate properly the confocal scanner dummy.
         """
@@ -316,16 +334,7 @@ class ConfocalScannerDummy(Base, ConfocalScannerInterface):
         if np.shape(line_path)[1] != self._line_length:
             self._set_up_line(np.shape(line_path)[1])
 
-        count_data = np.random.uniform(0, 2e4, self._line_length)
-        z_data = line_path[2, :]
-
-        #TODO: Change the gaussian function here to the one from fitlogic and delete the local modules to calculate
-        #the gaussian functions
-        x_data = np.array(line_path[0, :])
-        y_data = np.array(line_path[1, :])
-        for i in range(self._num_points):
-            count_data += self.twoD_gaussian_function((x_data, y_data), *(self._points[i])
-                ) * self.gaussian_function(np.array(z_data), *(self._points_z[i]))
+        count_data = self._get_fluorescence(line_path)
 
         time.sleep(self._line_length * 1. / self._clock_frequency)
         time.sleep(self._line_length * 1. / self._clock_frequency)
@@ -339,6 +348,67 @@ class ConfocalScannerDummy(Base, ConfocalScannerInterface):
                 np.ones(count_data.shape) * line_path[1, 0] * 100
             ]).transpose()
 
+    def supports_frame_scan(self):
+        """ Function to test if the hardware supports hardware timed scanning of whole frames.
+
+        @return bool: Whether start_frame_scan, read_frame_scan and stop_frame_scan are available
+        """
+        return True
+
+    def start_frame_scan(self, frame_path=None, pixel_clock=False):
+        """ Starts scanning a whole frame. The dummy acquires the samples with the clock frequency
+        in the background.
+
+        @param float[k][n] frame_path: array k of n-part tuples defining all positions of the frame
+        @param bool pixel_clock: whether we need to output a pixel clock for this frame
+
+        @return int: error code (0:OK, -1:error)
+        """
+        if not isinstance(frame_path, (frozenset, list, set, tuple, np.ndarray, )):
+            self.log.error('Given frame_path list is no array type.')
+            return -1
+
+        self._frame_path = np.array(frame_path, dtype=float)
+        self._frame_samples_read = 0
+        self._frame_start_time = time.time()
+        return 0
+
+    def read_frame_scan(self):
+        """ Returns the counts of the frame scan acquired since the last call.
+
+        @return float[k][m]: the photon counts per second for the next k positions of the frame
+                             path with m channels. k can be 0 if no new data is available.
+        """
+        if self._frame_path is None:
+            self.log.error('No frame scan running, cannot read frame data.')
+            return np.array([[-1.]])
+
+        acquired = int((time.time() - self._frame_start_time) * self._clock_frequency)
+        stop = min(acquired, self._frame_path.shape[1])
+        start = self._frame_samples_read
+        if stop <= start:
+            return np.empty((0, len(self.get_scanner_count_channels())))
+
+        path = self._frame_path[:, start:stop]
+        count_data = self._get_fluorescence(path)
+        self._frame_samples_read = stop
+        # update the scanner position instance variable
+        self._current_position = list(path[:, -1])
+
+        return np.array([
+                count_data,
+                5e5 - count_data,
+                path[1, :] * 100
+            ]).transpose()
+
+    def stop_frame_scan(self):
+        """ Stops a running frame scan.
+
+        @return int: error code (0:OK, -1:error)
+        """
+        self._frame_path = None
+        return 0
+
     def close_scanner(self):
         """ Closes the scanner and cleans up afterwards.
 
@@ -357,6 +427,92 @@ class ConfocalScannerDummy(Base, ConfocalScannerInterface):
         self.log.debug('ConfocalScannerDummy>close_scanner_clock')
         return 0
 
+    def _prepare_emitters(self):
+        """ Sorts the emitters along x and precomputes the coefficients of their profiles, so
+        that only the emitters close to a path have to be rendered.
+        """
+        order = np.argsort(self._points[:, 1])
+        self._points = self._points[order]
+        self._points_z = self._points_z[order]
+
+        amplitude, x_zero, y_zero, sigma_x, sigma_y, theta, offset = self._points.transpose()
+        self._emitter_x = x_zero
+        self._emitter_y = y_zero
+        self._emitter_z = self._points_z[:, 1]
+        self._emitter_sigma_z = self._points_z[:, 2]
+        # the offsets of the emitter profiles are zero, so the emitters are fully described by
+        # the product of their amplitudes and the shape of the lateral and axial gaussians.
+        self._emitter_amplitude = amplitude * self._points_z[:, 0]
+        self._emitter_a = (np.cos(theta)**2) / (2 * sigma_x**2) + (np.sin(theta)**2) / (2 * sigma_y**2)
+        self._emitter_b = -(np.sin(2 * theta)) / (4 * sigma_x**2) + (np.sin(2 * theta)) / (4 * sigma_y**2)
+        self._emitter_c = (np.sin(theta)**2) / (2 * sigma_x**2) + (np.cos(theta)**2) / (2 * sigma_y**2)
+        # emitters further away from a position than this do not contribute any counts
+        self._emitter_cutoff = 6 * np.max(np.abs(self._points[:, 3:5]))
+        # accumulated illumination time of each emitter at the focus, used for bleaching
+        self._emitter_exposure = np.zeros(self._num_points)
+        self._drift_start_time = time.time()
+
+    def _get_fluorescence(self, path):
+        """ Calculates the fluorescence of the dummy NVs along a path.
+
+        @param float[][n] path: array of position tuples, only x, y and z are used
+
+        @return float[n]: the photon counts per second at each position of the path
+
+        The path is rendered in chunks. For every chunk only the emitters within the cutoff
+        distance of the bounding box of the chunk are evaluated, which are found by bisection in
+        the emitters sorted along x.
+        """
+        num_samples = np.shape(path)[1]
+        if self._poisson_noise:
+            count_data = np.full(num_samples, float(self._background_count_rate))
+        else:
+            count_data = np.random.uniform(0, 2 * self._background_count_rate, num_samples)
+
+        # a drifting sample is equivalent to a scanner moving the opposite way
+        drift = np.zeros(3)
+        drift[0:len(self._drift_velocity)] = self._drift_velocity[0:3]
+        drift *= time.time() - self._drift_start_time
+        x_data = np.asarray(path[0], dtype=float) - drift[0]
+        y_data = np.asarray(path[1], dtype=float) - drift[1]
+        z_data = np.asarray(path[2], dtype=float) - drift[2]
+
+        cutoff = self._emitter_cutoff
+        for start in range(0, num_samples, self._render_chunk_size):
+            stop = min(start + self._render_chunk_size, num_samples)
+            x = x_data[start:stop]
+            y = y_data[start:stop]
+            z = z_data[start:stop]
+
+            first = np.searchsorted(self._emitter_x, x.min() - cutoff, side='left')
+            last = np.searchsorted(self._emitter_x, x.max() + cutoff, side='right')
+            indices = np.arange(first, last)
+            emitter_y = self._emitter_y[indices]
+            indices = indices[(emitter_y >= y.min() - cutoff) & (emitter_y <= y.max() + cutoff)]
+            if indices.size == 0:
+                continue
+
+            dx = x[np.newaxis, :] - self._emitter_x[indices, np.newaxis]
+            dy = y[np.newaxis, :] - self._emitter_y[indices, np.newaxis]
+            dz = z[np.newaxis, :] - self._emitter_z[indices, np.newaxis]
+            profile = np.exp(
+                - self._emitter_a[indices, np.newaxis] * dx**2
+                - 2 * self._emitter_b[indices, np.newaxis] * dx * dy
+                - self._emitter_c[indices, np.newaxis] * dy**2
+                - dz**2 / (2 * self._emitter_sigma_z[indices, np.newaxis]**2))
+
+            amplitude = self._emitter_amplitude[indices]
+            if self._bleaching_time > 0:
+                amplitude = amplitude * np.exp(
+                    -self._emitter_exposure[indices] / self._bleaching_time)
+                self._emitter_exposure[indices] += profile.sum(axis=1) / self._clock_frequency
+            count_data[start:stop] += amplitude @ profile
+
+        if self._poisson_noise:
+            count_data = np.random.poisson(
+                count_data / self._clock_frequency) * float(self._clock_frequency)
+        return count_data
+
 ############################################################################
 #                                                                          #
 #    the following two functions are needed to fluoreschence signal        #
@@ -135,6 +135,10 @@ class NationalInstrumentsXSeries(Base, SlowCounterInterface, ConfocalScannerInte
         self._scanner_ao_task = None
         self._scanner_counter_daq_tasks = list()
         self._line_length = None
+        self._frame_path = None
+        self._frame_pixel_clock = False
+        self._frame_samples_read = 0
+        self._frame_discard_first = False
         self._odmr_length = None
         self._gated_counter_daq_task = None
         self._scanner_analog_daq_task = None
@@ -1406,6 +1410,212 @@ class NationalInstrumentsXSeries(Base, SlowCounterInterface, ConfocalScannerInte
         # return values is a rate of counts/s
         return all_data.transpose()
 
+    def supports_frame_scan(self):
+        """ Function to test if the hardware supports hardware timed scanning of whole frames.
+
+        @return bool: Whether start_frame_scan, read_frame_scan and stop_frame_scan are available
+        """
+        return True
+
+    def start_frame_scan(self, frame_path=None, pixel_clock=False):
+        """ Uploads the path of a whole frame and starts scanning it hardware timed.
+
+        @param float[k][n] frame_path: array k of n-part tuples defining all positions of the
+                                       frame including the moves between the lines (flyback)
+        @param bool pixel_clock: whether we need to output a pixel clock for this frame
+
+        @return int: error code (0:OK, -1:error)
+
+        The analog output, scanner clock and counter tasks are set up like for scan_line, but
+        with the length of the whole frame. The counts are fetched with read_frame_scan while
+        the frame is scanned.
+        """
+        if self._scanner_counter_channels and len(self._scanner_counter_daq_tasks) < 1:
+            self.log.error('Configured counter is not running, cannot scan a frame.')
+            return -1
+
+        if self._scanner_ai_channels and self._scanner_analog_daq_task is None:
+            self.log.error('Configured analog input is not running, cannot scan a frame.')
+            return -1
+
+        if not isinstance(frame_path, (frozenset, list, set, tuple, np.ndarray, )):
+            self.log.error('Given frame_path list is not array type.')
+            return -1
+
+        frame_path = np.array(frame_path, dtype=np.float64)
+        try:
+            daq.DAQmxSetSampTimingType(self._scanner_ao_task, daq.DAQmx_Val_SampClk)
+            if self._set_up_line(frame_path.shape[1]) < 0:
+                return -1
+            frame_volts = self._scanner_position_to_volt(frame_path)
+            if np.any(np.isnan(frame_volts)):
+                return -1
+            # write the whole frame to the analog output buffer at once
+            self._write_scanner_ao(
+                voltages=np.ascontiguousarray(frame_volts),
+                length=self._line_length,
+                start=False)
+
+            for i, task in enumerate(self._scanner_counter_daq_tasks):
+                # The counts are fetched in several reads while the frame is scanned. The read
+                # offset set up for scan_line would skip a sample at every read, so the first
+                # semi period is discarded by read_frame_scan instead.
+                daq.DAQmxSetReadOffset(task, 0)
+
+            # start the timed analog output task
+            daq.DAQmxStartTask(self._scanner_ao_task)
+
+            for i, task in enumerate(self._scanner_counter_daq_tasks):
+                daq.DAQmxStopTask(task)
+
+            daq.DAQmxStopTask(self._scanner_clock_daq_task)
+
+            if pixel_clock and self._pixel_clock_channel is not None:
+                daq.DAQmxConnectTerms(
+                    self._scanner_clock_channel + 'InternalOutput',
+                    self._pixel_clock_channel,
+                    daq.DAQmx_Val_DoNotInvertPolarity)
+
+            # start the scanner counting task that acquires counts synchroneously
+            for i, task in enumerate(self._scanner_counter_daq_tasks):
+                daq.DAQmxStartTask(task)
+
+            if self._scanner_ai_channels:
+                daq.DAQmxStartTask(self._scanner_analog_daq_task)
+
+            daq.DAQmxStartTask(self._scanner_clock_daq_task)
+        except:
+            self.log.exception('Error while starting frame scan.')
+            return -1
+
+        self._frame_path = frame_path
+        self._frame_pixel_clock = pixel_clock
+        self._frame_samples_read = 0
+        self._frame_discard_first = len(self._scanner_counter_daq_tasks) > 0
+        return 0
+
+    def read_frame_scan(self):
+        """ Returns the counts of the frame scan acquired since the last call.
+
+        @return float[k][m]: the photon counts per second for the next k positions of the frame
+                             path with m channels. k can be 0 if no new data is available.
+        """
+        if self._frame_path is None:
+            self.log.error('No frame scan running, cannot read frame data.')
+            return np.array([[-1.]])
+
+        num_channels = len(self.get_scanner_count_channels())
+        remaining = self._line_length - self._frame_samples_read
+        if remaining <= 0:
+            return np.empty((0, num_channels))
+
+        try:
+            available = daq.uInt32()
+            if self._scanner_counter_daq_tasks:
+                semi_periods = list()
+                for i, task in enumerate(self._scanner_counter_daq_tasks):
+                    daq.DAQmxGetReadAvailSampPerChan(task, daq.byref(available))
+                    semi_periods.append(available.value)
+                semi_periods = min(semi_periods)
+                if self._frame_discard_first:
+                    if semi_periods < 1:
+                        return np.empty((0, num_channels))
+                    # drop the counts acquired before the first clock edge
+                    discard = np.empty(1, dtype=np.uint32)
+                    n_read_samples = daq.int32()
+                    for i, task in enumerate(self._scanner_counter_daq_tasks):
+                        daq.DAQmxReadCounterU32(
+                            task, 1, self._RWTimeout, discard, 1, daq.byref(n_read_samples),
+                            None)
+                    self._frame_discard_first = False
+                    semi_periods -= 1
+                samples = min(semi_periods // 2, remaining)
+            else:
+                daq.DAQmxGetReadAvailSampPerChan(
+                    self._scanner_analog_daq_task, daq.byref(available))
+                samples = min(available.value, remaining)
+
+            if samples < 1:
+                return np.empty((0, num_channels))
+
+            all_data = np.full((num_channels, samples), 2, dtype=np.float64)
+
+            if self._scanner_counter_daq_tasks:
+                scan_data = np.empty(
+                    (len(self._scanner_counter_daq_tasks), 2 * samples), dtype=np.uint32)
+                n_read_samples = daq.int32()
+                for i, task in enumerate(self._scanner_counter_daq_tasks):
+                    daq.DAQmxReadCounterU32(
+                        task,
+                        2 * samples,
+                        self._RWTimeout,
+                        scan_data[i],
+                        2 * samples,
+                        daq.byref(n_read_samples),
+                        None)
+                # add up adjoint semi periods to also get the counts from the low time of
+                # the clock:
+                real_data = scan_data[:, ::2]
+                real_data += scan_data[:, 1::2]
+                all_data[0:len(real_data)] = real_data * self._scanner_clock_frequency
+
+            if self._scanner_ai_channels:
+                analog_data = np.empty((len(self._scanner_ai_channels), samples), dtype=np.float64)
+                analog_read_samples = daq.int32()
+                daq.DAQmxReadAnalogF64(
+                    self._scanner_analog_daq_task,
+                    samples,
+                    self._RWTimeout,
+                    daq.DAQmx_Val_GroupByChannel,
+                    analog_data,
+                    analog_data.size,
+                    daq.byref(analog_read_samples),
+                    None)
+                all_data[len(self._scanner_counter_channels):] = analog_data
+
+            self._frame_samples_read += samples
+        except:
+            self.log.exception('Error while reading frame scan data.')
+            return np.array([[-1.]])
+        # return values is a rate of counts/s
+        return all_data.transpose()
+
+    def stop_frame_scan(self):
+        """ Stops a running frame scan and returns the hardware to on-demand positioning.
+
+        @return int: error code (0:OK, -1:error)
+        """
+        retval = 0
+        try:
+            for i, task in enumerate(self._scanner_counter_daq_tasks):
+                daq.DAQmxStopTask(task)
+            if self._scanner_ai_channels:
+                daq.DAQmxStopTask(self._scanner_analog_daq_task)
+            daq.DAQmxStopTask(self._scanner_clock_daq_task)
+        except:
+            self.log.exception('Error while stopping frame scan.')
+            retval = -1
+
+        if self._stop_analog_output() < 0:
+            retval = -1
+
+        if self._frame_pixel_clock and self._pixel_clock_channel is not None:
+            try:
+                daq.DAQmxDisconnectTerms(
+                    self._scanner_clock_channel + 'InternalOutput',
+                    self._pixel_clock_channel)
+            except:
+                self.log.exception('Error while disconnecting pixel clock.')
+                retval = -1
+
+        if self._frame_path is not None:
+            # update the scanner position instance variable with the last position read
+            last_sample = max(min(self._frame_samples_read, self._frame_path.shape[1]) - 1, 0)
+            self._current_position = np.array(self._frame_path[:, last_sample])
+        self._frame_path = None
+        self._frame_pixel_clock = False
+        return retval
+
     def close_scanner(self):
         """ Closes the scanner and cleans up afterwards.
 
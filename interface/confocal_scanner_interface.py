@@ -20,6 +20,8 @@ Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
 top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
 """
 
+import numpy as np
+
 from core.interface import abstract_interface_method
 from core.meta import InterfaceMetaclass
 
@@ -175,3 +177,54 @@ class ConfocalScannerInterface(metaclass=InterfaceMetaclass):
         """
         pass
 
+    def supports_frame_scan(self):
+        """ Function to test if the hardware supports hardware timed scanning of whole frames.
+
+        @return bool: Whether start_frame_scan, read_frame_scan and stop_frame_scan are available
+
+        This function is not abstract - Thus it is optional and if a hardware do not implement it,
+        the answer is False.
+        """
+        return False
+
+    def start_frame_scan(self, frame_path=None, pixel_clock=False):
+        """ Uploads the path of a whole frame and starts scanning it hardware timed.
+
+        @param float[k][n] frame_path: array k of n-part tuples defining all positions of the
+                                       frame including the moves between the lines (flyback)
+        @param bool pixel_clock: whether we need to output a pixel clock for this frame
+
+        @return int: error code (0:OK, -1:error)
+
+        The path is written to the hardware once and scanned with the scanner clock frequency
+        without further software interaction. The counts are acquired continuously and have to be
+        fetched with read_frame_scan while the frame is scanned.
+
+        This function is not abstract - Thus it is optional and if a hardware do not implement it,
+        it will always fail. Check supports_frame_scan before using it.
+        """
+        return -1
+
+    def read_frame_scan(self):
+        """ Returns the counts of the frame scan acquired since the last call.
+
+        @return float[k][m]: the photon counts per second for the next k positions of the frame
+                             path with m channels. k can be 0 if no new data is available.
+
+        The counts are returned in the order of the frame path given to start_frame_scan. Once
+        counts for all positions of the frame path have been returned, the frame is finished.
+
+        This function is not abstract - Thus it is optional and if a hardware do not implement it,
+        it will always return an error (-1) array.
+        """
+        return np.array([[-1.]])
+
+    def stop_frame_scan(self):
+        """ Stops a running frame scan and returns the hardware to on-demand positioning.
+
+        @return int: error code (0:OK, -1:error)
+
+        This function is not abstract - Thus it is optional and if a hardware do not implement it,
+        it will always fail.
+        """
+        return -1
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains helper functions to fit lmfit models with analytic derivatives.
+
+The model functions of the fit methods in logic/fitmethods can provide their partial derivatives
+in an attribute 'jacobian' of the model function. For composite models made of such functions
+by addition, subtraction and multiplication the Jacobian is assembled with the sum and product
+rules. The least squares minimum is then located with scipy using the analytic Jacobian, which
+needs one model evaluation per iteration instead of one per parameter. The usual
+lmfit.model.ModelResult with uncertainties is built from the least squares solution, without
+another lmfit fit.
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import operator
+import re
+import numpy as np
+from lmfit.model import CompositeModel, ModelResult
+from scipy.optimize import least_squares
+
+
+def has_analytic_jacobian(model):
+    """ Check whether the Jacobian of a model can be calculated analytically.
+
+    @param lmfit.Model model: the model to check
+
+    @return bool: all model functions provide their derivatives and are combined by +, - or *
+    """
+    if isinstance(model, CompositeModel):
+        return (model.op in (operator.add, operator.sub, operator.mul)
+                and has_analytic_jacobian(model.left)
+                and has_analytic_jacobian(model.right))
+    return hasattr(model.func, 'jacobian')
+
+
+def model_parameter_names(model):
+    """ Get the names of all parameters, which are arguments of the model functions.
+
+    @param lmfit.Model model: the model
+
+    @return list: parameter names including the prefixes
+    """
+    if isinstance(model, CompositeModel):
+        names = model_parameter_names(model.left)
+        names.extend(name for name in model_parameter_names(model.right) if name not in names)
+        return names
+    return list(model.param_names)
+
+
+def eval_with_jacobian(model, values, x):
+    """ Evaluate a model and its partial derivatives.
+
+    @param lmfit.Model model: the model, has_analytic_jacobian(model) must be True
+    @param dict values: values of all parameters returned by model_parameter_names(model)
+    @param numpy.ndarray x: independent variable
+
+    @return tuple(numpy.ndarray, dict): the model values and the partial derivatives by
+                                        parameter name
+    """
+    if isinstance(model, CompositeModel):
+        left_value, left_jacobian = eval_with_jacobian(model.left, values, x)
+        right_value, right_jacobian = eval_with_jacobian(model.right, values, x)
+        if model.op is operator.mul:
+            jacobian = {name: derivative * right_value
+                        for name, derivative in left_jacobian.items()}
+            for name, derivative in right_jacobian.items():
+                jacobian[name] = jacobian.get(name, 0) + derivative * left_value
+        else:
+            sign = 1 if model.op is operator.add else -1
+            jacobian = dict(left_jacobian)
+            for name, derivative in right_jacobian.items():
+                jacobian[name] = jacobian.get(name, 0) + sign * derivative
+        return model.op(left_value, right_value), jacobian
+
+    prefix_length = len(model.prefix)
+    kwargs = {name[prefix_length:]: values[name] for name in model.param_names}
+    value = model.func(x, **kwargs)
+    jacobian = {model.prefix + name: derivative
+                for name, derivative in model.func.jacobian(x, **kwargs).items()}
+    return value, jacobian
+
+
+def fit_with_analytic_jacobian(model, data, params, x, **kwargs):
+    """ Fit a model like model.fit(data, x=x, params=params), but with the analytic Jacobian.
+
+    @param lmfit.Model model: the model to fit
+    @param numpy.ndarray data: data to fit
+    @param lmfit.Parameters params: starting values of the fit
+    @param numpy.ndarray x: independent variable
+    @param kwargs: further keyword arguments for model.fit
+
+    @return lmfit.model.ModelResult: the result of the fit
+
+    The minimum is located with scipy.optimize.least_squares. The ModelResult is built from its
+    solution: the standard errors and correlations are taken from the covariance matrix
+    (J^T J)^-1 scaled by the reduced chi-square like lmfit does, so no further model evaluations
+    are needed. Parameters tied by expressions are evaluated by lmfit, their derivatives with
+    respect to the free parameters are taken numerically from the expressions, which does not
+    need any model evaluation. Falls back to a plain lmfit fit if the model has no analytic
+    Jacobian, if further fit options (e.g. weights) are given or if least_squares fails.
+    """
+    names = model_parameter_names(model)
+    if not has_analytic_jacobian(model) or any(value is not None for value in kwargs.values()):
+        return model.fit(data, x=x, params=params, **kwargs)
+
+    tied = [name for name in names if params[name].expr]
+    expressions = ' '.join(params[name].expr for name in tied)
+    free = [name for name, param in params.items()
+            if param.vary and not param.expr
+            and (name in names or re.search(r'\b{0}\b'.format(re.escape(name)), expressions))]
+    if len(free) == 0 or len(data) <= len(free):
+        return model.fit(data, x=x, params=params, **kwargs)
+
+    x = np.asarray(x, dtype=np.float64)
+    data = np.asarray(data, dtype=np.float64)
+    work_params = params.copy()
+    lower = np.array([-np.inf if params[name].min is None else params[name].min
+                      for name in free], dtype=np.float64)
+    upper = np.array([np.inf if params[name].max is None else params[name].max
+                      for name in free], dtype=np.float64)
+    start = np.clip([params[name].value for name in free], lower, upper)
+    # keep the starting point strictly inside finite bounds
+    at_bound = (start <= lower) | (start >= upper)
+    start[at_bound] = np.where(np.isfinite(lower) & np.isfinite(upper),
+                               (lower + upper) / 2, start)[at_bound]
+
+    def get_values(p):
+        for name, value in zip(free, p):
+            work_params[name].value = value
+        if tied:
+            work_params.update_constraints()
+        return {name: work_params[name].value for name in names}
+
+    def tied_slopes(p, values):
+        # derivatives of the tied parameters with respect to the free parameters
+        slopes = np.zeros((len(tied), len(free)))
+        for column in range(len(free)):
+            step = 1e-8 * max(abs(p[column]), 1.0)
+            shifted = np.array(p, dtype=np.float64)
+            shifted[column] += step
+            shifted_values = get_values(shifted)
+            for row, tied_name in enumerate(tied):
+                slopes[row, column] = (shifted_values[tied_name] - values[tied_name]) / step
+        get_values(p)
+        return slopes
+
+    def residual(p):
+        value = eval_with_jacobian(model, get_values(p), x)[0]
+        return np.broadcast_to(value, data.shape) - data
+
+    def jacobian(p):
+        values = get_values(p)
+        derivatives = eval_with_jacobian(model, values, x)[1]
+        columns = [np.broadcast_to(derivatives.get(name, 0.0), data.shape).astype(np.float64)
+                   for name in free]
+        # chain rule for the parameters tied by expressions
+        if tied:
+            slopes = tied_slopes(p, values)
+            for column in range(len(free)):
+                for row, tied_name in enumerate(tied):
+                    if slopes[row, column] != 0 and tied_name in derivatives:
+                        columns[column] = (columns[column]
+                                           + slopes[row, column] * derivatives[tied_name])
+        return np.column_stack(columns)
+
+    bounded = np.any(np.isfinite(lower)) or np.any(np.isfinite(upper))
+    try:
+        solution = least_squares(residual, start, jac=jacobian, bounds=(lower, upper),
+                                 method='trf' if bounded else 'lm', x_scale='jac')
+    except Exception:
+        return model.fit(data, x=x, params=params, **kwargs)
+
+    # final parameters, the tied parameters are updated by lmfit
+    best_params = params.copy()
+    for name, value in zip(free, solution.x):
+        best_params[name].value = value
+    best_params.update_constraints()
+
+    ndata = data.size
+    nvarys = len(free)
+    chisqr = float(np.sum(solution.fun ** 2))
+    redchi = chisqr / (ndata - nvarys)
+    try:
+        covar = np.linalg.inv(np.dot(solution.jac.T, solution.jac)) * redchi
+        stderr = np.sqrt(np.diag(covar))
+        errorbars = bool(np.all(np.isfinite(stderr)) and np.all(stderr > 0))
+    except np.linalg.LinAlgError:
+        covar = None
+        errorbars = False
+    if errorbars:
+        for index, name in enumerate(free):
+            best_params[name].stderr = stderr[index]
+            best_params[name].correl = {
+                other: covar[index, other_index] / (stderr[index] * stderr[other_index])
+                for other_index, other in enumerate(free) if other_index != index}
+        if tied:
+            slopes = tied_slopes(solution.x, get_values(solution.x))
+            for row, name in enumerate(tied):
+                best_params[name].stderr = float(np.sqrt(max(
+                    np.dot(slopes[row], np.dot(covar, slopes[row])), 0)))
+
+    result = ModelResult(model, params, data=data, method='least_squares', fcn_kws={'x': x})
+    result.userargs = (data, None)
+    result.params = best_params
+    result.var_names = free
+    result.init_vals = list(start)
+    result.init_values = {name: params[name].value for name in names}
+    result.best_values = {name: best_params[name].value for name in names}
+    result.init_fit = model.eval(params=params, x=x)
+    result.best_fit = np.broadcast_to(model.eval(params=best_params, x=x), data.shape)
+    result.residual = result.best_fit - data
+    result.nfev = solution.nfev
+    result.njev = solution.njev
+    result.success = solution.status > 0
+    result.status = solution.status
+    result.message = solution.message
+    result.covar = covar
+    result.errorbars = errorbars
+    result.ndata = ndata
+    result.nvarys = nvarys
+    result.nfree = ndata - nvarys
+    result.chisqr = chisqr
+    result.redchi = redchi
+    # -2 * log likelihood
+    neg2_log_likelihood = ndata * np.log(max(chisqr / ndata, np.finfo(float).tiny))
+    result.aic = neg2_log_likelihood + 2 * nvarys
+    result.bic = neg2_log_likelihood + np.log(ndata) * nvarys
+    return result
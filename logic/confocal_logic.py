@@ -22,6 +22,8 @@ top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi
 from qtpy import QtCore
 from collections import OrderedDict
 from copy import copy
+import concurrent.futures
+import functools
 import time
 import datetime
 import numpy as np
@@ -30,6 +32,7 @@ import matplotlib.pyplot as plt
 
 from logic.generic_logic import GenericLogic
 from core.util.mutex import Mutex
+from core.util.tracing import traced_iteration
 from core.connector import Connector
 from core.statusvariable import StatusVar
 
@@ -261,12 +264,17 @@ class ConfocalLogic(GenericLogic):
     _clock_frequency = StatusVar('clock_frequency', 500)
     return_slowness = StatusVar(default=50)
     max_history_length = StatusVar(default=10)
+    frame_scan_mode = StatusVar(default=False)
+    frame_scan_serpentine = StatusVar(default=False)
+    frame_scan_update_interval = StatusVar(default=0.2)
+    frame_scan_poll_interval = StatusVar(default=0.02)
 
     # signals
     signal_start_scanning = QtCore.Signal(str)
     signal_continue_scanning = QtCore.Signal(str)
     signal_stop_scanning = QtCore.Signal()
     signal_scan_lines_next = QtCore.Signal()
+    signal_scan_frame_next = QtCore.Signal()
     signal_xy_image_updated = QtCore.Signal()
     signal_depth_image_updated = QtCore.Signal()
     signal_change_position = QtCore.Signal(str)
@@ -300,6 +308,15 @@ class ConfocalLogic(GenericLogic):
         self.depth_img_is_xz = True
         self.permanent_scan = False
 
+        # bookkeeping of hardware timed frame scans
+        self._frame_scan_running = False
+        self._frame_rows = np.empty(0, dtype=int)
+        self._frame_cols = np.empty(0, dtype=int)
+        self._frame_line_ends = np.empty(0, dtype=bool)
+        self._frame_start_row = 0
+        self._frame_samples_done = 0
+        self._frame_last_update = 0
+
     def on_activate(self):
         """ Initialisation performed during activation of the module.
         """
@@ -341,6 +358,7 @@ class ConfocalLogic(GenericLogic):
 
         # Sets connections between signals and functions
         self.signal_scan_lines_next.connect(self._scan_line, QtCore.Qt.QueuedConnection)
+        self.signal_scan_frame_next.connect(self._scan_frame, QtCore.Qt.QueuedConnection)
         self.signal_start_scanning.connect(self.start_scanner, QtCore.Qt.QueuedConnection)
         self.signal_continue_scanning.connect(self.continue_scanner, QtCore.Qt.QueuedConnection)
 
@@ -595,6 +613,14 @@ class ConfocalLogic(GenericLogic):
             self.set_position('scanner')
             return -1
 
+        if self._use_frame_scan():
+            if self._start_frame_scan() < 0:
+                self.kill_scanner()
+                self.module_state.unlock()
+                self.set_position('scanner')
+                return -1
+            return 0
+
         self.signal_scan_lines_next.emit()
         return 0
 
@@ -624,6 +650,14 @@ class ConfocalLogic(GenericLogic):
             self.set_position('scanner')
             return -1
 
+        if self._use_frame_scan():
+            if self._start_frame_scan() < 0:
+                self.kill_scanner()
+                self.module_state.unlock()
+                self.set_position('scanner')
+                return -1
+            return 0
+
         self.signal_scan_lines_next.emit()
         return 0
 
@@ -712,31 +746,41 @@ class ConfocalLogic(GenericLogic):
         """
         return self._scanning_device.get_scanner_count_channels()
 
+    def _finish_scanning(self):
+        """ Closes the scanner after a stop request, stores where to continue the scan and adds
+        a new history entry.
+        """
+        with self.threadlock:
+            if self._frame_scan_running:
+                self._scanning_device.stop_frame_scan()
+                self._frame_scan_running = False
+            self.kill_scanner()
+            self.stopRequested = False
+            self.module_state.unlock()
+            self.signal_xy_image_updated.emit()
+            self.signal_depth_image_updated.emit()
+            self.set_position('scanner')
+            if self._zscan:
+                self._depth_line_pos = self._scan_counter
+            else:
+                self._xy_line_pos = self._scan_counter
+            # add new history entry
+            new_history = ConfocalHistoryEntry(self)
+            new_history.snapshot(self)
+            self.history.append(new_history)
+            if len(self.history) > self.max_history_length:
+                self.history.pop(0)
+            self.history_index = len(self.history) - 1
+
+    @traced_iteration
     def _scan_line(self):
         """scanning an image in either depth or xy
 
         """
         # stops scanning
         if self.stopRequested:
-            with self.threadlock:
-                self.kill_scanner()
-                self.stopRequested = False
-                self.module_state.unlock()
-                self.signal_xy_image_updated.emit()
-                self.signal_depth_image_updated.emit()
-                self.set_position('scanner')
-                if self._zscan:
-                    self._depth_line_pos = self._scan_counter
-                else:
-                    self._xy_line_pos = self._scan_counter
-                # add new history entry
-                new_history = ConfocalHistoryEntry(self)
-                new_history.snapshot(self)
-                self.history.append(new_history)
-                if len(self.history) > self.max_history_length:
-                    self.history.pop(0)
-                self.history_index = len(self.history) - 1
-                return
+            self._finish_scanning()
+            return
 
         image = self.depth_image if self._zscan else self.xy_image
         n_ch = len(self.get_scanner_axes())
@@ -756,7 +800,8 @@ class ConfocalLogic(GenericLogic):
                     start_line = np.vstack(
                         [lsx, lsy, lsz, np.ones(lsx.shape) * self._current_a])
                 # move to the start position of the scan, counts are thrown away
-                start_line_counts = self._scanning_device.scan_line(start_line)
+                with self.tracer.phase('hardware'):
+                    start_line_counts = self._scanning_device.scan_line(start_line)
                 if np.any(start_line_counts == -1):
                     self.stopRequested = True
                     self.signal_scan_lines_next.emit()
@@ -778,7 +823,8 @@ class ConfocalLogic(GenericLogic):
                     [lsx, lsy, lsz, np.ones(lsx.shape) * self._current_a])
 
             # scan the line in the scan
-            line_counts = self._scanning_device.scan_line(line, pixel_clock=True)
+            with self.tracer.phase('hardware'):
+                line_counts = self._scanning_device.scan_line(line, pixel_clock=True)
             if np.any(line_counts == -1):
                 self.stopRequested = True
                 self.signal_scan_lines_next.emit()
@@ -815,7 +861,8 @@ class ConfocalLogic(GenericLogic):
                         ])
 
             # return the scanner to the start of next line, counts are thrown away
-            return_line_counts = self._scanning_device.scan_line(return_line)
+            with self.tracer.phase('hardware'):
+                return_line_counts = self._scanning_device.scan_line(return_line)
             if np.any(return_line_counts == -1):
                 self.stopRequested = True
                 self.signal_scan_lines_next.emit()
@@ -827,10 +874,12 @@ class ConfocalLogic(GenericLogic):
                     self.depth_image[self._scan_counter, :, 3:3 + s_ch] = line_counts
                 else:
                     self.depth_image[self._scan_counter, :, 3:3 + s_ch] = line_counts
-                self.signal_depth_image_updated.emit()
+                with self.tracer.phase('emit'):
+                    self.signal_depth_image_updated.emit()
             else:
                 self.xy_image[self._scan_counter, :, 3:3 + s_ch] = line_counts
-                self.signal_xy_image_updated.emit()
+                with self.tracer.phase('emit'):
+                    self.signal_xy_image_updated.emit()
 
             # next line in scan
             self._scan_counter += 1
@@ -852,6 +901,176 @@ class ConfocalLogic(GenericLogic):
             self.stop_scanning()
             self.signal_scan_lines_next.emit()
 
+    def set_frame_scan_mode(self, enabled, serpentine=None):
+        """ Selects whether images are scanned line by line or as whole hardware timed frames.
+
+        @param bool enabled: scan whole frames if the hardware supports it
+        @param bool serpentine: optional, scan every second line backwards instead of returning
+                                to the start of the line
+
+        @return int: error code (0:OK, -1:error)
+        """
+        if self.module_state() == 'locked':
+            self.log.error('Cannot change the frame scan mode while scanning.')
+            return -1
+        self.frame_scan_mode = bool(enabled)
+        if serpentine is not None:
+            self.frame_scan_serpentine = bool(serpentine)
+        if self.frame_scan_mode and not self._scanning_device.supports_frame_scan():
+            self.log.warning('The scanning hardware does not support frame scans, images will be '
+                             'scanned line by line.')
+        return 0
+
+    def _use_frame_scan(self):
+        """ Whether the current scan is performed as hardware timed frame scan.
+
+        @return bool: frame scan mode is selected and supported by the hardware
+        """
+        return self.frame_scan_mode and self._scanning_device.supports_frame_scan()
+
+    def _build_frame_path(self, start_row=0):
+        """ Builds the scanner path of a whole frame starting with the given line of the image.
+
+        @param int start_row: first line of the image to scan
+
+        @return tuple(float[n][k], int[k], int[k]): path with n scanner axes and k samples, image
+                                                    row and column of each sample. Samples not
+                                                    belonging to a pixel have row and column -1.
+
+        The frame starts with a move from the current scanner position to the first pixel. In
+        raster mode every line is followed by a flyback to the start of the next line, in
+        serpentine mode every second line is scanned backwards with a short transition to the
+        next line. Counts acquired during moves are thrown away.
+        """
+        image = self.depth_image if self._zscan else self.xy_image
+        n_ch = len(self.get_scanner_axes())
+        rs = max(int(self.return_slowness), 2)
+
+        # adjust z of the lines in the image to the current z before building the frame
+        if not self._zscan:
+            image[start_row:, :, 2] = self._current_z
+
+        position = np.zeros(3)
+        hw_position = np.array(self._scanning_device.get_scanner_position(), dtype=float)[0:3]
+        position[0:len(hw_position)] = hw_position
+
+        segments = list()
+        rows = list()
+        cols = list()
+        columns = np.arange(image.shape[1])
+        for row in range(start_row, image.shape[0]):
+            backwards = self.frame_scan_serpentine and (row - start_row) % 2 == 1
+            line_columns = columns[::-1] if backwards else columns
+            line = image[row, line_columns, 0:3].transpose()
+
+            # move to the start of the line, the first move and the raster flyback are slow
+            if row == start_row or not self.frame_scan_serpentine:
+                move_length = rs
+            else:
+                move_length = max(rs // 10, 2)
+            move = np.linspace(position, line[:, 0], move_length, endpoint=False).transpose()
+
+            segments.extend((move, line))
+            rows.extend((np.full(move_length, -1), np.full(line.shape[1], row)))
+            cols.extend((np.full(move_length, -1), line_columns))
+            position = line[:, -1]
+
+        path = np.hstack(segments)
+        if n_ch <= 3:
+            path = path[0:n_ch]
+        else:
+            path = np.vstack([path, np.ones(path.shape[1]) * self._current_a])
+        return path, np.concatenate(rows), np.concatenate(cols)
+
+    def _start_frame_scan(self):
+        """ Uploads the path of the remaining frame to the hardware and starts scanning it.
+
+        @return int: error code (0:OK, -1:error)
+        """
+        path, self._frame_rows, self._frame_cols = self._build_frame_path(self._scan_counter)
+        # the last sample of every line
+        self._frame_line_ends = np.zeros(self._frame_rows.size, dtype=bool)
+        self._frame_line_ends[:-1] = (self._frame_rows[:-1] >= 0) & (self._frame_rows[1:] < 0)
+        self._frame_line_ends[-1] = self._frame_rows[-1] >= 0
+        self._frame_start_row = self._scan_counter
+        self._frame_samples_done = 0
+        self._frame_last_update = time.time()
+
+        if self._scanning_device.start_frame_scan(path, pixel_clock=True) < 0:
+            self.log.error('Could not start frame scan.')
+            return -1
+        self._frame_scan_running = True
+        self.signal_scan_frame_next.emit()
+        return 0
+
+    def _scan_frame(self):
+        """ Collects the counts of a running frame scan and puts them into the image.
+
+        The image update signals are emitted at most every frame_scan_update_interval seconds.
+        """
+        # stops scanning
+        if self.stopRequested:
+            self._finish_scanning()
+            return
+
+        if not self._frame_scan_running:
+            return
+
+        image = self.depth_image if self._zscan else self.xy_image
+        s_ch = len(self.get_scanner_count_channels())
+        update_signal = (self.signal_depth_image_updated if self._zscan
+                         else self.signal_xy_image_updated)
+
+        try:
+            counts = self._scanning_device.read_frame_scan()
+            if np.any(counts == -1):
+                self.stopRequested = True
+                self.signal_scan_frame_next.emit()
+                return
+
+            num_samples = len(counts)
+            if num_samples > 0:
+                done = self._frame_samples_done
+                rows = self._frame_rows[done:done + num_samples]
+                cols = self._frame_cols[done:done + num_samples]
+                is_pixel = rows >= 0
+                image[rows[is_pixel], cols[is_pixel], 3:3 + s_ch] = counts[is_pixel]
+                self._frame_samples_done += num_samples
+                self._scan_counter = self._frame_start_row + np.count_nonzero(
+                    self._frame_line_ends[:self._frame_samples_done])
+
+            frame_done = self._frame_samples_done >= self._frame_rows.size
+            now = time.time()
+            if frame_done or now - self._frame_last_update >= self.frame_scan_update_interval:
+                self._frame_last_update = now
+                update_signal.emit()
+
+            if not frame_done:
+                QtCore.QTimer.singleShot(int(self.frame_scan_poll_interval * 1000),
+                                         self._scan_frame)
+                return
+
+            self._scanning_device.stop_frame_scan()
+            self._frame_scan_running = False
+
+            # stop scanning when last frame was performed and makes scan not continuable
+            if not self.permanent_scan:
+                self.stop_scanning()
+                if self._zscan:
+                    self._zscan_continuable = False
+                else:
+                    self._xyscan_continuable = False
+                self.signal_scan_frame_next.emit()
+            else:
+                self._scan_counter = 0
+                if self._start_frame_scan() < 0:
+                    self.stop_scanning()
+                    self.signal_scan_frame_next.emit()
+        except:
+            self.log.exception('The scan went wrong, killing the scanner.')
+            self.stop_scanning()
+            self.signal_scan_frame_next.emit()
+
     def save_xy_data(self, colorscale_range=None, percentile_range=None, block=True):
         """ Save the current confocal xy data to file.
 
@@ -869,13 +1088,15 @@ class ConfocalLogic(GenericLogic):
         @param: bool block (optional) If False, return immediately; if True, block until save completes."""
 
         if block:
-            self._save_xy_data(colorscale_range, percentile_range)
+            concurrent.futures.wait(self._save_xy_data(colorscale_range, percentile_range))
         else:
             self._signal_save_xy.emit(colorscale_range, percentile_range)
 
     @QtCore.Slot(object, object)
     def _save_xy_data(self, colorscale_range=None, percentile_range=None):
         """ Execute save operation. Slot for _signal_save_xy.
+
+        @return list: concurrent.futures.Future of the queued save jobs
         """
         self.signal_save_started.emit()
         filepath = self._save_logic.get_path_for_module('Confocal')
@@ -906,13 +1127,17 @@ class ConfocalLogic(GenericLogic):
         axes = ['X', 'Y']
         crosshair_pos = [self.get_position()[0], self.get_position()[1]]
 
-        figs = {ch: self.draw_figure(data=self.xy_image[:, :, 3 + n],
-                                     image_extent=image_extent,
-                                     scan_axis=axes,
-                                     cbar_range=colorscale_range,
-                                     percentile_range=percentile_range,
-                                     crosshair_pos=crosshair_pos)
+        # snapshot of the image, the figures are drawn in the save thread of the save logic
+        image = self.xy_image.copy()
+        figs = {ch: functools.partial(self.draw_figure,
+                                      data=image[:, :, 3 + n],
+                                      image_extent=image_extent,
+                                      scan_axis=axes,
+                                      cbar_range=colorscale_range,
+                                      percentile_range=percentile_range,
+                                      crosshair_pos=crosshair_pos)
                 for n, ch in enumerate(self.get_scanner_count_channels())}
+        futures = list()
 
         # Save the image data and figure
         for n, ch in enumerate(self.get_scanner_count_channels()):
@@ -921,40 +1146,40 @@ class ConfocalLogic(GenericLogic):
             image_data['Confocal pure XY scan image data without axis.\n'
                 'The upper left entry represents the signal at the upper left pixel position.\n'
                 'A pixel-line in the image corresponds to a row '
-                'of entries where the Signal is in counts/s:'] = self.xy_image[:, :, 3 + n]
+                'of entries where the Signal is in counts/s:'] = image[:, :, 3 + n]
 
             filelabel = 'confocal_xy_image_{0}'.format(ch.replace('/', ''))
-            self._save_logic.save_data(image_data,
-                                       filepath=filepath,
-                                       timestamp=timestamp,
-                                       parameters=parameters,
-                                       filelabel=filelabel,
-                                       fmt='%.6e',
-                                       delimiter='\t',
-                                       plotfig=figs[ch])
+            futures.append(self._save_logic.save_data_async(image_data,
+                                                            filepath=filepath,
+                                                            timestamp=timestamp,
+                                                            parameters=parameters,
+                                                            filelabel=filelabel,
+                                                            fmt='%.6e',
+                                                            delimiter='\t',
+                                                            plotfig=figs[ch]))
 
         # prepare the full raw data in an OrderedDict:
         data = OrderedDict()
-        data['x position (m)'] = self.xy_image[:, :, 0].flatten()
-        data['y position (m)'] = self.xy_image[:, :, 1].flatten()
-        data['z position (m)'] = self.xy_image[:, :, 2].flatten()
+        data['x position (m)'] = image[:, :, 0].flatten()
+        data['y position (m)'] = image[:, :, 1].flatten()
+        data['z position (m)'] = image[:, :, 2].flatten()
 
         for n, ch in enumerate(self.get_scanner_count_channels()):
-            data['count rate {0} (Hz)'.format(ch)] = self.xy_image[:, :, 3 + n].flatten()
+            data['count rate {0} (Hz)'.format(ch)] = image[:, :, 3 + n].flatten()
 
         # Save the raw data to file
         filelabel = 'confocal_xy_data'
-        self._save_logic.save_data(data,
-                                   filepath=filepath,
-                                   timestamp=timestamp,
-                                   parameters=parameters,
-                                   filelabel=filelabel,
-                                   fmt='%.6e',
-                                   delimiter='\t')
-
-        self.log.debug('Confocal Image saved.')
-        self.signal_xy_data_saved.emit()
-        return
+        futures.append(self._save_logic.save_data_async(data,
+                                                        filepath=filepath,
+                                                        timestamp=timestamp,
+                                                        parameters=parameters,
+                                                        filelabel=filelabel,
+                                                        fmt='%.6e',
+                                                        delimiter='\t'))
+
+        # the save logic processes the jobs in order, so the last one finishes last
+        futures[-1].add_done_callback(lambda future: self._xy_data_saved())
+        return futures
 
     def save_depth_data(self, colorscale_range=None, percentile_range=None, block=True):
         """ Save the current confocal depth data to file.
@@ -972,13 +1197,16 @@ class ConfocalLogic(GenericLogic):
         
         @param: bool block (optional) If False, return immediately; if True, block until save completes."""
         if block:
-            self._save_depth_data(colorscale_range, percentile_range)
+            concurrent.futures.wait(self._save_depth_data(colorscale_range, percentile_range))
         else:
             self._signal_save_depth.emit(colorscale_range, percentile_range)
 
     @QtCore.Slot(object, object)
     def _save_depth_data(self, colorscale_range=None, percentile_range=None):
-        """ Execute save operation. Slot for _signal_save_depth. """
+        """ Execute save operation. Slot for _signal_save_depth.
+
+        @return list: concurrent.futures.Future of the queued save jobs
+        """
         self.signal_save_started.emit()
         filepath = self._save_logic.get_path_for_module('Confocal')
         timestamp = datetime.datetime.now()
@@ -1015,13 +1243,17 @@ class ConfocalLogic(GenericLogic):
                         self.image_z_range[0],
                         self.image_z_range[1]]
 
-        figs = {ch: self.draw_figure(data=self.depth_image[:, :, 3 + n],
-                                     image_extent=image_extent,
-                                     scan_axis=axes,
-                                     cbar_range=colorscale_range,
-                                     percentile_range=percentile_range,
-                                     crosshair_pos=crosshair_pos)
+        # snapshot of the image, the figures are drawn in the save thread of the save logic
+        image = self.depth_image.copy()
+        figs = {ch: functools.partial(self.draw_figure,
+                                      data=image[:, :, 3 + n],
+                                      image_extent=image_extent,
+                                      scan_axis=axes,
+                                      cbar_range=colorscale_range,
+                                      percentile_range=percentile_range,
+                                      crosshair_pos=crosshair_pos)
                 for n, ch in enumerate(self.get_scanner_count_channels())}
+        futures = list()
 
         # Save the image data and figure
         for n, ch in enumerate(self.get_scanner_count_channels()):
@@ -1030,40 +1262,48 @@ class ConfocalLogic(GenericLogic):
             image_data['Confocal pure depth scan image data without axis.\n'
                 'The upper left entry represents the signal at the upper left pixel position.\n'
                 'A pixel-line in the image corresponds to a row in '
-                'of entries where the Signal is in counts/s:'] = self.depth_image[:, :, 3 + n]
+                'of entries where the Signal is in counts/s:'] = image[:, :, 3 + n]
 
             filelabel = 'confocal_depth_image_{0}'.format(ch.replace('/', ''))
-            self._save_logic.save_data(image_data,
-                                       filepath=filepath,
-                                       timestamp=timestamp,
-                                       parameters=parameters,
-                                       filelabel=filelabel,
-                                       fmt='%.6e',
-                                       delimiter='\t',
-                                       plotfig=figs[ch])
+            futures.append(self._save_logic.save_data_async(image_data,
+                                                            filepath=filepath,
+                                                            timestamp=timestamp,
+                                                            parameters=parameters,
+                                                            filelabel=filelabel,
+                                                            fmt='%.6e',
+                                                            delimiter='\t',
+                                                            plotfig=figs[ch]))
 
         # prepare the full raw data in an OrderedDict:
         data = OrderedDict()
-        data['x position (m)'] = self.depth_image[:, :, 0].flatten()
-        data['y position (m)'] = self.depth_image[:, :, 1].flatten()
-        data['z position (m)'] = self.depth_image[:, :, 2].flatten()
+        data['x position (m)'] = image[:, :, 0].flatten()
+        data['y position (m)'] = image[:, :, 1].flatten()
+        data['z position (m)'] = image[:, :, 2].flatten()
 
         for n, ch in enumerate(self.get_scanner_count_channels()):
-            data['count rate {0} (Hz)'.format(ch)] = self.depth_image[:, :, 3 + n].flatten()
+            data['count rate {0} (Hz)'.format(ch)] = image[:, :, 3 + n].flatten()
 
         # Save the raw data to file
         filelabel = 'confocal_depth_data'
-        self._save_logic.save_data(data,
-                                   filepath=filepath,
-                                   timestamp=timestamp,
-                                   parameters=parameters,
-                                   filelabel=filelabel,
-                                   fmt='%.6e',
-                                   delimiter='\t')
+        futures.append(self._save_logic.save_data_async(data,
+                                                        filepath=filepath,
+                                                        timestamp=timestamp,
+                                                        parameters=parameters,
+                                                        filelabel=filelabel,
+                                                        fmt='%.6e',
+                                                        delimiter='\t'))
+
+        # the save logic processes the jobs in order, so the last one finishes last
+        futures[-1].add_done_callback(lambda future: self._depth_data_saved())
+        return futures
+
+    def _xy_data_saved(self):
+        self.log.debug('Confocal Image saved.')
+        self.signal_xy_data_saved.emit()
 
+    def _depth_data_saved(self):
         self.log.debug('Confocal Image saved.')
         self.signal_depth_data_saved.emit()
-        return
 
     def draw_figure(self, data, image_extent, scan_axis=None, cbar_range=None, percentile_range=None,  crosshair_pos=None):
         """ Create a 2-D color map figure of the scan image.
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains the Qudi catalogue of saved measurement data.
+
+The catalogue is a SQLite database next to the daily data directories. The SaveLogic adds an
+entry for every saved file with path, module, timestamp, active POI, parameters and the shapes
+of the saved arrays. Existing data directories can be indexed by parsing the headers of the
+text files. Queries return CatalogueEntry objects, which load the data only when it is accessed.
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+
+def _to_json(value):
+    """ JSON conversion of parameter values, which json can not serialise itself. """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray) and value.size <= 1000:
+        return value.tolist()
+    return str(value)
+
+
+def _parse_timestamp(value):
+    """ Convert a datetime, date or ISO string into the ISO string stored in the catalogue. """
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time()).isoformat()
+    return str(value)
+
+
+class CatalogueEntry:
+    """ A saved file in the data catalogue. The data is loaded when it is accessed first.
+    """
+
+    def __init__(self, catalogue, path, module, timestamp, poi, filetype, parameters, shapes,
+                 group=''):
+        self._catalogue = catalogue
+        self.path = path
+        self.group = group or ''
+        self.module = module
+        self.timestamp = datetime.datetime.strptime(timestamp[:19], '%Y-%m-%dT%H:%M:%S')
+        self.poi = poi
+        self.filetype = filetype
+        self.parameters = json.loads(parameters) if parameters else dict()
+        self.shapes = json.loads(shapes) if shapes else dict()
+        self._data = None
+
+    def __repr__(self):
+        path = '{0}:{1}'.format(self.path, self.group) if self.group else self.path
+        return 'CatalogueEntry({0!r}, module={1!r}, timestamp={2}, poi={3!r})'.format(
+            path, self.module, self.timestamp.isoformat(), self.poi)
+
+    @property
+    def data(self):
+        """ The saved arrays, loaded on first access.
+
+        @return dict-like: the arrays by name. Text files are parsed once and cached as .npy
+                           file, which is memory-mapped afterwards. npz files are loaded per
+                           array, HDF5 files return the h5py group of this save.
+        """
+        if self._data is None:
+            self._data = self._catalogue.load(self)
+        return self._data
+
+
+class DataCatalogue:
+    """ SQLite index of the saved measurement data.
+
+    All methods open their own connection, so the catalogue can be used from the save thread,
+    logic threads and the jupyter kernel at the same time.
+    """
+
+    # a HDF5 file can hold several saves, so an entry is identified by path and group. Files
+    # without groups use the empty string, NULL would make every row unique.
+    _schema = (
+        'CREATE TABLE IF NOT EXISTS measurements ('
+        'id INTEGER PRIMARY KEY, path TEXT, hdf5_group TEXT NOT NULL DEFAULT \'\', '
+        'module TEXT, timestamp TEXT, poi TEXT, filetype TEXT, parameters TEXT, shapes TEXT, '
+        'UNIQUE (path, hdf5_group))',
+        'CREATE INDEX IF NOT EXISTS measurements_module ON measurements (module)',
+        'CREATE INDEX IF NOT EXISTS measurements_timestamp ON measurements (timestamp)',
+        'CREATE INDEX IF NOT EXISTS measurements_poi ON measurements (poi)',
+    )
+
+    # header of the text files written by the SaveLogic
+    _header_regex = re.compile(
+        r'Saved Data from the class (?P<module>\S+) on (?P<date>\d\d\.\d\d\.\d{4}) at '
+        r'(?P<time>\d\dh\d\dm\d\ds)')
+
+    def __init__(self, filename, cache_dir=None):
+        """
+        @param str filename: path of the SQLite database, created if it does not exist
+        @param str cache_dir: optional, directory of the .npy copies of text files. Defaults to
+                              the directory 'catalogue_cache' next to the database.
+        """
+        self.filename = filename
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(filename)),
+                                     'catalogue_cache')
+        self.cache_dir = cache_dir
+        with self._connect() as connection:
+            self._upgrade_schema(connection)
+            for statement in self._schema:
+                connection.execute(statement)
+
+    def _connect(self):
+        return sqlite3.connect(self.filename, timeout=10)
+
+    @staticmethod
+    def _upgrade_schema(connection):
+        """ Move the entries of a catalogue without HDF5 groups into the current table.
+
+        @param sqlite3.Connection connection: open connection to the catalogue
+        """
+        columns = [row[1] for row in connection.execute('PRAGMA table_info(measurements)')]
+        if not columns or 'hdf5_group' in columns:
+            return
+        connection.execute('ALTER TABLE measurements RENAME TO measurements_old')
+        for index in ('measurements_module', 'measurements_timestamp', 'measurements_poi'):
+            connection.execute('DROP INDEX IF EXISTS {0}'.format(index))
+        for statement in DataCatalogue._schema:
+            connection.execute(statement)
+        connection.execute(
+            'INSERT INTO measurements '
+            '(path, module, timestamp, poi, filetype, parameters, shapes) '
+            'SELECT path, module, timestamp, poi, filetype, parameters, shapes '
+            'FROM measurements_old')
+        connection.execute('DROP TABLE measurements_old')
+
+    def add(self, path, module, timestamp, poi='', filetype='text', parameters=None,
+            shapes=None, group=''):
+        """ Add or replace the entry of a saved file.
+
+        @param str path: path of the file
+        @param str module: name of the module, which saved the data
+        @param datetime timestamp: time of the measurement
+        @param str poi: name of the active POI
+        @param str filetype: 'text', 'npz' or 'hdf5'
+        @param dict parameters: parameters saved with the data
+        @param dict shapes: shapes of the saved arrays by name, None if unknown
+        @param str group: optional, name of the group in a HDF5 file, which holds this save
+        """
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO measurements '
+                '(path, hdf5_group, module, timestamp, poi, filetype, parameters, shapes) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (os.path.abspath(path), group or '', module, _parse_timestamp(timestamp), poi,
+                 filetype, json.dumps(parameters or dict(), default=_to_json),
+                 json.dumps(shapes or dict())))
+
+    def query(self, module=None, poi=None, since=None, until=None, path_contains=None,
+              **parameters):
+        """ Find saved files.
+
+        @param str module: optional, name of the module, which saved the data
+        @param str poi: optional, name of the POI
+        @param since: optional, datetime, date or ISO string of the earliest measurement
+        @param until: optional, datetime, date or ISO string of the latest measurement
+        @param str path_contains: optional, part of the file path, e.g. a file label
+        @param parameters: optional, parameter values the entries must have
+
+        @return list: CatalogueEntry objects sorted by timestamp
+        """
+        conditions = list()
+        values = list()
+        for column, value in (('module', module), ('poi', poi)):
+            if value is not None:
+                conditions.append('{0} = ?'.format(column))
+                values.append(value)
+        if since is not None:
+            conditions.append('timestamp >= ?')
+            values.append(_parse_timestamp(since))
+        if until is not None:
+            conditions.append('timestamp <= ?')
+            values.append(_parse_timestamp(until))
+        if path_contains is not None:
+            conditions.append('path LIKE ?')
+            values.append('%{0}%'.format(path_contains))
+        statement = ('SELECT path, module, timestamp, poi, filetype, parameters, shapes, '
+                     'hdf5_group FROM measurements')
+        if conditions:
+            statement += ' WHERE ' + ' AND '.join(conditions)
+        statement += ' ORDER BY timestamp'
+
+        with self._connect() as connection:
+            rows = connection.execute(statement, values).fetchall()
+        entries = [CatalogueEntry(self, *row) for row in rows]
+        if parameters:
+            entries = [entry for entry in entries
+                       if all(entry.parameters.get(key) == value
+                              for key, value in parameters.items())]
+        return entries
+
+    def remove_missing(self):
+        """ Remove the entries of files, which do not exist anymore.
+
+        @return int: number of removed entries
+        """
+        with self._connect() as connection:
+            paths = [row[0] for row in connection.execute('SELECT path FROM measurements')]
+            missing = [(path, ) for path in paths if not os.path.exists(path)]
+            connection.executemany('DELETE FROM measurements WHERE path = ?', missing)
+        return len(missing)
+
+    def index_directory(self, directory):
+        """ Add all text files written by the SaveLogic in a directory tree to the catalogue.
+
+        @param str directory: root of the tree, e.g. the data directory
+
+        @return int: number of added files
+
+        Only the commented header of each file is read. Files already in the catalogue are
+        skipped.
+        """
+        with self._connect() as connection:
+            known = set(row[0] for row in connection.execute('SELECT path FROM measurements'))
+        added = 0
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [name for name in dirs if os.path.join(root, name) != self.cache_dir]
+            for name in sorted(files):
+                path = os.path.abspath(os.path.join(root, name))
+                if not name.endswith('.dat') or path in known:
+                    continue
+                entry = self._read_header(path)
+                if entry is not None and entry[0] not in known:
+                    self.add(*entry)
+                    added += 1
+        return added
+
+    def _read_header(self, path):
+        """ Parse the header of a text file written by the SaveLogic.
+
+        @param str path: path of the file
+
+        @return tuple: path, module, timestamp, poi, filetype, parameters and shapes or None if
+                       the file has no SaveLogic header. For the parameter files of npz data
+                       the path of the npz file is returned.
+        """
+        with open(path, 'r', encoding='latin1') as file:
+            first = file.readline()
+            match = self._header_regex.search(first)
+            if match is None:
+                return None
+            timestamp = datetime.datetime.strptime(
+                '{0} {1}'.format(match.group('date'), match.group('time')),
+                '%d.%m.%Y %Hh%Mm%Ss')
+            parameters = OrderedDict()
+            poi = ''
+            columns = ''
+            in_parameters = True
+            for line in file:
+                if not line.startswith('#'):
+                    break
+                line = line[1:].rstrip('\n')
+                if line.startswith('Data:'):
+                    in_parameters = False
+                elif in_parameters and ': ' in line:
+                    key, value = line.split(': ', 1)
+                    if key == 'Measured at POI':
+                        poi = value
+                        continue
+                    try:
+                        parameters[key] = json.loads(value)
+                    except ValueError:
+                        parameters[key] = value
+                elif not in_parameters and line and not line.startswith('='):
+                    columns = line
+        filetype = 'npz' if path.endswith('_params.dat') else 'text'
+        if filetype == 'npz':
+            path = path[:-len('_params.dat')] + '.npz'
+        return (path, match.group('module'), timestamp, poi, filetype, parameters,
+                {columns: None})
+
+    def load(self, entry):
+        """ Load the data of a catalogue entry, see CatalogueEntry.data.
+
+        @param CatalogueEntry entry: the entry to load
+
+        @return dict-like: the arrays by name
+        """
+        if entry.filetype == 'npz':
+            return np.load(entry.path)
+        if entry.filetype == 'hdf5':
+            if h5py is None:
+                raise ImportError('Loading HDF5 files needs the python package h5py.')
+            file = h5py.File(entry.path, 'r')
+            if entry.group:
+                return file[entry.group]
+            return file[file.attrs.get('latest', list(file.keys())[-1])]
+
+        # text files are parsed once and memory-mapped from a binary copy afterwards
+        stat = os.stat(entry.path)
+        key = hashlib.sha1('{0}|{1}|{2}'.format(
+            entry.path, stat.st_size, stat.st_mtime).encode('utf-8')).hexdigest()
+        cache_file = os.path.join(self.cache_dir, key + '.npy')
+        if not os.path.exists(cache_file):
+            array = np.loadtxt(entry.path, comments='#', ndmin=1)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.save(cache_file, array)
+        array = np.load(cache_file, mmap_mode='r')
+        with open(entry.path, 'r', encoding='latin1') as file:
+            columns = ''
+            for line in file:
+                if not line.startswith('#'):
+                    break
+                columns = line[1:].rstrip('\n')
+        return OrderedDict([(columns, array)])
@@ -20,23 +20,106 @@ Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
 top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
 """
 
+import ast
+import concurrent.futures
 import importlib
 import inspect
 import lmfit
+import logging
+import multiprocessing
 from qtpy import QtCore
 import numpy as np
 import os
 import sys
+import tempfile
 from collections import OrderedDict
 from distutils.version import LooseVersion
 
 from logic.generic_logic import GenericLogic
+from logic.analytic_fit import fit_with_analytic_jacobian
 from core.util.modules import get_main_dir
 from core.util.mutex import Mutex
 from core.config import load, save
 from core.configoption import ConfigOption
 
 
+def _parse_function_names(filename):
+    """ Get the names of the functions defined at the top level of a python file.
+
+    @param str filename: path of the python file
+
+    @return list: names of the functions
+    """
+    with open(filename, 'rb') as file:
+        tree = ast.parse(file.read(), filename)
+    return [node.name for node in tree.body if isinstance(node, ast.FunctionDef)]
+
+
+def scan_fit_methods(path_list, manifest=None):
+    """ Find the fit methods in the python files of the given directories without importing them.
+
+    @param list path_list: directories containing the fit method files
+    @param dict manifest: optional, manifest returned by a previous scan. Files which were not
+                          modified since then are not parsed again.
+
+    @return tuple(OrderedDict, dict): the module names of the fit methods by method name, and the
+                                      manifest of this scan with the modification time and the
+                                      method names of each file
+    """
+    if manifest is None:
+        manifest = dict()
+    new_manifest = dict()
+    methods = OrderedDict()
+    for path in path_list:
+        for f in sorted(os.listdir(path)):
+            filename = os.path.join(path, f)
+            if not (os.path.isfile(filename) and f.endswith('.py')):
+                continue
+            if path not in sys.path:
+                sys.path.append(path)
+            mtime = os.path.getmtime(filename)
+            entry = manifest.get(filename)
+            if entry is None or entry.get('mtime') != mtime:
+                entry = {'mtime': mtime, 'methods': _parse_function_names(filename)}
+            new_manifest[filename] = entry
+            for method in entry['methods']:
+                methods[method] = f[:-3]
+    return methods, new_manifest
+
+
+class _LazyFitMethod:
+    """ Placeholder for a fit method in a class, which imports the module of the method when the
+    method is used for the first time and replaces itself by the method.
+    """
+
+    def __init__(self, name, module_name):
+        self.name = name
+        self.module_name = module_name
+
+    def __get__(self, instance, owner):
+        function = getattr(importlib.import_module(self.module_name), self.name)
+        setattr(owner, self.name, function)
+        if instance is None:
+            return function
+        return function.__get__(instance, owner)
+
+
+class _LazyBoundFitMethod:
+    """ Reference to a fit method of an object for the fit_list, which does not trigger the
+    import of the method before it is called.
+    """
+
+    def __init__(self, instance, name):
+        self._instance = instance
+        self.__name__ = name
+
+    def __call__(self, *args, **kwargs):
+        return getattr(self._instance, self.__name__)(*args, **kwargs)
+
+    def __repr__(self):
+        return '<fit method {0}>'.format(self.__name__)
+
+
 class FitLogic(GenericLogic):
     """
     Documentation to add a new fit model/estimator/function can be found in
@@ -54,13 +137,15 @@ class FitLogic(GenericLogic):
     _additional_methods_import_path = ConfigOption(name='additional_fit_methods_path',
                                                    default=None,
                                                    missing='nothing')
+    # Number of threads running fits submitted with submit_fit
+    _fit_workers = ConfigOption(name='fit_workers', default=2, missing='nothing')
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # locking for thread safety
         self.lock = Mutex()
+        self._fit_executor = None
 
-        filenames = []
         # for path in directories:
         path_list = [os.path.join(get_main_dir(), 'logic', 'fitmethods')]
         # adding additional path, to be defined in the config
@@ -82,12 +167,28 @@ class FitLogic(GenericLogic):
                 self.log.error('ConfigOption additional_predefined_methods_path needs to either be a string or '
                                'a list of strings.')
 
-        for path in path_list:
-            for f in os.listdir(path):
-                if os.path.isfile(os.path.join(path, f)) and f.endswith('.py'):
-                    filenames.append(f[:-3])
-                    if path not in sys.path:
-                        sys.path.append(path)
+        self._fit_method_paths = path_list
+
+        # The methods of all fit method files are listed in a manifest, which is only updated for
+        # modified files. The modules are imported when one of their methods is used.
+        try:
+            manifest_file = os.path.join(self._manager.getStatusDir(),
+                                         'fit_methods_manifest.cfg')
+        except:
+            manifest_file = None
+        manifest = dict()
+        if manifest_file is not None and os.path.isfile(manifest_file):
+            try:
+                manifest = dict(load(manifest_file))
+            except:
+                self.log.warning('Could not load fit methods manifest, all fit method files '
+                                 'are scanned again.')
+        fit_methods, new_manifest = scan_fit_methods(path_list, manifest)
+        if manifest_file is not None and new_manifest != manifest:
+            try:
+                save(manifest_file, new_manifest)
+            except:
+                self.log.warning('Could not save fit methods manifest.')
 
         # A dictionary containing all fit methods and their estimators.
         self.fit_list = OrderedDict()
@@ -95,31 +196,26 @@ class FitLogic(GenericLogic):
         self.fit_list['2d'] = OrderedDict()
         self.fit_list['3d'] = OrderedDict()
 
-        # Go through the fitmethods files and import all methods.
+        # Go through the fitmethods and attach all methods.
         # Also determine which methods need to be added to the fit_list dictionary
         estimators_for_dict = list()
         models_for_dict = list()
         fits_for_dict = list()
 
-        for files in filenames:
-            mod = importlib.import_module('{0}'.format(files))
-            for method in dir(mod):
-                ref = getattr(mod, method)
-                if callable(ref) and (inspect.ismethod(ref) or inspect.isfunction(ref)):
-                    method_str = str(method)
-                    try:
-                        # import methods in Fitlogic
-                        setattr(FitLogic, method, ref)
-                        # append method to a list of methods to include in the fit_list dictionary
-                        if method_str.startswith('make_') and method_str.endswith('_fit'):
-                            fits_for_dict.append(method_str.split('_', 1)[1].rsplit('_', 1)[0])
-                        elif method_str.startswith('make_') and method_str.endswith('_model'):
-                            models_for_dict.append(method_str.split('_', 1)[1].rsplit('_', 1)[0])
-                        elif method_str.startswith('estimate_'):
-                            estimators_for_dict.append(method_str.split('_', 1)[1])
-                    except:
-                        self.log.error('Method "{0}" could not be imported to FitLogic.'
-                                       ''.format(str(method)))
+        for method_str, module_name in fit_methods.items():
+            try:
+                # import methods in Fitlogic
+                setattr(FitLogic, method_str, _LazyFitMethod(method_str, module_name))
+                # append method to a list of methods to include in the fit_list dictionary
+                if method_str.startswith('make_') and method_str.endswith('_fit'):
+                    fits_for_dict.append(method_str.split('_', 1)[1].rsplit('_', 1)[0])
+                elif method_str.startswith('make_') and method_str.endswith('_model'):
+                    models_for_dict.append(method_str.split('_', 1)[1].rsplit('_', 1)[0])
+                elif method_str.startswith('estimate_'):
+                    estimators_for_dict.append(method_str.split('_', 1)[1])
+            except:
+                self.log.error('Method "{0}" could not be imported to FitLogic.'
+                               ''.format(method_str))
 
         fits_for_dict.sort()
         models_for_dict.sort()
@@ -140,11 +236,12 @@ class FitLogic(GenericLogic):
             # Attach make_*_fit method to fit_list
             if fit_name not in self.fit_list[dimension]:
                 self.fit_list[dimension][fit_name] = OrderedDict()
-            self.fit_list[dimension][fit_name]['make_fit'] = getattr(self, fit_method)
+            self.fit_list[dimension][fit_name]['make_fit'] = _LazyBoundFitMethod(self, fit_method)
 
             # Attach make_*_model method to fit_list
             if fit_name in models_for_dict:
-                self.fit_list[dimension][fit_name]['make_model'] = getattr(self, model_method)
+                self.fit_list[dimension][fit_name]['make_model'] = _LazyBoundFitMethod(
+                    self, model_method)
             else:
                 self.log.error('No make_*_model method for fit "{0}" found in FitLogic.'
                                ''.format(fit_name))
@@ -154,11 +251,13 @@ class FitLogic(GenericLogic):
             for estimator_name in estimators_for_dict:
                 estimator_method = 'estimate_' + estimator_name
                 if fit_name == estimator_name:
-                    self.fit_list[dimension][fit_name]['generic'] = getattr(self, estimator_method)
+                    self.fit_list[dimension][fit_name]['generic'] = _LazyBoundFitMethod(
+                        self, estimator_method)
                     found_estimator = True
                 elif estimator_name.startswith(fit_name + '_'):
                     custom_name = estimator_name.split('_', 1)[1]
-                    self.fit_list[dimension][fit_name][custom_name] = getattr(self, estimator_method)
+                    self.fit_list[dimension][fit_name][custom_name] = _LazyBoundFitMethod(
+                        self, estimator_method)
                     found_estimator = True
             if not found_estimator:
                 self.log.error('No estimator method for fit "{0}" found in FitLogic.'
@@ -177,7 +276,28 @@ class FitLogic(GenericLogic):
 
     def on_deactivate(self):
         """ """
-        pass
+        with self.lock:
+            if self._fit_executor is not None:
+                self._fit_executor.shutdown(wait=False)
+                self._fit_executor = None
+
+    def submit_fit(self, fit_function, *args, **kwargs):
+        """ Run a fit in the worker pool of FitLogic instead of the calling thread.
+
+        @param callable fit_function: function performing the fit
+        @param args: positional arguments for fit_function
+        @param kwargs: keyword arguments for fit_function
+
+        @return concurrent.futures.Future: future of the return value of fit_function
+
+        The worker pool has fit_workers threads. lmfit spends most of the time in numpy and scipy,
+        so the calling logic thread stays responsive, e.g. for acquisition timers.
+        """
+        with self.lock:
+            if self._fit_executor is None:
+                self._fit_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max(1, int(self._fit_workers)))
+            return self._fit_executor.submit(fit_function, *args, **kwargs)
 
     def validate_load_fits(self, fits):
         """ Take fit names and estimators from a dict and check if they are valid.
@@ -284,6 +404,129 @@ class FitLogic(GenericLogic):
         return FitContainer(self, container_name, dimension)
 
 
+class FitMethods:
+    """ Provides the fit methods of FitLogic without a running qudi module, e.g. in the worker
+    processes of batch fits.
+    """
+    log = logging.getLogger('{0}.FitMethods'.format(__name__))
+
+    @classmethod
+    def load(cls, path_list):
+        """ Attach all fit methods found in the given directories to this class.
+
+        @param list path_list: directories containing the fit method files
+        """
+        fit_methods, manifest = scan_fit_methods(path_list)
+        for method, module_name in fit_methods.items():
+            setattr(cls, method, _LazyFitMethod(method, module_name))
+
+
+class _BatchFit:
+    """ Fits many data sets with the same model, which is built only once.
+
+    The first data set of a range is fitted with the starting values from the estimator, every
+    following data set starts from the result of its predecessor (warm start). If a warm started
+    fit fails, the data set is fitted again with the starting values from the estimator.
+    """
+
+    def __init__(self, fit_methods, fit_name, est_name, x_data, y_data, add_params=None,
+                 warm_start=True, analytic_jacobian=False):
+        """
+        @param fit_methods: FitLogic or FitMethods instance providing the fit methods
+        @param str fit_name: name of the fit, e.g. 'lorentzian'
+        @param str est_name: name of the estimator of the fit, e.g. 'generic' or 'dip'
+        @param numpy.ndarray x_data: 1D x values, common to all data sets
+        @param numpy.ndarray y_data: 2D array with one data set per row
+        @param lmfit.parameter.Parameters add_params: optional, parameters replacing the values
+                                                      from the estimator
+        @param bool warm_start: start each fit from the result of the preceding data set
+        @param bool analytic_jacobian: locate the minimum with the analytic Jacobian of the model
+        """
+        self.model, self.params = getattr(fit_methods, 'make_{0}_model'.format(fit_name))()
+        if est_name == 'generic':
+            self.estimator = getattr(fit_methods, 'estimate_{0}'.format(fit_name))
+        else:
+            self.estimator = getattr(fit_methods, 'estimate_{0}_{1}'.format(fit_name, est_name))
+        self.substitute_params = fit_methods._substitute_params
+        self.param_names = list(self.params.keys())
+        self.x_data = x_data
+        self.y_data = y_data
+        self.add_params = add_params
+        self.warm_start = warm_start
+        self.analytic_jacobian = analytic_jacobian
+
+    def _fit(self, data, params):
+        try:
+            if self.analytic_jacobian:
+                return fit_with_analytic_jacobian(self.model, data, params, self.x_data)
+            return self.model.fit(data, x=self.x_data, params=params)
+        except Exception:
+            return None
+
+    def fit_range(self, start, stop):
+        """ Fit the data sets start to stop - 1.
+
+        @param int start: index of the first data set
+        @param int stop: index after the last data set
+
+        @return tuple: start, values, errors, chi_sqr, success of the fitted data sets
+        """
+        num = stop - start
+        values = np.full((num, len(self.param_names)), np.nan)
+        errors = np.full((num, len(self.param_names)), np.nan)
+        chi_sqr = np.full(num, np.nan)
+        success = np.zeros(num, dtype=bool)
+
+        previous = None
+        for index in range(num):
+            data = np.asarray(self.y_data[start + index], dtype=np.float64)
+            result = None
+            if previous is not None:
+                result = self._fit(data, previous.copy())
+            if result is None or not result.success:
+                error, params = self.estimator(self.x_data, data, self.params.copy())
+                params = self.substitute_params(initial_params=params,
+                                                update_params=self.add_params)
+                result = self._fit(data, params)
+            if result is None:
+                previous = None
+                continue
+
+            for column, name in enumerate(self.param_names):
+                values[index, column] = result.params[name].value
+                if result.params[name].stderr is not None:
+                    errors[index, column] = result.params[name].stderr
+            chi_sqr[index] = result.chisqr
+            success[index] = result.success
+            previous = result.params if self.warm_start else None
+        return start, values, errors, chi_sqr, success
+
+
+# batch fit of a worker process, set up by _init_batch_fit_worker
+_worker_batch_fit = None
+
+
+def _init_batch_fit_worker(path_list, fit_name, est_name, x_data, y_filename, add_params,
+                           warm_start, analytic_jacobian):
+    """ Set up the batch fit of a worker process. The data sets are read from a memory-mapped
+    .npy file shared by all workers.
+    """
+    global _worker_batch_fit
+    FitMethods.load(path_list)
+    if add_params is not None:
+        params = lmfit.parameter.Parameters()
+        params.loads(add_params)
+        add_params = params
+    y_data = np.load(y_filename, mmap_mode='r')
+    _worker_batch_fit = _BatchFit(FitMethods(), fit_name, est_name, x_data, y_data,
+                                  add_params=add_params, warm_start=warm_start,
+                                  analytic_jacobian=analytic_jacobian)
+
+
+def _run_batch_fit_range(bounds):
+    return _worker_batch_fit.fit_range(*bounds)
+
+
 class FitContainer(QtCore.QObject):
     """ A class for managing a single flexible fit setting in a logic module.
     """
@@ -291,6 +534,9 @@ class FitContainer(QtCore.QObject):
     sigCurrentFit = QtCore.Signal(str)
     sigNewFitResult = QtCore.Signal(str, lmfit.model.ModelResult)
     sigNewFitParameters = QtCore.Signal(str, lmfit.parameter.Parameters)
+    # fit_x, fit_y and result of a fit started with do_fit_async
+    sigAsyncFitFinished = QtCore.Signal(object, object, object)
+    _sigAsyncFitDone = QtCore.Signal(object, int)
 
     def __init__(self, fit_logic, name, dimension):
         """ Create a fit container.
@@ -319,8 +565,15 @@ class FitContainer(QtCore.QObject):
         self.current_fit_param = lmfit.parameter.Parameters()
         self.current_fit_result = None
         self.use_settings = None
+        # locate the minimum with the analytic Jacobian for fits supporting it
+        self.use_analytic_jacobian = False
+        self._analytic_jacobian_support = dict()
         self.units = ['independent variable {0}'.format(i+1) for i in range(self.dim)]
         self.units.append('dependent variable')
+        # the fit started last with do_fit_async, earlier fits are superseded
+        self._async_fit_future = None
+        self._async_fit_generation = 0
+        self._sigAsyncFitDone.connect(self._async_fit_done, QtCore.Qt.QueuedConnection)
 
     def set_units(self, units):
         """ Set units for this fit.
@@ -331,6 +584,31 @@ class FitContainer(QtCore.QObject):
         if len(units) == self.dim + 1:
             self.units = units
 
+    def set_analytic_jacobian(self, enabled):
+        """ Choose whether fits supporting it use the analytic Jacobian of their model.
+
+            @param enabled bool: use the analytic Jacobian
+
+        Fits without analytic Jacobian are not affected. The analytic Jacobian needs a single
+        model evaluation per iteration and converges in fewer iterations for well estimated
+        starting values, the fit result is the same within the fit tolerances.
+        """
+        self.use_analytic_jacobian = bool(enabled)
+
+    def _supports_analytic_jacobian(self, fit_name):
+        """ Check whether the fit method of a configured fit accepts analytic_jacobian.
+
+            @param fit_name str: name of the configured fit
+
+            @return bool: the fit method has the argument analytic_jacobian
+        """
+        function_name = self.fit_list[fit_name]['fit_name']
+        if function_name not in self._analytic_jacobian_support:
+            make_fit = getattr(self.fit_logic, 'make_{0}_fit'.format(function_name))
+            self._analytic_jacobian_support[function_name] = (
+                'analytic_jacobian' in inspect.signature(make_fit).parameters)
+        return self._analytic_jacobian_support[function_name]
+
     def load_from_dict(self, fit_dict):
         """ Take a list of fits from a storable dictionary, load to self.fit_list and check.
             @param fit_dict dict: fit dictionary with function references etc
@@ -385,6 +663,7 @@ class FitContainer(QtCore.QObject):
                         self.use_settings[para]=self.fit_list[self.current_fit]['parameters'][para]
             else:
                 self.use_settings=None
+        self.cancel_async_fit()
         self.clear_result()
         self.sigCurrentFit.emit(self.current_fit)
         return self.current_fit, self.use_settings
@@ -415,31 +694,76 @@ class FitContainer(QtCore.QObject):
                             obtained from this object. If no fit is performed
                             then result is set to None.
         """
+        # a fit started with do_fit_async would overwrite the result later
+        self.cancel_async_fit()
         self.clear_result()
+        self._check_current_fit()
 
-        fit_x = np.linspace(
-            start=x_data[0],
-            stop=x_data[-1],
-            num=int(len(x_data) * self.fit_granularity_fact))
+        fit_x, fit_y, result = self._compute_fit(
+            self.current_fit, self.use_settings, x_data, y_data)
+        self._apply_fit_result(result)
 
-        # set the keyword arguments, which will be passed to the fit.
-        kwargs = {
-            'x_axis': x_data,
-            'data': y_data,
-            'units': self.units,
-            'add_params': self.use_settings}
+        return fit_x, fit_y, result
 
-        result = None
+    def do_fit_async(self, x_data, y_data):
+        """ Performs the chosen fit in the worker pool of FitLogic.
 
-        if self.current_fit in self.fit_list:
-            result = self.fit_list[self.current_fit]['make_fit'](
-                estimator=self.fit_list[self.current_fit]['estimator'],
-                **kwargs)
+        @param array x_data: 1D np.array or 1D list with the x values
+        @param array y_data: 1D np.array or 1D list with the y values
 
-        elif self.current_fit == 'No Fit':
-            fit_y = np.zeros(fit_x.shape)
+        @return concurrent.futures.Future: future of the tuple (fit_x, fit_y, fit_result) as
+                                           returned by do_fit
 
-        else:
+        A fit of this container started before, which is still waiting or running, is superseded:
+        a waiting fit is cancelled and the result of a running fit is discarded. When the fit is
+        finished, the results are stored in this container, sigNewFitParameters, sigNewFitResult
+        and sigFitUpdated are emitted like for do_fit and sigAsyncFitFinished is emitted with
+        fit_x, fit_y and fit_result. All signals are emitted in the thread of this container.
+        """
+        self.cancel_async_fit()
+        self._check_current_fit()
+        generation = self._async_fit_generation
+        use_settings = None if self.use_settings is None else self.use_settings.copy()
+        # copy the data, the measurement may continue to write into the arrays
+        future = self.fit_logic.submit_fit(
+            self._compute_fit, self.current_fit, use_settings,
+            np.array(x_data, copy=True), np.array(y_data, copy=True))
+        future.add_done_callback(lambda done: self._sigAsyncFitDone.emit(done, generation))
+        self._async_fit_future = future
+        return future
+
+    def cancel_async_fit(self):
+        """ Cancel the fit started with do_fit_async, if it is not finished yet.
+
+        If the fit is already running, it continues in the background but its result is
+        discarded.
+        """
+        self._async_fit_generation += 1
+        if self._async_fit_future is not None:
+            self._async_fit_future.cancel()
+            self._async_fit_future = None
+
+    @QtCore.Slot(object, int)
+    def _async_fit_done(self, future, generation):
+        """ Store the result of a fit started with do_fit_async, unless it was superseded.
+        """
+        if generation != self._async_fit_generation or future.cancelled():
+            return
+        self._async_fit_future = None
+        try:
+            fit_x, fit_y, result = future.result()
+        except:
+            self.fit_logic.log.exception('Fit "{0}" of {1} failed.'.format(self.current_fit,
+                                                                          self.name))
+            return
+        self.clear_result()
+        self._apply_fit_result(result)
+        self.sigAsyncFitFinished.emit(fit_x, fit_y, result)
+
+    def _check_current_fit(self):
+        """ Set the current fit to 'No Fit' if it is not configured in this container.
+        """
+        if self.current_fit not in self.fit_list and self.current_fit != 'No Fit':
             self.fit_logic.log.warning(
                 'The Fit Function "{0}" is not implemented to be used in the ODMR Logic. '
                 'Correct that! Fit Call will be skipped and Fit Function will be set to '
@@ -447,12 +771,48 @@ class FitContainer(QtCore.QObject):
 
             self.current_fit = 'No Fit'
 
-        if self.current_fit != 'No Fit':
-            # after the fit was performed, retrieve the fitting function and
-            # evaluate the fitted parameters according to the function:
-            model, params = self.fit_list[self.current_fit]['make_model']()
-            fit_y = model.eval(x=fit_x, params=result.params)
+    def _compute_fit(self, fit_name, use_settings, x_data, y_data):
+        """ Performs a fit without changing the state of this container.
+
+        @param str fit_name: name of the configured fit, or 'No Fit'
+        @param lmfit.parameter.Parameters use_settings: parameters overriding the estimator
+        @param array x_data: 1D np.array or 1D list with the x values
+        @param array y_data: 1D np.array or 1D list with the y values
+
+        @return: tuple (fit_x, fit_y, fit_result), see do_fit
+        """
+        fit_x = np.linspace(
+            start=x_data[0],
+            stop=x_data[-1],
+            num=int(len(x_data) * self.fit_granularity_fact))
+
+        if fit_name == 'No Fit':
+            return fit_x, np.zeros(fit_x.shape), None
+
+        # set the keyword arguments, which will be passed to the fit.
+        kwargs = {
+            'x_axis': x_data,
+            'data': y_data,
+            'units': self.units,
+            'add_params': use_settings}
+        if self.use_analytic_jacobian and self._supports_analytic_jacobian(fit_name):
+            kwargs['analytic_jacobian'] = True
+
+        result = self.fit_list[fit_name]['make_fit'](
+            estimator=self.fit_list[fit_name]['estimator'],
+            **kwargs)
+
+        # after the fit was performed, retrieve the fitting function and
+        # evaluate the fitted parameters according to the function:
+        model, params = self.fit_list[fit_name]['make_model']()
+        fit_y = model.eval(x=fit_x, params=result.params)
+        return fit_x, fit_y, result
+
+    def _apply_fit_result(self, result):
+        """ Store a fit result in this container and announce it.
 
+        @param lmfit.model.ModelResult result: result of the fit, None if no fit was performed
+        """
         if result is not None:
             self.current_fit_param = result.params
             self.current_fit_result = result
@@ -461,4 +821,94 @@ class FitContainer(QtCore.QObject):
 
         self.sigFitUpdated.emit()
 
-        return fit_x, fit_y, result
+    def do_batch_fit(self, x_data, y_data, warm_start=True, max_workers=None, chunk_size=None):
+        """ Performs the chosen fit on many data sets with a common x axis.
+
+        @param array x_data: 1D np.array or 1D list with the x values
+        @param array y_data: 2D np.array with one data set per row, each with the size of x_data
+        @param bool warm_start: optional, start each fit from the result of the preceding data set
+                                instead of the estimator. Neighbouring data sets (e.g. pixels or
+                                POIs) usually have similar parameters, so this saves iterations.
+        @param int max_workers: optional, number of worker processes. Defaults to the number of
+                                CPUs, 1 fits all data sets in the calling thread.
+        @param int chunk_size: optional, number of consecutive data sets fitted by one worker
+                               task. Each chunk starts with the estimator.
+
+        @return OrderedDict: the stacked fit results with the entries
+            list 'param_names': names of the fit parameters
+            np.array 'values': 2D array (data sets, parameters) with the fitted values
+            np.array 'errors': 2D array (data sets, parameters) with the errors, NaN if unknown
+            np.array 'chi_sqr': 1D array with the chi square of each fit
+            np.array 'success': 1D bool array, whether the fit converged
+            Returns None if no fit is selected.
+
+        The model is built only once per worker and no lmfit.model.ModelResult objects are kept.
+        The data sets are handed to the worker processes in a memory-mapped file, so they are not
+        copied for every task.
+        """
+        if self.current_fit not in self.fit_list:
+            self.fit_logic.log.warning('No fit selected in {0}, batch fit is skipped.'
+                                       ''.format(self.name))
+            return None
+
+        fit = self.fit_list[self.current_fit]
+        x_data = np.asarray(x_data, dtype=np.float64)
+        y_data = np.asarray(y_data, dtype=np.float64)
+        if y_data.ndim != 2 or y_data.shape[1] != x_data.size:
+            self.fit_logic.log.error('Batch fit needs one data set with the size of the x data '
+                                     'per row.')
+            return None
+
+        num_sets = y_data.shape[0]
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = max(1, min(int(max_workers), num_sets))
+        if chunk_size is None:
+            chunk_size = int(np.ceil(num_sets / (4 * max_workers)))
+        chunk_size = max(1, int(chunk_size))
+        bounds = [(start, min(start + chunk_size, num_sets))
+                  for start in range(0, num_sets, chunk_size)]
+
+        if max_workers == 1 or len(bounds) == 1:
+            batch_fit = _BatchFit(self.fit_logic, fit['fit_name'], fit['est_name'], x_data,
+                                  y_data, add_params=self.use_settings, warm_start=warm_start,
+                                  analytic_jacobian=self.use_analytic_jacobian)
+            param_names = batch_fit.param_names
+            chunks = [batch_fit.fit_range(*bound) for bound in bounds]
+        else:
+            param_names = list(fit['make_model']()[1].keys())
+            add_params = None if self.use_settings is None else self.use_settings.dumps()
+            fd, y_filename = tempfile.mkstemp(prefix='qudi_batch_fit_', suffix='.npy')
+            os.close(fd)
+            try:
+                shared = np.lib.format.open_memmap(y_filename, mode='w+', dtype=np.float64,
+                                                   shape=y_data.shape)
+                shared[:] = y_data
+                shared.flush()
+                del shared
+                # spawn fresh interpreters, forking a process with running Qt threads is unsafe
+                pool = multiprocessing.get_context('spawn').Pool(
+                    max_workers,
+                    initializer=_init_batch_fit_worker,
+                    initargs=(self.fit_logic._fit_method_paths, fit['fit_name'],
+                              fit['est_name'], x_data, y_filename, add_params, warm_start,
+                              self.use_analytic_jacobian))
+                try:
+                    chunks = pool.map(_run_batch_fit_range, bounds)
+                finally:
+                    pool.close()
+                    pool.join()
+            finally:
+                try:
+                    os.remove(y_filename)
+                except OSError:
+                    pass
+
+        chunks.sort(key=lambda chunk: chunk[0])
+        results = OrderedDict()
+        results['param_names'] = param_names
+        results['values'] = np.vstack([chunk[1] for chunk in chunks])
+        results['errors'] = np.vstack([chunk[2] for chunk in chunks])
+        results['chi_sqr'] = np.concatenate([chunk[3] for chunk in chunks])
+        results['success'] = np.concatenate([chunk[4] for chunk in chunks])
+        return results
@@ -68,6 +68,19 @@ def make_barestretchedexponentialdecay_model(self, prefix=None):
         """
         return np.exp(-np.power(x/lifetime, beta))
 
+    def barestretchedexponentialdecay_jacobian(x, beta, lifetime):
+        """ Partial derivatives of barestretchedexponentialdecay_function by beta and
+        lifetime. """
+        scaled = x / lifetime
+        power = np.power(scaled, beta)
+        decay = np.exp(-power)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_scaled = np.where(scaled > 0, np.log(scaled), 0.0)
+        return {'beta': -decay * power * log_scaled,
+                'lifetime': decay * beta * power / lifetime}
+
+    barestretchedexponentialdecay_function.jacobian = barestretchedexponentialdecay_jacobian
+
     if not isinstance(prefix, str) and prefix is not None:
 
         self.log.error('The passed prefix <{0}> of type {1} is not a string and'
@@ -171,7 +184,8 @@ def make_decayexponentialstretched_model(self, prefix=None):
 #  single exponential decay with offset  #
 ##########################################
 
-def make_decayexponential_fit(self, x_axis, data, estimator, units=None, add_params=None, **kwargs):
+def make_decayexponential_fit(self, x_axis, data, estimator, units=None, add_params=None,
+                              analytic_jacobian=False, **kwargs):
     """ Performes a exponential decay with offset fit on the provided data.
 
     @param numpy.array x_axis: 1D axis values
@@ -179,6 +193,8 @@ def make_decayexponential_fit(self, x_axis, data, estimator, units=None, add_par
     @param Parameters or dict add_params: optional, additional parameters of
                 type lmfit.parameter.Parameters, OrderedDict or dict for the fit
                 which will be used instead of the values from the estimator.
+    @param bool analytic_jacobian: optional, fit with the analytic Jacobian of the model
+                                   instead of lmfit's numerical derivatives
 
     @return object result: lmfit.model.ModelFit object, all parameters
                            provided about the fitting, like: success,
@@ -192,7 +208,8 @@ def make_decayexponential_fit(self, x_axis, data, estimator, units=None, add_par
     params = self._substitute_params(initial_params=params,
                                      update_params=add_params)
     try:
-        result = exponentialdecay.fit(data, x=x_axis, params=params, **kwargs)
+        result = self._fit_model(exponentialdecay, data, x_axis, params,
+                                 analytic_jacobian=analytic_jacobian, **kwargs)
     except:
         result = exponentialdecay.fit(data, x=x_axis, params=params, **kwargs)
         self.log.warning('The exponentialdecay with offset fit did not work. '
@@ -75,6 +75,14 @@ def make_gaussianwithoutoffset_model(self, prefix=None):
         """
         return np.exp(- np.power((center - x), 2) / (2 * np.power(sigma, 2)))
 
+    def physical_gauss_jacobian(x, center, sigma):
+        """ Partial derivatives of physical_gauss by center and sigma. """
+        gauss = physical_gauss(x, center, sigma)
+        return {'center': -gauss * (center - x) / np.power(sigma, 2),
+                'sigma': gauss * np.power((center - x), 2) / np.power(sigma, 3)}
+
+    physical_gauss.jacobian = physical_gauss_jacobian
+
     amplitude_model, params = self.make_amplitude_model(prefix=prefix)
 
     if not isinstance(prefix, str) and prefix is not None:
@@ -301,7 +309,8 @@ def make_twoDgaussian_model(self, prefix=None):
 # 1D Gaussian with flat offset    #
 ###################################
 
-def make_gaussian_fit(self, x_axis, data, estimator, units=None, add_params=None, **kwargs):
+def make_gaussian_fit(self, x_axis, data, estimator, units=None, add_params=None,
+                      analytic_jacobian=False, **kwargs):
     """ Perform a 1D gaussian peak fit on the provided data.
 
     @param numpy.array x_axis: 1D axis values
@@ -311,6 +320,8 @@ def make_gaussian_fit(self, x_axis, data, estimator, units=None, add_params=None
     @param Parameters or dict add_params: optional, additional parameters of
                 type lmfit.parameter.Parameters, OrderedDict or dict for the fit
                 which will be used instead of the values from the estimator.
+    @param bool analytic_jacobian: optional, fit with the analytic Jacobian of the model
+                                   instead of lmfit's numerical derivatives
 
     @return object model: lmfit.model.ModelFit object, all parameters
                           provided about the fitting, like: success,
@@ -325,7 +336,8 @@ def make_gaussian_fit(self, x_axis, data, estimator, units=None, add_params=None
     params = self._substitute_params(initial_params=params,
                                      update_params=add_params)
     try:
-        result = mod_final.fit(data, x=x_axis, params=params, **kwargs)
+        result = self._fit_model(mod_final, data, x_axis, params,
+                                 analytic_jacobian=analytic_jacobian, **kwargs)
     except:
         self.log.warning('The 1D gaussian peak fit did not work. Error '
                        'message: {0}\n'.format(result.message))
@@ -28,6 +28,8 @@ from scipy.ndimage import filters
 from lmfit import Parameters
 from collections import OrderedDict
 
+from logic.analytic_fit import fit_with_analytic_jacobian
+
 ############################################################################
 #                                                                          #
 #                             General methods                              #
@@ -130,6 +132,25 @@ def _substitute_params(self, initial_params, update_params=None):
 
     return initial_params
 
+
+def _fit_model(self, model, data, x_axis, params, analytic_jacobian=False, **kwargs):
+    """ Fit a model to the data, optionally with the analytic Jacobian of the model.
+
+    @param lmfit.Model model: model to fit
+    @param numpy.array data: data to fit
+    @param numpy.array x_axis: independent variable
+    @param lmfit.Parameters params: starting parameters of the fit
+    @param bool analytic_jacobian: optional, fit with the analytic derivatives of the model
+                                   functions using scipy.optimize.least_squares instead of lmfit.
+                                   Models without analytic derivatives are fitted as usual.
+
+    @return object result: lmfit.model.ModelFit object
+    """
+    if analytic_jacobian:
+        return fit_with_analytic_jacobian(model, data, params, x_axis, **kwargs)
+    return model.fit(data, x=x_axis, params=params, **kwargs)
+
+
 def create_fit_string(self, result, model, units=None, decimal_digits_value_given=None,
                       decimal_digits_err_given=None):
     """ This method can produces a well readable string from the results of a fitted model.
@@ -62,6 +62,12 @@ def make_hyperbolicsaturation_model(self, prefix=None):
 
         return I_sat * (x / (x + P_sat))
 
+    def hyperbolicsaturation_jacobian(x, I_sat, P_sat):
+        """ Partial derivatives of hyperbolicsaturation_function by I_sat and P_sat. """
+        return {'I_sat': x / (x + P_sat), 'P_sat': -I_sat * x / np.power(x + P_sat, 2)}
+
+    hyperbolicsaturation_function.jacobian = hyperbolicsaturation_jacobian
+
     if not isinstance(prefix, str) and prefix is not None:
         self.log.error('The passed prefix <{0}> of type {1} is not a string and'
                      'cannot be used as a prefix and will be ignored for now.'
@@ -80,7 +86,8 @@ def make_hyperbolicsaturation_model(self, prefix=None):
     return complete_model, params
 
 
-def make_hyperbolicsaturation_fit(self, x_axis, data, estimator, units=None, add_params=None, **kwargs):
+def make_hyperbolicsaturation_fit(self, x_axis, data, estimator, units=None, add_params=None,
+                                  analytic_jacobian=False, **kwargs):
     """ Perform a fit on the provided data with a fluorescence depending function.
 
     @param numpy.array x_axis: 1D axis values
@@ -90,6 +97,8 @@ def make_hyperbolicsaturation_fit(self, x_axis, data, estimator, units=None, add
     @param Parameters or dict add_params: optional, additional parameters of
                 type lmfit.parameter.Parameters, OrderedDict or dict for the fit
                 which will be used instead of the values from the estimator.
+    @param bool analytic_jacobian: optional, fit with the analytic Jacobian of the model
+                                   instead of lmfit's numerical derivatives
 
     @return object result: lmfit.model.ModelFit object, all parameters
                            provided about the fitting, like: success,
@@ -106,7 +115,8 @@ def make_hyperbolicsaturation_fit(self, x_axis, data, estimator, units=None, add
         initial_params=params,
         update_params=add_params)
 
-    result = mod_final.fit(data, x=x_axis, params=params, **kwargs)
+    result = self._fit_model(mod_final, data, x_axis, params,
+                             analytic_jacobian=analytic_jacobian, **kwargs)
 
     return result
 
@@ -65,6 +65,8 @@ def make_constant_model(self, prefix=None):
 
         return offset
 
+    constant_function.jacobian = lambda x, offset: {'offset': 1.0}
+
     if not isinstance(prefix, str) and prefix is not None:
         self.log.error('The passed prefix <{0}> of type {1} is not a string and cannot be used as '
                        'a prefix and will be ignored for now. Correct that!'.format(prefix,
@@ -101,6 +103,8 @@ def make_amplitude_model(self, prefix=None):
 
         return amplitude
 
+    amplitude_function.jacobian = lambda x, amplitude: {'amplitude': 1.0}
+
     if not isinstance(prefix, str) and prefix is not None:
         self.log.error('The passed prefix <{0}> of type {1} is not a string and cannot be used as '
                        'a prefix and will be ignored for now. Correct that!'.format(prefix,
@@ -137,6 +141,8 @@ def make_slope_model(self, prefix=None):
 
         return slope
 
+    slope_function.jacobian = lambda x, slope: {'slope': 1.0}
+
     if not isinstance(prefix, str) and prefix is not None:
         self.log.error('The passed prefix <{0}> of type {1} is not a string and cannot be used as '
                        'a prefix and will be ignored for now. Correct that!'.format(prefix,
@@ -172,6 +178,8 @@ def make_linear_model(self, prefix=None):
 
         return x
 
+    linear_function.jacobian = lambda x: {}
+
     if not isinstance(prefix, str) and prefix is not None:
         self.log.error('The passed prefix <{0}> of type {1} is not a string and cannot be used as '
                        'a prefix and will be ignored for now. Correct that!'.format(prefix,
@@ -142,6 +142,15 @@ def make_lorentzianwithoutoffset_model(self, prefix=None):
         """
         return np.power(sigma, 2) / (np.power((center - x), 2) + np.power(sigma, 2))
 
+    def physical_lorentzian_jacobian(x, center, sigma):
+        """ Partial derivatives of physical_lorentzian by center and sigma. """
+        delta_sq = np.power((center - x), 2)
+        denominator_sq = np.power(delta_sq + np.power(sigma, 2), 2)
+        return {'center': -2 * np.power(sigma, 2) * (center - x) / denominator_sq,
+                'sigma': 2 * sigma * delta_sq / denominator_sq}
+
+    physical_lorentzian.jacobian = physical_lorentzian_jacobian
+
     amplitude_model, params = self.make_amplitude_model(prefix=prefix)
 
     if not isinstance(prefix, str) and prefix is not None:
@@ -282,7 +291,7 @@ def make_lorentziantriple_model(self):
 ################################################################################
 
 def make_lorentzian_fit(self, x_axis, data, estimator, units=None,
-                        add_params=None, **kwargs):
+                        add_params=None, analytic_jacobian=False, **kwargs):
     """ Perform a 1D lorentzian fit on the provided data.
 
     @param numpy.array x_axis: 1D axis values
@@ -292,6 +301,8 @@ def make_lorentzian_fit(self, x_axis, data, estimator, units=None,
     @param Parameters or dict add_params: optional, additional parameters of
                 type lmfit.parameter.Parameters, OrderedDict or dict for the fit
                 which will be used instead of the values from the estimator.
+    @param bool analytic_jacobian: optional, fit with the analytic Jacobian of the model
+                                   instead of lmfit's numerical derivatives
 
     @return object model: lmfit.model.ModelFit object, all parameters
                           provided about the fitting, like: success,
@@ -306,7 +317,8 @@ def make_lorentzian_fit(self, x_axis, data, estimator, units=None,
     params = self._substitute_params(initial_params=params,
                                      update_params=add_params)
     try:
-        result = model.fit(data, x=x_axis, params=params, **kwargs)
+        result = self._fit_model(model, data, x_axis, params,
+                                 analytic_jacobian=analytic_jacobian, **kwargs)
     except:
         result = model.fit(data, x=x_axis, params=params, **kwargs)
         self.log.warning('The 1D lorentzian fit did not work. Error '
@@ -434,7 +446,8 @@ def estimate_lorentzian_peak (self, x_axis, data, params):
 #                   Double Lorentzian with offset fitting                      #
 ################################################################################
 
-def make_lorentziandouble_fit(self, x_axis, data, estimator, units=None, add_params=None, **kwargs):
+def make_lorentziandouble_fit(self, x_axis, data, estimator, units=None, add_params=None,
+                              analytic_jacobian=False, **kwargs):
     """ Perform a 1D double lorentzian dip fit with offset on the provided data.
 
     @param numpy.array x_axis: 1D axis values
@@ -444,6 +457,8 @@ def make_lorentziandouble_fit(self, x_axis, data, estimator, units=None, add_par
     @param Parameters or dict add_params: optional, additional parameters of
                 type lmfit.parameter.Parameters, OrderedDict or dict for the fit
                 which will be used instead of the values from the estimator.
+    @param bool analytic_jacobian: optional, fit with the analytic Jacobian of the model
+                                   instead of lmfit's numerical derivatives
 
     @return object model: lmfit.model.ModelFit object, all parameters
                           provided about the fitting, like: success,
@@ -460,7 +475,8 @@ def make_lorentziandouble_fit(self, x_axis, data, estimator, units=None, add_par
     params = self._substitute_params(initial_params=params,
                                      update_params=add_params)
     try:
-        result = model.fit(data, x=x_axis, params=params, **kwargs)
+        result = self._fit_model(model, data, x_axis, params,
+                                 analytic_jacobian=analytic_jacobian, **kwargs)
     except:
         result = model.fit(data, x=x_axis, params=params, **kwargs)
         self.log.error('The double lorentzian fit did not '
@@ -757,7 +773,7 @@ def estimate_lorentziandouble_N15(self, x_axis, data, params):
 # make_N14_fit
 
 def make_lorentziantriple_fit(self, x_axis, data, estimator, units=None,
-                            add_params=None, **kwargs):
+                            add_params=None, analytic_jacobian=False, **kwargs):
     """ Perform a triple lorentzian fit
 
     @param numpy.array x_axis: 1D axis values
@@ -767,6 +783,8 @@ def make_lorentziantriple_fit(self, x_axis, data, estimator, units=None,
     @param Parameters or dict add_params: optional, additional parameters of
                 type lmfit.parameter.Parameters, OrderedDict or dict for the fit
                 which will be used instead of the values from the estimator.
+    @param bool analytic_jacobian: optional, fit with the analytic Jacobian of the model
+                                   instead of lmfit's numerical derivatives
 
     @return object model: lmfit.model.ModelFit object, all parameters
                           provided about the fitting, like: success,
@@ -781,7 +799,8 @@ def make_lorentziantriple_fit(self, x_axis, data, estimator, units=None,
     params = self._substitute_params(initial_params=params,
                                      update_params=add_params)
     try:
-        result = model.fit(data, x=x_axis, params=params, **kwargs)
+        result = self._fit_model(model, data, x_axis, params,
+                                 analytic_jacobian=analytic_jacobian, **kwargs)
     except:
         result = model.fit(data, x=x_axis, params=params, **kwargs)
         self.log.error('The triple lorentzian fit did not '
@@ -74,6 +74,13 @@ def make_baresine_model(self, prefix=None):
 
         return np.sin(2*np.pi*frequency*x+phase)
 
+    def bare_sine_jacobian(x, frequency, phase):
+        """ Partial derivatives of bare_sine_function by frequency and phase. """
+        cosine = np.cos(2*np.pi*frequency*x+phase)
+        return {'frequency': 2*np.pi*x*cosine, 'phase': cosine}
+
+    bare_sine_function.jacobian = bare_sine_jacobian
+
     if not isinstance(prefix, str) and prefix is not None:
         self.log.error('The passed prefix <{0}> of type {1} is not a string and'
                        'cannot be used as a prefix and will be ignored for now.'
@@ -680,7 +687,8 @@ def estimate_sine(self, x_axis, data, params):
 ##########################
 
 
-def make_sineexponentialdecay_fit(self, x_axis, data, estimator, units=None, add_params=None, **kwargs):
+def make_sineexponentialdecay_fit(self, x_axis, data, estimator, units=None, add_params=None,
+                                  analytic_jacobian=False, **kwargs):
     """ Perform a sine exponential decay fit on the provided data.
 
     @param numpy.array x_axis: 1D axis values
@@ -690,6 +698,8 @@ def make_sineexponentialdecay_fit(self, x_axis, data, estimator, units=None, add
     @param Parameters or dict add_params: optional, additional parameters of
                 type lmfit.parameter.Parameters, OrderedDict or dict for the fit
                 which will be used instead of the values from the estimator.
+    @param bool analytic_jacobian: optional, fit with the analytic Jacobian of the model
+                                   instead of lmfit's numerical derivatives
 
     @return object result: lmfit.model.ModelFit object, all parameters
                            provided about the fitting, like: success,
@@ -703,7 +713,8 @@ def make_sineexponentialdecay_fit(self, x_axis, data, estimator, units=None, add
     params = self._substitute_params(initial_params=params,
                                      update_params=add_params)
     try:
-        result = sine_exp_decay_offset.fit(data, x=x_axis, params=params, **kwargs)
+        result = self._fit_model(sine_exp_decay_offset, data, x_axis, params,
+                                 analytic_jacobian=analytic_jacobian, **kwargs)
     except:
 
         result = sine_exp_decay_offset.fit(data, x=x_axis, params=params, **kwargs)
@@ -2090,3 +2101,387 @@ def estimate_sinetriplewiththreeexpdecay(self, x_axis, data, params):
     params['offset'].set(value=data.mean())
 
     return error, params
+
+
+################################################################################
+#                                                                              #
+#           Spectral estimators for sums of sines without nested fits          #
+#                                                                              #
+################################################################################
+
+# The estimators with the suffix _fft take the frequencies of all sines from the highest peaks
+# of one zero-padded Fourier transform of the data. The estimators with the suffix _pencil refine
+# these frequencies and the lifetimes with the matrix pencil method. In both cases amplitudes,
+# phases and offset follow from a linear least squares problem, so no nonlinear fit is needed
+# to estimate the starting values.
+
+
+def _find_spectral_peaks(self, x_axis, data, num_peaks, zeropad_num=15):
+    """ Find the frequencies of the highest peaks in the Fourier transform of the data.
+
+    @param numpy.array x_axis: 1D axis values, should be equidistant
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param int num_peaks: number of peaks to find
+    @param int zeropad_num: zeropadding of the Fourier transform, see compute_ft
+
+    @return numpy.array: frequencies of the peaks, sorted by descending peak height
+
+    Peaks closer than the main lobe width of the Hann window are not resolved. If less peaks are
+    found the highest peak is repeated.
+    """
+    dft_x, dft_y = compute_ft(x_axis, data, zeropad_num=zeropad_num, window='hann')
+    # local maxima, excluding the zero frequency
+    maxima = np.flatnonzero((dft_y[1:-1] > dft_y[:-2]) & (dft_y[1:-1] >= dft_y[2:])) + 1
+    if len(maxima) == 0:
+        maxima = np.array([max(int(dft_y[1:].argmax()) + 1, 1)])
+    maxima = maxima[np.argsort(dft_y[maxima])[::-1]]
+
+    # main lobe half width of the Hann window: 2/T
+    min_separation = 2 / (len(x_axis) * (x_axis[1] - x_axis[0]))
+    freq_step = dft_x[1] - dft_x[0]
+    frequencies = list()
+    for index in maxima:
+        # parabolic interpolation of the logarithmic peak
+        if 0 < index < len(dft_y) - 1 and np.all(dft_y[index - 1:index + 2] > 0):
+            left, center, right = np.log(dft_y[index - 1:index + 2])
+            curvature = left - 2 * center + right
+            shift = 0.5 * (left - right) / curvature if curvature < 0 else 0
+        else:
+            shift = 0
+        frequency = dft_x[index] + shift * freq_step
+        if all(abs(frequency - found) >= min_separation for found in frequencies):
+            frequencies.append(frequency)
+        if len(frequencies) == num_peaks:
+            break
+    while len(frequencies) < num_peaks:
+        frequencies.append(frequencies[0])
+    return np.array(frequencies)
+
+
+def _matrix_pencil(self, x_axis, data, num_modes):
+    """ Estimate the complex modes of a sum of damped sines with the matrix pencil method.
+
+    @param numpy.array x_axis: 1D axis values, must be equidistant
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param int num_modes: number of complex exponentials, 2 per damped sine
+
+    @return tuple(numpy.array, numpy.array): frequencies and lifetimes of the modes with positive
+                                             frequency (np.inf for undamped modes)
+    """
+    num_points = len(data)
+    pencil = max(num_modes, num_points // 3)
+    hankel = data[np.arange(num_points - pencil)[:, np.newaxis] + np.arange(pencil + 1)]
+    _, _, v_h = np.linalg.svd(hankel, full_matrices=False)
+    v_sig = v_h[:num_modes].conj().T
+    poles = np.linalg.eigvals(np.linalg.pinv(v_sig[:-1]).dot(v_sig[1:]))
+
+    stepsize = x_axis[1] - x_axis[0]
+    frequencies = np.angle(poles) / (2 * np.pi * stepsize)
+    with np.errstate(divide='ignore'):
+        damping = -np.log(np.abs(poles)) / stepsize
+        lifetimes = np.where(damping > 0, 1 / damping, np.inf)
+    positive = frequencies > 0
+    return frequencies[positive], lifetimes[positive]
+
+
+def _solve_sine_amplitudes(self, x_axis, data, frequencies, lifetimes):
+    """ Linear least squares solution for amplitudes, phases and offset of a sum of sines with
+    known frequencies and lifetimes.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param numpy.array frequencies: frequency of each sine
+    @param numpy.array lifetimes: lifetime of the exponential decay of each sine (np.inf for no
+                                  decay)
+
+    @return tuple(float, numpy.array, numpy.array, float): offset, amplitudes, phases and sum of
+                                                           squared residuals
+    """
+    columns = [np.ones(len(x_axis))]
+    for frequency, lifetime in zip(frequencies, lifetimes):
+        envelope = np.exp(-x_axis / lifetime) if np.isfinite(lifetime) else 1.0
+        columns.append(envelope * np.sin(2 * np.pi * frequency * x_axis))
+        columns.append(envelope * np.cos(2 * np.pi * frequency * x_axis))
+    design = np.column_stack(columns)
+    coefficients, _, _, _ = np.linalg.lstsq(design, data, rcond=None)
+    residual = np.sum((design.dot(coefficients) - data)**2)
+    sine_coeff = coefficients[1::2]
+    cosine_coeff = coefficients[2::2]
+    # A*sin(w*x + phi) = A*cos(phi)*sin(w*x) + A*sin(phi)*cos(w*x)
+    amplitudes = np.hypot(sine_coeff, cosine_coeff)
+    phases = np.arctan2(cosine_coeff, sine_coeff)
+    return coefficients[0], amplitudes, phases, residual
+
+
+def _estimate_sine_components(self, x_axis, data, num_sines, decay=None, matrix_pencil=False):
+    """ Estimate the components of a sum of sines with offset without nonlinear fits.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param int num_sines: number of sines
+    @param str decay: optional, None for undamped sines, 'common' for one exponential decay of
+                      all sines or 'individual' for one exponential decay per sine
+    @param bool matrix_pencil: optional, refine frequencies and lifetimes with the matrix pencil
+                               method. Requires an equidistant x_axis.
+
+    @return tuple(float, numpy.array, numpy.array, numpy.array, numpy.array): offset and the
+            amplitudes, frequencies, phases and lifetimes of the sines, sorted by descending
+            amplitude. The lifetimes are np.inf for undamped sines.
+    """
+    x_axis = np.array(x_axis, dtype=np.float64)
+    data = np.array(data, dtype=np.float64)
+    stepsize = x_axis[1] - x_axis[0]
+    x_range = x_axis[-1] - x_axis[0]
+    level = data - data.mean()
+
+    frequencies = self._find_spectral_peaks(x_axis, level, num_sines)
+    lifetimes = np.full(num_sines, np.inf)
+
+    equidistant = np.allclose(np.diff(x_axis), stepsize, rtol=1e-3)
+    if matrix_pencil and equidistant and len(x_axis) > 4 * num_sines:
+        # two complex modes per sine and one for the offset
+        pencil_freqs, pencil_lifetimes = self._matrix_pencil(x_axis, data, 2 * num_sines + 1)
+        resolution = 1 / (len(x_axis) * stepsize)
+        for index, frequency in enumerate(frequencies):
+            if len(pencil_freqs) == 0:
+                break
+            nearest = np.abs(pencil_freqs - frequency).argmin()
+            if abs(pencil_freqs[nearest] - frequency) < 2 * resolution:
+                frequencies[index] = pencil_freqs[nearest]
+                if decay is not None:
+                    lifetimes[index] = pencil_lifetimes[nearest]
+
+    if decay is not None:
+        min_lifetime = 2 * stepsize
+        lifetimes = np.clip(np.where(np.isfinite(lifetimes), lifetimes, 10 * x_range),
+                            min_lifetime, 10 * x_range)
+        lifetime_grid = np.geomspace(min_lifetime, 10 * x_range, 40)
+
+        def residual(lifetime_values):
+            return self._solve_sine_amplitudes(x_axis, data, frequencies, lifetime_values)[3]
+
+        if decay == 'common':
+            candidates = list(lifetime_grid)
+            if matrix_pencil:
+                candidates.append(np.median(lifetimes))
+            residuals = [residual(np.full(num_sines, lifetime)) for lifetime in candidates]
+            lifetimes = np.full(num_sines, candidates[int(np.argmin(residuals))])
+        else:
+            # coordinate descent over the lifetime of each sine
+            for sweep in range(2):
+                for index in range(num_sines):
+                    trial = lifetimes.copy()
+                    residuals = list()
+                    for lifetime in lifetime_grid:
+                        trial[index] = lifetime
+                        residuals.append(residual(trial))
+                    best = lifetime_grid[int(np.argmin(residuals))]
+                    trial[index] = lifetimes[index]
+                    if min(residuals) < residual(trial):
+                        lifetimes[index] = best
+
+    offset, amplitudes, phases, _ = self._solve_sine_amplitudes(x_axis, data, frequencies,
+                                                                lifetimes)
+    order = np.argsort(amplitudes)[::-1]
+    return offset, amplitudes[order], frequencies[order], phases[order], lifetimes[order]
+
+
+def _set_sine_components(self, x_axis, data, params, num_sines, decay=None, matrix_pencil=False):
+    """ Fill the parameters of a multiple sine model with the spectral estimate.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: parameters of the model
+    @param int num_sines: number of sines
+    @param str decay: None, 'common' or 'individual', see _estimate_sine_components
+    @param bool matrix_pencil: refine with the matrix pencil method
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the filled parameters
+
+    The sines of models with a common decay use the prefixes s1_, s2_, ..., those of models with
+    individual decays the prefixes e1_, e2_, ...
+    """
+    error = self._check_1D_input(x_axis=x_axis, data=data, params=params)
+    if error != 0:
+        return error, params
+
+    offset, amplitudes, frequencies, phases, lifetimes = self._estimate_sine_components(
+        x_axis, data, num_sines, decay=decay, matrix_pencil=matrix_pencil)
+
+    min_lifetime = 2 * (x_axis[1] - x_axis[0])
+    prefix = 'e' if decay == 'individual' else 's'
+    for index in range(num_sines):
+        name = '{0}{1:d}_'.format(prefix, index + 1)
+        params[name + 'amplitude'].set(value=amplitudes[index])
+        params[name + 'frequency'].set(value=frequencies[index])
+        params[name + 'phase'].set(value=phases[index])
+        if decay == 'individual':
+            params[name + 'lifetime'].set(value=lifetimes[index], min=min_lifetime)
+    if decay == 'common':
+        params['lifetime'].set(value=lifetimes[0], min=min_lifetime)
+    params['offset'].set(value=offset)
+    return error, params
+
+
+def estimate_sinedouble_fft(self, x_axis, data, params):
+    """ Spectral estimator for two sines with offset, see _estimate_sine_components.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: object includes parameter dictionary which
+                                    can be set
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the initial values
+    """
+    return self._set_sine_components(x_axis, data, params, 2)
+
+
+def estimate_sinedouble_pencil(self, x_axis, data, params):
+    """ Spectral estimator for two sines with offset, refined with the matrix pencil method.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: object includes parameter dictionary which
+                                    can be set
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the initial values
+    """
+    return self._set_sine_components(x_axis, data, params, 2, matrix_pencil=True)
+
+
+def estimate_sinedoublewithexpdecay_fft(self, x_axis, data, params):
+    """ Spectral estimator for two sines with offset and exponential decay.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: object includes parameter dictionary which
+                                    can be set
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the initial values
+    """
+    return self._set_sine_components(x_axis, data, params, 2, decay='common')
+
+
+def estimate_sinedoublewithexpdecay_pencil(self, x_axis, data, params):
+    """ Spectral estimator for two sines with offset and exponential decay, refined with the
+    matrix pencil method.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: object includes parameter dictionary which
+                                    can be set
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the initial values
+    """
+    return self._set_sine_components(x_axis, data, params, 2, decay='common',
+                                     matrix_pencil=True)
+
+
+def estimate_sinedoublewithtwoexpdecay_fft(self, x_axis, data, params):
+    """ Spectral estimator for two sines with offset and individual exponential decays.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: object includes parameter dictionary which
+                                    can be set
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the initial values
+    """
+    return self._set_sine_components(x_axis, data, params, 2, decay='individual')
+
+
+def estimate_sinedoublewithtwoexpdecay_pencil(self, x_axis, data, params):
+    """ Spectral estimator for two sines with offset and individual exponential decays, refined
+    with the matrix pencil method.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: object includes parameter dictionary which
+                                    can be set
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the initial values
+    """
+    return self._set_sine_components(x_axis, data, params, 2, decay='individual',
+                                     matrix_pencil=True)
+
+
+def estimate_sinetriple_fft(self, x_axis, data, params):
+    """ Spectral estimator for three sines with offset, see _estimate_sine_components.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: object includes parameter dictionary which
+                                    can be set
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the initial values
+    """
+    return self._set_sine_components(x_axis, data, params, 3)
+
+
+def estimate_sinetriple_pencil(self, x_axis, data, params):
+    """ Spectral estimator for three sines with offset, refined with the matrix pencil method.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: object includes parameter dictionary which
+                                    can be set
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the initial values
+    """
+    return self._set_sine_components(x_axis, data, params, 3, matrix_pencil=True)
+
+
+def estimate_sinetriplewithexpdecay_fft(self, x_axis, data, params):
+    """ Spectral estimator for three sines with offset and exponential decay.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: object includes parameter dictionary which
+                                    can be set
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the initial values
+    """
+    return self._set_sine_components(x_axis, data, params, 3, decay='common')
+
+
+def estimate_sinetriplewithexpdecay_pencil(self, x_axis, data, params):
+    """ Spectral estimator for three sines with offset and exponential decay, refined with the
+    matrix pencil method.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: object includes parameter dictionary which
+                                    can be set
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the initial values
+    """
+    return self._set_sine_components(x_axis, data, params, 3, decay='common',
+                                     matrix_pencil=True)
+
+
+def estimate_sinetriplewiththreeexpdecay_fft(self, x_axis, data, params):
+    """ Spectral estimator for three sines with offset and individual exponential decays.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: object includes parameter dictionary which
+                                    can be set
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the initial values
+    """
+    return self._set_sine_components(x_axis, data, params, 3, decay='individual')
+
+
+def estimate_sinetriplewiththreeexpdecay_pencil(self, x_axis, data, params):
+    """ Spectral estimator for three sines with offset and individual exponential decays,
+    refined with the matrix pencil method.
+
+    @param numpy.array x_axis: 1D axis values
+    @param numpy.array data: 1D data, should have the same dimension as x_axis.
+    @param lmfit.Parameters params: object includes parameter dictionary which
+                                    can be set
+
+    @return tuple (error, params): error code (0:OK, -1:error) and the initial values
+    """
+    return self._set_sine_components(x_axis, data, params, 3, decay='individual',
+                                     matrix_pencil=True)
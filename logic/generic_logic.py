@@ -21,6 +21,7 @@ top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi
 from qtpy import QtCore
 from core.module import Base
 from core.util.mutex import Mutex
+from core.util.tracing import Tracer
 
 
 class GenericLogic(Base):
@@ -35,6 +36,8 @@ class GenericLogic(Base):
         """
         super().__init__(**kwargs)
         self.taskLock = Mutex()
+        # timing of measurement loops, see core.util.tracing
+        self.tracer = Tracer(self._name)
 
     @QtCore.Slot(QtCore.QThread)
     def moveToThread(self, thread):
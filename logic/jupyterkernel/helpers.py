@@ -29,7 +29,22 @@ distributed as part of this software.
 import sys
 import builtins
 from base64 import encodebytes
+import functools
 import threading
+from qtpy import QtCore
+
+# queued calls by id, kept alive until they are deleted in the thread of the module
+_pending_calls = dict()
+_pending_calls_lock = threading.Lock()
+
+
+def _release_queued_call(key, *args):
+    """ Drop the reference to a queued call, when it is destroyed in the thread of the module.
+
+      @param int key: id of the _QueuedCall
+    """
+    with _pending_calls_lock:
+        _pending_calls.pop(key, None)
 
 
 class ThreadFixer(threading.Thread):
@@ -90,6 +105,63 @@ class DisplayHook:
         self.result = result
 
 
+class _QueuedCall(QtCore.QObject):
+    """ Runs a function in the thread this object is moved to, see queued_call. """
+
+    sigCall = QtCore.Signal()
+
+    def __init__(self, function, args, kwargs):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        self.sigCall.connect(self.run, QtCore.Qt.QueuedConnection)
+        self.destroyed.connect(functools.partial(_release_queued_call, id(self)))
+
+    @QtCore.Slot()
+    def run(self):
+        try:
+            self.result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+            # delete in this thread once run has returned, not when the caller drops the object
+            self.deleteLater()
+
+
+def queued_call(function, *args, timeout=None, **kwargs):
+    """ Call a method of a qudi module in the thread of the module and wait for the result.
+
+      @param callable function: bound method of a module, e.g. odmrlogic.start_odmr_scan
+      @param args: positional arguments of the method
+      @param float timeout: optional, seconds to wait for the result
+      @param kwargs: keyword arguments of the method
+
+      @return: return value of the method
+
+    Methods of objects, which are no QObjects (e.g. remote modules), and calls from the thread
+    of the module are executed directly.
+    """
+    owner = getattr(function, '__self__', None)
+    if not isinstance(owner, QtCore.QObject) or owner.thread() == QtCore.QThread.currentThread():
+        return function(*args, **kwargs)
+    call = _QueuedCall(function, args, kwargs)
+    call.moveToThread(owner.thread())
+    with _pending_calls_lock:
+        _pending_calls[id(call)] = call
+    call.sigCall.emit()
+    if not call.done.wait(timeout):
+        raise TimeoutError('Call of {0} did not finish within {1} s.'.format(
+            getattr(function, '__qualname__', function), timeout))
+    if call.error is not None:
+        raise call.error
+    return call.result
+
+
 def cursor_pos_to_lc(text, cursor_pos):
     """Calulate line, coulumn number from position in string.
       
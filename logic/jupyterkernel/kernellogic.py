@@ -18,6 +18,7 @@ along with Qudi. If not, see <http://www.gnu.org/licenses/>.
 Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
 top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
 """
+from core.configoption import ConfigOption
 from logic.generic_logic import GenericLogic
 from qtpy import QtCore
 import pyqtgraph as pg
@@ -25,6 +26,7 @@ import numpy as np
 import time
 
 from .qzmqkernel import QZMQKernel
+from .helpers import queued_call
 from core.util.network import netobtain
 
 
@@ -39,6 +41,9 @@ class QudiKernelLogic(GenericLogic):
     sigStartKernel = QtCore.Signal(str)
     sigStopKernel = QtCore.Signal(int)
 
+    # execute cells in a separate thread, so kernels can be interrupted
+    threaded_execution = ConfigOption('threaded_execution', False)
+
     def __init__(self, **kwargs):
         """ Create logic object
           @param dict kwargs: additional parameters as a dict
@@ -77,14 +82,15 @@ class QudiKernelLogic(GenericLogic):
         """
         realconfig = netobtain(config)
         self.log.debug('Start {0}'.format(realconfig))
-        kernel = QZMQKernel(realconfig)
+        kernel = QZMQKernel(realconfig, threaded_execution=self.threaded_execution)
         kernelthread = self._manager.tm.newThread('kernel-{0}'.format(kernel.engine_id))
         kernel.moveToThread(kernelthread)
         kernel.user_global_ns.update({
             'pg': pg,
             'np': np,
             'config': self._manager.tree['defined'],
-            'manager': self._manager
+            'manager': self._manager,
+            'queued_call': queued_call
         })
         kernel.sigShutdownFinished.connect(self.cleanupKernel)
         self.log.debug('Kernel is {0}'.format(kernel.engine_id))
@@ -51,6 +51,8 @@ import logging
 from warnings import warn
 
 import ast
+import ctypes
+import queue
 import traceback
 import jedi
 import threading
@@ -72,13 +74,17 @@ from IPython.core.error import InputRejected
 from qtpy import QtCore
 
 
-# TODO: When executing two cells at the same time (the second before first is finished) the notebook hangs
-
-
 class QZMQKernel(QtCore.QObject):
-    """ A Qt-based embeddable kernel for Jupyter. """
+    """ A Qt-based embeddable kernel for Jupyter.
+
+    With threaded_execution, cells are executed one after the other in a separate execution
+    thread. The thread of the kernel keeps serving the shell, control and iopub sockets, so
+    completion requests, interrupts and shutdown requests are handled while a cell is running.
+    An interrupt_request raises KeyboardInterrupt in the running cell.
+    """
 
     sigShutdownFinished = QtCore.Signal(str)
+    _sigShellReply = QtCore.Signal(object)
 
     supported_mime = (
         'text/plain',
@@ -92,7 +98,7 @@ class QZMQKernel(QtCore.QObject):
         'image/svg+xml'
     )
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, threaded_execution=False):
         super().__init__()
         # namespaces
         self.user_global_ns = globals()
@@ -101,6 +107,14 @@ class QZMQKernel(QtCore.QObject):
         self.exiting = False
         self.engine_id = str(uuid.uuid4())
 
+        # execution of cells outside of the kernel thread
+        self.threaded_execution = threaded_execution
+        self._execution_queue = queue.Queue()
+        self._execution_thread = None
+        self._execution_lock = threading.Lock()
+        self._executing = False
+        self._sigShellReply.connect(self._send_shell_reply, QtCore.Qt.QueuedConnection)
+
         if config is not None:
             self._config = config
         else:
@@ -174,6 +188,14 @@ class QZMQKernel(QtCore.QObject):
         self.hb_thread.start()
 
         self.init_exec_env()
+        if self.threaded_execution:
+            self._execution_thread = threading.Thread(
+                target=self._execution_loop,
+                name='notebook-{0}'.format(self.engine_id),
+                daemon=True)
+            # marker for the output redirection
+            self._execution_thread.notebook_thread = True
+            self._execution_thread.start()
         logging.info('{} ready! Listening...'.format(self.engine_id))
 
     def init_exec_env(self):
@@ -194,9 +216,43 @@ class QZMQKernel(QtCore.QObject):
 
         setup_matplotlib(self)
 
+    def _execution_loop(self):
+        """ Execute the queued execute requests in the execution thread. """
+        while True:
+            request = self._execution_queue.get()
+            if request is None:
+                return
+            try:
+                self.shell_execute(*request)
+            except KeyboardInterrupt:
+                # interrupt arrived after the cell finished
+                logging.debug('Interrupt after end of cell execution ignored.')
+            except Exception:
+                logging.exception('Executing a cell failed.')
+
+    @QtCore.Slot()
+    def interrupt(self):
+        """ Raise KeyboardInterrupt in the cell running in the execution thread.
+
+          @return bool: True if a running cell was interrupted
+
+        The exception is raised when the cell executes the next python instruction, so calls
+        blocking in C code (e.g. time.sleep or hardware calls) finish first.
+        """
+        with self._execution_lock:
+            if not self._executing or self._execution_thread is None:
+                return False
+            count = ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                ctypes.c_ulong(self._execution_thread.ident),
+                ctypes.py_object(KeyboardInterrupt))
+        return count == 1
+
     @QtCore.Slot()
     def shutdown(self):
         logging.info('{} shutting down.'.format(self.engine_id))
+        if self._execution_thread is not None:
+            self.interrupt()
+            self._execution_queue.put(None)
         self.iopub_stream.close()
         self.stdin_stream.close()
         self.shell_stream.close()
@@ -235,7 +291,10 @@ class QZMQKernel(QtCore.QObject):
         # is_complete_request, is_complete_reply, connect_request, connect_reply
         # kernel_info_request, kernel_info_reply, shutdown_request, shutdown_reply
         if msg['header']["msg_type"] == "execute_request":
-            self.shell_execute(identities, msg)
+            if self.threaded_execution:
+                self._execution_queue.put((identities, msg))
+            else:
+                self.shell_execute(identities, msg)
         elif msg['header']["msg_type"] == "kernel_info_request":
             self.shell_kernel_info(identities, msg)
         elif msg['header']["msg_type"] == "complete_request":
@@ -267,58 +326,98 @@ class QZMQKernel(QtCore.QObject):
         # capture output
         self.displaydata = list()
         # actual execution
+        with self._execution_lock:
+            self._executing = True
         try:
-            res = self.run_cell(msg['content']['code'])
-        except Exception as e:
+            try:
+                res = self.run_cell(msg['content']['code'])
+            finally:
+                self._end_execution()
+        except (Exception, KeyboardInterrupt) as e:
+            # the interrupt may have hit the first _end_execution call
+            self._end_execution()
             res = ExecutionResult()
             tb = traceback.format_exc()
             print('{}\n{}'.format(e, tb), file=sys.stderr)
+        finally:
+            # reverse the redirect for the Thread module
+            sys.modules['threading'].Thread = old_thread
 
-        # reverse the redirect for the Thread module
-        sys.modules['threading'].Thread = old_thread
-
-        # send captured result if there is any
-        if len(res.result) > 0:
+        try:
+            # send captured result if there is any
+            if len(res.result) > 0:
+                content = {
+                    'execution_count': self.execution_count,
+                    'data': {"text/plain": res.result[0]},
+                    'metadata': {}
+                }
+                self.iopub_stream.send('execute_result', content)
+
+            # output data from this run
+            for content in self.displaydata:
+                self.iopub_stream.send('display_data', content)
+        except KeyboardInterrupt:
+            # an interrupt arriving after the end of the cell must not suppress the reply
+            logging.debug('Interrupt after end of cell execution ignored.')
+        finally:
+            # tell the notebook server that we are not busy anymore
             content = {
-                'execution_count': self.execution_count,
-                'data': {"text/plain": res.result[0]},
-                'metadata': {}
+                'execution_state': "idle",
+            }
+            self.iopub_stream.send('status', content)
+
+            # publish execution result on shell channel
+            metadata = {
+                "dependencies_met": True,
+                "engine": self.engine_id,
+                "status": "ok",
+                "started": datetime.datetime.now().isoformat(),
             }
-            self.iopub_stream.send('execute_result', content)
+            content = {
+                "status": "ok",
+                "execution_count": self.execution_count,
+                "user_variables": {},
+                "payload": [],
+                "user_expressions": {},
+            }
+            self._send_shell_reply(
+                ('execute_reply', content, metadata, msg['header'], identities))
 
-        # output data from this run
-        for content in self.displaydata:
-            self.iopub_stream.send('display_data', content)
+            self.execution_count += 1
 
-        # tell the notebook server that we are not busy anymore
-        content = {
-            'execution_state': "idle",
-        }
-        self.iopub_stream.send('status', content)
+    def _end_execution(self):
+        """ Mark the end of the cell execution, so interrupt does not raise anymore.
 
-        # publish execution result on shell channel
-        metadata = {
-            "dependencies_met": True,
-            "engine": self.engine_id,
-            "status": "ok",
-            "started": datetime.datetime.now().isoformat(),
-        }
-        content = {
-            "status": "ok",
-            "execution_count": self.execution_count,
-            "user_variables": {},
-            "payload": [],
-            "user_expressions": {},
-        }
+        An interrupt requested just before the end of the cell, which was not raised yet, is
+        discarded.
+        """
+        with self._execution_lock:
+            self._executing = False
+            if (self._execution_thread is not None
+                    and threading.current_thread() is self._execution_thread):
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self._execution_thread.ident), None)
+
+    @QtCore.Slot(object)
+    def _send_shell_reply(self, reply):
+        """ Send a reply on the shell socket from the kernel thread.
+
+          @param tuple reply: message type, content, metadata, parent header and identities
+
+        The shell socket is also used by the kernel thread, so replies from the execution
+        thread are passed to the kernel thread.
+        """
+        if QtCore.QThread.currentThread() != self.thread():
+            self._sigShellReply.emit(reply)
+            return
+        msg_type, content, metadata, parent_header, identities = reply
         self.shell_stream.send(
-            'execute_reply',
+            msg_type,
             content,
             metadata=metadata,
-            parent_header=msg['header'],
+            parent_header=parent_header,
             identities=identities)
 
-        self.execution_count += 1
-
     def shell_kernel_info(self, identities, msg):
         content = {
             "protocol_version": "5.0",
@@ -386,6 +485,13 @@ class QZMQKernel(QtCore.QObject):
         # Control message handler:
         if msg['header']["msg_type"] == "shutdown_request":
             self.shutdown()
+        elif msg['header']["msg_type"] == "interrupt_request":
+            self.interrupt()
+            self.control_stream.send(
+                'interrupt_reply',
+                {'status': 'ok'},
+                parent_header=msg['header'],
+                identities=identities)
 
     def iopub_handler(self, msg):
         # handle some of these messages:
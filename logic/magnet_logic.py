@@ -27,6 +27,7 @@ import time
 from collections import OrderedDict
 from core.connector import Connector
 from core.statusvariable import StatusVar
+from core.util.tracing import traced_iteration
 from logic.generic_logic import GenericLogic
 from qtpy import QtCore
 from interface.slow_counter_interface import CountingMode
@@ -816,6 +817,7 @@ class MagnetLogic(GenericLogic):
             # start the continuous alignment loop body self._continuous_loop_body:
             self._sigContinuousAlignmentNext.emit()
 
+    @traced_iteration
     def _stepwise_loop_body(self):
         """ Go one by one through the created path
         @return:
@@ -827,7 +829,8 @@ class MagnetLogic(GenericLogic):
             return
 
         self._do_premeasurement_proc()
-        pos = self._magnet_device.get_pos()
+        with self.tracer.phase('hardware'):
+            pos = self._magnet_device.get_pos()
         end_pos = self._pathway[self._pathway_index]
         self.log.debug('end_pos {0}'.format(end_pos))
         differences = []
@@ -858,7 +861,8 @@ class MagnetLogic(GenericLogic):
 
         self.log.debug("Distance from desired position: {0}".format(distance))
         # perform here one of the chosen alignment measurements
-        meas_val, add_meas_val = self._do_alignment_measurement()
+        with self.tracer.phase('measurement'):
+            meas_val, add_meas_val = self._do_alignment_measurement()
 
         # set the measurement point to the proper array and the proper position:
         # save also all additional measurement information, which have been
@@ -878,11 +882,12 @@ class MagnetLogic(GenericLogic):
 
             # commenting this out for now, because it is kind of useless for us
             # self.set_velocity(move_dict_vel)
-            self._magnet_device.move_abs(move_dict_abs)
+            with self.tracer.phase('hardware'):
+                self._magnet_device.move_abs(move_dict_abs)
 
-            while self._check_is_moving():
-                time.sleep(self._checktime)
-                self.log.debug("Went into while loop in stepwise_loop_body")
+                while self._check_is_moving():
+                    time.sleep(self._checktime)
+                    self.log.debug("Went into while loop in stepwise_loop_body")
 
             self.log.debug("stepwise_loop_body reports magnet moving ? {0}".format(self._check_is_moving()))
 
@@ -894,7 +899,8 @@ class MagnetLogic(GenericLogic):
                 end_pos[axis_name] = self._backmap[self._pathway_index][axis_name]
 
             # rerun this loop again
-            self._sigStepwiseAlignmentNext.emit()
+            with self.tracer.phase('emit'):
+                self._sigStepwiseAlignmentNext.emit()
 
         else:
             self._end_alignment_procedure()
@@ -27,10 +27,12 @@ from interface.microwave_interface import TriggerEdge
 import numpy as np
 import time
 import datetime
+import functools
 import matplotlib.pyplot as plt
 
 from logic.generic_logic import GenericLogic
 from core.util.mutex import Mutex
+from core.util.tracing import traced_iteration
 from core.connector import Connector
 from core.configoption import ConfigOption
 from core.statusvariable import StatusVar
@@ -135,6 +137,7 @@ class ODMRLogic(GenericLogic):
 
         # Connect signals
         self.sigNextLine.connect(self._scan_odmr_line, QtCore.Qt.QueuedConnection)
+        self.fc.sigAsyncFitFinished.connect(self._fit_finished, QtCore.Qt.QueuedConnection)
         return
 
     def on_deactivate(self):
@@ -156,6 +159,8 @@ class ODMRLogic(GenericLogic):
         self._mw_device.off()
         # Disconnect signals
         self.sigNextLine.disconnect()
+        self.fc.cancel_async_fit()
+        self.fc.sigAsyncFitFinished.disconnect(self._fit_finished)
 
     @fc.constructor
     def sv_set_fits(self, val):
@@ -674,6 +679,7 @@ class ODMRLogic(GenericLogic):
                 self._clearOdmrData = True
         return
 
+    @traced_iteration
     def _scan_odmr_line(self):
         """ Scans one line in ODMR
 
@@ -697,11 +703,12 @@ class ODMRLogic(GenericLogic):
                 self.elapsed_sweeps = 0
                 self._startTime = time.time()
 
-            # reset position so every line starts from the same frequency
-            self.reset_sweep()
+            with self.tracer.phase('hardware'):
+                # reset position so every line starts from the same frequency
+                self.reset_sweep()
 
-            # Acquire count data
-            error, new_counts = self._odmr_counter.count_odmr(length=self.odmr_plot_x.size)
+                # Acquire count data
+                error, new_counts = self._odmr_counter.count_odmr(length=self.odmr_plot_x.size)
 
             if error:
                 self.stopRequested = True
@@ -754,9 +761,11 @@ class ODMRLogic(GenericLogic):
             if self.elapsed_time >= self.run_time:
                 self.stopRequested = True
             # Fire update signals
-            self.sigOdmrElapsedTimeUpdated.emit(self.elapsed_time, self.elapsed_sweeps)
-            self.sigOdmrPlotsUpdated.emit(self.odmr_plot_x, self.odmr_plot_y, self.odmr_plot_xy)
-            self.sigNextLine.emit()
+            with self.tracer.phase('emit'):
+                self.sigOdmrElapsedTimeUpdated.emit(self.elapsed_time, self.elapsed_sweeps)
+                self.sigOdmrPlotsUpdated.emit(
+                    self.odmr_plot_x, self.odmr_plot_y, self.odmr_plot_xy)
+                self.sigNextLine.emit()
             return
 
     def get_odmr_channels(self):
@@ -779,6 +788,27 @@ class ODMRLogic(GenericLogic):
         """
         Execute the currently configured fit on the measurement data. Optionally on passed data
         """
+        x_data, y_data = self._prepare_fit(fit_function, x_data, y_data, channel_index)
+        fit_x, fit_y, result = self.fc.do_fit(x_data, y_data)
+        self._fit_finished(fit_x, fit_y, result)
+        return
+
+    def do_fit_async(self, fit_function=None, x_data=None, y_data=None, channel_index=0):
+        """
+        Start the fit of do_fit in the worker pool of the fit logic.
+
+        sigOdmrFitUpdated is emitted when the fit is finished. The measurement continues while
+        the fit is running.
+        """
+        x_data, y_data = self._prepare_fit(fit_function, x_data, y_data, channel_index)
+        self.fc.do_fit_async(x_data, y_data)
+        return
+
+    def _prepare_fit(self, fit_function, x_data, y_data, channel_index):
+        """ Set the fit function and select the data to fit.
+
+        @return tuple: x and y data of the fit
+        """
         if (x_data is None) or (y_data is None):
             x_data = self.odmr_plot_x
             y_data = self.odmr_plot_y[channel_index]
@@ -791,9 +821,13 @@ class ODMRLogic(GenericLogic):
                 if fit_function != 'No Fit':
                     self.log.warning('Fit function "{0}" not available in ODMRLogic fit container.'
                                      ''.format(fit_function))
+        return x_data, y_data
 
-        self.odmr_fit_x, self.odmr_fit_y, result = self.fc.do_fit(x_data, y_data)
-
+    @QtCore.Slot(object, object, object)
+    def _fit_finished(self, fit_x, fit_y, result):
+        """ Store the fit data and publish the fit result.
+        """
+        self.odmr_fit_x, self.odmr_fit_y = fit_x, fit_y
         if result is None:
             result_str_dict = {}
         else:
@@ -844,32 +878,53 @@ class ODMRLogic(GenericLogic):
             for name, param in self.fc.current_fit_param.items():
                 parameters[name] = str(param)
 
-            fig = self.draw_figure(
+            # snapshot of the plot data, the figure is drawn in the save thread of the save logic
+            fig = functools.partial(
+                self.draw_figure,
                 nch,
                 cbar_range=colorscale_range,
-                percentile_range=percentile_range)
-
-            self._save_logic.save_data(data,
-                                       filepath=filepath,
-                                       parameters=parameters,
-                                       filelabel=filelabel,
-                                       fmt='%.6e',
-                                       delimiter='\t',
-                                       timestamp=timestamp,
-                                       plotfig=fig)
-
-            self._save_logic.save_data(data2,
-                                       filepath=filepath2,
-                                       parameters=parameters,
-                                       filelabel=filelabel2,
-                                       fmt='%.6e',
-                                       delimiter='\t',
-                                       timestamp=timestamp)
+                percentile_range=percentile_range,
+                plot_data=self._plot_data_snapshot(nch))
+
+            self._save_logic.save_data_async(data,
+                                             filepath=filepath,
+                                             parameters=parameters,
+                                             filelabel=filelabel,
+                                             fmt='%.6e',
+                                             delimiter='\t',
+                                             timestamp=timestamp,
+                                             plotfig=fig)
+
+            self._save_logic.save_data_async(data2,
+                                             filepath=filepath2,
+                                             parameters=parameters,
+                                             filelabel=filelabel2,
+                                             fmt='%.6e',
+                                             delimiter='\t',
+                                             timestamp=timestamp)
 
             self.log.info('ODMR data saved to:\n{0}'.format(filepath))
         return
 
-    def draw_figure(self, channel_number, cbar_range=None, percentile_range=None):
+    def _plot_data_snapshot(self, channel_number, copy_data=True):
+        """ Collect the data of a channel drawn by draw_figure.
+
+        @param int channel_number: number of the ODMR channel
+        @param bool copy_data: copy the arrays, so the figure can be drawn later in another thread
+
+        @return dict: frequencies, counts, fit and matrix data of the channel
+        """
+        plot_data = {'freq_data': self.odmr_plot_x,
+                     'count_data': self.odmr_plot_y[channel_number],
+                     'fit_freq_vals': self.odmr_fit_x,
+                     'fit_count_vals': self.odmr_fit_y,
+                     'matrix_data': self.odmr_plot_xy[:, channel_number]}
+        if copy_data:
+            plot_data = {key: np.array(value, copy=True) for key, value in plot_data.items()}
+        return plot_data
+
+    def draw_figure(self, channel_number, cbar_range=None, percentile_range=None,
+                    plot_data=None):
         """ Draw the summary figure to save with the data.
 
         @param: list cbar_range: (optional) [color_scale_min, color_scale_max].
@@ -878,13 +933,18 @@ class ODMRLogic(GenericLogic):
 
         @param: list percentile_range: (optional) Percentile range of the chosen cbar_range.
 
+        @param: dict plot_data: (optional) data of the channel returned by _plot_data_snapshot.
+                                If not supplied then the current data will be drawn.
+
         @return: fig fig: a matplotlib figure object to be saved to file.
         """
-        freq_data = self.odmr_plot_x
-        count_data = self.odmr_plot_y[channel_number]
-        fit_freq_vals = self.odmr_fit_x
-        fit_count_vals = self.odmr_fit_y
-        matrix_data = self.odmr_plot_xy[:, channel_number]
+        if plot_data is None:
+            plot_data = self._plot_data_snapshot(channel_number, copy_data=False)
+        freq_data = plot_data['freq_data']
+        count_data = plot_data['count_data']
+        fit_freq_vals = plot_data['fit_freq_vals']
+        fit_count_vals = plot_data['fit_count_vals']
+        matrix_data = plot_data['matrix_data']
 
         # If no colorbar range was given, take full range of data
         if cbar_range is None:
@@ -24,12 +24,16 @@ from qtpy import QtCore
 from collections import OrderedDict
 from interface.microwave_interface import MicrowaveMode
 from interface.microwave_interface import TriggerEdge
+import concurrent.futures
 import numpy as np
 import time
 import datetime
+import functools
 import matplotlib.pyplot as plt
 import cv2
 from logic.generic_logic import GenericLogic
+from logic.odmr_pixel_fit import ODMRPixelFitter, LORENTZIAN_FITS
+from logic.sweep_image_cube import SweepImageCube
 from core.util.mutex import Mutex
 from core.connector import Connector
 from core.configoption import ConfigOption
@@ -54,6 +58,15 @@ class ODMRLogic(GenericLogic):
         'LIST',
         missing='warn',
         converter=lambda x: MicrowaveMode[x.upper()])
+    # number of worker processes for the per-pixel fit (None: number of CPUs)
+    _pixel_fit_workers = ConfigOption('pixel_fit_workers', None, missing='nothing')
+    # data type of the accumulated sweep images ('float32', 'float64' or 'int32') and directory
+    # of the memory-mapped file holding them (None: temporary directory of the system)
+    _sweep_images_dtype = ConfigOption('sweep_images_dtype', 'float32', missing='nothing')
+    _sweep_images_directory = ConfigOption('sweep_images_directory', None, missing='nothing')
+    # Subtract a constant instead of the reference frames (for tests with a dummy camera)
+    _dummy_reference_subtraction = ConfigOption('dummy_reference_subtraction', False,
+                                                missing='nothing')
     # Default clock frequency is set dependant on exp. time. here f is in
     # milliseconds.
     f = 1
@@ -71,9 +84,13 @@ class ODMRLogic(GenericLogic):
     lines_to_average = StatusVar('lines_to_average', 0)
     _oversampling = StatusVar('oversampling', default=10)
     _lock_in_active = StatusVar('lock_in_active', default=False)
+    pixel_fit_binning = StatusVar('pixel_fit_binning', 1)
+    sweep_images_binning = StatusVar('sweep_images_binning', 1)
+    pixel_fit_each_sweep = StatusVar('pixel_fit_each_sweep', False)
 
     # Internal signals
     sigNextLine = QtCore.Signal()
+    _sigPixelFitDone = QtCore.Signal(object)
 
     # Update signals, e.g. for GUI module
     sigParameterUpdated = QtCore.Signal(dict)
@@ -81,6 +98,7 @@ class ODMRLogic(GenericLogic):
     sigOdmrPlotsUpdated = QtCore.Signal(np.ndarray, np.ndarray, np.ndarray)
     sigOdmrFitUpdated = QtCore.Signal(np.ndarray, np.ndarray, dict, str)
     sigOdmrElapsedTimeUpdated = QtCore.Signal(float, int)
+    sigOdmrPixelFitMapsUpdated = QtCore.Signal(dict)
 
     def __init__(self, config, **kwargs):
         super().__init__(config=config, **kwargs)
@@ -136,9 +154,13 @@ class ODMRLogic(GenericLogic):
              self.odmr_plot_x.size]
         )
         # The array for images of the entire sweep is intialized.
-        self.sweep_images = np.zeros(
-            (self.odmr_plot_x.size, *np.flip(self._camera.get_size(), axis=0))
-        )
+        self._sweep_cube = None
+        self._initialize_sweep_images()
+        # Per-pixel fit engine and the last resulting maps
+        self._pixel_fitter = ODMRPixelFitter(max_workers=self._pixel_fit_workers)
+        self.pixel_fit_maps = dict()
+        # pixel fit started with do_pixel_fit_maps_async
+        self._pixel_fit_future = None
         # Switch off microwave and set CW frequency and power
         self.mw_off()
         self.set_cw_parameters(self.cw_mw_frequency, self.cw_mw_power)
@@ -147,6 +169,8 @@ class ODMRLogic(GenericLogic):
         self.sigNextLine.connect(
             self._scan_odmr_line,
             QtCore.Qt.QueuedConnection)
+        self._sigPixelFitDone.connect(self._pixel_fit_done, QtCore.Qt.QueuedConnection)
+        self.fc.sigAsyncFitFinished.connect(self._fit_finished, QtCore.Qt.QueuedConnection)
         return
 
     def on_deactivate(self):
@@ -168,10 +192,18 @@ class ODMRLogic(GenericLogic):
         # Switch off microwave source for sure (also if CW mode is active or
         # module is still locked)
         self._mw_device.off()
+        # Terminate the worker processes of the per-pixel fit
+        self._wait_for_pixel_fit()
+        self._pixel_fitter.shutdown()
+        # Release the memory-mapped sweep images
+        self.sweep_images = None
+        self._sweep_cube.close()
         # The camera's deactivate function is called as well.
         self._camera.on_deactivate()
         # Disconnect signals
         self.sigNextLine.disconnect()
+        self.fc.cancel_async_fit()
+        self.fc.sigAsyncFitFinished.disconnect(self._fit_finished)
 
     @fc.constructor
     def sv_set_fits(self, val):
@@ -241,6 +273,43 @@ class ODMRLogic(GenericLogic):
             self.odmr_fit_x, self.odmr_fit_y, {}, current_fit)
         return
 
+    def _initialize_sweep_images(self):
+        """ Create a new, memory-mapped accumulation cube for the images of the sweeps.
+
+        The cube replaces the previous one. Its shape is (frequencies, height, width) with the
+        camera image size divided by sweep_images_binning.
+        """
+        if self._sweep_cube is not None:
+            # drop the reference to the memory map first, so its file can be released
+            self.sweep_images = None
+            self._sweep_cube.close()
+        self._sweep_cube = SweepImageCube(self.odmr_plot_x.size,
+                                          np.flip(self._camera.get_size(), axis=0),
+                                          dtype=self._sweep_images_dtype,
+                                          binning=self.sweep_images_binning,
+                                          directory=self._sweep_images_directory)
+        self.sweep_images = self._sweep_cube.data
+        self.log.debug('Sweep image cube of shape {0} ({1:.1f} MB) created.'
+                       ''.format(self._sweep_cube.shape, self._sweep_cube.nbytes / 2**20))
+
+    def set_sweep_images_binning(self, binning):
+        """
+        Sets the number of camera pixels along each image axis combined into one superpixel
+        before the images are accumulated. Takes effect with the next started scan.
+
+        @param int binning: desired binning (1 means no binning)
+
+        @return int: actually set binning
+        """
+        if self.module_state() != 'locked' and isinstance(binning, int) and binning > 0:
+            self.sweep_images_binning = binning
+        else:
+            self.log.warning('set_sweep_images_binning failed. Logic is either locked or input '
+                             'value is no positive integer.')
+
+        self.sigParameterUpdated.emit({'sweep_images_binning': self.sweep_images_binning})
+        return self.sweep_images_binning
+
     def set_trigger(self, trigger_pol, frequency):
         """
         Set trigger polarity of external microwave trigger (for list and sweep mode).
@@ -710,9 +779,9 @@ class ODMRLogic(GenericLogic):
                  self.odmr_plot_x.size]
             )
             # Sweep images are set to zero at every new scan
-            self.sweep_images = np.zeros(
-                (self.odmr_plot_x.size, *np.flip(self._camera.get_size(), axis=0))
-            )
+            self._initialize_sweep_images()
+            self._pixel_fitter.reset()
+            self.pixel_fit_maps = dict()
             self.sigNextLine.emit()
             return 0
 
@@ -795,9 +864,7 @@ class ODMRLogic(GenericLogic):
             # if during the scan a clearing of the ODMR data is needed:
             if self._clearOdmrData:
                 self.elapsed_sweeps = 0
-                self.sweep_images = np.zeros(
-                    (self.odmr_plot_x.size, *np.flip(self._camera.get_size(), axis=0))
-                )
+                self._sweep_cube.clear()
                 self._startTime = time.time()
 
             # reset position so every line starts from the same frequency
@@ -812,19 +879,16 @@ class ODMRLogic(GenericLogic):
                 length=self.odmr_plot_x.size)
             self._camera.start_trigger_seq(self.odmr_plot_x.size * 2)
             self._odmr_counter.stop_tasks()
-            # The collected frames are then acquired by the logic here from cam logic Should consider memory issues
-            # for the future.
+            # The collected frames are then acquired by the logic here from cam logic.
             frames = self._camera.get_last_image()
-            # The reference images from switch off time should be subtracted as below. For dummy measurements
-            # so as to not be just left with noise we can do a dummy
-            # subtraction.
-            new_counts = frames[1::2] - frames[0::2]
-            # Remove for actual mesurements
-            new_counts = frames[1::2] - np.full_like(frames[0::2], 1)
-            # The sweep images are added up and the new counts are taken as the mean of the image which is what
-            # ends up being plotted as odmr_plot_y
-            self.sweep_images += new_counts
-            new_counts = np.mean(new_counts, axis=(1, 2))
+            # The reference images from switch off time are subtracted blockwise from the signal
+            # images and added up in the memory-mapped sweep image cube. For dummy measurements
+            # a constant can be subtracted instead so as to not be just left with noise.
+            # The new counts are taken as the mean of the difference images which is what ends
+            # up being plotted as odmr_plot_y
+            new_counts = self._sweep_cube.add_sweep(
+                frames,
+                reference_offset=1 if self._dummy_reference_subtraction else None)
 
             if error:
                 self.stopRequested = True
@@ -886,6 +950,9 @@ class ODMRLogic(GenericLogic):
                 self.elapsed_time, self.elapsed_sweeps)
             self.sigOdmrPlotsUpdated.emit(
                 self.odmr_plot_x, self.odmr_plot_y, self.odmr_plot_xy)
+            # Refit the pixel maps starting from the solution of the previous sweep
+            if self.pixel_fit_each_sweep:
+                self.do_pixel_fit_maps_async(warm_start=True)
             self.sigNextLine.emit()
             return
 
@@ -946,17 +1013,44 @@ class ODMRLogic(GenericLogic):
         """
         Execute the currently configured fit on the measurement data. Optionally on passed data
         """
+        x_data, y_data = self._prepare_fit(fit_function, x_data, y_data, channel_index, pixel_fit)
+        fit_x, fit_y, result = self.fc.do_fit(x_data, y_data)
+        self._fit_finished(fit_x, fit_y, result)
+        return
+
+    def do_fit_async(
+            self,
+            fit_function=None,
+            x_data=None,
+            y_data=None,
+            channel_index=0,
+            pixel_fit=False):
+        """
+        Start the fit of do_fit in the worker pool of the fit logic.
+
+        sigOdmrFitUpdated is emitted when the fit is finished. The measurement continues while
+        the fit is running.
+        """
+        x_data, y_data = self._prepare_fit(fit_function, x_data, y_data, channel_index, pixel_fit)
+        self.fc.do_fit_async(x_data, y_data)
+        return
+
+    def _prepare_fit(self, fit_function, x_data, y_data, channel_index, pixel_fit):
+        """ Set the fit function and select the data to fit, for a pixel fit the spectrum of the
+        pixel clicked in the mean images.
+
+        @return tuple: x and y data of the fit
+        """
         # To enable default odmr_plot_y if no pixel is clicke and imshow is
         # just closed. Good for preview.
         self.coord = None
-        if pixel_fit and np.count_nonzero(self.sweep_images) != 0:
-            frames = self.sweep_images / self.elapsed_sweeps
-            frames[:] = [cv2.flip(frame, 0) for frame in frames]
-            frames1 = np.zeros((np.shape(frames)[0], 600, 600))
-            frames1[:] = [
-                cv2.resize(
-                    frame, (600, 600), interpolation=cv2.INTER_AREA) for frame in frames]
-            frames = frames1
+        if pixel_fit and self._sweep_cube.sweeps > 0:
+            mean_frames = self._sweep_cube.mean_images()
+            frames = np.zeros((mean_frames.shape[0], 600, 600))
+            for index, frame in enumerate(mean_frames):
+                frames[index] = cv2.resize(
+                    cv2.flip(frame, 0), (600, 600), interpolation=cv2.INTER_AREA)
+            del mean_frames
             self.do_pixel_spectrum(frames)
             # If no mouse click happens the odmr_plot_y data is not updated and stays the same.
             # This ends up allowing us to have a preview of the entire sweep as
@@ -989,10 +1083,13 @@ class ODMRLogic(GenericLogic):
                     self.log.warning(
                         'Fit function "{0}" not available in ODMRLogic fit container.'
                         ''.format(fit_function))
+        return x_data, y_data
 
-        self.odmr_fit_x, self.odmr_fit_y, result = self.fc.do_fit(
-            x_data, y_data)
-
+    @QtCore.Slot(object, object, object)
+    def _fit_finished(self, fit_x, fit_y, result):
+        """ Store the fit data and publish the fit result.
+        """
+        self.odmr_fit_x, self.odmr_fit_y = fit_x, fit_y
         if result is None:
             result_str_dict = {}
         else:
@@ -1004,6 +1101,143 @@ class ODMRLogic(GenericLogic):
             self.fc.current_fit)
         return
 
+    def set_pixel_fit_binning(self, binning):
+        """
+        Sets the number of camera pixels along each image axis combined into one superpixel for
+        the per-pixel fit.
+
+        @param int binning: desired binning (1 means no binning)
+
+        @return int: actually set binning
+        """
+        if isinstance(binning, int) and binning > 0:
+            self.pixel_fit_binning = binning
+            self._pixel_fitter.reset()
+        else:
+            self.log.warning('set_pixel_fit_binning failed. '
+                             'Input parameter binning is no positive integer.')
+
+        self.sigParameterUpdated.emit({'pixel_fit_binning': self.pixel_fit_binning})
+        return self.pixel_fit_binning
+
+    def do_pixel_fit_maps(self, binning=None, warm_start=True):
+        """
+        Fit the ODMR spectrum of every (super)pixel of the accumulated sweep images.
+
+        The currently selected fit of the fit container has to be a single, double or triple
+        Lorentzian. It is first applied to the mean spectrum to get initial centers and widths.
+        Starting from there all pixels are fitted with the same model in a process pool.
+        If warm_start is True and the last pixel fit was done on images with the same geometry,
+        the last solution is used as start values instead.
+
+        @param int binning: optional, superpixel size. Defaults to pixel_fit_binning.
+        @param bool warm_start: refit starting from the previous solution if possible
+
+        @return dict: maps of the fit results, see ODMRPixelFitter.fit_image_stack.
+                      Empty dict if no fit could be done.
+        """
+        # a pixel fit running in the background uses the same warm start solution
+        self._wait_for_pixel_fit()
+        fit_args = self._prepare_pixel_fit(binning, warm_start)
+        if fit_args is None:
+            return dict()
+        self.pixel_fit_maps = self._pixel_fitter.fit_image_stack(**fit_args)
+        self.sigOdmrPixelFitMapsUpdated.emit(self.pixel_fit_maps)
+        return self.pixel_fit_maps
+
+    def do_pixel_fit_maps_async(self, binning=None, warm_start=True):
+        """
+        Start the per-pixel fit of do_pixel_fit_maps in the worker pool of the fit logic.
+
+        The reference fit of the mean spectrum is done in the calling thread, the fit of all
+        pixels in the background. When it is finished, pixel_fit_maps is set and
+        sigOdmrPixelFitMapsUpdated is emitted in the thread of this module. If the previous pixel
+        fit is still running, no new fit is started, so a measurement is never slowed down by
+        pixel fits piling up.
+
+        @param int binning: optional, superpixel size. Defaults to pixel_fit_binning.
+        @param bool warm_start: refit starting from the previous solution if possible
+
+        @return concurrent.futures.Future: future of the maps of the fit results. None if no fit
+                                           was started.
+        """
+        if self._pixel_fit_future is not None and not self._pixel_fit_future.done():
+            return None
+        fit_args = self._prepare_pixel_fit(binning, warm_start)
+        if fit_args is None:
+            return None
+        future = self._fit_logic.submit_fit(self._pixel_fitter.fit_image_stack, **fit_args)
+        future.add_done_callback(self._sigPixelFitDone.emit)
+        self._pixel_fit_future = future
+        return future
+
+    @QtCore.Slot(object)
+    def _pixel_fit_done(self, future):
+        """ Store the maps of a pixel fit started with do_pixel_fit_maps_async.
+        """
+        if future.cancelled():
+            return
+        try:
+            self.pixel_fit_maps = future.result()
+        except:
+            self.log.exception('Per-pixel fit failed.')
+            return
+        self.sigOdmrPixelFitMapsUpdated.emit(self.pixel_fit_maps)
+
+    def _wait_for_pixel_fit(self):
+        """ Block until the pixel fit started with do_pixel_fit_maps_async is finished.
+        """
+        if self._pixel_fit_future is not None:
+            concurrent.futures.wait([self._pixel_fit_future])
+
+    def _prepare_pixel_fit(self, binning, warm_start):
+        """
+        Check the fit settings and fit the mean spectrum of the sweep images.
+
+        @param int binning: superpixel size, None for pixel_fit_binning
+        @param bool warm_start: refit starting from the previous solution if possible
+
+        @return dict: keyword arguments for ODMRPixelFitter.fit_image_stack. None if no pixel fit
+                      can be done.
+        """
+        if self._sweep_cube.sweeps == 0:
+            self.log.warning('No sweep images acquired yet. Per-pixel fit skipped.')
+            return None
+        if self.fc.current_fit not in self.fc.fit_list:
+            self.log.warning('No fit function selected. Per-pixel fit skipped.')
+            return None
+        fit = self.fc.fit_list[self.fc.current_fit]
+        if fit['fit_name'] not in LORENTZIAN_FITS:
+            self.log.error('Per-pixel fit is only available for the fit functions {0}, not for '
+                           '"{1}".'.format(list(LORENTZIAN_FITS), fit['fit_name']))
+            return None
+        if binning is None:
+            binning = self.pixel_fit_binning
+
+        # the binning is already applied to the mean images, so only the binned cube is written
+        frames = self._sweep_cube.mean_images(binning=binning)
+        x_data = self.odmr_plot_x[:frames.shape[0]].copy()
+
+        # Reference fit of the mean spectrum for the initial centers and widths
+        result = fit['make_fit'](x_axis=x_data,
+                                 data=np.mean(frames, axis=(1, 2)),
+                                 estimator=fit['estimator'],
+                                 units=self.fc.units,
+                                 add_params=self.fc.use_settings)
+        no_of_lorentzians = LORENTZIAN_FITS[fit['fit_name']]
+        if no_of_lorentzians == 1:
+            prefixes = ['']
+        else:
+            prefixes = ['l{0:d}_'.format(ii) for ii in range(no_of_lorentzians)]
+        centers = [result.params[prefix + 'center'].value for prefix in prefixes]
+        sigmas = [result.params[prefix + 'sigma'].value for prefix in prefixes]
+        return {'x_axis': x_data,
+                'image_stack': frames,
+                'centers': centers,
+                'sigmas': sigmas,
+                'binning': 1,
+                'warm_start': warm_start}
+
     def save_odmr_data(
             self,
             tag=None,
@@ -1053,46 +1287,71 @@ class ODMRLogic(GenericLogic):
             for name, param in self.fc.current_fit_param.items():
                 parameters[name] = str(param)
 
-            fig = self.draw_figure(
+            # snapshot of the plot data, the figure is drawn in the save thread of the save logic
+            fig = functools.partial(
+                self.draw_figure,
                 nch,
                 cbar_range=colorscale_range,
-                percentile_range=percentile_range)
-
-            self._save_logic.save_data(data,
-                                       filepath=filepath,
-                                       parameters=parameters,
-                                       filelabel=filelabel,
-                                       fmt='%.6e',
-                                       delimiter='\t',
-                                       timestamp=timestamp,
-                                       plotfig=fig)
-
-            self._save_logic.save_data(data2,
-                                       filepath=filepath2,
-                                       parameters=parameters,
-                                       filelabel=filelabel2,
-                                       fmt='%.6e',
-                                       delimiter='\t',
-                                       timestamp=timestamp)
+                percentile_range=percentile_range,
+                plot_data=self._plot_data_snapshot(nch))
+
+            self._save_logic.save_data_async(data,
+                                             filepath=filepath,
+                                             parameters=parameters,
+                                             filelabel=filelabel,
+                                             fmt='%.6e',
+                                             delimiter='\t',
+                                             timestamp=timestamp,
+                                             plotfig=fig)
+
+            self._save_logic.save_data_async(data2,
+                                             filepath=filepath2,
+                                             parameters=parameters,
+                                             filelabel=filelabel2,
+                                             fmt='%.6e',
+                                             delimiter='\t',
+                                             timestamp=timestamp)
             # The files is saved as a compressed .npz file which can be looaed by np.load('.npz')['sweep_images']
             # Provides best possible compression for array storage. Saved with almost the same timestamp
-            # as used in save_logic
+            # as used in save_logic. The mean images are streamed blockwise from the memory-mapped
+            # cube to the file, so the whole cube is never loaded into memory.
             if len(tag) > 0:
                 tag = '_' + tag
             loc = filepath + '/' + \
                 timestamp.strftime("%Y%m%d-%H%M-%S") + tag + '_sweep_images'
-            np.savez_compressed(
-                loc,
-                sweep_images=(self.sweep_images /
-                              self.elapsed_sweeps).astype(np.uint16))
+            self._sweep_cube.save_npz(loc, key='sweep_images', dtype=np.uint16)
+            # The maps of the last per-pixel fit are saved next to the sweep images
+            if self.pixel_fit_maps:
+                np.savez_compressed(
+                    filepath + '/' + timestamp.strftime("%Y%m%d-%H%M-%S") + tag +
+                    '_pixel_fit_maps',
+                    **self.pixel_fit_maps)
             self.log.info('ODMR data saved to:\n{0}'.format(filepath))
         return
 
+    def _plot_data_snapshot(self, channel_number, copy_data=True):
+        """ Collect the data of a channel drawn by draw_figure.
+
+        @param int channel_number: number of the ODMR channel
+        @param bool copy_data: copy the arrays, so the figure can be drawn later in another thread
+
+        @return dict: frequencies, counts, fit and matrix data of the channel
+        """
+        plot_data = {'freq_data': self.odmr_plot_x,
+                     'count_data': self.odmr_plot_y[channel_number],
+                     'fit_freq_vals': self.odmr_fit_x,
+                     'fit_count_vals': self.odmr_fit_y,
+                     'matrix_data': self.odmr_plot_xy[:, channel_number]}
+        if copy_data:
+            plot_data = {key: np.array(value, copy=True) for key, value in plot_data.items()}
+        return plot_data
+
     def draw_figure(
             self,
             channel_number,
             cbar_range=None,
-            percentile_range=None):
+            percentile_range=None,
+            plot_data=None):
         """ Draw the summary figure to save with the data.
 
         @param: list cbar_range: (optional) [color_scale_min, color_scale_max].
@@ -1101,13 +1360,18 @@ class ODMRLogic(GenericLogic):
 
         @param: list percentile_range: (optional) Percentile range of the chosen cbar_range.
 
+        @param: dict plot_data: (optional) data of the channel returned by _plot_data_snapshot.
+                                If not supplied then the current data will be drawn.
+
         @return: fig fig: a matplotlib figure object to be saved to file.
         """
-        freq_data = self.odmr_plot_x
-        count_data = self.odmr_plot_y[channel_number]
-        fit_freq_vals = self.odmr_fit_x
-        fit_count_vals = self.odmr_fit_y
-        matrix_data = self.odmr_plot_xy[:, channel_number]
+        if plot_data is None:
+            plot_data = self._plot_data_snapshot(channel_number, copy_data=False)
+        freq_data = plot_data['freq_data']
+        count_data = plot_data['count_data']
+        fit_freq_vals = plot_data['fit_freq_vals']
+        fit_count_vals = plot_data['fit_count_vals']
+        matrix_data = plot_data['matrix_data']
 
         # If no colorbar range was given, take full range of data
         if cbar_range is None:
@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains the Qudi helper classes and functions for fitting the ODMR spectrum of every
+pixel (or binned superpixel) of a widefield ODMR image stack.
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import multiprocessing
+import os
+import numpy as np
+
+
+"""
+The model fitted to every pixel is the sum of physical Lorentzians with a common offset as defined
+in logic/fitmethods/lorentzianlikemethods.py:
+
+                                   n-1             sigma_k^2
+    L(x) = offset +  sum   amplitude_k * ---------------------------
+                                   k=0       (x - center_k)^2 + sigma_k^2
+
+All pixels are fitted at once with a vectorised Levenberg-Marquardt algorithm using the analytic
+Jacobian of this model. For large images the pixels are split into chunks which are distributed
+over a process pool.
+The parameters of each pixel are stored in a flat array with the layout
+    [offset, amplitude_0, ..., amplitude_n-1, center_0, ..., center_n-1, sigma_0, ..., sigma_n-1]
+"""
+
+# Number of Lorentzians belonging to the multi-Lorentzian fit names of FitLogic
+LORENTZIAN_FITS = {'lorentzian': 1, 'lorentziandouble': 2, 'lorentziantriple': 3}
+
+
+def bin_image_stack(image_stack, binning=1):
+    """ Bin the images of an image stack into superpixels by averaging binning x binning pixels.
+
+    @param numpy.ndarray image_stack: 3D array with shape (frames, height, width)
+    @param int binning: number of pixels along each image axis combined into one superpixel.
+                        Pixels at the border not filling a whole superpixel are discarded.
+
+    @return numpy.ndarray: binned image stack with shape
+                           (frames, height // binning, width // binning)
+    """
+    binning = max(1, int(binning))
+    if binning == 1:
+        return image_stack
+    frames, height, width = image_stack.shape
+    height, width = height // binning, width // binning
+    cropped = image_stack[:, :height * binning, :width * binning]
+    return cropped.reshape(frames, height, binning, width, binning).mean(axis=(2, 4))
+
+
+def lorentzian_sum(x_axis, params, no_of_lorentzians):
+    """ Evaluate the multi-Lorentzian model with offset for many parameter sets at once.
+
+    @param numpy.ndarray x_axis: 1D axis values with length F
+    @param numpy.ndarray params: 2D parameter array with shape (N, 1 + 3 * no_of_lorentzians)
+    @param int no_of_lorentzians: number of Lorentzians in the model
+
+    @return numpy.ndarray: model values with shape (N, F)
+    """
+    return _lorentzian_sum_and_jacobian(x_axis, params, no_of_lorentzians, jacobian=False)[0]
+
+
+def _lorentzian_sum_and_jacobian(x_axis, params, no_of_lorentzians, jacobian=True):
+    """ Evaluate the multi-Lorentzian model with offset and optionally its analytic Jacobian.
+
+    @return tuple: (model with shape (N, F), jacobian with shape (N, F, P) or None)
+    """
+    n = no_of_lorentzians
+    amplitude = params[:, 1:1 + n, np.newaxis]
+    center = params[:, 1 + n:1 + 2 * n, np.newaxis]
+    sigma = params[:, 1 + 2 * n:1 + 3 * n, np.newaxis]
+
+    delta = x_axis[np.newaxis, np.newaxis, :] - center
+    sigma_sq = sigma ** 2
+    denominator = delta ** 2 + sigma_sq
+    lorentz = sigma_sq / denominator
+    model = params[:, 0:1] + np.sum(amplitude * lorentz, axis=1)
+    if not jacobian:
+        return model, None
+
+    jac = np.empty((params.shape[0], x_axis.size, params.shape[1]))
+    jac[:, :, 0] = 1.0
+    jac[:, :, 1:1 + n] = lorentz.transpose(0, 2, 1)
+    common = 2.0 * amplitude * sigma / denominator ** 2
+    jac[:, :, 1 + n:1 + 2 * n] = (common * sigma * delta).transpose(0, 2, 1)
+    jac[:, :, 1 + 2 * n:1 + 3 * n] = (common * delta ** 2).transpose(0, 2, 1)
+    return model, jac
+
+
+def estimate_lorentzian_pixels(x_axis, spectra, centers, sigmas):
+    """ Vectorised estimator for offset and amplitudes of every spectrum.
+
+    For fixed centers and widths the multi-Lorentzian model is linear in offset and amplitudes.
+    Since all spectra share the same design matrix, all of them are estimated with a single
+    linear least squares solution.
+
+    @param numpy.ndarray x_axis: 1D axis values with length F
+    @param numpy.ndarray spectra: 2D array of spectra with shape (N, F)
+    @param numpy.ndarray centers: 1D array with the center of each Lorentzian
+    @param numpy.ndarray sigmas: 1D array with the HWHM of each Lorentzian
+
+    @return numpy.ndarray: initial parameters with shape (N, 1 + 3 * len(centers))
+    """
+    centers = np.atleast_1d(np.asarray(centers, dtype=float))
+    sigmas = np.atleast_1d(np.asarray(sigmas, dtype=float))
+    n = centers.size
+
+    design = np.ones((x_axis.size, 1 + n))
+    design[:, 1:] = (sigmas ** 2 / ((x_axis[:, np.newaxis] - centers) ** 2 + sigmas ** 2))
+    linear_params = np.linalg.lstsq(design, spectra.T, rcond=None)[0].T
+
+    params = np.empty((spectra.shape[0], 1 + 3 * n))
+    params[:, :1 + n] = linear_params
+    params[:, 1 + n:1 + 2 * n] = centers
+    params[:, 1 + 2 * n:] = sigmas
+    return params
+
+
+def fit_lorentzian_pixels(x_axis, spectra, initial_params, lower_bounds, upper_bounds,
+                          no_of_lorentzians, max_iterations=50, tolerance=1e-7):
+    """ Vectorised Levenberg-Marquardt fit of the multi-Lorentzian model to many spectra at once.
+
+    This is a module-level function so it can be executed by the worker processes of a pool.
+
+    @param numpy.ndarray x_axis: 1D axis values with length F
+    @param numpy.ndarray spectra: 2D array of spectra with shape (N, F)
+    @param numpy.ndarray initial_params: 2D array of start parameters with shape (N, P)
+    @param numpy.ndarray lower_bounds: 1D array of lower parameter bounds with length P
+    @param numpy.ndarray upper_bounds: 1D array of upper parameter bounds with length P
+    @param int no_of_lorentzians: number of Lorentzians in the model
+    @param int max_iterations: maximum number of Levenberg-Marquardt iterations
+    @param float tolerance: relative decrease of chi-square below which a fit is converged
+
+    @return tuple: (params with shape (N, P), errors with shape (N, P),
+                    chi-square with shape (N,), success flags with shape (N,))
+    """
+    params = np.clip(np.array(initial_params, dtype=float), lower_bounds, upper_bounds)
+    num_spectra, num_params = params.shape
+    diag_index = np.arange(num_params)
+
+    model, jac = _lorentzian_sum_and_jacobian(x_axis, params, no_of_lorentzians)
+    residuals = spectra - model
+    chi_sqr = np.sum(residuals ** 2, axis=1)
+    damping = np.full(num_spectra, 1e-3)
+    active = np.isfinite(chi_sqr)
+    converged = np.zeros(num_spectra, dtype=bool)
+
+    for iteration in range(max_iterations):
+        index = np.flatnonzero(active)
+        if index.size == 0:
+            break
+        jtj = np.einsum('nfp,nfq->npq', jac[index], jac[index])
+        gradient = np.einsum('nfp,nf->np', jac[index], residuals[index])
+        curvature = np.maximum(jtj[:, diag_index, diag_index], 1e-30)
+        jtj[:, diag_index, diag_index] += damping[index, np.newaxis] * curvature
+        try:
+            step = np.linalg.solve(jtj, gradient[..., np.newaxis])[..., 0]
+        except np.linalg.LinAlgError:
+            step = np.einsum('npq,nq->np', np.linalg.pinv(jtj), gradient)
+
+        new_params = np.clip(params[index] + step, lower_bounds, upper_bounds)
+        new_model, new_jac = _lorentzian_sum_and_jacobian(x_axis, new_params, no_of_lorentzians)
+        new_residuals = spectra[index] - new_model
+        new_chi_sqr = np.sum(new_residuals ** 2, axis=1)
+
+        improved = new_chi_sqr < chi_sqr[index]
+        accepted = index[improved]
+        rejected = index[~improved]
+        decrease = (chi_sqr[accepted] - new_chi_sqr[improved]) / np.maximum(chi_sqr[accepted],
+                                                                            1e-300)
+        params[accepted] = new_params[improved]
+        jac[accepted] = new_jac[improved]
+        residuals[accepted] = new_residuals[improved]
+        chi_sqr[accepted] = new_chi_sqr[improved]
+        damping[accepted] = np.maximum(damping[accepted] / 10, 1e-12)
+        damping[rejected] *= 10
+
+        done = accepted[decrease < tolerance]
+        converged[done] = True
+        active[done] = False
+        # A pixel that can not be improved anymore is at its minimum within numerical precision
+        stuck = rejected[damping[rejected] > 1e12]
+        converged[stuck] = True
+        active[stuck] = False
+
+    # Standard errors from the covariance matrix scaled with the reduced chi-square
+    dof = max(x_axis.size - num_params, 1)
+    jtj = np.einsum('nfp,nfq->npq', jac, jac)
+    covariance = np.linalg.pinv(jtj) * (chi_sqr / dof)[:, np.newaxis, np.newaxis]
+    errors = np.sqrt(np.abs(covariance[:, diag_index, diag_index]))
+    return params, errors, chi_sqr, converged & np.isfinite(chi_sqr)
+
+
+class ODMRPixelFitter:
+    """
+    Fit engine for widefield ODMR image stacks.
+
+    Fits every pixel (or binned superpixel) of an image stack with shape (frequencies, height,
+    width) with a multi-Lorentzian model and returns maps of the resonance frequency, contrast and
+    linewidth. The pixels are processed in chunks by a pool of worker processes.
+    The result of the last fit is kept and used as start values for the next fit of an image stack
+    with the same geometry (warm start), so refitting after each new sweep only needs a few
+    iterations.
+    """
+
+    def __init__(self, max_workers=None, chunk_size=2048):
+        """
+        @param int max_workers: optional, number of worker processes. Defaults to the number of
+                                CPUs. Pass 1 to fit in the calling thread without a pool.
+        @param int chunk_size: number of pixels fitted per vectorised chunk
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self.max_workers = max(1, int(max_workers))
+        self.chunk_size = max(1, int(chunk_size))
+        self._pool = None
+        self._last_solution = None
+
+    def shutdown(self):
+        """ Terminate the worker processes and forget the last solution.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self._last_solution = None
+
+    def reset(self):
+        """ Forget the last solution so the next fit starts from the estimator again.
+        """
+        self._last_solution = None
+
+    def fit_image_stack(self, x_axis, image_stack, centers, sigmas, binning=1, warm_start=True,
+                        max_iterations=50, warm_max_iterations=10):
+        """ Fit every (super)pixel of an image stack with a multi-Lorentzian model.
+
+        @param numpy.ndarray x_axis: 1D frequency axis with length F
+        @param numpy.ndarray image_stack: 3D array of images with shape (F, height, width)
+        @param list centers: initial center of each Lorentzian (e.g. from a fit of the mean
+                             spectrum). The number of centers defines the number of Lorentzians.
+        @param list sigmas: initial HWHM of each Lorentzian
+        @param int binning: number of pixels along each image axis combined into one superpixel
+        @param bool warm_start: use the previous solution as start values if available
+        @param int max_iterations: maximum number of iterations starting from the estimator
+        @param int warm_max_iterations: maximum number of iterations for a warm start
+
+        @return dict: maps with the shape of the binned images. Per-Lorentzian maps ('center',
+                      'contrast', 'fwhm', 'amplitude' and their '*_error' counterparts) have an
+                      additional leading axis with one entry per Lorentzian. Further keys are
+                      'offset', 'chi_sqr' and 'success'.
+        """
+        x_axis = np.asarray(x_axis, dtype=float)
+        binned = bin_image_stack(np.asarray(image_stack), binning)
+        num_freq, height, width = binned.shape
+        if num_freq != x_axis.size:
+            raise ValueError('Length of frequency axis ({0:d}) does not match number of images '
+                             '({1:d}) in image stack.'.format(x_axis.size, num_freq))
+        n = np.atleast_1d(centers).size
+
+        # Work in a normalized frequency axis to keep the fit numerically well conditioned
+        x_center = (x_axis[0] + x_axis[-1]) / 2
+        x_scale = max(abs(x_axis[-1] - x_axis[0]) / 2, np.finfo(float).tiny)
+        x_norm = (x_axis - x_center) / x_scale
+        spectra = binned.reshape(num_freq, -1).T.astype(float, copy=False)
+
+        # parameter bounds analogous to estimate_lorentzian_dip
+        stepsize = abs(x_norm[1] - x_norm[0]) if num_freq > 1 else 1.0
+        full_width = x_norm[-1] - x_norm[0]
+        lower = np.full(1 + 3 * n, -np.inf)
+        upper = np.full(1 + 3 * n, np.inf)
+        lower[1 + n:1 + 2 * n] = x_norm[0] - num_freq * stepsize
+        upper[1 + n:1 + 2 * n] = x_norm[-1] + num_freq * stepsize
+        lower[1 + 2 * n:] = stepsize / 2
+        upper[1 + 2 * n:] = full_width * 10
+
+        geometry = (tuple(x_axis), spectra.shape, n)
+        if warm_start and self._last_solution is not None and \
+                self._last_solution[0] == geometry:
+            initial_params = self._last_solution[1]
+            iterations = warm_max_iterations
+        else:
+            initial_params = estimate_lorentzian_pixels(
+                x_norm,
+                spectra,
+                (np.atleast_1d(centers) - x_center) / x_scale,
+                np.atleast_1d(sigmas) / x_scale)
+            iterations = max_iterations
+        # dips stay dips and peaks stay peaks
+        amplitude_sign = np.sign(np.median(initial_params[:, 1:1 + n], axis=0))
+        lower[1:1 + n] = np.where(amplitude_sign < 0, -np.inf, 0)
+        upper[1:1 + n] = np.where(amplitude_sign < 0, 0, np.inf)
+
+        params, errors, chi_sqr, success = self._run_chunks(
+            x_norm, spectra, initial_params, lower, upper, n, iterations)
+        self._last_solution = (geometry, params.copy())
+
+        # scale back to the original frequency axis
+        params[:, 1 + n:1 + 2 * n] = params[:, 1 + n:1 + 2 * n] * x_scale + x_center
+        params[:, 1 + 2 * n:] *= x_scale
+        errors[:, 1 + n:] *= x_scale
+
+        def per_lorentzian(values):
+            return values.T.reshape(n, height, width)
+
+        offset = params[:, :1]
+        amplitude = params[:, 1:1 + n]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            contrast = np.abs(amplitude / offset) * 100
+            contrast_error = contrast * np.sqrt(
+                (errors[:, 1:1 + n] / amplitude) ** 2 + (errors[:, :1] / offset) ** 2)
+
+        maps = dict()
+        maps['center'] = per_lorentzian(params[:, 1 + n:1 + 2 * n])
+        maps['center_error'] = per_lorentzian(errors[:, 1 + n:1 + 2 * n])
+        maps['contrast'] = per_lorentzian(contrast)
+        maps['contrast_error'] = per_lorentzian(contrast_error)
+        maps['fwhm'] = per_lorentzian(2 * params[:, 1 + 2 * n:])
+        maps['fwhm_error'] = per_lorentzian(2 * errors[:, 1 + 2 * n:])
+        maps['amplitude'] = per_lorentzian(amplitude)
+        maps['amplitude_error'] = per_lorentzian(errors[:, 1:1 + n])
+        maps['offset'] = params[:, 0].reshape(height, width)
+        maps['chi_sqr'] = chi_sqr.reshape(height, width)
+        maps['success'] = success.reshape(height, width)
+        return maps
+
+    def _run_chunks(self, x_axis, spectra, initial_params, lower, upper, no_of_lorentzians,
+                    max_iterations):
+        """ Split the spectra into chunks and fit them, in parallel if more than one worker and
+        more than one chunk is available.
+        """
+        bounds = range(0, spectra.shape[0], self.chunk_size)
+        args = [(x_axis, spectra[i:i + self.chunk_size], initial_params[i:i + self.chunk_size],
+                 lower, upper, no_of_lorentzians, max_iterations) for i in bounds]
+
+        if self.max_workers > 1 and len(args) > 1:
+            if self._pool is None:
+                # spawn instead of fork: the qudi process runs Qt and hardware threads
+                self._pool = multiprocessing.get_context('spawn').Pool(
+                    processes=self.max_workers)
+            results = self._pool.starmap(fit_lorentzian_pixels, args)
+        else:
+            results = [fit_lorentzian_pixels(*arg) for arg in args]
+
+        return tuple(np.concatenate(parts) for parts in zip(*results))
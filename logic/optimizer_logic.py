@@ -27,6 +27,7 @@ from logic.generic_logic import GenericLogic
 from core.connector import Connector
 from core.statusvariable import StatusVar
 from core.util.mutex import Mutex
+from core.util.tracing import traced_iteration
 
 
 class OptimizerLogic(GenericLogic):
@@ -311,6 +312,7 @@ class OptimizerLogic(GenericLogic):
         time.sleep(self.hw_settle_time)
         return 0
 
+    @traced_iteration
     def _refocus_xy_line(self):
         """Scanning a line of the xy optimization image.
         This method repeats itself using the _sigScanNextXyLine
@@ -349,7 +351,8 @@ class OptimizerLogic(GenericLogic):
         else:
             line = np.vstack((lsx, lsy, lsz, np.zeros(lsx.shape)))
 
-        line_counts = self._scanning_device.scan_line(line, True)
+        with self.tracer.phase('hardware'):
+            line_counts = self._scanning_device.scan_line(line, True)
         if np.any(line_counts == -1):
             self.log.error('The scan went wrong, killing the scanner.')
             self.stop_refocus()
@@ -364,7 +367,8 @@ class OptimizerLogic(GenericLogic):
         else:
             return_line = np.vstack((lsx, lsy, lsz, np.zeros(lsx.shape)))
 
-        return_line_counts = self._scanning_device.scan_line(return_line, True)
+        with self.tracer.phase('hardware'):
+            return_line_counts = self._scanning_device.scan_line(return_line, True)
         if np.any(return_line_counts == -1):
             self.log.error('The scan went wrong, killing the scanner.')
             self.stop_refocus()
@@ -373,7 +377,8 @@ class OptimizerLogic(GenericLogic):
 
         s_ch = len(self.get_scanner_count_channels())
         self.xy_refocus_image[self._xy_scan_line_count, :, 3:3 + s_ch] = line_counts
-        self.sigImageUpdated.emit()
+        with self.tracer.phase('emit'):
+            self.sigImageUpdated.emit()
 
         self._xy_scan_line_count += 1
 
@@ -136,7 +136,7 @@ class PulsedMasterLogic(GenericLogic):
 
         # Connect signals controlling PulsedMeasurementLogic
         self.sigDoFit.connect(
-            self.pulsedmeasurementlogic().do_fit, QtCore.Qt.QueuedConnection)
+            self.pulsedmeasurementlogic().do_fit_async, QtCore.Qt.QueuedConnection)
         self.sigToggleMeasurement.connect(
             self.pulsedmeasurementlogic().toggle_pulsed_measurement, QtCore.Qt.QueuedConnection)
         self.sigToggleMeasurementPause.connect(
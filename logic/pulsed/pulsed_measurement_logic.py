@@ -23,6 +23,7 @@ from qtpy import QtCore
 from collections import OrderedDict
 import numpy as np
 import copy
+import functools
 import time
 import datetime
 import matplotlib.pyplot as plt
@@ -147,6 +148,7 @@ class PulsedMeasurementLogic(GenericLogic):
 
         # for fit:
         self.fc = None  # Fit container
+        self._async_fit_alternative_data = False  # data set of the running do_fit_async
         self.fit_result = None
         self.alt_fit_result = None
         self.signal_fit_data = np.empty((2, 0), dtype=float)  # The x,y data of the fit result
@@ -210,6 +212,7 @@ class PulsedMeasurementLogic(GenericLogic):
         # Connect internal signals
         self.sigStartTimer.connect(self.__analysis_timer.start, QtCore.Qt.QueuedConnection)
         self.sigStopTimer.connect(self.__analysis_timer.stop, QtCore.Qt.QueuedConnection)
+        self.fc.sigAsyncFitFinished.connect(self._async_fit_finished, QtCore.Qt.QueuedConnection)
         return
 
     def on_deactivate(self):
@@ -228,6 +231,8 @@ class PulsedMeasurementLogic(GenericLogic):
         self.__analysis_timer.timeout.disconnect()
         self.sigStartTimer.disconnect()
         self.sigStopTimer.disconnect()
+        self.fc.cancel_async_fit()
+        self.fc.sigAsyncFitFinished.disconnect(self._async_fit_finished)
         return
 
     ############################################################################
@@ -1000,18 +1005,60 @@ class PulsedMeasurementLogic(GenericLogic):
         fit_data = np.array([x_fit, y_fit])
 
         if update_fit_data:
-            if use_alternative_data:
-                self.signal_fit_alt_data = fit_data
-                self.alt_fit_result = copy.deepcopy(self.fc.current_fit_result)
-                self.sigFitUpdated.emit(self.fc.current_fit, self.signal_fit_alt_data,
-                                        self.alt_fit_result, use_alternative_data)
-            else:
-                self.signal_fit_data = fit_data
-                self.fit_result = copy.deepcopy(self.fc.current_fit_result)
-                self.sigFitUpdated.emit(self.fc.current_fit, self.signal_fit_data, self.fit_result,
-                                        use_alternative_data)
+            self._update_fit_data(fit_data, use_alternative_data)
         return fit_data, self.fc.current_fit_result
 
+    @QtCore.Slot(str)
+    @QtCore.Slot(str, bool)
+    def do_fit_async(self, fit_method, use_alternative_data=False):
+        """
+        Starts the chosen fit of the measured data in the worker pool of the fit logic.
+
+        @param str fit_method: name of the fit method to use
+        @param bool use_alternative_data: Flag indicating if the signal data (False) or the
+                                          alternative signal data (True) should be fitted.
+
+        sigFitUpdated is emitted when the fit is finished. The analysis of the running
+        measurement continues meanwhile.
+        """
+        # Set current fit
+        self.fc.set_current_fit(fit_method)
+
+        data = self.signal_alt_data if use_alternative_data else self.signal_data
+        if len(data) < 2 or len(data[0]) < 2 or len(data[1]) < 2:
+            self.log.debug('The data you are trying to fit does not contain enough data for a fit.')
+            return
+
+        self._async_fit_alternative_data = use_alternative_data
+        self.fc.do_fit_async(data[0], data[1])
+        return
+
+    @QtCore.Slot(object, object, object)
+    def _async_fit_finished(self, x_fit, y_fit, result):
+        """ Store the fit data of a fit started with do_fit_async.
+        """
+        self._update_fit_data(np.array([x_fit, y_fit]), self._async_fit_alternative_data)
+        return
+
+    def _update_fit_data(self, fit_data, use_alternative_data):
+        """ Store the fit data and the current fit result and emit sigFitUpdated.
+
+        @param 2D numpy.ndarray fit_data: the x and y data of the fit (shape=(2,X))
+        @param bool use_alternative_data: Flag indicating if the signal data (False) or the
+                                          alternative signal data (True) were fitted.
+        """
+        if use_alternative_data:
+            self.signal_fit_alt_data = fit_data
+            self.alt_fit_result = copy.deepcopy(self.fc.current_fit_result)
+            self.sigFitUpdated.emit(self.fc.current_fit, self.signal_fit_alt_data,
+                                    self.alt_fit_result, use_alternative_data)
+        else:
+            self.signal_fit_data = fit_data
+            self.fit_result = copy.deepcopy(self.fc.current_fit_result)
+            self.sigFitUpdated.emit(self.fc.current_fit, self.signal_fit_data, self.fit_result,
+                                    use_alternative_data)
+        return
+
     def _apply_invoked_settings(self):
         """
         """
@@ -1286,14 +1333,14 @@ class PulsedMeasurementLogic(GenericLogic):
             parameters['gated counting'] = self.fast_counter_settings['is_gated']
             parameters['extraction parameters'] = self.extraction_settings
 
-            self.savelogic().save_data(data,
-                                       timestamp=timestamp,
-                                       parameters=parameters,
-                                       filepath=filepath,
-                                       filelabel=filelabel,
-                                       filetype='text',
-                                       fmt='%d',
-                                       delimiter='\t')
+            self.savelogic().save_data_async(data,
+                                             timestamp=timestamp,
+                                             parameters=parameters,
+                                             filepath=filepath,
+                                             filelabel=filelabel,
+                                             filetype='text',
+                                             fmt='%d',
+                                             delimiter='\t')
 
         #####################################################################
         ####                Save measurement data                        ####
@@ -1341,240 +1388,16 @@ class PulsedMeasurementLogic(GenericLogic):
             parameters['fast counter settings'] = self.fast_counter_settings
 
             if save_figure:
-                # Prepare the figure to save as a "data thumbnail"
-                plt.style.use(self.savelogic().mpl_qd_style)
-
-                # extract the possible colors from the colorscheme:
-                prop_cycle = self.savelogic().mpl_qd_style['axes.prop_cycle']
-                colors = {}
-                for i, color_setting in enumerate(prop_cycle):
-                    colors[i] = color_setting['color']
-
-                # scale the x_axis for plotting
-                max_val = np.max(self.signal_data[0])
-                scaled_float = units.ScaledFloat(max_val)
-                counts_prefix = scaled_float.scale
-                x_axis_scaled = self.signal_data[0] / scaled_float.scale_val
-
-                # Create the figure object
-                if self._alternative_data_type and self._alternative_data_type != 'None':
-                    fig, (ax1, ax2) = plt.subplots(2, 1)
-                else:
-                    fig, ax1 = plt.subplots()
-
-                if with_error:
-                    ax1.errorbar(x=x_axis_scaled, y=self.signal_data[1],
-                                 yerr=self.measurement_error[1], fmt='-o',
-                                 linestyle=':', linewidth=0.5, color=colors[0],
-                                 ecolor=colors[1], capsize=3, capthick=0.9,
-                                 elinewidth=1.2, label='data trace 1')
-
-                    if self._alternating:
-                        ax1.errorbar(x=x_axis_scaled, y=self.signal_data[2],
-                                     yerr=self.measurement_error[2], fmt='-D',
-                                     linestyle=':', linewidth=0.5, color=colors[3],
-                                     ecolor=colors[4],  capsize=3, capthick=0.7,
-                                     elinewidth=1.2, label='data trace 2')
-                else:
-                    ax1.plot(x_axis_scaled, self.signal_data[1], '-o', color=colors[0],
-                             linestyle=':', linewidth=0.5, label='data trace 1')
-
-                    if self._alternating:
-                        ax1.plot(x_axis_scaled, self.signal_data[2], '-o',
-                                 color=colors[3], linestyle=':', linewidth=0.5,
-                                 label='data trace 2')
-
-                # Do not include fit curve if there is no fit calculated.
-                if self.signal_fit_data.size != 0 and np.sum(self.signal_fit_data[1]) > 0:
-                    x_axis_fit_scaled = self.signal_fit_data[0] / scaled_float.scale_val
-                    ax1.plot(x_axis_fit_scaled, self.signal_fit_data[1],
-                             color=colors[2], marker='None', linewidth=1.5,
-                             label='fit')
-
-                    # add then the fit result to the plot:
-
-                    # Parameters for the text plot:
-                    # The position of the text annotation is controlled with the
-                    # relative offset in x direction and the relative length factor
-                    # rel_len_fac of the longest entry in one column
-                    rel_offset = 0.02
-                    rel_len_fac = 0.011
-                    entries_per_col = 24
-
-                    # create the formatted fit text:
-                    if hasattr(self.fit_result, 'result_str_dict'):
-                        result_str = units.create_formatted_output(self.fit_result.result_str_dict)
-                    else:
-                        result_str = ''
-                    # do reverse processing to get each entry in a list
-                    entry_list = result_str.split('\n')
-                    # slice the entry_list in entries_per_col
-                    chunks = [entry_list[x:x+entries_per_col] for x in range(0, len(entry_list), entries_per_col)]
-
-                    is_first_column = True  # first entry should contain header or \n
-
-                    for column in chunks:
-
-                        max_length = max(column, key=len)   # get the longest entry
-                        column_text = ''
-
-                        for entry in column:
-                            column_text += entry + '\n'
-
-                        column_text = column_text[:-1]  # remove the last new line
-
-                        heading = ''
-                        if is_first_column:
-                            heading = 'Fit results:'
-
-                        column_text = heading + '\n' + column_text
-
-                        ax1.text(1.00 + rel_offset, 0.99, column_text,
-                                 verticalalignment='top',
-                                 horizontalalignment='left',
-                                 transform=ax1.transAxes,
-                                 fontsize=12)
-
-                        # the rel_offset in position of the text is a linear function
-                        # which depends on the longest entry in the column
-                        rel_offset += rel_len_fac * len(max_length)
-
-                        is_first_column = False
-
-                # handle the save of the alternative data plot
-                if self._alternative_data_type and self._alternative_data_type != 'None':
-
-                    # scale the x_axis for plotting
-                    max_val = np.max(self.signal_alt_data[0])
-                    scaled_float = units.ScaledFloat(max_val)
-                    x_axis_prefix = scaled_float.scale
-                    x_axis_ft_scaled = self.signal_alt_data[0] / scaled_float.scale_val
-
-                    # since no ft units are provided, make a small work around:
-                    if self._alternative_data_type == 'FFT':
-                        if self._data_units[0] == 's':
-                            inverse_cont_var = 'Hz'
-                        elif self._data_units[0] == 'Hz':
-                            inverse_cont_var = 's'
-                        else:
-                            inverse_cont_var = '(1/{0})'.format(self._data_units[0])
-                        x_axis_ft_label = 'FT {0} ({1}{2})'.format(
-                            self._data_labels[0], x_axis_prefix, inverse_cont_var)
-                        y_axis_ft_label = 'FT({0}) (arb. u.)'.format(self._data_labels[1])
-                        ft_label = 'FT of data trace 1'
-
-                    elif self._alternative_data_type == 'Histogram':
-                        pass
-                    else:
-                        if self._data_units[0]:
-                            x_axis_ft_label = '{0} ({1}{2})'.format(self._data_labels[0], x_axis_prefix,
-                                                                    self._data_units[0])
-                        else:
-                            x_axis_ft_label = '{0}'.format(self._data_labels[0])
-                        if self._data_units[1]:
-                            y_axis_ft_label = '{0} ({1})'.format(self._data_labels[1], self._data_units[1])
-                        else:
-                            y_axis_ft_label = '{0}'.format(self._data_labels[1])
-
-                        ft_label = '{0} of data traces'.format(self._alternative_data_type)
-
-                    if with_error and self._alternative_data_type != 'FFT':
-                        if self._alternating:
-                            yerr = np.sqrt(self.measurement_error[1]**2+self.measurement_error[2]**2)
-                        else:
-                            yerr = self.measurement_error[1]
-                        ax2.errorbar(x_axis_ft_scaled, self.signal_alt_data[1], yerr=yerr, fmt ='-o',
-                            linestyle=':', linewidth=0.5, color=colors[0],
-                            label=ft_label)
-
-                    else:
-                        ax2.plot(x_axis_ft_scaled, self.signal_alt_data[1], '-o',
-                                linestyle=':', linewidth=0.5, color=colors[0],
-                                label=ft_label)
-                    if self._alternating and len(self.signal_alt_data) > 2:
-                        ax2.plot(x_axis_ft_scaled, self.signal_alt_data[2], '-D',
-                                 linestyle=':', linewidth=0.5, color=colors[3],
-                                 label=ft_label.replace('1', '2'))
-
-                    ax2.set_xlabel(x_axis_ft_label)
-                    ax2.set_ylabel(y_axis_ft_label)
-                    ax2.legend(bbox_to_anchor=(0., 1.02, 1., .102), loc=3, ncol=2,
-                               mode="expand", borderaxespad=0.)
-
-                    if self.signal_fit_alt_data.size != 0 and abs(np.sum(self.signal_fit_alt_data[1])) > 0:
-                        x_axis_fit_scaled = self.signal_fit_alt_data[0] / scaled_float.scale_val
-                        ax2.plot(x_axis_fit_scaled, self.signal_fit_alt_data[1],
-                                 color=colors[2], marker='None', linewidth=1.5,
-                                 label='secondary fit')
-
-                        # add then the fit result to the plot:
-
-                        # Parameters for the text plot:
-                        # The position of the text annotation is controlled with the
-                        # relative offset in x direction and the relative length factor
-                        # rel_len_fac of the longest entry in one column
-                        rel_offset = 0.02
-                        rel_len_fac = 0.011
-                        entries_per_col = 24
-
-                        # create the formatted fit text:
-                        if hasattr(self.alt_fit_result, 'result_str_dict'):
-                            result_str = units.create_formatted_output(self.alt_fit_result.result_str_dict)
-                        else:
-                            result_str = ''
-                        # do reverse processing to get each entry in a list
-                        entry_list = result_str.split('\n')
-                        # slice the entry_list in entries_per_col
-                        chunks = [entry_list[x:x+entries_per_col] for x in range(0, len(entry_list), entries_per_col)]
-
-                        is_first_column = True  # first entry should contain header or \n
-
-                        for column in chunks:
-                            max_length = max(column, key=len)   # get the longest entry
-                            column_text = ''
-
-                            for entry in column:
-                                column_text += entry + '\n'
-
-                            column_text = column_text[:-1]  # remove the last new line
-
-                            heading = ''
-                            if is_first_column:
-                                heading = 'Fit results:'
-
-                            column_text = heading + '\n' + column_text
-
-                            ax2.text(1.00 + rel_offset, 0.99, column_text,
-                                     verticalalignment='top',
-                                     horizontalalignment='left',
-                                     transform=ax2.transAxes,
-                                     fontsize=12)
-
-                            # the rel_offset in position of the text is a linear function
-                            # which depends on the longest entry in the column
-                            rel_offset += rel_len_fac * len(max_length)
-
-                            is_first_column = False
-
-                ax1.set_xlabel(
-                    '{0} ({1}{2})'.format(self._data_labels[0], counts_prefix, self._data_units[0]))
-                if self._data_units[1]:
-                    ax1.set_ylabel('{0} ({1})'.format(self._data_labels[1], self._data_units[1]))
-                else:
-                    ax1.set_ylabel('{0}'.format(self._data_labels[1]))
-
-                fig.tight_layout()
-                ax1.legend(bbox_to_anchor=(0., 1.02, 1., .102), loc=3, ncol=2,
-                           mode="expand", borderaxespad=0.)
-                # plt.legend(bbox_to_anchor=(0., 1.02, 1., .102), loc=3, ncol=2,
-                #            mode="expand", borderaxespad=0.)
+                # snapshot of the data, the figure is drawn in the save thread of the save logic
+                fig = functools.partial(self.draw_figure, with_error=with_error,
+                                        plot_data=self._plot_data_snapshot())
             else:
                 fig = None
 
-            self.savelogic().save_data(data, timestamp=timestamp,
-                                       parameters=parameters, fmt='%.15e',
-                                       filepath=filepath, filelabel=filelabel, filetype='text',
-                                       delimiter='\t', plotfig=fig)
+            self.savelogic().save_data_async(data, timestamp=timestamp,
+                                             parameters=parameters, fmt='%.15e',
+                                             filepath=filepath, filelabel=filelabel,
+                                             filetype='text', delimiter='\t', plotfig=fig)
 
         #####################################################################
         ####                Save raw data timetrace                      ####
@@ -1594,13 +1417,289 @@ class PulsedMeasurementLogic(GenericLogic):
         parameters['alternating'] = self._alternating
         parameters['Controlled variable'] = list(self.signal_data[0])
 
-        self.savelogic().save_data(data, timestamp=timestamp,
-                                   parameters=parameters, fmt='%d',
-                                   filepath=filepath, filelabel=filelabel,
-                                   filetype=self._raw_data_save_type,
-                                   delimiter='\t')
+        self.savelogic().save_data_async(data, timestamp=timestamp,
+                                         parameters=parameters, fmt='%d',
+                                         filepath=filepath, filelabel=filelabel,
+                                         filetype=self._raw_data_save_type,
+                                         delimiter='\t')
         return filepath
 
+    def _plot_data_snapshot(self, copy_data=True):
+        """ Collect the data and settings drawn by draw_figure.
+
+        @param bool copy_data: copy the arrays, so the figure can be drawn later in another thread
+
+        @return dict: signal, error, fit and alternative data with the fit results, labels and
+                      units
+        """
+        plot_data = {'signal_data': self.signal_data,
+                     'measurement_error': self.measurement_error,
+                     'signal_fit_data': self.signal_fit_data,
+                     'signal_alt_data': self.signal_alt_data,
+                     'signal_fit_alt_data': self.signal_fit_alt_data}
+        if copy_data:
+            plot_data = {key: np.array(value, copy=True) for key, value in plot_data.items()}
+        # the fit results are replaced and not modified by new fits
+        plot_data['fit_result'] = self.fit_result
+        plot_data['alt_fit_result'] = self.alt_fit_result
+        plot_data['alternative_data_type'] = self._alternative_data_type
+        plot_data['alternating'] = self._alternating
+        plot_data['data_units'] = tuple(self._data_units)
+        plot_data['data_labels'] = tuple(self._data_labels)
+        return plot_data
+
+    def draw_figure(self, with_error=True, plot_data=None):
+        """ Draw the figure of the measurement to save with the data.
+
+        @param bool with_error: select whether errors should be plotted
+        @param dict plot_data: optional, data returned by _plot_data_snapshot. If not supplied
+                               then the current data will be drawn.
+
+        @return matplotlib.figure.Figure: the figure
+        """
+        if plot_data is None:
+            plot_data = self._plot_data_snapshot(copy_data=False)
+        signal_data = plot_data['signal_data']
+        measurement_error = plot_data['measurement_error']
+        signal_fit_data = plot_data['signal_fit_data']
+        signal_alt_data = plot_data['signal_alt_data']
+        signal_fit_alt_data = plot_data['signal_fit_alt_data']
+        fit_result = plot_data['fit_result']
+        alt_fit_result = plot_data['alt_fit_result']
+        alternative_data_type = plot_data['alternative_data_type']
+        alternating = plot_data['alternating']
+        data_units = plot_data['data_units']
+        data_labels = plot_data['data_labels']
+
+        # Prepare the figure to save as a "data thumbnail"
+        plt.style.use(self.savelogic().mpl_qd_style)
+
+        # extract the possible colors from the colorscheme:
+        prop_cycle = self.savelogic().mpl_qd_style['axes.prop_cycle']
+        colors = {}
+        for i, color_setting in enumerate(prop_cycle):
+            colors[i] = color_setting['color']
+
+        # scale the x_axis for plotting
+        max_val = np.max(signal_data[0])
+        scaled_float = units.ScaledFloat(max_val)
+        counts_prefix = scaled_float.scale
+        x_axis_scaled = signal_data[0] / scaled_float.scale_val
+
+        # Create the figure object
+        if alternative_data_type and alternative_data_type != 'None':
+            fig, (ax1, ax2) = plt.subplots(2, 1)
+        else:
+            fig, ax1 = plt.subplots()
+
+        if with_error:
+            ax1.errorbar(x=x_axis_scaled, y=signal_data[1],
+                         yerr=measurement_error[1], fmt='-o',
+                         linestyle=':', linewidth=0.5, color=colors[0],
+                         ecolor=colors[1], capsize=3, capthick=0.9,
+                         elinewidth=1.2, label='data trace 1')
+
+            if alternating:
+                ax1.errorbar(x=x_axis_scaled, y=signal_data[2],
+                             yerr=measurement_error[2], fmt='-D',
+                             linestyle=':', linewidth=0.5, color=colors[3],
+                             ecolor=colors[4],  capsize=3, capthick=0.7,
+                             elinewidth=1.2, label='data trace 2')
+        else:
+            ax1.plot(x_axis_scaled, signal_data[1], '-o', color=colors[0],
+                     linestyle=':', linewidth=0.5, label='data trace 1')
+
+            if alternating:
+                ax1.plot(x_axis_scaled, signal_data[2], '-o',
+                         color=colors[3], linestyle=':', linewidth=0.5,
+                         label='data trace 2')
+
+        # Do not include fit curve if there is no fit calculated.
+        if signal_fit_data.size != 0 and np.sum(signal_fit_data[1]) > 0:
+            x_axis_fit_scaled = signal_fit_data[0] / scaled_float.scale_val
+            ax1.plot(x_axis_fit_scaled, signal_fit_data[1],
+                     color=colors[2], marker='None', linewidth=1.5,
+                     label='fit')
+
+            # add then the fit result to the plot:
+
+            # Parameters for the text plot:
+            # The position of the text annotation is controlled with the
+            # relative offset in x direction and the relative length factor
+            # rel_len_fac of the longest entry in one column
+            rel_offset = 0.02
+            rel_len_fac = 0.011
+            entries_per_col = 24
+
+            # create the formatted fit text:
+            if hasattr(fit_result, 'result_str_dict'):
+                result_str = units.create_formatted_output(fit_result.result_str_dict)
+            else:
+                result_str = ''
+            # do reverse processing to get each entry in a list
+            entry_list = result_str.split('\n')
+            # slice the entry_list in entries_per_col
+            chunks = [entry_list[x:x+entries_per_col] for x in range(0, len(entry_list), entries_per_col)]
+
+            is_first_column = True  # first entry should contain header or \n
+
+            for column in chunks:
+
+                max_length = max(column, key=len)   # get the longest entry
+                column_text = ''
+
+                for entry in column:
+                    column_text += entry + '\n'
+
+                column_text = column_text[:-1]  # remove the last new line
+
+                heading = ''
+                if is_first_column:
+                    heading = 'Fit results:'
+
+                column_text = heading + '\n' + column_text
+
+                ax1.text(1.00 + rel_offset, 0.99, column_text,
+                         verticalalignment='top',
+                         horizontalalignment='left',
+                         transform=ax1.transAxes,
+                         fontsize=12)
+
+                # the rel_offset in position of the text is a linear function
+                # which depends on the longest entry in the column
+                rel_offset += rel_len_fac * len(max_length)
+
+                is_first_column = False
+
+        # handle the save of the alternative data plot
+        if alternative_data_type and alternative_data_type != 'None':
+
+            # scale the x_axis for plotting
+            max_val = np.max(signal_alt_data[0])
+            scaled_float = units.ScaledFloat(max_val)
+            x_axis_prefix = scaled_float.scale
+            x_axis_ft_scaled = signal_alt_data[0] / scaled_float.scale_val
+
+            # since no ft units are provided, make a small work around:
+            if alternative_data_type == 'FFT':
+                if data_units[0] == 's':
+                    inverse_cont_var = 'Hz'
+                elif data_units[0] == 'Hz':
+                    inverse_cont_var = 's'
+                else:
+                    inverse_cont_var = '(1/{0})'.format(data_units[0])
+                x_axis_ft_label = 'FT {0} ({1}{2})'.format(
+                    data_labels[0], x_axis_prefix, inverse_cont_var)
+                y_axis_ft_label = 'FT({0}) (arb. u.)'.format(data_labels[1])
+                ft_label = 'FT of data trace 1'
+
+            elif alternative_data_type == 'Histogram':
+                pass
+            else:
+                if data_units[0]:
+                    x_axis_ft_label = '{0} ({1}{2})'.format(data_labels[0], x_axis_prefix,
+                                                            data_units[0])
+                else:
+                    x_axis_ft_label = '{0}'.format(data_labels[0])
+                if data_units[1]:
+                    y_axis_ft_label = '{0} ({1})'.format(data_labels[1], data_units[1])
+                else:
+                    y_axis_ft_label = '{0}'.format(data_labels[1])
+
+                ft_label = '{0} of data traces'.format(alternative_data_type)
+
+            if with_error and alternative_data_type != 'FFT':
+                if alternating:
+                    yerr = np.sqrt(measurement_error[1]**2+measurement_error[2]**2)
+                else:
+                    yerr = measurement_error[1]
+                ax2.errorbar(x_axis_ft_scaled, signal_alt_data[1], yerr=yerr, fmt ='-o',
+                    linestyle=':', linewidth=0.5, color=colors[0],
+                    label=ft_label)
+
+            else:
+                ax2.plot(x_axis_ft_scaled, signal_alt_data[1], '-o',
+                        linestyle=':', linewidth=0.5, color=colors[0],
+                        label=ft_label)
+            if alternating and len(signal_alt_data) > 2:
+                ax2.plot(x_axis_ft_scaled, signal_alt_data[2], '-D',
+                         linestyle=':', linewidth=0.5, color=colors[3],
+                         label=ft_label.replace('1', '2'))
+
+            ax2.set_xlabel(x_axis_ft_label)
+            ax2.set_ylabel(y_axis_ft_label)
+            ax2.legend(bbox_to_anchor=(0., 1.02, 1., .102), loc=3, ncol=2,
+                       mode="expand", borderaxespad=0.)
+
+            if signal_fit_alt_data.size != 0 and abs(np.sum(signal_fit_alt_data[1])) > 0:
+                x_axis_fit_scaled = signal_fit_alt_data[0] / scaled_float.scale_val
+                ax2.plot(x_axis_fit_scaled, signal_fit_alt_data[1],
+                         color=colors[2], marker='None', linewidth=1.5,
+                         label='secondary fit')
+
+                # add then the fit result to the plot:
+
+                # Parameters for the text plot:
+                # The position of the text annotation is controlled with the
+                # relative offset in x direction and the relative length factor
+                # rel_len_fac of the longest entry in one column
+                rel_offset = 0.02
+                rel_len_fac = 0.011
+                entries_per_col = 24
+
+                # create the formatted fit text:
+                if hasattr(alt_fit_result, 'result_str_dict'):
+                    result_str = units.create_formatted_output(alt_fit_result.result_str_dict)
+                else:
+                    result_str = ''
+                # do reverse processing to get each entry in a list
+                entry_list = result_str.split('\n')
+                # slice the entry_list in entries_per_col
+                chunks = [entry_list[x:x+entries_per_col] for x in range(0, len(entry_list), entries_per_col)]
+
+                is_first_column = True  # first entry should contain header or \n
+
+                for column in chunks:
+                    max_length = max(column, key=len)   # get the longest entry
+                    column_text = ''
+
+                    for entry in column:
+                        column_text += entry + '\n'
+
+                    column_text = column_text[:-1]  # remove the last new line
+
+                    heading = ''
+                    if is_first_column:
+                        heading = 'Fit results:'
+
+                    column_text = heading + '\n' + column_text
+
+                    ax2.text(1.00 + rel_offset, 0.99, column_text,
+                             verticalalignment='top',
+                             horizontalalignment='left',
+                             transform=ax2.transAxes,
+                             fontsize=12)
+
+                    # the rel_offset in position of the text is a linear function
+                    # which depends on the longest entry in the column
+                    rel_offset += rel_len_fac * len(max_length)
+
+                    is_first_column = False
+
+        ax1.set_xlabel(
+            '{0} ({1}{2})'.format(data_labels[0], counts_prefix, data_units[0]))
+        if data_units[1]:
+            ax1.set_ylabel('{0} ({1})'.format(data_labels[1], data_units[1]))
+        else:
+            ax1.set_ylabel('{0}'.format(data_labels[1]))
+
+        fig.tight_layout()
+        ax1.legend(bbox_to_anchor=(0., 1.02, 1., .102), loc=3, ncol=2,
+                   mode="expand", borderaxespad=0.)
+        # plt.legend(bbox_to_anchor=(0., 1.02, 1., .102), loc=3, ncol=2,
+        #            mode="expand", borderaxespad=0.)
+        return fig
+
     def _compute_alt_data(self):
         """
         Performing transformations on the measurement data (e.g. fourier transform).
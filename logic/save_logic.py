@@ -20,8 +20,9 @@ top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi
 """
 
 from cycler import cycler
+import concurrent.futures
+import copy
 import datetime
-import inspect
 import logging
 import matplotlib.pyplot as plt
 import numpy as np
@@ -34,10 +35,17 @@ from core.configoption import ConfigOption
 from core.util import units
 from core.util.mutex import Mutex
 from core.util.network import netobtain
+from logic.data_catalogue import DataCatalogue
 from logic.generic_logic import GenericLogic
 from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from qtpy import QtCore
 from PIL import Image
 from PIL import PngImagePlugin
+try:
+    import h5py
+except ImportError:
+    h5py = None
 
 
 class DailyLogHandler(logging.FileHandler):
@@ -106,6 +114,59 @@ class DailyLogHandler(logging.FileHandler):
             super().emit(record)
 
 
+def savetxt_fast(file, data, fmt='%.15e', delimiter='\t', header='', comments='#',
+                 block_size=65536):
+    """
+    Write a 1D or 2D numeric array to a text file like numpy.savetxt, but format whole blocks of
+    rows at once.
+
+    @param file: file object opened in binary mode
+    @param numpy.ndarray data: 1D array (written as one column) or 2D array
+    @param str or list fmt: format specifier for all columns, or one per column
+    @param str delimiter: string separating the columns
+    @param str header: string written at the beginning of the file, prefixed by comments
+    @param str comments: string prepended to each line of the header
+    @param int block_size: approximate number of values formatted at once
+
+    The output is byte-identical to numpy.savetxt. numpy.savetxt converts every row into a
+    tuple of numpy scalars and formats it separately. Here the values of a block are converted to
+    python numbers at once and formatted with a single string operation, which is several times
+    faster for large arrays. Arrays, which are not numeric or have structured data types, and
+    format strings numpy.savetxt would interpret differently are written with numpy.savetxt.
+    """
+    data = np.asarray(data)
+    if data.ndim == 1:
+        num_cols = 1
+    elif data.ndim == 2:
+        num_cols = data.shape[1]
+    else:
+        num_cols = 0
+
+    if isinstance(fmt, str) and fmt.count('%') == 1:
+        row_fmt = delimiter.join([fmt] * num_cols)
+    elif isinstance(fmt, (list, tuple)) and len(fmt) == num_cols:
+        row_fmt = delimiter.join(fmt)
+    else:
+        row_fmt = None
+    if (row_fmt is None or data.size == 0 or data.dtype.names is not None
+            or data.dtype.kind not in 'biuf'):
+        np.savetxt(file, data, fmt=fmt, delimiter=delimiter, header=header, comments=comments)
+        return
+
+    if len(header) > 0:
+        header = header.replace('\n', '\n' + comments)
+        file.write((comments + header + '\n').encode('latin1'))
+
+    rows = data.reshape(data.shape[0], num_cols)
+    block_rows = max(1, block_size // num_cols)
+    block_fmt = (row_fmt + '\n') * block_rows
+    for start in range(0, rows.shape[0], block_rows):
+        block = rows[start:start + block_rows]
+        if block.shape[0] != block_rows:
+            block_fmt = (row_fmt + '\n') * block.shape[0]
+        file.write((block_fmt % tuple(block.ravel().tolist())).encode('latin1'))
+
+
 class FunctionImplementationError(Exception):
 
     def __init__(self, value):
@@ -129,6 +190,7 @@ class SaveLogic(GenericLogic):
         log_into_daily_directory: True
         save_pdf: True
         save_png: True
+        data_catalogue: True
     """
 
     _win_data_dir = ConfigOption('win_data_directory', 'C:/Data/')
@@ -136,6 +198,11 @@ class SaveLogic(GenericLogic):
     log_into_daily_directory = ConfigOption('log_into_daily_directory', False, missing='warn')
     save_pdf = ConfigOption('save_pdf', False)
     save_png = ConfigOption('save_png', True)
+    # index every saved file in a SQLite database in the data directory
+    use_data_catalogue = ConfigOption('data_catalogue', False)
+
+    # future and result (file path or -1) of a job queued with save_data_async
+    sigSaveFinished = QtCore.Signal(object, object)
 
     # Matplotlib style definition for saving plots
     mpl_qd_style = {
@@ -202,6 +269,12 @@ class SaveLogic(GenericLogic):
 
         self._daily_loghandler = None
 
+        # background saving, the thread is started with the first job
+        self._save_executor = None
+        self._save_queue_lock = Mutex()
+
+        self._catalogue = None
+
     def on_activate(self):
         """ Definition, configuration and initialisation of the SaveLogic.
         """
@@ -217,7 +290,22 @@ class SaveLogic(GenericLogic):
         else:
             self._daily_loghandler = None
 
+        if self.use_data_catalogue:
+            try:
+                os.makedirs(self.data_dir, exist_ok=True)
+                self._catalogue = DataCatalogue(
+                    os.path.join(self.data_dir, 'qudi_data_catalogue.sqlite'))
+            except Exception:
+                self.log.exception('Could not open the data catalogue. Saved data is not '
+                                   'indexed.')
+                self._catalogue = None
+
     def on_deactivate(self):
+        # write all queued data before deactivation
+        with self._save_queue_lock:
+            if self._save_executor is not None:
+                self._save_executor.shutdown(wait=True)
+                self._save_executor = None
         if self._daily_loghandler is not None:
             # removes the log handler logging into the daily directory
             logging.getLogger().removeHandler(self._daily_loghandler)
@@ -238,7 +326,8 @@ class SaveLogic(GenericLogic):
         self._daily_loghandler.setLevel(level)
 
     def save_data(self, data, filepath=None, parameters=None, filename=None, filelabel=None,
-                  timestamp=None, filetype='text', fmt='%.15e', delimiter='\t', plotfig=None):
+                  timestamp=None, filetype='text', fmt='%.15e', delimiter='\t', plotfig=None,
+                  append=False, module_name=None):
         """
         General save routine for data.
 
@@ -284,7 +373,10 @@ class SaveLogic(GenericLogic):
                                    filename and a timestamp, because then the timestamp will be
                                    ignored.
         @param string filetype: optional, the file format the data should be saved in. Valid inputs
-                                are 'text', 'xml' and 'npz'. Default is 'text'.
+                                are 'text', 'npz' and 'hdf5'. Default is 'text'.
+                                'hdf5' stores every data item as chunked, compressed dataset and
+                                the parameters as attributes (needs the h5py package). Generated
+                                filenames end with '.h5'. The data arrays may have any dimension.
         @param string or list of strings fmt: optional, format specifier for saved data. See python
                                               documentation for
                                               "Format Specification Mini-Language". If you want for
@@ -299,6 +391,14 @@ class SaveLogic(GenericLogic):
                                               behaviour or failure to save right away.
         @param string delimiter: optional, insert here the delimiter, like '\n' for new line, '\t'
                                  for tab, ',' for a comma ect.
+        @param bool append: optional, only for filetype 'hdf5'. Add the data as a new group to an
+                            existing file instead of overwriting it, so that repeated saves of one
+                            measurement end up in one file. Pass the same filename for each save.
+        @param str module_name: optional, name of the calling module used for the directory and
+                                the file label. If not given, it is taken from the module the
+                                caller is defined in.
+
+        @return str: path of the saved file, -1 if saving failed
 
         1D data
         =======
@@ -329,6 +429,125 @@ class SaveLogic(GenericLogic):
         YOU ARE RESPONSIBLE FOR THE IDENTIFIER! DO NOT FORGET THE UNITS FOR THE SAVED TIME
         TRACE/MATRIX.
         """
+        if module_name is None:
+            module_name = self._get_caller_module_name()
+
+        return self._save_data(data, module_name, self.active_poi_name,
+                               self._additional_parameters, filepath=filepath,
+                               parameters=parameters, filename=filename, filelabel=filelabel,
+                               timestamp=timestamp, filetype=filetype, fmt=fmt,
+                               delimiter=delimiter, plotfig=plotfig, append=append)
+
+    def save_data_async(self, data, filepath=None, parameters=None, filename=None,
+                        filelabel=None, timestamp=None, filetype='text', fmt='%.15e',
+                        delimiter='\t', plotfig=None, append=False, module_name=None):
+        """
+        Queue data for saving in the background, see save_data for the arguments.
+
+        @param plotfig: optional, a matplotlib figure or a callable without arguments returning
+                        the figure. A callable is called in the save thread, so drawing the
+                        figure does not block the caller either.
+
+        @return concurrent.futures.Future: future of the save job. Its result is the path of the
+                                           saved file, or -1 if saving failed. sigSaveFinished
+                                           is emitted with the future and this result when the
+                                           job is done.
+
+        The data arrays and parameters are copied when the job is queued, so the caller can
+        continue to modify them. The active POI name, the additional parameters and the
+        timestamp are taken at that time as well. The jobs are processed one after the other
+        in a single save thread.
+        """
+        if module_name is None:
+            module_name = self._get_caller_module_name()
+
+        if timestamp is None:
+            timestamp = datetime.datetime.now()
+        # snapshot of the data, keeping the order of the keys
+        data_copy = OrderedDict()
+        for key, value in data.items():
+            data_copy[key] = np.array(netobtain(value), copy=True)
+        parameters = copy.deepcopy(netobtain(parameters))
+        additional_parameters = copy.deepcopy(self._additional_parameters)
+
+        with self._save_queue_lock:
+            if self._save_executor is None:
+                self._save_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            future = self._save_executor.submit(
+                self._run_save_job, data_copy, module_name, self.active_poi_name,
+                additional_parameters, filepath=filepath, parameters=parameters,
+                filename=filename, filelabel=filelabel, timestamp=timestamp, filetype=filetype,
+                fmt=fmt, delimiter=delimiter, plotfig=plotfig, append=append)
+        future.add_done_callback(self._save_job_done)
+        return future
+
+    @staticmethod
+    def _get_caller_module_name(depth=2):
+        """ Get the name of the module the caller of a save method is defined in.
+
+        @param int depth: number of frames between this method and the caller, 2 for a direct
+                          call from the public save method
+
+        @return str: the last part of the module name, e.g. 'confocal_logic', or 'UNSPECIFIED'
+                     if the caller has no module (such as when calling this from the console).
+
+        Only looks at the global namespace of the calling frame. inspect.stack() would build the
+        frame info of the whole stack and read the source lines from disk on every save.
+        """
+        try:
+            name = sys._getframe(depth).f_globals['__name__']
+        except (AttributeError, KeyError, ValueError):
+            return 'UNSPECIFIED'
+        if not name or name == '__main__':
+            return 'UNSPECIFIED'
+        return name.split('.')[-1]
+
+    def wait_for_saves(self, timeout=None):
+        """ Block until all queued save jobs are done.
+
+        @param float timeout: optional, maximum time to wait in seconds
+
+        @return bool: True if all jobs are done, False if the timeout expired
+        """
+        with self._save_queue_lock:
+            if self._save_executor is None:
+                return True
+            # the single save thread processes the jobs in order, so the marker job finishes last
+            marker = self._save_executor.submit(lambda: None)
+        done, _ = concurrent.futures.wait([marker], timeout=timeout)
+        return len(done) == 1
+
+    def _run_save_job(self, data, module_name, poi_name, additional_parameters, plotfig=None,
+                      **kwargs):
+        """ Save a queued job in the save thread.
+        """
+        try:
+            if plotfig is not None and not isinstance(plotfig, Figure):
+                plotfig = plotfig()
+            return self._save_data(data, module_name, poi_name, additional_parameters,
+                                   plotfig=plotfig, **kwargs)
+        except:
+            self.log.exception('Saving data of module {0} in the background failed.'
+                               ''.format(module_name))
+            return -1
+
+    def _save_job_done(self, future):
+        """ Announce a finished save job. Called in the save thread.
+        """
+        result = -1 if future.cancelled() or future.exception() is not None else future.result()
+        self.sigSaveFinished.emit(future, result)
+
+    def _save_data(self, data, module_name, poi_name, additional_parameters, filepath=None,
+                   parameters=None, filename=None, filelabel=None, timestamp=None,
+                   filetype='text', fmt='%.15e', delimiter='\t', plotfig=None, append=False):
+        """ Save data for a given module, see save_data.
+
+        @param str module_name: name of the calling module, used for the directory and file label
+        @param str poi_name: name of the active POI, empty string if none
+        @param dict additional_parameters: additional parameters added to the parameters
+
+        @return str: path of the saved file, -1 if saving failed
+        """
         start_time = time.time()
         # Create timestamp if none is present
         if timestamp is None:
@@ -354,6 +573,9 @@ class SaveLogic(GenericLogic):
                     return -1
 
             # determine dimensions
+            if filetype == 'hdf5':
+                # HDF5 datasets have no restrictions on the dimensions
+                continue
             if data[keyname].ndim < 3:
                 length = data[keyname].shape[0]
                 arr_length.append(length)
@@ -377,6 +599,8 @@ class SaveLogic(GenericLogic):
                     multiple_dtypes = True
             arr_dtype.append(data[keyname].dtype)
 
+        shapes = OrderedDict((keyname, data[keyname].shape) for keyname in data)
+
         # Raise error if data contains a mixture of 1D and 2D arrays
         if found_2d and found_1d:
             self.log.error('Passed data dictionary contains 1D AND 2D arrays. This is not allowed. '
@@ -384,18 +608,6 @@ class SaveLogic(GenericLogic):
                            'arrays only. Saving data failed!')
             return -1
 
-        # try to trace back the functioncall to the class which was calling it.
-        try:
-            frm = inspect.stack()[1]
-            # this will get the object, which called the save_data function.
-            mod = inspect.getmodule(frm[0])
-            # that will extract the name of the class.
-            module_name = mod.__name__.split('.')[-1]
-        except:
-            # Sometimes it is not possible to get the object which called the save_data function
-            # (such as when calling this from the console).
-            module_name = 'UNSPECIFIED'
-
         # determine proper file path
         if filepath is None:
             filepath = self.get_path_for_module(module_name)
@@ -407,15 +619,16 @@ class SaveLogic(GenericLogic):
         # create filelabel if none has been passed
         if filelabel is None:
             filelabel = module_name
-        if self.active_poi_name != '':
-            filelabel = self.active_poi_name.replace(' ', '_') + '_' + filelabel
+        if poi_name != '':
+            filelabel = poi_name.replace(' ', '_') + '_' + filelabel
 
         # determine proper unique filename to save if none has been passed
         if filename is None:
-            filename = timestamp.strftime('%Y%m%d-%H%M-%S' + '_' + filelabel + '.dat')
+            extension = '.h5' if filetype == 'hdf5' else '.dat'
+            filename = timestamp.strftime('%Y%m%d-%H%M-%S' + '_' + filelabel + extension)
 
         # Check format specifier.
-        if not isinstance(fmt, str) and len(fmt) != len(data):
+        if filetype != 'hdf5' and not isinstance(fmt, str) and len(fmt) != len(data):
             self.log.error('Length of list of format specifiers and number of data items differs. '
                            'Saving not possible. Please pass exactly as many format specifiers as '
                            'data arrays.')
@@ -426,14 +639,14 @@ class SaveLogic(GenericLogic):
                  ''.format(module_name, timestamp.strftime('%d.%m.%Y at %Hh%Mm%Ss'))
         header += '\nParameters:\n===========\n\n'
         # Include the active POI name (if not empty) as a parameter in the header
-        if self.active_poi_name != '':
-            header += 'Measured at POI: {0}\n'.format(self.active_poi_name)
+        if poi_name != '':
+            header += 'Measured at POI: {0}\n'.format(poi_name)
         # add the parameters if specified:
         if parameters is not None:
             # check whether the format for the parameters have a dict type:
             if isinstance(parameters, dict):
-                if isinstance(self._additional_parameters, dict):
-                    parameters = {**self._additional_parameters, **parameters}
+                if isinstance(additional_parameters, dict):
+                    parameters = {**additional_parameters, **parameters}
                 for entry, param in parameters.items():
                     if isinstance(param, float):
                         header += '{0}: {1:.16e}\n'.format(entry, param)
@@ -498,6 +711,21 @@ class SaveLogic(GenericLogic):
             self.save_array_as_text(data=[], filename=filename[:-4]+'_params.dat', filepath=filepath,
                                     fmt=fmt, header=header, delimiter=delimiter, comments='#',
                                     append=False)
+        # write HDF5 file with the parameters as attributes
+        elif filetype == 'hdf5':
+            if parameters is not None and not isinstance(parameters, dict):
+                parameters = {'not specified parameters': parameters}
+            elif isinstance(additional_parameters, dict):
+                parameters = {**additional_parameters, **(parameters or dict())}
+            attributes = {'module': module_name,
+                          'timestamp': timestamp.isoformat(),
+                          'poi': poi_name}
+            hdf5_group = self.save_hdf5(data, filename, filepath, parameters=parameters,
+                                        attributes=attributes,
+                                        group_name=timestamp.strftime('%Y%m%d-%H%M-%S'),
+                                        append=append)
+            if hdf5_group is None:
+                return -1
         else:
             self.log.error('Only saving of data as textfile and npz-file is implemented. Filetype "{0}" is not '
                            'supported yet. Saving as textfile.'.format(filetype))
@@ -515,6 +743,7 @@ class SaveLogic(GenericLogic):
             metadata['Subject'] = 'Find more information on: https://github.com/Ulm-IQO/qudi'
             metadata['Keywords'] = 'Python 3, Qt, experiment control, automation, measurement, software, framework, modular'
             metadata['Producer'] = 'qudi - Software Suite'
+            fig_basename = os.path.splitext(os.path.join(filepath, filename))[0]
             if timestamp is not None:
                 metadata['CreationDate'] = timestamp
                 metadata['ModDate'] = timestamp
@@ -524,7 +753,7 @@ class SaveLogic(GenericLogic):
             
             if self.save_pdf:
                 # determine the PDF-Filename
-                fig_fname_vector = os.path.join(filepath, filename)[:-4] + '_fig.pdf'
+                fig_fname_vector = fig_basename + '_fig.pdf'
 
                 # Create the PdfPages object to which we will save the pages:
                 # The with statement makes sure that the PdfPages object is closed properly at
@@ -539,7 +768,7 @@ class SaveLogic(GenericLogic):
 
             if self.save_png:
                 # determine the PNG-Filename and save the plain PNG
-                fig_fname_image = os.path.join(filepath, filename)[:-4] + '_fig.png'
+                fig_fname_image = fig_basename + '_fig.png'
                 plotfig.savefig(fig_fname_image, bbox_inches='tight', pad_inches=0.05)
 
                 # Use Pillow (an fork for PIL) to attach metadata to the PNG
@@ -566,23 +795,163 @@ class SaveLogic(GenericLogic):
             self.log.debug('Time needed to save data: {0:.2f}s'.format(time.time()-start_time))
             #----------------------------------------------------------------------------------
 
+        if filetype == 'npz':
+            saved_path = os.path.join(filepath, filename[:-4] + '.npz')
+        else:
+            saved_path = os.path.join(filepath, filename)
+        if self._catalogue is not None:
+            if not isinstance(parameters, dict):
+                parameters = dict() if parameters is None else {'not specified parameters':
+                                                                    parameters}
+            if isinstance(additional_parameters, dict):
+                parameters = {**additional_parameters, **parameters}
+            try:
+                self._catalogue.add(saved_path, module_name, timestamp, poi=poi_name,
+                                    filetype=filetype if filetype in ('npz', 'hdf5') else 'text',
+                                    parameters=parameters, shapes=shapes,
+                                    group=hdf5_group if filetype == 'hdf5' else '')
+            except Exception:
+                self.log.exception('Could not add "{0}" to the data catalogue.'.format(saved_path))
+        return saved_path
+
     def save_array_as_text(self, data, filename, filepath='', fmt='%.15e', header='',
                            delimiter='\t', comments='#', append=False):
         """
         An Independent method, which can save a 1D or 2D numpy.ndarray as textfile.
         Can append to files.
+
+        The output is the same as of numpy.savetxt, but numeric arrays are formatted and written
+        in blocks of rows, see savetxt_fast.
         """
         # write to file. Append if requested.
-        if append:
-            with open(os.path.join(filepath, filename), 'ab') as file:
-                np.savetxt(file, data, fmt=fmt, delimiter=delimiter, header=header,
-                           comments=comments)
-        else:
-            with open(os.path.join(filepath, filename), 'wb') as file:
-                np.savetxt(file, data, fmt=fmt, delimiter=delimiter, header=header,
-                           comments=comments)
+        with open(os.path.join(filepath, filename), 'ab' if append else 'wb') as file:
+            savetxt_fast(file, data, fmt=fmt, delimiter=delimiter, header=header,
+                         comments=comments)
         return
 
+    def save_hdf5(self, data, filename, filepath='', parameters=None, attributes=None,
+                  group_name=None, append=False):
+        """
+        Save a dictionary of arrays as datasets of a group in a HDF5 file.
+
+        @param dict data: the arrays to save, the keys are used as dataset names. A '/' in a key
+                          is replaced by '_', the original key is kept in the dataset attribute
+                          'label'.
+        @param str filename: name of the file
+        @param str filepath: optional, directory of the file
+        @param dict parameters: optional, stored as attributes of the group
+        @param dict attributes: optional, further attributes of the group, e.g. the module name
+        @param str group_name: optional, name of the group. Defaults to the current time. An
+                               index is appended if the group exists already.
+        @param bool append: optional, add the group to an existing file instead of overwriting it
+
+        @return str: name of the group the data was saved in, None if saving failed
+
+        Numeric arrays are stored as chunked datasets compressed with gzip and shuffle filter,
+        string arrays as variable length strings. Attribute values, which HDF5 can not store, are
+        converted into strings.
+        """
+        if h5py is None:
+            self.log.error('Saving in HDF5 files needs the python package h5py. Please install '
+                           'it, e.g. with "conda install h5py".')
+            return None
+        if group_name is None:
+            group_name = datetime.datetime.now().strftime('%Y%m%d-%H%M-%S')
+
+        with h5py.File(os.path.join(filepath, filename), 'a' if append else 'w') as file:
+            unique_name = group_name
+            index = 1
+            while unique_name in file:
+                unique_name = '{0}_{1:d}'.format(group_name, index)
+                index += 1
+            group = file.create_group(unique_name)
+            for attributes_dict in (attributes, parameters):
+                if attributes_dict is None:
+                    continue
+                for key, value in attributes_dict.items():
+                    group.attrs[str(key)] = self._hdf5_attribute(netobtain(value))
+
+            for key, value in data.items():
+                array = np.asarray(netobtain(value))
+                name = str(key).replace('/', '_')
+                if array.dtype.kind == 'U' or array.dtype.kind == 'O':
+                    dataset = group.create_dataset(
+                        name, data=array.astype(object),
+                        dtype=h5py.special_dtype(vlen=str))
+                elif array.ndim == 0 or array.size == 0:
+                    dataset = group.create_dataset(name, data=array)
+                else:
+                    dataset = group.create_dataset(name, data=array, chunks=True,
+                                                   compression='gzip', compression_opts=4,
+                                                   shuffle=True)
+                dataset.attrs['label'] = str(key)
+            # the latest group is the default for readers of the file
+            file.attrs['latest'] = unique_name
+        return unique_name
+
+    @staticmethod
+    def _hdf5_attribute(value):
+        """ Convert a parameter into a value HDF5 can store as attribute.
+
+        @param value: the parameter
+
+        @return: the value if it is a number, string or numeric array, else its string
+                 representation
+        """
+        if isinstance(value, (str, bytes, bool, int, float, complex, np.number, np.bool_)):
+            return value
+        if isinstance(value, (list, tuple, np.ndarray)):
+            array = np.asarray(value)
+            if array.dtype.kind in 'biufc':
+                return array
+        return str(value)
+
+    @property
+    def catalogue(self):
+        """ The DataCatalogue of the saved data or None if it is disabled in the config.
+
+        Example from the jupyter notebook:
+
+            entries = savelogic.catalogue.query(module='odmr_logic', poi='NV1', since='2019-05-01')
+            counts = entries[-1].data
+        """
+        return self._catalogue
+
+    def query_data(self, module=None, poi=None, since=None, until=None, path_contains=None,
+                   **parameters):
+        """ Find saved data in the data catalogue, see DataCatalogue.query.
+
+        @param str module: optional, name of the module, which saved the data
+        @param str poi: optional, name of the POI
+        @param since: optional, datetime, date or ISO string of the earliest measurement
+        @param until: optional, datetime, date or ISO string of the latest measurement
+        @param str path_contains: optional, part of the file path, e.g. a file label
+        @param parameters: optional, parameter values the entries must have
+
+        @return list: CatalogueEntry objects sorted by timestamp, their data is loaded on access
+        """
+        if self._catalogue is None:
+            self.log.error('The data catalogue is disabled in the config of the SaveLogic.')
+            return list()
+        return self._catalogue.query(module=module, poi=poi, since=since, until=until,
+                                     path_contains=path_contains, **parameters)
+
+    def index_data_directory(self, directory=None):
+        """ Add text files saved before the data catalogue existed to the catalogue.
+
+        @param str directory: optional, directory tree to index. Default is the data directory.
+
+        @return int: number of added files, -1 on error
+        """
+        if self._catalogue is None:
+            self.log.error('The data catalogue is disabled in the config of the SaveLogic.')
+            return -1
+        if directory is None:
+            directory = self.data_dir
+        added = self._catalogue.index_directory(directory)
+        self.log.info('Added {0} files in "{1}" to the data catalogue.'.format(added, directory))
+        return added
+
     def get_daily_directory(self):
         """ Gets or creates daily save directory.
 
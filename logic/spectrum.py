@@ -94,6 +94,7 @@ class SpectrumLogic(GenericLogic):
         self._save_logic = self.savelogic()
 
         self.sig_next_diff_loop.connect(self._loop_differential_spectrum)
+        self.fc.sigAsyncFitFinished.connect(self._fit_finished, QtCore.Qt.QueuedConnection)
         self.sig_specdata_updated.emit()
 
     def on_deactivate(self):
@@ -101,6 +102,8 @@ class SpectrumLogic(GenericLogic):
         """
         if self.module_state() != 'idle' and self.module_state() != 'deactivated':
             pass
+        self.fc.cancel_async_fit()
+        self.fc.sigAsyncFitFinished.disconnect(self._fit_finished)
 
     @fc.constructor
     def sv_set_fits(self, val):
@@ -392,6 +395,32 @@ class SpectrumLogic(GenericLogic):
 
         @param array y_data: intensity data for spectrum.
         """
+        x_data, y_data = self._prepare_fit(fit_function, x_data, y_data)
+        fit_x, fit_y, result = self.fc.do_fit(x_data, y_data)
+        self._fit_finished(fit_x, fit_y, result)
+        return
+
+    def do_fit_async(self, fit_function=None, x_data=None, y_data=None):
+        """
+        Start the fit of do_fit in the worker pool of the fit logic.
+
+        @param string fit_function: The name of one of the defined fit functions.
+
+        @param array x_data: wavelength data for spectrum.
+
+        @param array y_data: intensity data for spectrum.
+
+        spectrum_fit_updated_Signal is emitted when the fit is finished.
+        """
+        x_data, y_data = self._prepare_fit(fit_function, x_data, y_data)
+        self.fc.do_fit_async(x_data, y_data)
+        return
+
+    def _prepare_fit(self, fit_function, x_data, y_data):
+        """ Set the fit function and select the data to fit within the fit domain.
+
+        @return tuple: x and y data of the fit
+        """
         if (x_data is None) or (y_data is None):
             x_data = self.spectrum_data[0]
             y_data = self.spectrum_data[1]
@@ -411,9 +440,12 @@ class SpectrumLogic(GenericLogic):
                     self.log.warning('Fit function "{0}" not available in Spectrum logic '
                                      'fit container.'.format(fit_function)
                                      )
+        return x_data, y_data
 
-        spectrum_fit_x, spectrum_fit_y, result = self.fc.do_fit(x_data, y_data)
-
+    @QtCore.Slot(object, object, object)
+    def _fit_finished(self, spectrum_fit_x, spectrum_fit_y, result):
+        """ Store the fit data and publish the fit result.
+        """
         self.spectrum_fit = np.array([spectrum_fit_x, spectrum_fit_y])
 
         if result is None:
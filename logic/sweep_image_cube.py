@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains the Qudi helper class for accumulating the camera images of ODMR frequency
+sweeps out of core in a memory-mapped file.
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import tempfile
+import zipfile
+import numpy as np
+
+
+class SweepImageCube:
+    """
+    Accumulation cube for the images of camera based ODMR sweeps.
+
+    The cube has the shape (frequencies, height, width) and holds the sum of the difference
+    images (signal - reference) of all sweeps. It lives in a memory-mapped temporary file, so the
+    size of the cube is not limited by the available RAM. The file is deleted by the operating
+    system as soon as it is closed and no longer mapped. Optionally the images are binned into
+    superpixels before they are added, which reduces the size of the cube by binning**2.
+
+    The difference frames are computed blockwise into a preallocated work buffer directly from
+    the frames returned by the camera, so adding a sweep does not allocate memory of the size of
+    the camera sequence.
+    """
+
+    # supported accumulation data types
+    dtypes = {'float32': np.float32, 'float64': np.float64, 'int32': np.int32}
+
+    def __init__(self, num_frequencies, image_shape, dtype='float32', binning=1, directory=None,
+                 block_size=16):
+        """
+        @param int num_frequencies: number of frequency steps per sweep
+        @param tuple image_shape: (height, width) of the camera images
+        @param str dtype: data type of the accumulated sums, one of 'float32', 'float64', 'int32'
+        @param int binning: number of pixels along each image axis combined into one superpixel.
+                            Pixels at the border not filling a whole superpixel are discarded.
+        @param str directory: optional, directory of the memory-mapped files. Defaults to the
+                              temporary directory of the system.
+        @param int block_size: number of frequency steps processed at once
+        """
+        if dtype not in self.dtypes:
+            raise ValueError('Data type "{0}" not supported for sweep image cube. Use one of '
+                             '{1}.'.format(dtype, list(self.dtypes)))
+        self.dtype = np.dtype(self.dtypes[dtype])
+        self.binning = max(1, int(binning))
+        self.block_size = max(1, int(block_size))
+        self.num_frequencies = int(num_frequencies)
+        self.image_shape = (int(image_shape[0]), int(image_shape[1]))
+        # The part of the camera image used for the cube
+        self._crop_shape = (self.image_shape[0] // self.binning * self.binning,
+                            self.image_shape[1] // self.binning * self.binning)
+        self.shape = (self.num_frequencies,
+                      self.image_shape[0] // self.binning,
+                      self.image_shape[1] // self.binning)
+        self.sweeps = 0
+        self.directory = directory
+
+        self.data = self._temporary_memmap(self.shape, self.dtype)
+        self._diff_buffer = np.empty((self.block_size, *self._crop_shape), dtype=self.dtype)
+        if self.binning > 1:
+            self._bin_buffer = np.empty((self.block_size, *self.shape[1:]), dtype=self.dtype)
+        else:
+            self._bin_buffer = None
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes if self.data is not None else 0
+
+    def _temporary_memmap(self, shape, dtype):
+        """ Create a zero-initialised array in an anonymous temporary file.
+
+        The file has no name on POSIX systems and is opened with delete-on-close on Windows, so it
+        disappears when the last view of the memory map is released, even if views are still
+        referenced when the cube is closed.
+
+        @param tuple shape: shape of the array
+        @param dtype: data type of the array
+
+        @return numpy.memmap: memory-mapped array
+        """
+        with tempfile.TemporaryFile(prefix='qudi_sweep_images_', dir=self.directory) as file:
+            # the memory map keeps its own handle of the file
+            return np.memmap(file, dtype=dtype, mode='w+', shape=shape)
+
+    def close(self):
+        """ Release the memory map. The backing file is deleted once no view of it is left.
+        """
+        self.data = None
+
+    def clear(self):
+        """ Set all accumulated sums to zero.
+        """
+        for start in range(0, self.num_frequencies, self.block_size):
+            self.data[start:start + self.block_size] = 0
+        self.sweeps = 0
+
+    def add_sweep(self, frames, reference_offset=None):
+        """ Add the difference images of one sweep to the cube.
+
+        @param numpy.ndarray frames: camera frames with shape (2 * frequencies, height, width).
+                                     Even frames are the reference (microwave off) images, odd
+                                     frames the signal images.
+        @param float reference_offset: optional, if given this constant is subtracted from the
+                                       signal images instead of the reference images.
+
+        @return numpy.ndarray: 1D array with the mean of each difference image
+        """
+        height, width = self._crop_shape
+        signal = frames[1::2, :height, :width]
+        reference = frames[0::2, :height, :width]
+        if signal.shape[0] != self.num_frequencies:
+            raise ValueError('Number of signal frames ({0:d}) does not match number of frequency '
+                             'steps ({1:d}).'.format(signal.shape[0], self.num_frequencies))
+
+        mean_counts = np.empty(self.num_frequencies)
+        for start in range(0, self.num_frequencies, self.block_size):
+            stop = min(start + self.block_size, self.num_frequencies)
+            diff = self._diff_buffer[:stop - start]
+            if reference_offset is None:
+                np.subtract(signal[start:stop], reference[start:stop], out=diff,
+                            dtype=self.dtype, casting='unsafe')
+            else:
+                np.subtract(signal[start:stop], reference_offset, out=diff, dtype=self.dtype,
+                            casting='unsafe')
+            mean_counts[start:stop] = np.mean(diff, axis=(1, 2), dtype=np.float64)
+
+            if self._bin_buffer is not None:
+                binned = self._bin_buffer[:stop - start]
+                diff.reshape(stop - start, self.shape[1], self.binning, self.shape[2],
+                             self.binning).sum(axis=(2, 4), out=binned)
+                self.data[start:stop] += binned
+            else:
+                self.data[start:stop] += diff
+        self.sweeps += 1
+        return mean_counts
+
+    def mean_images(self, dtype=np.float64, binning=1):
+        """ Return the accumulated images divided by the number of sweeps.
+
+        The mean is computed blockwise into a memory-mapped temporary file like the cube itself,
+        so the full cube is never held in memory.
+
+        @param dtype: data type of the returned array
+        @param int binning: optional, number of pixels along each image axis averaged into one
+                            superpixel. Pixels at the border not filling a whole superpixel are
+                            discarded.
+
+        @return numpy.memmap: mean difference images with shape
+                              (frequencies, height // binning, width // binning)
+        """
+        binning = max(1, int(binning))
+        height, width = self.shape[1] // binning, self.shape[2] // binning
+        mean = self._temporary_memmap((self.num_frequencies, height, width), dtype)
+        divisor = max(self.sweeps, 1) * binning ** 2
+        for start in range(0, self.num_frequencies, self.block_size):
+            block = self.data[start:start + self.block_size, :height * binning, :width * binning]
+            if binning > 1:
+                block = block.reshape(block.shape[0], height, binning, width, binning).sum(
+                    axis=(2, 4), dtype=np.float64)
+            np.divide(block, divisor, out=mean[start:start + self.block_size], casting='unsafe')
+        return mean
+
+    def save_npz(self, filename, key='sweep_images', dtype=np.uint16):
+        """ Stream the mean images blockwise into a compressed .npz file.
+
+        The resulting file can be loaded with np.load(filename)[key] like a file written by
+        np.savez_compressed, but the full cube is never held in memory.
+
+        @param str filename: path of the file to write. The extension .npz is appended if missing.
+        @param str key: name of the array within the .npz archive
+        @param dtype: data type of the stored mean images
+
+        @return str: path of the written file
+        """
+        if not filename.endswith('.npz'):
+            filename += '.npz'
+        dtype = np.dtype(dtype)
+        header = {'descr': np.lib.format.dtype_to_descr(dtype),
+                  'fortran_order': False,
+                  'shape': self.shape}
+        divisor = max(self.sweeps, 1)
+        with zipfile.ZipFile(filename, mode='w', compression=zipfile.ZIP_DEFLATED,
+                             allowZip64=True) as archive:
+            with archive.open(key + '.npy', mode='w', force_zip64=True) as entry:
+                np.lib.format.write_array_header_2_0(entry, header)
+                for start in range(0, self.num_frequencies, self.block_size):
+                    block = self.data[start:start + self.block_size] / divisor
+                    entry.write(block.astype(dtype).tobytes())
+        return filename
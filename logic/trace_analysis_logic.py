@@ -27,6 +27,41 @@ from core.connector import Connector
 from logic.generic_logic import GenericLogic
 
 
+def analog_digital_converter(cut_off, data):
+    """ Converts an analog trace into a digital trace.
+
+    @param float cut_off: values greater or equal to cut_off are high
+    @param numpy array data: 1D trace of data
+
+    @return numpy array: 1D integer array with 1 for high and 0 for low values
+    """
+    return (np.asarray(data) >= cut_off).astype(np.int8)
+
+
+def time_in_high_low(digital_trace, dt):
+    """ Calculates the durations of all consecutive runs of 1s and 0s in a digital trace.
+
+    @param numpy array digital_trace: 1D trace of 1s and 0s
+    @param float dt: duration of one data point
+
+    @return numpy array: durations of the runs in the order they occur in the trace, positive for
+                         runs of 1s and negative for runs of 0s. If the trace starts with a 0 and
+                         ends with a 1, the array starts with an additional entry 0.
+                         An empty trace gives an empty array.
+    """
+    digital_trace = np.asarray(digital_trace)
+    if digital_trace.size == 0:
+        return np.zeros(0)
+    # indices at which a new run starts
+    run_starts = np.concatenate(
+        ([0], np.flatnonzero(digital_trace[1:] != digital_trace[:-1]) + 1))
+    run_lengths = np.diff(np.append(run_starts, digital_trace.size))
+    occurances = np.where(digital_trace[run_starts] == 1, run_lengths, -run_lengths)
+    if digital_trace[0] == 0 and digital_trace[-1] == 1:
+        occurances = np.concatenate(([0], occurances))
+    return occurances * dt
+
+
 class TraceAnalysisLogic(GenericLogic):
     """ Perform a gated counting measurement with the hardware.  """
 
@@ -232,36 +267,27 @@ class TraceAnalysisLogic(GenericLogic):
                       float lifetime_dark: the lifetime in the dark state in s
                       float lifetime_bright: lifetime in the bright state in s
         """
-        no_flip = 0.0
+        trace = np.asarray(trace)
+        # state of each data point and of the data point following it
+        high = trace[:-1] > threshold
+        next_high = trace[1:] > threshold
+        low = trace[:-1] < threshold
+        next_low = trace[1:] < threshold
 
         if analyze_mode == 'full':
-            for ii in range(len(trace) - 1):
-                if trace[ii] > threshold and trace[ii + 1] > threshold:
-                    no_flip = no_flip + 1
-
-                elif trace[ii] < threshold and trace[ii + 1] < threshold:
-                    no_flip = no_flip + 1
-
+            no_flip = float(np.count_nonzero(high & next_high) + np.count_nonzero(low & next_low))
             probability = 1.0 - (no_flip / len(trace))
             lost_events = 0.0
 
         if analyze_mode == 'dark':
-            dark_counter = 0.0
-            for ii in range(len(trace) - 1):
-                if trace[ii] < threshold:
-                    dark_counter = dark_counter + 1
-                    if trace[ii + 1] < threshold:
-                        no_flip = no_flip + 1
+            dark_counter = float(np.count_nonzero(low))
+            no_flip = float(np.count_nonzero(low & next_low))
             probability = 1.0 - (no_flip / dark_counter)
             lost_events = (1.0 - (dark_counter / len(trace))) * 100
 
         if analyze_mode == 'bright':
-            bright_counter = 0.0
-            for ii in range(len(trace) - 1):
-                if trace[ii] > threshold:
-                    bright_counter = bright_counter + 1
-                    if trace[ii + 1] > threshold:
-                        no_flip = no_flip + 1
+            bright_counter = float(np.count_nonzero(high))
+            no_flip = float(np.count_nonzero(high & next_high))
             probability = 1.0 - (no_flip / bright_counter)
             lost_events = (1.0 - (bright_counter / len(trace))) * 100
 
@@ -284,35 +310,7 @@ class TraceAnalysisLogic(GenericLogic):
         """
         init_threshold = init_threshold if init_threshold is not None else [1, 1]
         ana_threshold = ana_threshold if ana_threshold is not None else [1, 1]
-        no_flip = 0.0
-        flip = 0.0
-
-        # find all indices in the trace-array, where the value is above init_threshold[1]
-        init_high = np.where(trace[:-1] > init_threshold[1])[0]
-        # find all indices in the trace-array, where the value is below init_threshold[0]
-        init_low = np.where(trace[:-1] < init_threshold[0])[0]
-        # find all indices in the trace-array, where the value is above ana_threshold[1]
-        ana_high = np.where(trace > ana_threshold[1])[0]
-        # find all indices in the trace-array, where the value is below ana_threshold[0]
-        ana_low = np.where(trace < ana_threshold[0])[0]
-
-        if analyze_mode == 'bright' or analyze_mode == 'full':
-            # analyze the trace where the data were the nuclear was initalized into one direction
-            for index in init_high:
-                # check if the following data point is in the analysis array
-                if index + 1 in ana_high:
-                    no_flip = no_flip + 1
-                elif index + 1 in ana_low:
-                    flip = flip + 1
-
-        if analyze_mode == 'dark' or analyze_mode == 'full':
-            # repeat the same if the nucleus was initalized into the other array
-            for index in init_low:
-                # check if the following data point is in the analysis array
-                if index + 1 in ana_high:
-                    flip = flip + 1
-                elif index + 1 in ana_low:
-                    no_flip = no_flip + 1
+        flip, no_flip = self._count_flips(trace, init_threshold, ana_threshold, analyze_mode)
 
         # the flip probability is given by the number of flips divided by the total number of analyzed data points
         if (flip + no_flip) == 0:
@@ -324,6 +322,38 @@ class TraceAnalysisLogic(GenericLogic):
 
         return probability, lost_events
 
+    def _count_flips(self, trace, init_threshold, ana_threshold, analyze_mode='full'):
+        """ Counts how often a data point after an initialisation changed its state.
+
+        @param np.array trace: 1D trace of data
+        @param list init_threshold: [low, high] thresholds, a data point below low (above high)
+                                    initialises the dark (bright) state
+        @param list ana_threshold: [low, high] thresholds, the data point following an
+                                   initialisation is analysed as dark below low and as bright
+                                   above high
+        @param str analyze_mode: 'full', 'bright' or 'dark', which initialisations are analysed
+
+        @return tuple(float, float): number of flips and number of data points without flip
+        """
+        trace = np.asarray(trace)
+        init_high = trace[:-1] > init_threshold[1]
+        init_low = trace[:-1] < init_threshold[0]
+        ana_high = trace[1:] > ana_threshold[1]
+        # a data point counts as bright if it satisfies both analysis thresholds
+        ana_low = (trace[1:] < ana_threshold[0]) & ~ana_high
+
+        no_flip = 0.0
+        flip = 0.0
+        if analyze_mode == 'bright' or analyze_mode == 'full':
+            # analyze the trace where the data were the nuclear was initalized into one direction
+            no_flip += np.count_nonzero(init_high & ana_high)
+            flip += np.count_nonzero(init_high & ana_low)
+        if analyze_mode == 'dark' or analyze_mode == 'full':
+            # repeat the same if the nucleus was initalized into the other array
+            flip += np.count_nonzero(init_low & ana_high)
+            no_flip += np.count_nonzero(init_low & ana_low)
+        return float(flip), float(no_flip)
+
     def analyze_flip_prob4(self, trace, bins=30, init_threshold = None, ana_threshold = None, analyze_mode='full'):
         """
         Method which calculates the histogram, the fidelity and the flip probability of a time trace.
@@ -366,33 +396,7 @@ class TraceAnalysisLogic(GenericLogic):
             self.log.warning('Not enough data points yet!')
 
         # calculate the flip probability
-        no_flip = 0.0
-        flip = 0.0
-        # find all indices in the trace-array, where the value is above init_threshold[1]
-        init_high = np.where(trace[:-1] > init_threshold[1])[0]
-        # find all indices in the trace-array, where the value is below init_threshold[0]
-        init_low = np.where(trace[:-1] < init_threshold[0])[0]
-        # find all indices in the trace-array, where the value is above ana_threshold[1]
-        ana_high = np.where(trace > ana_threshold[1])[0]
-        # find all indices in the trace-array, where the value is below ana_threshold[0]
-        ana_low = np.where(trace < ana_threshold[0])[0]
-
-        if analyze_mode == 'bright' or analyze_mode == 'full':
-            # analyze the trace where the data were the nuclear was initalized into one direction
-            for index in init_high:
-                # check if the following data point is in the analysis array
-                if index + 1 in ana_high:
-                    no_flip = no_flip + 1
-                elif index + 1 in ana_low:
-                    flip = flip + 1
-        if analyze_mode == 'dark' or analyze_mode == 'full':
-            # repeat the same if the nucleus was initalized into the other array
-            for index in init_low:
-                # check if the following data point is in the analysis array
-                if index + 1 in ana_high:
-                    flip = flip + 1
-                elif index + 1 in ana_low:
-                    no_flip = no_flip + 1
+        flip, no_flip = self._count_flips(trace, init_threshold, ana_threshold, analyze_mode)
 
         # the flip probability is given by the number of flips divided by the total number of analyzed data points
         if (flip + no_flip) == 0:
@@ -506,49 +510,7 @@ class TraceAnalysisLogic(GenericLogic):
                                                                                distr='gaussian_normalized')
                 threshold = threshold_fit
 
-            # helper functions to get and analyze the timetrace
-            def analog_digitial_converter(cut_off, data):
-                new_digital_trace = []
-                for data_point in data:
-                    if data_point >= cut_off:
-                        new_digital_trace.append(1)
-                    else:
-                        new_digital_trace.append(0)
-                return new_digital_trace
-
-            def time_in_high_low(raw_digital_trace, local_dt):
-                """
-                What I need this function to do is to get all consecutive {1, ... , n} 1s or 0s and add
-                them up and put into a list to later make a histogram from them.
-                """
-                occurances = []
-                index = 0
-                index2 = 0
-
-                while index < len(raw_digital_trace):
-                    occurances.append(0)
-                    # start following the consecutive 1s
-                    while raw_digital_trace[index] == 1:
-                        occurances[index2] += 1
-                        if index == (len(raw_digital_trace) - 1):
-                            occurances = np.array(occurances)
-                            return occurances * local_dt
-                        else:
-                            index += 1
-                    if raw_digital_trace[index - 1] == 1:
-                        index2 += 1
-                        occurances.append(0)
-                    # start following the consecutive 0s
-                    while raw_digital_trace[index] == 0:
-                        occurances[index2] -= 1
-                        if index == (len(raw_digital_trace) - 1):
-                            occurances = np.array(occurances)
-                            return occurances * local_dt
-                        else:
-                            index += 1
-                    index2 += 1
-
-            digital_trace = analog_digitial_converter(threshold, trace)
+            digital_trace = analog_digital_converter(threshold, trace)
             time_array = time_in_high_low(digital_trace, dt)
 
             # now we need to make a histogram as well as a fit
@@ -558,15 +520,12 @@ class TraceAnalysisLogic(GenericLogic):
             # number of steps in between, rather not use that for now
             # est_bins = np.int(longest/dt)
 
-            time_array_high = np.array([ii for ii in filter(lambda x: x > 0, time_array)])
-            time_array_low = np.array([ii for ii in filter(lambda x: x < 0, time_array)])
+            time_array_high = time_array[time_array > 0]
+            time_array_low = time_array[time_array < 0]
 
             # get lifetime of bright state
             time_hist_high = np.histogram(time_array_high, bins=num_bins)
-            vals = [i for i in filter(lambda x: x[1] > 0, enumerate(time_hist_high[0][0:num_bins]))]
-
-            indices = np.array([val[0] for val in vals])
-            indices = np.array([np.int(indice) for indice in indices])
+            indices = np.flatnonzero(time_hist_high[0][0:num_bins] > 0)
             self.log.debug('threshold {0}'.format(threshold))
             self.log.debug('time_array:{0}'.format(time_array))
             self.log.debug('time_array_high:{0}'.format(time_array_high))
@@ -588,10 +547,8 @@ class TraceAnalysisLogic(GenericLogic):
 
             # get lifetime of dark state
             time_hist_low = np.histogram(time_array_low, bins=num_bins)
-            vals = [i for i in filter(lambda x: x[1] > 0, enumerate(time_hist_low[0][0:num_bins]))]
-            indices = np.array([val[0] for val in vals])
-            indices = np.array([np.int(indice) for indice in indices])
-            values = np.array([val[1] for val in vals])
+            indices = np.flatnonzero(time_hist_low[0][0:num_bins] > 0)
+            values = time_hist_low[0][indices]
             # positive axis
             mirror_axis = -time_hist_low[1][indices]
             result = self._fit_logic.make_decayexponential_fit(mirror_axis,
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of fits with the analytic Jacobian of the model against plain lmfit fits.
+
+Fits noisy synthetic data of every model with analytic Jacobian both ways and compares the
+duration, the number of model evaluations, the fitted parameters and their standard errors.
+
+Usage (from the qudi directory):
+
+    python tools/fit_jacobian_benchmark.py --repetitions 20 --noise 0.05
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from logic.fit_logic import FitMethods
+
+
+def lorentz(x, center, sigma):
+    return sigma**2 / ((x - center)**2 + sigma**2)
+
+
+def gauss(x, center, sigma):
+    return np.exp(-(x - center)**2 / (2 * sigma**2))
+
+
+# fit name, estimator name, x axis, noiseless data
+CASES = [
+    ('lorentzian', 'dip', np.linspace(2.80e9, 2.94e9, 201),
+     lambda x: 1e5 * (1 - 0.2 * lorentz(x, 2.87e9, 5e6))),
+    ('lorentziandouble', 'dip', np.linspace(2.80e9, 2.94e9, 201),
+     lambda x: 1e5 * (1 - 0.2 * lorentz(x, 2.85e9, 4e6) - 0.15 * lorentz(x, 2.89e9, 4e6))),
+    ('lorentziantriple', 'N14', np.linspace(2.862e9, 2.878e9, 301),
+     lambda x: 1e5 * (1 - sum(0.1 * lorentz(x, 2.868e9 + n * 2.15e6, 3e5) for n in range(3)))),
+    ('gaussian', 'peak', np.linspace(-10e-6, 10e-6, 201),
+     lambda x: 2e4 + 1e5 * gauss(x, 1e-6, 1.5e-6)),
+    ('sineexponentialdecay', 'generic', np.linspace(0, 5e-6, 251),
+     lambda x: 0.5 + 0.3 * np.sin(2 * np.pi * 2e6 * x + 0.5) * np.exp(-x / 2e-6)),
+    ('decayexponential', 'generic', np.linspace(0, 1e-3, 201),
+     lambda x: 0.1 + 0.8 * np.exp(-x / 2e-4)),
+    ('hyperbolicsaturation', 'generic', np.linspace(0, 5e-3, 101),
+     lambda x: 2e5 * x / (x + 1e-3) + 1e6 * x + 1e3),
+]
+
+
+def run_fits(methods, fit_name, est_name, x, data_sets, analytic_jacobian):
+    make_fit = getattr(methods, 'make_{0}_fit'.format(fit_name))
+    if est_name == 'generic':
+        estimator = getattr(methods, 'estimate_{0}'.format(fit_name))
+    else:
+        estimator = getattr(methods, 'estimate_{0}_{1}'.format(fit_name, est_name))
+    start = time.perf_counter()
+    results = [make_fit(x_axis=x, data=data, estimator=estimator,
+                        analytic_jacobian=analytic_jacobian)
+               for data in data_sets]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repetitions', type=int, default=20,
+                        help='number of noisy data sets fitted per model')
+    parser.add_argument('--noise', type=float, default=0.05,
+                        help='standard deviation of the gaussian noise relative to the data span')
+    args = parser.parse_args()
+
+    FitMethods.load([os.path.join(os.path.dirname(__file__), '..', 'logic', 'fitmethods')])
+    methods = FitMethods()
+    rng = np.random.RandomState(0)
+
+    print('{0:<22} {1:>10} {2:>10} {3:>8} {4:>10} {5:>10} {6:>14} {7:>14}'.format(
+        'fit', 'lmfit [s]', 'jac [s]', 'speedup', 'nfev lmfit', 'nfev jac', 'max rel. diff',
+        'max err. diff'))
+    for fit_name, est_name, x, func in CASES:
+        clean = func(x)
+        span = np.ptp(clean)
+        data_sets = [clean + rng.normal(0, args.noise * span, x.size)
+                     for _ in range(args.repetitions)]
+        plain, t_plain = run_fits(methods, fit_name, est_name, x, data_sets, False)
+        analytic, t_analytic = run_fits(methods, fit_name, est_name, x, data_sets, True)
+
+        max_diff = 0
+        max_err_diff = 0
+        for plain_result, analytic_result in zip(plain, analytic):
+            for name, param in plain_result.params.items():
+                scale = max(abs(param.value), param.stderr or 0, 1e-300)
+                diff = abs(analytic_result.params[name].value - param.value) / scale
+                max_diff = max(max_diff, diff)
+                if param.stderr and analytic_result.params[name].stderr:
+                    err_diff = abs(analytic_result.params[name].stderr / param.stderr - 1)
+                    max_err_diff = max(max_err_diff, err_diff)
+        print('{0:<22} {1:>10.4f} {2:>10.4f} {3:>8.2f} {4:>10.1f} {5:>10.1f} {6:>14.2e} '
+              '{7:>14.2e}'.format(
+                  fit_name, t_plain, t_analytic, t_plain / max(t_analytic, 1e-9),
+                  np.mean([result.nfev for result in plain]),
+                  np.mean([result.nfev for result in analytic]),
+                  max_diff, max_err_diff))
+
+
+if __name__ == '__main__':
+    main()
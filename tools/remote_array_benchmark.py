@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Throughput benchmark of the transfer of numpy arrays from remote modules over localhost.
+
+Compares rpyc.utils.classic.obtain, which netobtain used for all objects, with the array server
+of the remote module server with and without compression. Noisy count data is used, so the
+compression ratios are realistic for pulsed traces and camera frames.
+
+Usage (from the qudi directory):
+
+    python tools/remote_array_benchmark.py --sizes 1e4 1e6 1e7 --repetitions 5
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.util.array_transport import ArrayClient, ArrayServer, available_compressions
+
+try:
+    import rpyc
+    import rpyc.utils.classic
+    from rpyc.utils.server import ThreadedServer
+except ImportError:
+    rpyc = None
+
+
+def start_rpyc_server():
+    server = ThreadedServer(rpyc.ClassicService, hostname='localhost', port=0,
+                            protocol_config={'allow_all_attrs': True, 'allow_pickle': True})
+    threading.Thread(target=server.start, daemon=True).start()
+    while not server.active:
+        time.sleep(0.01)
+    return server
+
+
+def timed(repetitions, func):
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        result = func()
+    return (time.perf_counter() - start) / repetitions, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e4, 1e6, 1e7],
+                        help='number of int64 elements of the arrays')
+    parser.add_argument('--repetitions', type=int, default=5,
+                        help='number of transfers per size and method')
+    args = parser.parse_args()
+
+    array_server = ArrayServer('localhost', 0)
+    array_server.start()
+    clients = [(str(compression), ArrayClient('localhost', array_server.port, compression))
+               for compression in available_compressions()]
+    if rpyc is not None:
+        rpyc_server = start_rpyc_server()
+        connection = rpyc.classic.connect('localhost', rpyc_server.port)
+    else:
+        print('rpyc not installed, only the array server is measured.')
+
+    print('{0:>10} {1:<14} {2:>12} {3:>12}'.format('elements', 'method', 'time [ms]', 'MB/s'))
+    for size in args.sizes:
+        data = np.random.RandomState(0).poisson(20, int(size)).astype(np.int64)
+        megabytes = data.nbytes / 1e6
+        if rpyc is not None:
+            # the same array in the server process
+            connection.execute('import numpy\n'
+                               'data = numpy.random.RandomState(0).poisson(20, {0:d})'
+                               '.astype(numpy.int64)'.format(data.size))
+            remote = connection.namespace['data']
+            duration, result = timed(args.repetitions,
+                                     lambda: rpyc.utils.classic.obtain(remote))
+            assert np.array_equal(result, data)
+            print('{0:>10d} {1:<14} {2:>12.2f} {3:>12.1f}'.format(
+                data.size, 'rpyc obtain', 1e3 * duration, megabytes / duration))
+        for name, client in clients:
+            duration, result = timed(args.repetitions,
+                                     lambda: client.fetch(array_server.put(data)))
+            assert np.array_equal(result, data)
+            print('{0:>10d} {1:<14} {2:>12.2f} {3:>12.1f}'.format(
+                data.size, 'array ' + name, 1e3 * duration, megabytes / duration))
+
+    for name, client in clients:
+        client.close()
+    array_server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark of the detection of the calling module in SaveLogic.save_data.
+
+Compares the former inspect.stack() based detection with the frame lookup of
+SaveLogic._get_caller_module_name at different call stack depths. Both look up the module of the
+function calling the save method. Run as a script, this module is __main__, which the new lookup
+reports as 'UNSPECIFIED'.
+
+Usage (from the qudi directory):
+
+    python tools/save_caller_benchmark.py --repetitions 2000
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import argparse
+import inspect
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from logic.save_logic import SaveLogic
+
+
+def legacy_module_name():
+    try:
+        frm = inspect.stack()[1]
+        mod = inspect.getmodule(frm[0])
+        return mod.__name__.split('.')[-1]
+    except:
+        return 'UNSPECIFIED'
+
+
+def new_module_name():
+    return SaveLogic._get_caller_module_name()
+
+
+def call_nested(depth, func):
+    """ Call func from depth nested frames, like a save call deep in a Qt call chain. """
+    if depth > 0:
+        return call_nested(depth - 1, func)
+    return func()
+
+
+def timed(repetitions, depth, func):
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        call_nested(depth, func)
+    return (time.perf_counter() - start) / repetitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repetitions', type=int, default=2000,
+                        help='number of calls per stack depth')
+    args = parser.parse_args()
+
+    print('{0:>12} {1:>18} {2:>16} {3:>10}'.format(
+        'stack depth', 'inspect [us]', 'getframe [us]', 'speedup'))
+    for depth in (0, 10, 30, 60):
+        t_old = timed(max(1, args.repetitions // 10), depth, legacy_module_name)
+        t_new = timed(args.repetitions, depth, new_module_name)
+        print('{0:>12d} {1:>18.1f} {2:>16.2f} {3:>10.0f}'.format(
+            depth, 1e6 * t_old, 1e6 * t_new, t_old / t_new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the text output of SaveLogic.save_array_as_text.
+
+Writes a confocal-like image and a long raw trace with numpy.savetxt and with savetxt_fast of the
+save logic into memory, checks that the bytes are identical and compares the durations.
+
+Usage (from the qudi directory):
+
+    python tools/save_text_benchmark.py --image-size 1000 --trace-length 1000000
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from logic.save_logic import savetxt_fast
+
+
+def timed_write(func, data, fmt):
+    buffer = io.BytesIO()
+    start = time.perf_counter()
+    func(buffer, data, fmt=fmt, delimiter='\t', header='Saved Data\nParameters:',
+         comments='#')
+    return buffer.getvalue(), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--image-size', type=int, default=1000,
+                        help='number of pixels along each axis of the image')
+    parser.add_argument('--trace-length', type=int, default=1000000,
+                        help='number of bins of the raw trace')
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    cases = [
+        ('image, %.15e', rng.random_sample((args.image_size, args.image_size)) * 1e5, '%.15e'),
+        ('image, %.6e', rng.random_sample((args.image_size, args.image_size)) * 1e5, '%.6e'),
+        ('raw trace, %d', rng.poisson(3, args.trace_length), '%d'),
+        ('xyz + counts, 4 columns', rng.random_sample((args.trace_length, 4)),
+         ['%.6e', '%.6e', '%.6e', '%.15e']),
+    ]
+
+    print('{0:<26} {1:>14} {2:>14} {3:>10}'.format('data', 'savetxt [s]', 'fast [s]', 'speedup'))
+    for name, data, fmt in cases:
+        old, t_old = timed_write(np.savetxt, data, fmt)
+        new, t_new = timed_write(savetxt_fast, data, fmt)
+        assert old == new, name
+        print('{0:<26} {1:>14.3f} {2:>14.3f} {3:>10.1f}'.format(name, t_old, t_new, t_old / t_new))
+    print('All outputs byte-identical.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the estimators for sums of sines.
+
+Compares the generic estimators, which run one nonlinear sine fit per component, with the
+spectral estimators (suffix _fft and _pencil) on noisy synthetic data. Reports the time spent
+in the estimator and the reduced chi square of the final fit.
+
+Usage (from the qudi directory):
+
+    python tools/sine_estimator_benchmark.py --repetitions 10 --noise 0.1
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from logic.fit_logic import FitMethods
+
+X_AXIS = np.linspace(0, 4e-6, 400)
+FREQUENCIES = (1.2e6, 2.9e6, 4.7e6)
+AMPLITUDES = (0.3, 0.2, 0.12)
+PHASES = (0.4, -1.1, 2.0)
+LIFETIMES = (3e-6, 1.5e-6, 2.5e-6)
+
+# fit name, number of sines, decay: None, common or individual
+CASES = [
+    ('sinedouble', 2, None),
+    ('sinedoublewithexpdecay', 2, 'common'),
+    ('sinedoublewithtwoexpdecay', 2, 'individual'),
+    ('sinetriple', 3, None),
+    ('sinetriplewithexpdecay', 3, 'common'),
+    ('sinetriplewiththreeexpdecay', 3, 'individual'),
+]
+
+
+def make_data(num_sines, decay):
+    data = np.full(X_AXIS.size, 1.0)
+    for index in range(num_sines):
+        if decay is None:
+            envelope = 1.0
+        elif decay == 'common':
+            envelope = np.exp(-X_AXIS / LIFETIMES[0])
+        else:
+            envelope = np.exp(-X_AXIS / LIFETIMES[index])
+        data += envelope * AMPLITUDES[index] * np.sin(
+            2 * np.pi * FREQUENCIES[index] * X_AXIS + PHASES[index])
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repetitions', type=int, default=10,
+                        help='number of noisy data sets per fit')
+    parser.add_argument('--noise', type=float, default=0.1,
+                        help='standard deviation of the gaussian noise relative to the largest '
+                             'amplitude')
+    args = parser.parse_args()
+
+    FitMethods.load([os.path.join(os.path.dirname(__file__), '..', 'logic', 'fitmethods')])
+    methods = FitMethods()
+    rng = np.random.RandomState(0)
+
+    print('{0:<30} {1:<8} {2:>16} {3:>16}'.format(
+        'fit', 'est.', 'estimator [ms]', 'red. chi sqr'))
+    for fit_name, num_sines, decay in CASES:
+        clean = make_data(num_sines, decay)
+        data_sets = [clean + rng.normal(0, args.noise * AMPLITUDES[0], X_AXIS.size)
+                     for _ in range(args.repetitions)]
+        make_model = getattr(methods, 'make_{0}_model'.format(fit_name))
+        make_fit = getattr(methods, 'make_{0}_fit'.format(fit_name))
+        for est_name in ('generic', 'fft', 'pencil'):
+            if est_name == 'generic':
+                estimator = getattr(methods, 'estimate_{0}'.format(fit_name))
+            else:
+                estimator = getattr(methods, 'estimate_{0}_{1}'.format(fit_name, est_name))
+            est_time = 0
+            chi_sqr = list()
+            for data in data_sets:
+                start = time.perf_counter()
+                estimator(X_AXIS, data, make_model()[1])
+                est_time += time.perf_counter() - start
+                result = make_fit(x_axis=X_AXIS, data=data, estimator=estimator)
+                chi_sqr.append(result.redchi)
+            print('{0:<30} {1:<8} {2:>16.2f} {3:>16.3e}'.format(
+                fit_name, est_name, 1e3 * est_time / len(data_sets), np.median(chi_sqr)))
+
+
+if __name__ == '__main__':
+    main()
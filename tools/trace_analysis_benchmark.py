@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the flip probability and lifetime analysis of the TraceAnalysisLogic.
+
+Compares the run-length based implementations of the logic with the previous element by element
+implementations, which are reproduced here, and checks that both give identical results.
+
+Usage (from the qudi directory):
+
+    python tools/trace_analysis_benchmark.py --points 1000000 --legacy-points 20000
+
+The previous implementation of analyze_flip_prob3/4 scales quadratically with the trace length,
+so the legacy implementations are only run on the first legacy-points data points.
+
+Qudi is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Qudi. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright (c) the Qudi Developers. See the COPYRIGHT.txt file at the
+top-level directory of this distribution and at <https://github.com/Ulm-IQO/qudi/>
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from logic.trace_analysis_logic import TraceAnalysisLogic
+from logic.trace_analysis_logic import analog_digital_converter, time_in_high_low
+
+
+class _TraceAnalysis:
+    """ Provides the analysis methods of the TraceAnalysisLogic without a module manager. """
+    log = logging.getLogger(__name__)
+    _count_flips = TraceAnalysisLogic._count_flips
+    analyze_flip_prob2 = TraceAnalysisLogic.analyze_flip_prob2
+    analyze_flip_prob3 = TraceAnalysisLogic.analyze_flip_prob3
+
+
+def legacy_flip_prob2(trace, threshold=1, analyze_mode='full'):
+    no_flip = 0.0
+
+    if analyze_mode == 'full':
+        for ii in range(len(trace) - 1):
+            if trace[ii] > threshold and trace[ii + 1] > threshold:
+                no_flip = no_flip + 1
+            elif trace[ii] < threshold and trace[ii + 1] < threshold:
+                no_flip = no_flip + 1
+        probability = 1.0 - (no_flip / len(trace))
+        lost_events = 0.0
+
+    if analyze_mode == 'dark':
+        dark_counter = 0.0
+        for ii in range(len(trace) - 1):
+            if trace[ii] < threshold:
+                dark_counter = dark_counter + 1
+                if trace[ii + 1] < threshold:
+                    no_flip = no_flip + 1
+        probability = 1.0 - (no_flip / dark_counter)
+        lost_events = (1.0 - (dark_counter / len(trace))) * 100
+
+    if analyze_mode == 'bright':
+        bright_counter = 0.0
+        for ii in range(len(trace) - 1):
+            if trace[ii] > threshold:
+                bright_counter = bright_counter + 1
+                if trace[ii + 1] > threshold:
+                    no_flip = no_flip + 1
+        probability = 1.0 - (no_flip / bright_counter)
+        lost_events = (1.0 - (bright_counter / len(trace))) * 100
+
+    return probability, lost_events
+
+
+def legacy_flip_prob3(trace, init_threshold, ana_threshold, analyze_mode='full'):
+    no_flip = 0.0
+    flip = 0.0
+    init_high = np.where(trace[:-1] > init_threshold[1])[0]
+    init_low = np.where(trace[:-1] < init_threshold[0])[0]
+    ana_high = np.where(trace > ana_threshold[1])[0]
+    ana_low = np.where(trace < ana_threshold[0])[0]
+
+    if analyze_mode == 'bright' or analyze_mode == 'full':
+        for index in init_high:
+            if index + 1 in ana_high:
+                no_flip = no_flip + 1
+            elif index + 1 in ana_low:
+                flip = flip + 1
+
+    if analyze_mode == 'dark' or analyze_mode == 'full':
+        for index in init_low:
+            if index + 1 in ana_high:
+                flip = flip + 1
+            elif index + 1 in ana_low:
+                no_flip = no_flip + 1
+
+    probability = flip / (flip + no_flip)
+    lost_events = len(trace) - (flip + no_flip)
+    return probability, lost_events
+
+
+def legacy_analog_digital_converter(cut_off, data):
+    new_digital_trace = []
+    for data_point in data:
+        if data_point >= cut_off:
+            new_digital_trace.append(1)
+        else:
+            new_digital_trace.append(0)
+    return new_digital_trace
+
+
+def legacy_time_in_high_low(raw_digital_trace, local_dt):
+    occurances = []
+    index = 0
+    index2 = 0
+
+    while index < len(raw_digital_trace):
+        occurances.append(0)
+        while raw_digital_trace[index] == 1:
+            occurances[index2] += 1
+            if index == (len(raw_digital_trace) - 1):
+                occurances = np.array(occurances)
+                return occurances * local_dt
+            else:
+                index += 1
+        if raw_digital_trace[index - 1] == 1:
+            index2 += 1
+            occurances.append(0)
+        while raw_digital_trace[index] == 0:
+            occurances[index2] -= 1
+            if index == (len(raw_digital_trace) - 1):
+                occurances = np.array(occurances)
+                return occurances * local_dt
+            else:
+                index += 1
+        index2 += 1
+
+
+def make_trace(points, flip_prob=0.01, seed=0):
+    """ Simulated single shot readout trace: poissonian counts of a two level system. """
+    rng = np.random.RandomState(seed)
+    flips = rng.random_sample(points) < flip_prob
+    state = np.cumsum(flips) % 2
+    return rng.poisson(np.where(state == 1, 20, 5)).astype(float)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--points', type=int, default=1000000,
+                        help='length of the trace analysed with the new implementation')
+    parser.add_argument('--legacy-points', type=int, default=20000,
+                        help='length of the trace analysed with both implementations')
+    args = parser.parse_args()
+
+    analysis = _TraceAnalysis()
+    trace = make_trace(args.points)
+    short = trace[:args.legacy_points]
+    dt = 1e-3
+
+    rows = list()
+    for mode in ('full', 'dark', 'bright'):
+        old, t_old = timed(legacy_flip_prob2, short, 12, mode)
+        new, t_new = timed(analysis.analyze_flip_prob2, short, 12, mode)
+        assert old == new, (mode, old, new)
+        _, t_full = timed(analysis.analyze_flip_prob2, trace, 12, mode)
+        rows.append(('analyze_flip_prob2 ({0})'.format(mode), t_old, t_new, t_full))
+
+        old, t_old = timed(legacy_flip_prob3, short, [10, 14], [10, 14], mode)
+        new, t_new = timed(analysis.analyze_flip_prob3, short, [10, 14], [10, 14], mode)
+        assert old == new, (mode, old, new)
+        _, t_full = timed(analysis.analyze_flip_prob3, trace, [10, 14], [10, 14], mode)
+        rows.append(('analyze_flip_prob3/4 ({0})'.format(mode), t_old, t_new, t_full))
+
+    old, t_old = timed(
+        lambda: legacy_time_in_high_low(legacy_analog_digital_converter(12, short), dt))
+    new, t_new = timed(lambda: time_in_high_low(analog_digital_converter(12, short), dt))
+    assert np.array_equal(old, new)
+    _, t_full = timed(lambda: time_in_high_low(analog_digital_converter(12, trace), dt))
+    rows.append(('lifetime run lengths', t_old, t_new, t_full))
+
+    print('{0:<30} {1:>14} {2:>14} {3:>10} {4:>18}'.format(
+        'analysis', 'legacy [s]', 'new [s]', 'speedup', 'new, {0:d} pts [s]'.format(args.points)))
+    for name, t_old, t_new, t_full in rows:
+        print('{0:<30} {1:>14.4f} {2:>14.6f} {3:>10.0f} {4:>18.4f}'.format(
+            name, t_old, t_new, t_old / max(t_new, 1e-9), t_full))
+    print('All results identical for {0:d} data points.'.format(len(short)))
+
+
+if __name__ == '__main__':
+    main()